@@ -10,7 +10,12 @@ from app.constants import DATE_FORMAT_FR
 import os
 
 
-def create_app():
+def create_app(demarrer_planificateur=True):
+    """
+    ``demarrer_planificateur=False`` : les threads du planificateur et de la file
+    d'envoi ne sont pas lancés (scripts, préchargement avant fork, voir serveur.py :
+    ils sont démarrés dans chaque worker)
+    """
     app = Flask(__name__)
 
     # Utiliser la configuration de base pour éviter les problèmes de DB
@@ -43,10 +48,11 @@ def create_app():
             return jsonify({'success': False, 'message': 'Session expirée ou non authentifié.'}), 401
         return redirect(url_for('auth.login'))
 
-    from app.models.utilisateur import Utilisateur
     @login_manager.user_loader
     def load_user(user_id):
-        return Utilisateur.query.get(int(user_id))
+        # Identité en cache : pas de SELECT utilisateur à chaque requête
+        from app.services.identite_service import IdentiteService
+        return IdentiteService.charger(int(user_id))
 
     # Importation et enregistrement des blueprints (modules de routes)
     from app.routes import auth
@@ -114,4 +120,38 @@ def create_app():
         from flask import render_template
         return render_template('welcome.html')
 
+    # Fichiers d'audit par rôle : ouverts à la première entrée, écrits en arrière-plan
+    from app.utils.audit_fichiers import init_journaux_audit
+    init_journaux_audit(app)
+
+    # Profilage SQL par requête (Server-Timing, budgets, /admin/performances)
+    from app.utils.profilage_sql import init_profileur_sql
+    init_profileur_sql(app)
+
+    # Métriques Prometheus (latence HTTP, pool, notifications, exports, jauges métier)
+    from app.utils.metriques import init_metriques
+    init_metriques(app)
+
+    # Modèles des emails de notification compilés une fois au démarrage
+    from app.utils.modeles_email import init_modeles_email
+    init_modeles_email(app)
+
+    # Commandes CLI (flask taches ...) et planificateur de tâches périodiques
+    from app.cli import register_cli
+    register_cli(app)
+    if app.config.get('SCHEDULER_ENABLED') and demarrer_planificateur:
+        from app.services.planification_service import PlanificationService
+        PlanificationService.demarrer(app)
+
+    # Worker de la file d'envoi démarré par le processus qui sert l'application
+    # (première requête, ou dès le fork dans serveur.py) : les messages restés en file
+    # repartent sans attendre une nouvelle notification. Les scripts et les commandes
+    # `flask ...`, qui ne servent pas de requêtes, ne lancent pas ce thread.
+    if app.config.get('NOTIFICATION_OUTBOX_WORKER') and demarrer_planificateur:
+        from app.services.outbox_service import OutboxService
+
+        @app.before_request
+        def demarrer_file_envoi():
+            OutboxService.get_worker()
+
     return app  # Retourne l'application Flask prête à l'emploi
\ No newline at end of file
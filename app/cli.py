@@ -0,0 +1,70 @@
+"""
+Commandes Flask CLI de l'application
+    flask --app run taches liste
+    flask --app run taches executer seuils_flotte
+    flask --app run taches worker [--une-fois]
+"""
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.services.planification_service import PlanificationService
+
+
+taches_cli = AppGroup('taches', help='Tâches périodiques (planificateur)')
+
+
+@taches_cli.command('liste')
+def liste_taches():
+    """Affiche les tâches, leur planification et leur dernière exécution"""
+    planificateur = PlanificationService.get_planificateur()
+    planificateur.initialiser()
+    for etat in planificateur.get_etat():
+        click.echo(
+            f"{etat['nom']:<16} {etat['planification']:<20} "
+            f"prochaine={etat.get('prochaine_execution') or '-'} "
+            f"derniere={etat.get('derniere_execution') or '-'} ({etat.get('dernier_statut') or '-'})"
+        )
+
+
+@taches_cli.command('executer')
+@click.argument('nom')
+def executer_tache(nom):
+    """Exécute immédiatement une tâche (sauf si un autre processus l'exécute déjà)"""
+    planificateur = PlanificationService.get_planificateur()
+    if nom not in planificateur.taches:
+        raise click.BadParameter(f"tâche inconnue ({', '.join(planificateur.taches)})", param_hint='NOM')
+    resultat = planificateur.executer(nom)
+    if resultat is None:
+        click.echo(f"{nom} : déjà en cours dans un autre processus")
+    else:
+        click.echo(f"{nom} : {'ok' if resultat else 'échec'}")
+        if not resultat:
+            raise SystemExit(1)
+
+
+@taches_cli.command('worker')
+@click.option('--une-fois', is_flag=True, help='Exécute les tâches dues puis quitte')
+def worker(une_fois):
+    """Exécute les tâches périodiques au premier plan (hors processus web)"""
+    planificateur = PlanificationService.get_planificateur()
+    if une_fois:
+        resultats = planificateur.executer_dues()
+        click.echo(f"{len(resultats)} tâche(s) exécutée(s) : {resultats}")
+        return
+    click.echo(f"Planificateur {planificateur.identifiant} démarré "
+               f"(scrutation toutes les {planificateur.intervalle:g} s)")
+    try:
+        if planificateur.is_alive():
+            # SCHEDULER_ENABLED : le thread est déjà lancé par create_app
+            planificateur.join()
+        else:
+            planificateur.run()
+    except KeyboardInterrupt:
+        planificateur.arreter()
+        current_app.logger.info("Planificateur arrêté")
+
+
+def register_cli(app) -> None:
+    app.cli.add_command(taches_cli)
@@ -8,6 +8,16 @@ from datetime import timedelta
 from .constants import AppConstants
 
 
+def taille_pool(workers: int, threads: int, max_connexions: int, max_overflow: int) -> int:
+    """
+    Connexions du pool de chaque worker : une par thread de requête plus deux pour les
+    threads de fond (file d'envoi, planificateur), bornée pour que
+    workers × (pool_size + max_overflow) reste sous max_connexions
+    """
+    plafond = max_connexions // max(workers, 1) - max_overflow
+    return max(min(threads + 2, plafond), 1)
+
+
 class Config:
     """Configuration de base de l'application Flask"""
 
@@ -32,11 +42,26 @@ class Config:
         warnings.warn("DATABASE_URL non défini! Utilisation de SQLite pour le développement.", RuntimeWarning)
         SQLALCHEMY_DATABASE_URI = 'sqlite:///transport_dev.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Serveur WSGI de production (serveur.py) - workers préforkés, threads par worker
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS') or 2 * (os.cpu_count() or 1) + 1)
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', '4'))
+    WEB_PRELOAD = os.environ.get('WEB_PRELOAD', 'true').lower() in ('1', 'true', 'yes')  # create_app une fois avant le fork
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', '60'))  # Worker bloqué redémarré après (s)
+    WEB_GRACEFUL_TIMEOUT = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', '30'))  # Fin des requêtes en cours au rechargement (s)
+    WEB_MAX_REQUESTS = int(os.environ.get('WEB_MAX_REQUESTS', '2000'))  # Worker recyclé après N requêtes, 0 = jamais
+
+    # Pool de connexions par worker, dérivé de WEB_WORKERS et WEB_THREADS
+    DB_MAX_CONNEXIONS = int(os.environ.get('DB_MAX_CONNEXIONS', '100'))  # Budget de connexions MySQL de l'instance
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '2'))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or
+                       taille_pool(WEB_WORKERS, WEB_THREADS, DB_MAX_CONNEXIONS, DB_MAX_OVERFLOW))
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
         'pool_timeout': 20,
-        'max_overflow': 0
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW
     }
 
     # Session
@@ -54,6 +79,22 @@ class Config:
     CACHE_TYPE = 'simple'
     CACHE_DEFAULT_TIMEOUT = AppConstants.CACHE_TIMEOUT
 
+    # Rapports générés en arrière-plan (PDF) - voir app/services/rapport_job_service.py
+    RAPPORT_JOBS_WORKERS = int(os.environ.get('RAPPORT_JOBS_WORKERS', '2'))  # 0 = exécution immédiate
+    RAPPORT_JOBS_MAX_EN_ATTENTE = int(os.environ.get('RAPPORT_JOBS_MAX_EN_ATTENTE', '20'))
+    RAPPORT_JOBS_TTL = int(os.environ.get('RAPPORT_JOBS_TTL', '3600'))  # Conservation du fichier (s)
+    RAPPORT_JOBS_TIMEOUT = int(os.environ.get('RAPPORT_JOBS_TIMEOUT', '900'))  # Job abandonné après (s)
+    RAPPORT_JOBS_DIR = os.environ.get('RAPPORT_JOBS_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'rapports_cache'
+    )  # Hors du package : dossier instance/ de Flask, ignoré par git
+
+    # Journal d'audit structuré - voir app/utils/audit_store.py
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', '50'))  # Entrées par INSERT
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', '2'))  # Délai max (s), 0 = pas de thread
+    AUDIT_LOG_DIR = os.environ.get('AUDIT_LOG_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'audit'
+    )  # Fichiers par rôle - voir app/utils/audit_fichiers.py
+
     # Pagination
     POSTS_PER_PAGE = AppConstants.DEFAULT_PAGE_SIZE
     MAX_SEARCH_RESULTS = 50
@@ -66,13 +107,67 @@ class Config:
     SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes')
     SMTP_USE_SSL = os.environ.get('SMTP_USE_SSL', 'false').lower() in ('1', 'true', 'yes')
     MAIL_FROM = os.environ.get('MAIL_FROM') or 'elienjine15@gmail.com'
+    SMTP_TIMEOUT = int(os.environ.get('SMTP_TIMEOUT', '10'))  # Délai réseau (s)
+    SMTP_IDLE_TIMEOUT = int(os.environ.get('SMTP_IDLE_TIMEOUT', '60'))  # Session réutilisée si inactive depuis moins (s)
+
+    # File d'envoi des notifications (notification_outbox)
+    NOTIFICATION_OUTBOX_WORKER = os.environ.get('NOTIFICATION_OUTBOX_WORKER', 'true').lower() in ('1', 'true', 'yes')  # false = scripts/outbox_worker.py
+    NOTIFICATION_OUTBOX_POLL = float(os.environ.get('NOTIFICATION_OUTBOX_POLL', '5'))  # Intervalle de scrutation (s)
+    NOTIFICATION_OUTBOX_MAX_TENTATIVES = int(os.environ.get('NOTIFICATION_OUTBOX_MAX_TENTATIVES', '6'))
+    NOTIFICATION_OUTBOX_BACKOFF = int(os.environ.get('NOTIFICATION_OUTBOX_BACKOFF', '60'))  # Délai après le 1er échec (s), doublé ensuite
+    NOTIFICATION_OUTBOX_BACKOFF_MAX = int(os.environ.get('NOTIFICATION_OUTBOX_BACKOFF_MAX', '3600'))
+    NOTIFICATION_DIGEST_ENABLED = os.environ.get('NOTIFICATION_DIGEST_ENABLED', 'false').lower() in ('1', 'true', 'yes')  # Alertes regroupées par destinataire (nécessite le planificateur)
+    NOTIFICATION_DIGEST_FENETRE = int(os.environ.get('NOTIFICATION_DIGEST_FENETRE', '900'))  # Délai max avant envoi du récapitulatif (s)
+    NOTIFICATION_DIGEST_TYPES = os.environ.get(
+        'NOTIFICATION_DIGEST_TYPES',
+        'SEUIL_VIDANGE,SEUIL_CARBURANT,EXPIRATION_DOCUMENT,EXPIRATION_PERMIS,PANNE_DECLAREE'
+    )  # Les pannes de criticité HAUTE restent immédiates
+    NOTIFICATION_DESTINATAIRES_TTL = int(os.environ.get('NOTIFICATION_DESTINATAIRES_TTL', '300'))  # Annuaire des destinataires en cache (s)
+
+    # Identité de l'utilisateur connecté - voir app/services/identite_service.py
+    IDENTITE_CACHE_TTL = int(os.environ.get('IDENTITE_CACHE_TTL', '60'))  # Délai max de prise en compte d'un changement de rôle par les autres workers (s)
+    IDENTITE_CACHE_TAILLE = int(os.environ.get('IDENTITE_CACHE_TAILLE', '1000'))  # Nombre max d'identités en cache par processus
+
+    # Planificateur de tâches périodiques - voir app/services/planification_service.py
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'false').lower() in ('1', 'true', 'yes')  # false = `flask taches worker`
+    SCHEDULER_POLL = float(os.environ.get('SCHEDULER_POLL', '30'))  # Intervalle de scrutation (s)
+    SCHEDULER_GIGUE = int(os.environ.get('SCHEDULER_GIGUE', '60'))  # Décalage aléatoire max des échéances (s)
+    SCHEDULER_SEUILS_INTERVALLE = int(os.environ.get('SCHEDULER_SEUILS_INTERVALLE', '900'))
+    SCHEDULER_EXPIRATIONS_CRON = os.environ.get('SCHEDULER_EXPIRATIONS_CRON', '0 7 * * *')
+    SCHEDULER_ROLLUP_CRON = os.environ.get('SCHEDULER_ROLLUP_CRON', '30 2 * * *')
+    SCHEDULER_ROLLUP_JOURS = int(os.environ.get('SCHEDULER_ROLLUP_JOURS', '2'))  # Jours reconstruits
+    SCHEDULER_PURGE_RAPPORTS_INTERVALLE = int(os.environ.get('SCHEDULER_PURGE_RAPPORTS_INTERVALLE', '3600'))
+    SCHEDULER_DIGEST_INTERVALLE = int(os.environ.get('SCHEDULER_DIGEST_INTERVALLE', '60'))  # Récapitulatifs dus
+
+    # Profilage SQL par requête HTTP - voir app/utils/profilage_sql.py
+    SQL_PROFILER_ENABLED = os.environ.get('SQL_PROFILER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    SQL_PROFILER_SERVER_TIMING = os.environ.get('SQL_PROFILER_SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes')  # En-tête Server-Timing (sessions ADMIN)
+    SQL_PROFILER_BUDGET_REQUETES = int(os.environ.get('SQL_PROFILER_BUDGET_REQUETES', '30'))  # Instructions SQL par requête avant avertissement
+    SQL_PROFILER_BUDGET_DB_MS = int(os.environ.get('SQL_PROFILER_BUDGET_DB_MS', '250'))  # Temps en base par requête avant avertissement (ms)
+    SQL_PROFILER_REQUETE_LENTE_MS = int(os.environ.get('SQL_PROFILER_REQUETE_LENTE_MS', '100'))  # Instruction retenue comme lente (ms)
+    SQL_PROFILER_TOP = int(os.environ.get('SQL_PROFILER_TOP', '20'))  # Instructions lentes conservées
+
+    # Métriques Prometheus (GET /metrics) - voir app/utils/metriques.py
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Jeton Bearer exigé par /metrics (sans jeton : 404)
+    METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', 'false').lower() in ('1', 'true', 'yes')  # /metrics sans jeton (réseau de confiance uniquement)
+
+    # Annuaire Active Directory (ENABLE_LDAP) - voir app/utils/annuaire_ldap.py
+    LDAP_SERVER = os.environ.get('LDAP_SERVER', '')  # ex. ldap://192.168.21.131
+    LDAP_DOMAIN = os.environ.get('LDAP_DOMAIN', '')  # Suffixe UPN du compte de service s'il est donné sans domaine
+    LDAP_BASE_DN = os.environ.get('LDAP_BASE_DN', os.environ.get('BASE_DN', ''))  # Base de recherche des comptes
+    LDAP_SERVICE_USER = os.environ.get('LDAP_SERVICE_USER')  # Compte de service (recherche des groupes)
+    LDAP_SERVICE_PASSWORD = os.environ.get('LDAP_SERVICE_PASSWORD')
+    LDAP_TIMEOUT = float(os.environ.get('LDAP_TIMEOUT', '5'))  # Connexion, réponse et attente du pool (s)
+    LDAP_POOL_TAILLE = int(os.environ.get('LDAP_POOL_TAILLE', '5'))  # Connexions par pool et par processus
+    LDAP_CACHE_TTL = int(os.environ.get('LDAP_CACHE_TTL', '300'))  # Compte et groupes AD en cache (s)
 
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FILE = os.environ.get('LOG_FILE', 'app.log')
 
     # Fonctionnalités
-    ENABLE_LDAP = os.environ.get('ENABLE_LDAP', 'false').lower() in ('1', 'true', 'yes')
+    ENABLE_LDAP = os.environ.get('ENABLE_LDAP', 'false').lower() in ('1', 'true', 'yes')  # Repli MySQL si l'annuaire est indisponible
     ENABLE_EMAIL_NOTIFICATIONS = os.environ.get('ENABLE_EMAIL_NOTIFICATIONS', 'false').lower() in ('1', 'true', 'yes')
     ENABLE_SMS_NOTIFICATIONS = os.environ.get('ENABLE_SMS_NOTIFICATIONS', 'false').lower() in ('1', 'true', 'yes')
 
@@ -183,6 +278,9 @@ class ProductionConfig(Config):
     # Logging en production
     LOG_LEVEL = 'WARNING'
 
+    # Pas d'en-tête Server-Timing en production, sauf activation explicite
+    SQL_PROFILER_SERVER_TIMING = os.environ.get('SQL_PROFILER_SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes')
+
     # Cache Redis en production
     CACHE_TYPE = 'redis' if os.environ.get('REDIS_URL') else 'simple'
     CACHE_REDIS_URL = os.environ.get('REDIS_URL')
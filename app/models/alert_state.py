@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from app.database import db
+
+
+TYPES_ALERTE = ('VIDANGE', 'CARBURANT', 'DOCUMENT', 'PERMIS')
+
+
+def _bus_cle(context) -> int:
+    """bus_udm_id de la ligne insérée, 0 pour une alerte sans bus"""
+    return context.get_current_parameters().get('bus_udm_id') or 0
+
+
+class AlertState(db.Model):
+    """
+    Dernier niveau d'alerte notifié par bus (et par document pour DOCUMENT).
+    PERMIS concerne un chauffeur : bus_udm_id est vide et reference porte chauffeur_id.
+    L'unicité porte sur bus_cle (bus_udm_id, 0 sans bus) : deux NULL ne sont jamais
+    égaux dans un index unique, bus_udm_id seul ne dédoublonnerait pas les permis.
+    Le niveau croît avec la gravité : une alerte n'est renvoyée que si le niveau
+    évalué dépasse celui enregistré. La ligne est supprimée quand la situation
+    redevient normale (vidange, plein, renouvellement), ce qui réarme l'alerte.
+    """
+    __tablename__ = 'alert_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    bus_udm_id = db.Column(db.Integer, db.ForeignKey('bus_udm.id', ondelete='CASCADE'), nullable=True)
+    bus_cle = db.Column(db.Integer, nullable=False, default=_bus_cle)  # Non NULL : clé d'unicité
+    type_alerte = db.Column(db.Enum(*TYPES_ALERTE, name='alert_state_type'), nullable=False)
+    reference = db.Column(db.String(50), nullable=False, default='')  # document_id (DOCUMENT), chauffeur_id (PERMIS)
+    niveau = db.Column(db.Integer, nullable=False)
+    valeur = db.Column(db.Float, nullable=True)  # Mesure au moment de la notification (km, %, jours)
+    notifie_le = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        db.UniqueConstraint('bus_cle', 'type_alerte', 'reference', name='uq_alert_state_cle'),
+        db.Index('idx_alert_state_bus', 'bus_udm_id'),
+    )
+
+    @property
+    def cle(self):
+        return (self.bus_udm_id, self.type_alerte, self.reference)
+
+    def __repr__(self):
+        return f'<AlertState bus={self.bus_udm_id} {self.type_alerte} {self.reference} niveau={self.niveau}>'
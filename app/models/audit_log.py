@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from app.database import db
+
+
+# Niveau d'audit -> niveau logging écrit dans les fichiers par rôle
+NIVEAUX_FICHIER = {'CRITICAL': 'ERROR', 'HIGH': 'WARNING'}
+
+
+class AuditLog(db.Model):
+    """
+    Journal d'audit structuré (une ligne par action critique).
+    Alimenté par lots par app/utils/audit_store.py ; les anciens fichiers
+    logs/audit/*.log s'importent avec scripts/importer_audit_logs.py
+    (source = 'fichier').
+    """
+    __tablename__ = 'audit_log'
+    __table_args__ = (
+        db.Index('idx_audit_log_horodatage', 'horodatage'),
+        db.Index('idx_audit_log_role', 'role', 'horodatage'),
+        db.Index('idx_audit_log_action', 'action', 'horodatage'),
+        db.Index('idx_audit_log_niveau', 'niveau', 'horodatage'),
+        db.Index('idx_audit_log_utilisateur', 'utilisateur', 'horodatage'),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    horodatage = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    utilisateur = db.Column(db.String(100), nullable=False, default='SYSTEM')
+    role = db.Column(db.String(20), nullable=False, default='UNKNOWN')
+    action = db.Column(db.String(50), nullable=False)
+    niveau = db.Column(db.String(10), nullable=False)
+    succes = db.Column(db.Boolean, nullable=False, default=True)
+    ip = db.Column(db.String(45), nullable=True)
+    ressource = db.Column(db.String(50), nullable=True)
+    ressource_id = db.Column(db.String(100), nullable=True)
+    details = db.Column(db.Text, nullable=True)
+    erreur = db.Column(db.Text, nullable=True)
+    source = db.Column(db.String(10), nullable=False, default='app')  # 'app' ou 'fichier' (import)
+
+    def to_line(self):
+        """Ligne au format des fichiers d'audit (format attendu par l'interface)"""
+        parts = [
+            self.horodatage.strftime('%Y-%m-%d %H:%M:%S'),
+            NIVEAUX_FICHIER.get(self.niveau, 'INFO'),
+            f"USER:{self.utilisateur}",
+            f"ROLE:{self.role}",
+            f"ACTION:{self.action}",
+            f"LEVEL:{self.niveau}",
+            f"SUCCESS:{bool(self.succes)}",
+            f"IP:{self.ip}",
+        ]
+        if self.ressource:
+            parts.append(f"RESOURCE:{self.ressource}")
+        if self.ressource_id:
+            parts.append(f"RESOURCE_ID:{self.ressource_id}")
+        if self.details:
+            parts.append(f"DETAILS:{self.details}")
+        if self.erreur:
+            parts.append(f"ERROR:{self.erreur}")
+        return " | ".join(parts)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'horodatage': self.horodatage.strftime('%Y-%m-%d %H:%M:%S'),
+            'utilisateur': self.utilisateur,
+            'role': self.role,
+            'action': self.action,
+            'niveau': self.niveau,
+            'succes': bool(self.succes),
+            'ip': self.ip,
+            'ressource': self.ressource,
+            'ressource_id': self.ressource_id,
+            'details': self.details,
+            'erreur': self.erreur,
+        }
+
+    def __repr__(self):
+        return f'<AuditLog {self.horodatage} {self.role} {self.action}>'
@@ -11,4 +11,10 @@ class Carburation(db.Model):
     cout_total = db.Column(db.Float, nullable=False)
     remarque = db.Column(db.String(256), nullable=True)
 
+    # Dernière carburation par bus et carburations du mois (cf. scripts/migrations/002_index_maintenance.sql)
+    __table_args__ = (
+        db.Index('idx_carburation_bus_date', bus_udm_id, date_carburation.desc()),
+        db.Index('idx_carburation_date', date_carburation),
+    )
+
     bus_udm = db.relationship('BusUdM', backref=db.backref('carburations', lazy=True))
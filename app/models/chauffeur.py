@@ -20,6 +20,10 @@ class Chauffeur(db.Model):
     telephone = db.Column(db.String(20), nullable=False, comment='Numéro de téléphone')
     date_delivrance_permis = db.Column(db.Date, nullable=False, comment='Date de délivrance du permis')
     date_expiration_permis = db.Column(db.Date, nullable=False, comment='Date d\'expiration du permis')
+    utilisateur_id = db.Column(
+        db.Integer, db.ForeignKey('utilisateur.utilisateur_id', ondelete='SET NULL'),
+        nullable=True, unique=True, comment='Compte utilisateur du chauffeur'
+    )
 
     def __repr__(self):
         return f'<Chauffeur {self.nom} {self.prenom}>'
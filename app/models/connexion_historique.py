@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from app.database import db
+
+
+class ConnexionHistorique(db.Model):
+    """
+    Historique des connexions réussies (une ligne par authentification).
+    Écrit par ConnexionService au login ; la dernière connexion d'un utilisateur
+    est lue via l'index (utilisateur_id, date_connexion).
+    """
+    __tablename__ = 'connexion_historique'
+    __table_args__ = (
+        db.Index('idx_connexion_utilisateur_date', 'utilisateur_id', 'date_connexion'),
+    )
+
+    log_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    utilisateur_id = db.Column(db.Integer, db.ForeignKey('utilisateur.utilisateur_id'), nullable=False)
+    date_connexion = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    ip_adresse = db.Column(db.String(45), nullable=False, default='')
+
+    # L'historique suit l'utilisateur (supprimé avec lui)
+    utilisateur = db.relationship(
+        'Utilisateur',
+        backref=db.backref('connexions', lazy='dynamic', cascade='all, delete-orphan')
+    )
+
+    def __repr__(self):
+        return f'<ConnexionHistorique {self.utilisateur_id} {self.date_connexion}>'
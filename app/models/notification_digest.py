@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from app.database import db
+
+
+class NotificationDigest(db.Model):
+    """
+    Alerte en attente de regroupement (mode récapitulatif des notifications).
+    Une ligne par destinataire et par alerte ; DigestService envoie un seul
+    email par destinataire une fois NOTIFICATION_DIGEST_FENETRE écoulée depuis
+    sa plus ancienne alerte, puis supprime les lignes.
+    """
+    __tablename__ = 'notification_digest'
+    __table_args__ = (
+        db.Index('idx_digest_destinataire_cree', 'destinataire', 'cree_le'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    destinataire = db.Column(db.String(255), nullable=False)
+    type_notification = db.Column(db.String(50), nullable=False)
+    sujet = db.Column(db.String(255), nullable=False)  # Sujet de l'alerte individuelle
+    bus_udm_id = db.Column(db.Integer, db.ForeignKey('bus_udm.id', ondelete='CASCADE'), nullable=True)
+    cree_le = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f'<NotificationDigest {self.destinataire} {self.type_notification}>'
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from app.database import db
+
+
+STATUTS_OUTBOX = ('EN_ATTENTE', 'EN_COURS', 'ENVOYE', 'ECHEC_DEFINITIF')
+
+
+class NotificationOutbox(db.Model):
+    """
+    Email de notification en attente d'envoi (file persistante).
+    Enregistré dans la transaction de la requête par OutboxService, puis livré
+    par le worker avec nouvelles tentatives espacées (backoff exponentiel).
+    Après NOTIFICATION_OUTBOX_MAX_TENTATIVES échecs : ECHEC_DEFINITIF (lettre morte).
+    """
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        db.Index('idx_outbox_statut_echeance', 'statut', 'prochaine_tentative'),
+        db.Index('idx_outbox_verrou', 'verrou'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    type_notification = db.Column(db.String(50), nullable=False)
+    destinataire = db.Column(db.String(255), nullable=False)
+    sujet = db.Column(db.String(255), nullable=False)
+    corps = db.Column(db.Text, nullable=False)
+    corps_html = db.Column(db.Text, nullable=True)  # Partie HTML facultative (multipart/alternative)
+    statut = db.Column(
+        db.Enum(*STATUTS_OUTBOX, name='notification_outbox_statut'),
+        nullable=False, default='EN_ATTENTE'
+    )
+    tentatives = db.Column(db.Integer, nullable=False, default=0)
+    prochaine_tentative = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    verrou = db.Column(db.String(32), nullable=True)  # Lot du worker qui traite le message
+    derniere_erreur = db.Column(db.Text, nullable=True)
+    cree_le = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    envoye_le = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type_notification': self.type_notification,
+            'destinataire': self.destinataire,
+            'sujet': self.sujet,
+            'statut': self.statut,
+            'tentatives': self.tentatives,
+            'prochaine_tentative': self.prochaine_tentative.isoformat() if self.prochaine_tentative else None,
+            'derniere_erreur': self.derniere_erreur,
+            'cree_le': self.cree_le.isoformat() if self.cree_le else None,
+            'envoye_le': self.envoye_le.isoformat() if self.envoye_le else None,
+        }
+
+    def __repr__(self):
+        return f'<NotificationOutbox {self.id} {self.destinataire} {self.statut}>'
@@ -6,6 +6,11 @@ from app.constants import utc_now
 
 class PanneBusUdM(db.Model):
     __tablename__ = 'panne_bus_udm'
+    # Index composites des filtres chauds (cf. scripts/migrations/002_index_maintenance.sql)
+    __table_args__ = (
+        db.Index('idx_panne_resolue_criticite', 'resolue', 'criticite'),
+        db.Index('idx_panne_bus_resolue', 'bus_udm_id', 'resolue'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     # Association ORM (option 2): référence vers BusUdM.id
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from app.database import db
+
+
+class RapportJob(db.Model):
+    """
+    Génération différée d'un rapport lourd (PDF) par RapportJobService.
+    Le fichier produit est conservé dans le dossier de cache jusqu'à expire_le ;
+    ``cle`` (empreinte du type et des paramètres) sert à dédoublonner les demandes.
+    """
+    __tablename__ = 'rapport_job'
+    __table_args__ = (
+        db.Index('idx_rapport_job_cle_statut', 'cle', 'statut'),
+        db.Index('idx_rapport_job_expire', 'expire_le'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    type_rapport = db.Column(db.String(50), nullable=False)
+    parametres = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    cle = db.Column(db.String(64), nullable=False)
+    statut = db.Column(
+        db.Enum('EN_ATTENTE', 'EN_COURS', 'TERMINE', 'ECHEC', name='rapport_job_statut'),
+        nullable=False, default='EN_ATTENTE'
+    )
+    fichier = db.Column(db.String(255), nullable=True)  # Chemin dans le dossier de cache
+    nom_fichier = db.Column(db.String(255), nullable=True)  # Nom proposé au téléchargement
+    mimetype = db.Column(db.String(100), nullable=True)
+    erreur = db.Column(db.Text, nullable=True)
+    demande_par = db.Column(db.Integer, nullable=True)
+    cree_le = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    termine_le = db.Column(db.DateTime, nullable=True)
+    expire_le = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type_rapport': self.type_rapport,
+            'statut': self.statut,
+            'nom_fichier': self.nom_fichier,
+            'erreur': self.erreur,
+            'cree_le': self.cree_le.isoformat() if self.cree_le else None,
+            'termine_le': self.termine_le.isoformat() if self.termine_le else None,
+            'expire_le': self.expire_le.isoformat() if self.expire_le else None,
+        }
+
+    def __repr__(self):
+        return f'<RapportJob {self.id} {self.type_rapport} {self.statut}>'
@@ -0,0 +1,34 @@
+from app.database import db
+
+
+class TachePlanifiee(db.Model):
+    """
+    État partagé d'une tâche périodique (voir app/utils/planificateur.py).
+    La ligne sert aussi de verrou : un processus ne lance la tâche que s'il a pu
+    réserver la ligne (detenteur + verrou_expire_le), ce qui évite qu'une même
+    échéance soit exécutée par plusieurs workers.
+    """
+    __tablename__ = 'tache_planifiee'
+
+    nom = db.Column(db.String(50), primary_key=True)
+    prochaine_execution = db.Column(db.DateTime, nullable=False)
+    derniere_execution = db.Column(db.DateTime, nullable=True)
+    derniere_duree = db.Column(db.Float, nullable=True)  # Secondes
+    dernier_statut = db.Column(db.String(10), nullable=True)  # OK / ECHEC
+    derniere_erreur = db.Column(db.Text, nullable=True)
+    detenteur = db.Column(db.String(64), nullable=True)  # Processus qui exécute la tâche
+    verrou_expire_le = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'nom': self.nom,
+            'prochaine_execution': self.prochaine_execution.isoformat() if self.prochaine_execution else None,
+            'derniere_execution': self.derniere_execution.isoformat() if self.derniere_execution else None,
+            'derniere_duree': self.derniere_duree,
+            'dernier_statut': self.dernier_statut,
+            'derniere_erreur': self.derniere_erreur,
+            'en_cours': self.detenteur is not None,
+        }
+
+    def __repr__(self):
+        return f'<TachePlanifiee {self.nom} {self.prochaine_execution}>'
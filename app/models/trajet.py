@@ -6,6 +6,14 @@ from datetime import datetime
 
 class Trajet(db.Model):
     __tablename__ = 'trajet'
+    # Index composites des filtres chauds (cf. scripts/migrations/001_index_trajet.sql)
+    __table_args__ = (
+        db.Index('idx_trajet_date_type', 'date_heure_depart', 'type_trajet'),
+        db.Index('idx_trajet_passagers_depart_date', 'type_passagers', 'point_depart', 'date_heure_depart'),
+        db.Index('idx_trajet_chauffeur_date', 'chauffeur_id', 'date_heure_depart'),
+        db.Index('idx_trajet_bus_date', 'numero_bus_udm', 'date_heure_depart'),
+        db.Index('idx_trajet_prestataire_date', 'prestataire_id', 'date_heure_depart'),
+    )
     trajet_id = db.Column(db.Integer, primary_key=True)
     type_trajet = db.Column(db.Enum('UDM_INTERNE', 'PRESTATAIRE', 'AUTRE', name='type_trajet_enum'), nullable=False)
     prestataire_id = db.Column(db.Integer, db.ForeignKey('prestataire.id'), nullable=True)
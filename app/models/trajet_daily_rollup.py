@@ -0,0 +1,33 @@
+from app.database import db
+
+
+class TrajetDailyRollup(db.Model):
+    """
+    Agrégat journalier des trajets (table de faits pré-agrégée pour les rapports).
+    Maintenu par TrajetRollupService à chaque enregistrement de trajet et
+    reconstructible depuis la table trajet (scripts/rebuild_trajet_rollup.py).
+
+    Les dimensions absentes sont stockées avec une valeur neutre ('' ou 0) et non
+    NULL, pour que la contrainte d'unicité serve de clé d'upsert.
+    """
+    __tablename__ = 'trajet_daily_rollup'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jour = db.Column(db.Date, nullable=False)
+    type_trajet = db.Column(db.String(20), nullable=False)
+    type_passagers = db.Column(db.String(20), nullable=False, default='')
+    point_depart = db.Column(db.String(50), nullable=False, default='')
+    numero_bus_udm = db.Column(db.String(50), nullable=False, default='')
+    chauffeur_id = db.Column(db.Integer, nullable=False, default=0)
+    prestataire_id = db.Column(db.Integer, nullable=False, default=0)
+    nombre_trajets = db.Column(db.Integer, nullable=False, default=0)
+    nombre_passagers = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('jour', 'type_trajet', 'type_passagers', 'point_depart',
+                            'numero_bus_udm', 'chauffeur_id', 'prestataire_id',
+                            name='uq_trajet_rollup_cle'),
+    )
+
+    def __repr__(self):
+        return f'<TrajetDailyRollup {self.jour} {self.type_trajet} {self.nombre_trajets}>'
@@ -10,4 +10,10 @@ class Vidange(db.Model):
     type_huile = db.Column(Enum('QUARTZ', 'RUBIA', name='type_huile_enum'), nullable=False)
     remarque = db.Column(db.String(256), nullable=True)
 
+    # Dernière vidange par bus et vidanges du mois (cf. scripts/migrations/002_index_maintenance.sql)
+    __table_args__ = (
+        db.Index('idx_vidange_bus_date', bus_udm_id, date_vidange.desc()),
+        db.Index('idx_vidange_date', date_vidange),
+    )
+
     bus_udm = db.relationship('BusUdM', backref=db.backref('vidanges', lazy=True))
@@ -14,3 +14,4 @@ from . import parametres
 from . import utils
 from . import audit
 from . import notifications
+from . import performances
@@ -5,7 +5,7 @@ Permet de voir qui fait quoi et quand
 
 from flask import render_template, request, jsonify
 from app.routes.common import admin_or_responsable
-from app.utils.audit_logger import get_audit_logs, get_role_statistics
+from app.utils.audit_logger import get_audit_logs, get_role_statistics, search_audit_logs
 from . import bp
 
 @bp.route('/audit')
@@ -19,12 +19,14 @@ def audit_logs():
     role_filter = request.args.get('role', '')
     action_filter = request.args.get('action', '')
     limit = int(request.args.get('limit', 100))
+    page = max(int(request.args.get('page', 1)), 1)
     
     # Récupérer les logs avec filtres
     logs = get_audit_logs(
         limit=limit,
         role_filter=role_filter if role_filter else None,
-        action_filter=action_filter if action_filter else None
+        action_filter=action_filter if action_filter else None,
+        offset=(page - 1) * limit
     )
     
     # Récupérer les statistiques
@@ -37,6 +39,7 @@ def audit_logs():
         role_filter=role_filter,
         action_filter=action_filter,
         limit=limit,
+        page=page,
         active_page='audit'
     )
 
@@ -53,19 +56,28 @@ def audit_stats_api():
 @admin_or_responsable
 def audit_logs_api():
     """
-    API pour récupérer les logs d'audit en JSON
+    API pour récupérer les logs d'audit en JSON (paginée : ?page=N&limit=M)
     """
     role_filter = request.args.get('role')
     action_filter = request.args.get('action')
+    level_filter = request.args.get('level')
+    user_filter = request.args.get('user')
     limit = int(request.args.get('limit', 50))
+    page = max(int(request.args.get('page', 1)), 1)
     
-    logs = get_audit_logs(
-        limit=limit,
+    result = search_audit_logs(
+        page=page,
+        per_page=limit,
         role_filter=role_filter,
-        action_filter=action_filter
+        action_filter=action_filter,
+        level_filter=level_filter,
+        user_filter=user_filter
     )
     
     return jsonify({
-        'logs': logs,
-        'count': len(logs)
+        'logs': result['items'],
+        'count': len(result['items']),
+        'total': result['total'],
+        'page': result['page'],
+        'pages': result['pages']
     })
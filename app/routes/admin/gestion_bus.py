@@ -8,7 +8,8 @@ from app.models.fuel_alert_state import FuelAlertState
 from app.models.document_bus_udm import DocumentBusUdM
 from app.models.trajet import Trajet
 from app.database import db
-from app.utils.emailer import send_email
+from app.utils.emailer import EmailMessage
+from app.services.outbox_service import OutboxService
 from app.services.gestion_vidange import OIL_CAPACITY_KM
 from app.routes.common import role_required
 from . import bp
@@ -490,7 +491,6 @@ def bus_udm_list_ajax():
 def mettre_a_jour_niveau_carburant_ajax(bus_id):
     from app.models.fuel_alert_state import FuelAlertState
     from app.models.utilisateur import Utilisateur
-    from app.utils.emailer import send_email
     
     bus = BusUdM.query.get(bus_id)
     if not bus:
@@ -540,7 +540,7 @@ def mettre_a_jour_niveau_carburant_ajax(bus_id):
                         f"Seuil atteint: {th}%.\n"
                         "Cette alerte est dédupliquée: vous ne recevrez pas de nouvel email tant que le bus reste dans cette tranche."
                     )
-                    send_email(subject, body, admin_email)
+                    OutboxService.enqueue([EmailMessage(subject, body, admin_email)], 'carburant')
                 
                 # Mettre à jour l'état
                 if state:
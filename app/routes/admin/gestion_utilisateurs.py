@@ -129,6 +129,7 @@ def ajouter_utilisateur_ajax():
 
             chauffeur = Chauffeur(
                 chauffeur_id=new_user.utilisateur_id,
+                utilisateur_id=new_user.utilisateur_id,
                 nom=nom,
                 prenom=prenom,
                 numero_permis=numero_permis,
@@ -174,6 +175,8 @@ def ajouter_utilisateur_ajax():
         # Ils utilisent seulement la table utilisateur
 
         db.session.commit()
+        from app.services.notification_service import NotificationService
+        NotificationService.invalider_destinataires()
 
         return jsonify({'success': True, 'message': f'Utilisateur {nom} {prenom} ajouté avec succès.'})
 
@@ -199,6 +202,10 @@ def supprimer_utilisateur_ajax(user_id):
     try:
         db.session.delete(user)
         db.session.commit()
+        from app.services.notification_service import NotificationService
+        NotificationService.invalider_destinataires()
+        from app.services.identite_service import IdentiteService
+        IdentiteService.invalider(user_id)
         return jsonify({'success': True, 'message': 'Utilisateur supprimé avec succès.'})
     except Exception as e:
         db.session.rollback()
@@ -258,23 +265,22 @@ def modifier_statut_chauffeur_ajax():
 
         # Envoyer notification email au chauffeur
         try:
-            from app.models.utilisateur import Utilisateur
             from app.services.notification_service import NotificationService
 
-            # Récupérer l'email du chauffeur
-            chauffeur_user = Utilisateur.query.filter_by(
-                utilisateur_id=int(chauffeur_id)
-            ).first()
+            # Récupérer l'email du chauffeur (annuaire des destinataires)
+            destinataire = NotificationService.get_destinataire(int(chauffeur_id))
 
-            if chauffeur_user and chauffeur_user.email:
+            if destinataire:
                 NotificationService.send_statut_chauffeur_notification(
-                    new_statut, chauffeur_user.email
+                    new_statut, destinataire.email, chauffeur_nom=destinataire.nom
                 )
+                db.session.commit()  # Valide la mise en file de l'email
             else:
                 current_app.logger.warning(f"Email manquant pour chauffeur ID {chauffeur_id}")
 
         except Exception as e:
             # Ne pas faire échouer la création du statut si l'email échoue
+            db.session.rollback()
             current_app.logger.warning(f"Échec notification statut chauffeur: {str(e)}")
 
         return jsonify({'success': True, 'message': 'Statut enregistré avec succès.'})
@@ -157,12 +157,14 @@ def declarer_panne():
             from app.services.notification_service import NotificationService
             # Vérifier si les notifications sont activées
             if current_app.config.get('ENABLE_EMAIL_NOTIFICATIONS', True):
-                NotificationService.send_panne_notification(nouvelle_panne, enregistre_par)
+                NotificationService.send_panne_notification(nouvelle_panne, enregistre_par, bus=bus_existant)
+                db.session.commit()  # Valide la mise en file des emails
                 print("📧 Notification de panne envoyée")
             else:
                 print("ℹ️ Notifications email désactivées")
         except Exception as e:
             # Ne pas faire échouer la déclaration si l'email échoue
+            db.session.rollback()
             print(f"⚠️ Échec notification panne: {str(e)}")
 
         response = jsonify({'success': True, 'message': 'Panne déclarée avec succès.'})
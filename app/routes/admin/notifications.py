@@ -10,9 +10,10 @@ from app.database import db
 from app.models.bus_udm import BusUdM
 from app.models.panne_bus_udm import PanneBusUdM
 from app.models.chauffeur_statut import ChauffeurStatut
-from app.models.utilisateur import Utilisateur
 from app.services.notification_service import NotificationService
 from app.services.alert_service import AlertService
+from app.services.digest_service import DigestService
+from app.services.outbox_service import OutboxService
 from app.routes.common import admin_only
 from app.utils.audit_logger import log_user_action
 from . import bp
@@ -24,10 +25,31 @@ def notifications():
     """Page de gestion des notifications"""
     return render_template(
         'roles/admin/notifications.html',
+        outbox=OutboxService.get_statistiques(),
+        digest=DigestService.get_statistiques() if current_app.config.get('NOTIFICATION_DIGEST_ENABLED') else None,
         active_page='notifications'
     )
 
 
+@bp.route('/notifications/outbox')
+@admin_only
+def outbox_status():
+    """État de la file d'envoi (profondeur, échecs récents) et des récapitulatifs en attente"""
+    return jsonify({'success': True, **OutboxService.get_statistiques(),
+                    'recapitulatif': DigestService.get_statistiques()})
+
+
+@bp.route('/notifications/outbox/<int:message_id>/relancer', methods=['POST'])
+@admin_only
+def relancer_notification(message_id):
+    """Remet en file un message en échec définitif"""
+    if not OutboxService.relancer(message_id):
+        return jsonify({'success': False, 'message': 'Message introuvable ou non en échec'}), 404
+
+    log_user_action('NOTIFICATION', 'relancer_notification', f"Relance du message {message_id}")
+    return jsonify({'success': True, 'message': 'Message remis en file'})
+
+
 @bp.route('/notifications/test_config', methods=['POST'])
 @admin_only
 def test_email_config():
@@ -81,8 +103,11 @@ def test_panne_notification():
         # Envoyer la notification sans enregistrer la panne
         success = NotificationService.send_panne_notification(
             panne_test, 
-            f"{current_user.prenom} {current_user.nom} (TEST)"
+            f"{current_user.prenom} {current_user.nom} (TEST)",
+            bus=bus,
+            immediat=True
         )
+        db.session.commit()  # Valide la mise en file (la panne de test n'est pas ajoutée à la session)
         
         log_user_action(
             'TEST', 
@@ -97,6 +122,7 @@ def test_panne_notification():
         })
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'message': f'Erreur test notification panne: {str(e)}'
@@ -113,11 +139,9 @@ def test_statut_notification():
             return jsonify({'success': False, 'message': 'ID chauffeur requis'}), 400
         
         # Récupérer l'email du chauffeur
-        chauffeur_user = Utilisateur.query.filter_by(
-            utilisateur_id=chauffeur_id
-        ).first()
+        destinataire = NotificationService.get_destinataire(int(chauffeur_id))
         
-        if not chauffeur_user or not chauffeur_user.email:
+        if not destinataire:
             return jsonify({
                 'success': False, 
                 'message': 'Chauffeur non trouvé ou email manquant'
@@ -136,8 +160,10 @@ def test_statut_notification():
         # Envoyer la notification
         success = NotificationService.send_statut_chauffeur_notification(
             statut_test, 
-            chauffeur_user.email
+            destinataire.email,
+            chauffeur_nom=destinataire.nom
         )
+        db.session.commit()  # Valide la mise en file (le statut de test n'est pas ajouté à la session)
         
         log_user_action(
             'TEST', 
@@ -148,10 +174,11 @@ def test_statut_notification():
         return jsonify({
             'success': success,
             'message': 'Notification de test envoyée' if success else 'Échec envoi notification',
-            'chauffeur_email': chauffeur_user.email
+            'chauffeur_email': destinataire.email
         })
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'message': f'Erreur test notification statut: {str(e)}'
@@ -4,7 +4,12 @@ from app.routes.common import admin_or_responsable
 from app.models.utilisateur import Utilisateur
 from app.models.prestataire import Prestataire
 from app.database import db
-from app.utils.audit_logger import log_user_action, get_audit_logs, get_role_statistics, log_document_printed
+from app.services.notification_service import NotificationService
+from app.services.identite_service import IdentiteService
+from app.utils.audit_logger import (
+    log_user_action, get_audit_logs, get_role_statistics, get_critical_alerts as get_recent_critical_alerts,
+    log_document_printed
+)
 from werkzeug.security import generate_password_hash
 from functools import wraps
 from . import bp
@@ -74,18 +79,21 @@ def parametres_audit_logs_api():
         role_filter = request.args.get('role')
         action_filter = request.args.get('action')
         limit = int(request.args.get('limit', 50))
+        page = max(int(request.args.get('page', 1)), 1)
 
         logs = get_audit_logs(
             limit=limit,
             role_filter=role_filter,
-            action_filter=action_filter
+            action_filter=action_filter,
+            offset=(page - 1) * limit
         )
 
         log_user_action('CONSULTATION', 'audit_logs', f'Consultation logs (limite: {limit})')
 
         return jsonify({
             'logs': logs,
-            'count': len(logs)
+            'count': len(logs),
+            'page': page
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -128,48 +136,18 @@ def audit_print_api():
 def get_critical_alerts():
     """API pour récupérer les alertes critiques des dernières 24h"""
     try:
-        from datetime import datetime, timedelta
-        import os
-        import re
-
-        alerts = []
-        yesterday = datetime.now() - timedelta(days=1)
-
-        # Parcourir tous les fichiers d'audit
-        audit_dir = os.path.join('logs', 'audit')
-        if not os.path.exists(audit_dir):
-            return jsonify([])
-
-        for filename in os.listdir(audit_dir):
-            if filename.startswith('audit_') and filename.endswith('.log'):
-                role = filename.replace('audit_', '').replace('.log', '').upper()
-                filepath = os.path.join(audit_dir, filename)
-
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-
-                    # Analyser les dernières lignes pour les alertes critiques
-                    for line in reversed(lines[-100:]):  # Dernières 100 lignes
-                        if 'LEVEL:CRITICAL' in line or 'UNAUTHORIZED_ACCESS' in line or 'SECURITY_VIOLATION' in line:
-                            # Extraire la date
-                            date_match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-                            if date_match:
-                                log_date = datetime.strptime(date_match.group(1), '%Y-%m-%d %H:%M:%S')
-                                if log_date >= yesterday:
-                                    alerts.append({
-                                        'role': role,
-                                        'timestamp': log_date.strftime('%d/%m %H:%M'),
-                                        'log': line.strip()
-                                    })
-
-                except Exception as e:
-                    continue
-
-        # Trier par date décroissante
-        alerts.sort(key=lambda x: x['timestamp'], reverse=True)
-
-        return jsonify(alerts[:10])  # Limiter à 10 alertes
+        from datetime import datetime
+
+        alerts = [
+            {
+                'role': alert['role'],
+                'timestamp': datetime.strptime(alert['timestamp'], '%Y-%m-%d %H:%M:%S').strftime('%d/%m %H:%M'),
+                'log': alert['log']
+            }
+            for alert in get_recent_critical_alerts(hours=24, limit=10)
+        ]
+
+        return jsonify(alerts)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -180,72 +158,21 @@ def get_critical_alerts():
 def users_api():
     """API pour récupérer la liste des utilisateurs"""
     try:
-        from datetime import datetime, timedelta
-        import os
-        import re
+        from app.services.connexion_service import ConnexionService
 
-        users = Utilisateur.query.all()
         users_data = []
 
-        # Fonction pour obtenir la dernière connexion depuis les logs d'audit
-        def get_last_login(user_login):
-            try:
-                audit_dir = os.path.join('logs', 'audit')
-                if not os.path.exists(audit_dir):
-                    return None
-
-                # Chercher dans tous les fichiers d'audit
-                for filename in os.listdir(audit_dir):
-                    if filename.startswith('audit_') and filename.endswith('.log'):
-                        filepath = os.path.join(audit_dir, filename)
-                        try:
-                            with open(filepath, 'r', encoding='utf-8') as f:
-                                lines = f.readlines()
-
-                            # Chercher les connexions de cet utilisateur (en partant de la fin)
-                            for line in reversed(lines):
-                                if 'LOGIN_SUCCESS' in line and user_login in line:
-                                    # Extraire la date
-                                    date_match = re.search(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
-                                    if date_match:
-                                        return date_match.group(1)
-                        except (IOError, OSError, UnicodeDecodeError):
-                            continue
-                return None
-            except (IOError, OSError):
-                return None
-
-        for user in users:
-            # Obtenir la dernière connexion
-            last_login = get_last_login(user.login)
-
-            # Déterminer si l'utilisateur est actif (connecté dans les 30 derniers jours)
-            is_active = False
-            if last_login:
-                try:
-                    last_login_date = datetime.strptime(last_login, '%Y-%m-%d %H:%M:%S')
-                    thirty_days_ago = datetime.now() - timedelta(days=30)
-                    is_active = last_login_date >= thirty_days_ago
-                except (ValueError, TypeError):
-                    is_active = False
-
-            # Formater la dernière connexion pour l'affichage
-            formatted_last_login = "Jamais connecté"
-            if last_login:
-                try:
-                    last_login_date = datetime.strptime(last_login, '%Y-%m-%d %H:%M:%S')
-                    formatted_last_login = last_login_date.strftime('%d/%m/%Y %H:%M')
-                except (ValueError, TypeError):
-                    formatted_last_login = "Date invalide"
-
+        # Dernière connexion de tous les utilisateurs en une requête (connexion_historique)
+        for user, last_login in ConnexionService.get_utilisateurs_avec_derniere_connexion():
             users_data.append({
                 'id': user.utilisateur_id,
                 'login': user.login,
                 'nom': user.nom or '',
                 'prenom': user.prenom or '',
                 'role': user.role,
-                'active': is_active,
-                'derniere_connexion': formatted_last_login
+                # Actif = connecté dans les 30 derniers jours
+                'active': ConnexionService.est_actif(last_login),
+                'derniere_connexion': last_login.strftime('%d/%m/%Y %H:%M') if last_login else "Jamais connecté"
             })
 
         log_user_action('CONSULTATION', 'users_list', f'Consultation liste utilisateurs ({len(users_data)} utilisateurs)')
@@ -288,6 +215,7 @@ def create_user_api():
 
         db.session.add(user)
         db.session.commit()
+        NotificationService.invalider_destinataires()
 
         log_user_action('CREATION', 'create_user', f'Création utilisateur: {data["login"]} (rôle: {data["role"]})')
 
@@ -318,6 +246,8 @@ def edit_user_role_api(user_id):
 
         user.role = new_role
         db.session.commit()
+        NotificationService.invalider_destinataires()
+        IdentiteService.invalider(user.utilisateur_id)
 
         log_user_action('MODIFICATION', 'edit_user_role',
                        f'Modification rôle utilisateur {user.login}: {old_role} → {new_role}')
@@ -359,6 +289,7 @@ def update_credentials_api(user_id):
         user.login = new_login
         user.mot_de_passe = generate_password_hash(new_password)
         db.session.commit()
+        IdentiteService.invalider(user.utilisateur_id)
 
         log_user_action('MODIFICATION', 'update_credentials',
                        f'Modification identifiants utilisateur: {old_login} → {new_login}')
@@ -518,8 +449,6 @@ def delete_prestataire_api(prestataire_id):
 def delete_user_api(user_id):
     """API pour supprimer un utilisateur"""
     try:
-        from app.models import Utilisateur
-
         # Vérifier que l'utilisateur existe
         user = Utilisateur.query.filter_by(utilisateur_id=user_id).first_or_404()
         user_name = f"{user.nom} {user.prenom}"
@@ -537,6 +466,8 @@ def delete_user_api(user_id):
         # Supprimer l'utilisateur
         db.session.delete(user)
         db.session.commit()
+        NotificationService.invalider_destinataires()
+        IdentiteService.invalider(user_id)
 
         # Auditer la suppression
         log_user_action('SUPPRESSION', 'delete_user', f'Suppression utilisateur: {user_name} ({user_login})')
@@ -0,0 +1,60 @@
+"""
+Routes d'administration du profilage SQL (app/utils/profilage_sql.py)
+Endpoints les plus coûteux en base et instructions les plus lentes
+"""
+
+from flask import render_template, jsonify, current_app
+
+from app.routes.common import admin_only
+from app.utils.audit_logger import log_user_action
+from app.utils.profilage_sql import get_profileur
+from . import bp
+
+
+def _statistiques():
+    profileur = get_profileur()
+    if profileur is None:
+        return None
+    return {
+        'depuis': profileur.depuis.isoformat(timespec='seconds'),
+        'endpoints': profileur.get_endpoints(),
+        'lentes': profileur.get_instructions_lentes(),
+    }
+
+
+@bp.route('/performances')
+@admin_only
+def performances():
+    """Page des endpoints triés par temps passé en base"""
+    return render_template(
+        'roles/admin/performances.html',
+        stats=_statistiques(),
+        budgets={
+            'instructions': current_app.config.get('SQL_PROFILER_BUDGET_REQUETES'),
+            'db_ms': current_app.config.get('SQL_PROFILER_BUDGET_DB_MS'),
+            'lente_ms': current_app.config.get('SQL_PROFILER_REQUETE_LENTE_MS'),
+        },
+        active_page='performances'
+    )
+
+
+@bp.route('/performances/api')
+@admin_only
+def performances_api():
+    """Statistiques du profilage SQL en JSON"""
+    stats = _statistiques()
+    if stats is None:
+        return jsonify({'success': False, 'message': 'Profilage SQL désactivé (SQL_PROFILER_ENABLED)'}), 404
+    return jsonify({'success': True, **stats})
+
+
+@bp.route('/performances/reinitialiser', methods=['POST'])
+@admin_only
+def reinitialiser_performances():
+    """Remet à zéro les statistiques du processus courant"""
+    profileur = get_profileur()
+    if profileur is None:
+        return jsonify({'success': False, 'message': 'Profilage SQL désactivé (SQL_PROFILER_ENABLED)'}), 404
+    profileur.reinitialiser()
+    log_user_action('PERFORMANCES', 'reinitialiser_performances', "Réinitialisation des statistiques SQL")
+    return jsonify({'success': True, 'message': 'Statistiques réinitialisées'})
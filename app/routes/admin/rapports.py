@@ -15,6 +15,9 @@ from app.models.prestataire import Prestataire
 from app.models.chauffeur import Chauffeur
 from app.models.vidange import Vidange
 from app.routes.common import admin_only, superviseur_access
+from app.services.rollup_service import TrajetRollupService
+from app.services.timeseries_service import TimeSeriesService
+from app.utils.periodes import date_range_filter, resolve_period
 
 from . import bp
 
@@ -38,30 +41,11 @@ def rapport_noblesse():
     print("DEBUG: Route rapport_noblesse appelée!")
     try:
         # Filtres
-        today = date.today()
-        start_date = today.replace(day=1)
-        end_date = today
-
         periode = request.args.get('periode', 'mois')
         date_debut = request.args.get('date_debut')
         date_fin = request.args.get('date_fin')
 
-        if date_debut and date_fin:
-            try:
-                start_date = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                end_date = datetime.strptime(date_fin, '%Y-%m-%d').date()
-            except ValueError:
-                start_date = today.replace(day=1)
-                end_date = today
-        elif periode == 'jour':
-            start_date = today
-            end_date = today
-        elif periode == 'semaine':
-            start_date = today - timedelta(days=today.weekday())
-            end_date = today
-        elif periode == 'annee':
-            start_date = today.replace(month=1, day=1)
-            end_date = today
+        start_date, end_date = resolve_period(periode, date_debut, date_fin, default='mois')
 
         print(f"DEBUG: periode={periode}, date_debut={date_debut}, date_fin={date_fin}, start_date={start_date}, end_date={end_date}")
         # Récupérer les trajets prestataires Noblesse (via relation Prestataire)
@@ -69,8 +53,7 @@ def rapport_noblesse():
             and_(
                 Trajet.type_trajet == 'PRESTATAIRE',
                 Prestataire.nom_prestataire == 'Noblesse',
-                func.date(Trajet.date_heure_depart) >= start_date,
-                func.date(Trajet.date_heure_depart) <= end_date
+                date_range_filter(Trajet.date_heure_depart, start_date, end_date)
             )
         ).order_by(Trajet.date_heure_depart.desc()).all()
 
@@ -114,30 +97,11 @@ def rapport_charter():
     """Rapport détaillé pour les trajets Charter (avec filtres)."""
     try:
         # Filtres
-        today = date.today()
-        start_date = today.replace(day=1)
-        end_date = today
-
         periode = request.args.get('periode', 'mois')
         date_debut = request.args.get('date_debut')
         date_fin = request.args.get('date_fin')
 
-        if date_debut and date_fin:
-            try:
-                start_date = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                end_date = datetime.strptime(date_fin, '%Y-%m-%d').date()
-            except ValueError:
-                start_date = today.replace(day=1)
-                end_date = today
-        elif periode == 'jour':
-            start_date = today
-            end_date = today
-        elif periode == 'semaine':
-            start_date = today - timedelta(days=today.weekday())
-            end_date = today
-        elif periode == 'annee':
-            start_date = today.replace(month=1, day=1)
-            end_date = today
+        start_date, end_date = resolve_period(periode, date_debut, date_fin, default='mois')
 
         print(f"DEBUG: periode={periode}, date_debut={date_debut}, date_fin={date_fin}, start_date={start_date}, end_date={end_date}")
         # Récupérer les trajets prestataires Charter (via relation Prestataire)
@@ -145,8 +109,7 @@ def rapport_charter():
             and_(
                 Trajet.type_trajet == 'PRESTATAIRE',
                 Prestataire.nom_prestataire == 'Charter',
-                func.date(Trajet.date_heure_depart) >= start_date,
-                func.date(Trajet.date_heure_depart) <= end_date
+                date_range_filter(Trajet.date_heure_depart, start_date, end_date)
             )
         ).order_by(Trajet.date_heure_depart.desc()).all()
 
@@ -187,38 +150,18 @@ def rapport_bus_udm():
     """Rapport détaillé pour les trajets Bus UdM (avec filtres)."""
     try:
         # Filtres
-        today = date.today()
-        start_date = today.replace(day=1)
-        end_date = today
-
         periode = request.args.get('periode', 'mois')
         date_debut = request.args.get('date_debut')
         date_fin = request.args.get('date_fin')
 
-        if date_debut and date_fin:
-            try:
-                start_date = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                end_date = datetime.strptime(date_fin, '%Y-%m-%d').date()
-            except ValueError:
-                start_date = today.replace(day=1)
-                end_date = today
-        elif periode == 'jour':
-            start_date = today
-            end_date = today
-        elif periode == 'semaine':
-            start_date = today - timedelta(days=today.weekday())
-            end_date = today
-        elif periode == 'annee':
-            start_date = today.replace(month=1, day=1)
-            end_date = today
+        start_date, end_date = resolve_period(periode, date_debut, date_fin, default='mois')
 
         print(f"DEBUG: periode={periode}, date_debut={date_debut}, date_fin={date_fin}, start_date={start_date}, end_date={end_date}")
         # Récupérer les trajets UdM sur période
         trajets = Trajet.query.filter(
             and_(
                 Trajet.type_trajet == 'UDM_INTERNE',
-                func.date(Trajet.date_heure_depart) >= start_date,
-                func.date(Trajet.date_heure_depart) <= end_date
+                date_range_filter(Trajet.date_heure_depart, start_date, end_date)
             )
         ).order_by(Trajet.date_heure_depart.desc()).all()
 
@@ -331,7 +274,11 @@ def api_chart(chart_type):
         return jsonify(get_trajets_evolution())
     elif chart_type == 'passagers_type':
         return jsonify(get_passagers_by_type())
-
+    elif chart_type == 'tendances':
+        try:
+            return jsonify(get_tendances(request.args))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     else:
         return jsonify({'error': 'Type de graphique invalide'}), 400
 
@@ -341,29 +288,13 @@ def api_chart(chart_type):
 def api_bus_usage():
     """API pour récupérer les données d'utilisation des bus UdM"""
     try:
-        today = date.today()
-        
         # Filtres
         periode = request.args.get('periode', 'jour')
         date_debut = request.args.get('date_debut')
         date_fin = request.args.get('date_fin')
 
         # Calculer les dates de début et fin
-        if date_debut and date_fin:
-            start_date = datetime.strptime(date_debut, '%Y-%m-%d').date()
-            end_date = datetime.strptime(date_fin, '%Y-%m-%d').date()
-        elif periode == 'mois':
-            start_date = today.replace(day=1)
-            end_date = today
-        elif periode == 'jour':
-            start_date = today
-            end_date = today
-        elif periode == 'semaine':
-            start_date = today - timedelta(days=today.weekday())
-            end_date = today
-        elif periode == 'annee':
-            start_date = today.replace(month=1, day=1)
-            end_date = today
+        start_date, end_date = resolve_period(periode, date_debut, date_fin, default='jour')
 
         print(f"DEBUG BUS USAGE: periode={periode}, start_date={start_date}, end_date={end_date}")
 
@@ -375,8 +306,7 @@ def api_bus_usage():
             and_(
                 Trajet.type_trajet == 'UDM_INTERNE',
                 Trajet.numero_bus_udm.isnot(None),
-                func.date(Trajet.date_heure_depart) >= start_date,
-                func.date(Trajet.date_heure_depart) <= end_date
+                date_range_filter(Trajet.date_heure_depart, start_date, end_date)
             )
         ).group_by(Trajet.numero_bus_udm).order_by(func.count(Trajet.trajet_id).desc()).all()
 
@@ -427,39 +357,22 @@ def api_bus_usage():
 
 
 def get_daily_stats(target_date):
-    """Statistiques pour une journée donnée"""
-    trajets = Trajet.query.filter(func.date(Trajet.date_heure_depart) == target_date).all()
-
-    stats = {
-        'total_trajets': len(trajets),
-        'trajets_udm': len([t for t in trajets if t.type_trajet == 'UDM_INTERNE']),
-        'trajets_prestataire': len([t for t in trajets if t.type_trajet == 'PRESTATAIRE']),
-        'trajets_autres': len([t for t in trajets if t.type_trajet == 'AUTRE']),
-        'total_passagers': sum([t.nombre_places_occupees or 0 for t in trajets]),
-        'passagers_etudiants': sum([t.nombre_places_occupees or 0 for t in trajets if t.type_passagers == 'ETUDIANT']),
-        'passagers_personnel': sum([t.nombre_places_occupees or 0 for t in trajets if t.type_passagers == 'PERSONNEL']),
-        'passagers_malades': sum([t.nombre_places_occupees or 0 for t in trajets if t.type_passagers == 'MALADE']),
-    }
-
-    return stats
+    """Statistiques pour une journée donnée (lues dans l'agrégat journalier)"""
+    return TrajetRollupService.get_totaux(target_date)
 
 def get_period_stats(start_date, end_date):
-    """Statistiques pour une période donnée"""
-    trajets = Trajet.query.filter(
-        and_(
-            func.date(Trajet.date_heure_depart) >= start_date,
-            func.date(Trajet.date_heure_depart) <= end_date
-        )
-    ).all()
+    """Statistiques pour une période donnée (lues dans l'agrégat journalier)"""
+    totaux = TrajetRollupService.get_totaux(start_date, end_date)
+    jours_periode = (end_date - start_date).days + 1
 
     stats = {
-        'total_trajets': len(trajets),
-        'trajets_udm': len([t for t in trajets if t.type_trajet == 'UDM_INTERNE']),
-        'trajets_prestataire': len([t for t in trajets if t.type_trajet == 'PRESTATAIRE']),
-        'trajets_autres': len([t for t in trajets if t.type_trajet == 'AUTRE']),
-        'total_passagers': sum([t.nombre_places_occupees or 0 for t in trajets]),
-        'moyenne_passagers_jour': round(sum([t.nombre_places_occupees or 0 for t in trajets]) / max(1, (end_date - start_date).days + 1), 1),
-        'jours_periode': (end_date - start_date).days + 1
+        'total_trajets': totaux['total_trajets'],
+        'trajets_udm': totaux['trajets_udm'],
+        'trajets_prestataire': totaux['trajets_prestataire'],
+        'trajets_autres': totaux['trajets_autres'],
+        'total_passagers': totaux['total_passagers'],
+        'moyenne_passagers_jour': round(totaux['total_passagers'] / max(1, jours_periode), 1),
+        'jours_periode': jours_periode
     }
 
     return stats
@@ -481,21 +394,23 @@ def get_fleet_stats():
 def get_trajets_evolution():
     """Données pour graphique d'évolution des trajets (7 derniers jours)"""
     today = date.today()
-    dates = [(today - timedelta(days=i)) for i in range(6, -1, -1)]
+    serie = TimeSeriesService.get_series(
+        ['trajets_udm', 'trajets_prestataire'], today - timedelta(days=6), today, 'jour'
+    )
 
     data = {
-        'labels': [d.strftime('%d/%m') for d in dates],
+        'labels': serie['labels'],
         'datasets': [
             {
                 'label': 'Bus UdM',
-                'data': [],
+                'data': serie['series']['trajets_udm'],
                 'borderColor': '#28a745',
                 'backgroundColor': 'rgba(40, 167, 69, 0.1)',
                 'tension': 0.4
             },
             {
                 'label': 'Prestataires',
-                'data': [],
+                'data': serie['series']['trajets_prestataire'],
                 'borderColor': '#007bff',
                 'backgroundColor': 'rgba(0, 123, 255, 0.1)',
                 'tension': 0.4
@@ -503,31 +418,38 @@ def get_trajets_evolution():
         ]
     }
 
-    for d in dates:
-        trajets_udm = Trajet.query.filter(
-            and_(func.date(Trajet.date_heure_depart) == d, Trajet.type_trajet == 'UDM_INTERNE')
-        ).count()
-        trajets_prestataire = Trajet.query.filter(
-            and_(func.date(Trajet.date_heure_depart) == d, Trajet.type_trajet == 'PRESTATAIRE')
-        ).count()
+    return data
 
-        data['datasets'][0]['data'].append(trajets_udm)
-        data['datasets'][1]['data'].append(trajets_prestataire)
+def get_tendances(args):
+    """
+    Données pour graphique de tendances paramétrable :
+    ?granularite=jour|semaine|mois&metriques=trajets,pannes&periode=...|date_debut=&date_fin=
+    """
+    start_date, end_date = resolve_period(
+        args.get('periode'), args.get('date_debut'), args.get('date_fin'), default='annee'
+    )
+    metriques = [m for m in args.get('metriques', 'trajets,pannes,etudiants').split(',') if m]
+    serie = TimeSeriesService.get_series(
+        metriques, start_date, end_date, args.get('granularite', 'mois')
+    )
 
-    return data
+    return {
+        'labels': serie['labels'],
+        'datasets': [
+            {'label': metrique, 'data': valeurs}
+            for metrique, valeurs in serie['series'].items()
+        ]
+    }
 
 def get_passagers_by_type():
     """Données pour graphique répartition des passagers"""
     today = date.today()
     month_start = today.replace(day=1)
 
-    trajets = Trajet.query.filter(
-        func.date(Trajet.date_heure_depart) >= month_start
-    ).all()
-
-    etudiants = sum([t.nombre_places_occupees or 0 for t in trajets if t.type_passagers == 'ETUDIANT'])
-    personnel = sum([t.nombre_places_occupees or 0 for t in trajets if t.type_passagers == 'PERSONNEL'])
-    malades = sum([t.nombre_places_occupees or 0 for t in trajets if t.type_passagers == 'MALADE'])
+    totaux = TrajetRollupService.get_totaux(month_start, today)
+    etudiants = totaux['passagers_etudiants']
+    personnel = totaux['passagers_personnel']
+    malades = totaux['passagers_malades']
 
     return {
         'labels': ['Étudiants', 'Personnel', 'Malades'],
@@ -584,28 +506,8 @@ def api_performances_chauffeurs():
 
         print(f"DEBUG API: periode={periode}, date_debut={date_debut}, date_fin={date_fin}")
 
-        today = date.today()
-
         # Déterminer la période
-        if date_debut and date_fin:
-            try:
-                start_date = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                end_date = datetime.strptime(date_fin, '%Y-%m-%d').date()
-            except ValueError:
-                start_date = today
-                end_date = today
-        elif periode == 'jour':
-            start_date = today
-            end_date = today
-        elif periode == 'semaine':
-            start_date = today - timedelta(days=today.weekday())
-            end_date = today
-        elif periode == 'mois':
-            start_date = today.replace(day=1)
-            end_date = today
-        else:
-            start_date = today
-            end_date = today
+        start_date, end_date = resolve_period(periode, date_debut, date_fin, default='jour')
 
         # Récupérer les données des trajets avec chauffeurs (LEFT JOIN pour inclure tous les trajets)
         trajets_data = db.session.query(
@@ -618,8 +520,7 @@ def api_performances_chauffeurs():
         ).filter(
             and_(
                 Trajet.type_trajet == 'UDM_INTERNE',
-                func.date(Trajet.date_heure_depart) >= start_date,
-                func.date(Trajet.date_heure_depart) <= end_date
+                date_range_filter(Trajet.date_heure_depart, start_date, end_date)
             )
         ).group_by(
             Trajet.chauffeur_id, Chauffeur.nom, Chauffeur.prenom
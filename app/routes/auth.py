@@ -3,17 +3,16 @@ from flask_login import login_user, logout_user
 from app.forms.login_form import LoginForm
 from app.models.utilisateur import Utilisateur
 from app.database import db
+from app.services.connexion_service import ConnexionService
+from app.services.notification_service import NotificationService
+from app.services.identite_service import IdentiteService
 from app.utils.audit_logger import (
     log_login_success, log_login_failed, log_logout,
     log_unauthorized_access, log_system_error
 )
-import os
+from app.utils.annuaire_ldap import AnnuaireIndisponible, get_annuaire
 
-# Configuration LDAP via variables d'environnement (OBLIGATOIRE en production)
-# Les valeurs par défaut sont vides - doivent être définies dans .env
-LDAP_SERVER = os.environ.get('LDAP_SERVER', '')
-LDAP_DOMAIN = os.environ.get('LDAP_DOMAIN', '')
-BASE_DN = os.environ.get('BASE_DN', '')
+# Configuration LDAP (LDAP_SERVER, LDAP_BASE_DN, compte de service) : voir app/config.py
 
 # Templates
 TEMPLATE_LOGIN = 'auth/login.html'
@@ -60,6 +59,26 @@ def authenticate_mysql(username, password):
         print(f'Erreur MySQL Auth: {e}')
         return False, [], str(e)
 
+def authenticate_ldap(username, password):
+    """Authentifie un utilisateur via l'annuaire AD (ENABLE_LDAP).
+
+    Même retour que authenticate_mysql. Les comptes absents de l'annuaire
+    (comptes locaux) et l'annuaire indisponible ou trop lent se replient
+    sur authenticate_mysql.
+    """
+    annuaire = get_annuaire()
+    if not annuaire.configured:
+        current_app.logger.warning('LDAP activé mais non configuré : authentification MySQL')
+        return authenticate_mysql(username, password)
+    try:
+        resultat = annuaire.authentifier(username, password)
+    except AnnuaireIndisponible as e:
+        current_app.logger.warning('LDAP indisponible (%s) : authentification MySQL pour %s', e, username)
+        return authenticate_mysql(username, password)
+    if resultat is None:
+        return authenticate_mysql(username, password)
+    return resultat
+
 # Création du blueprint pour l'authentification
 bp = Blueprint('auth', __name__)
 
@@ -115,12 +134,15 @@ def _get_or_create_user(username, role):
         user.set_password(secrets.token_urlsafe(16))
         db.session.add(user)
         db.session.commit()
+        NotificationService.invalider_destinataires()
         print(f'Utilisateur {username} créé automatiquement')
         return user
 
     if role and user.role != role:
         user.role = role
         db.session.commit()
+        NotificationService.invalider_destinataires()
+        IdentiteService.invalider(user.utilisateur_id)
         print(f'Rôle de {username} mis à jour vers {role}')
     return user
 
@@ -134,6 +156,7 @@ def _setup_session_and_audit(user, username, role, groups):
     if role:
         session['user_role'] = role
     print(f'Session créée - ID: {user.utilisateur_id}, Login: {username}, Rôle: {role}')
+    ConnexionService.enregistrer_connexion(user, request.remote_addr)
     log_login_success(
         user_id=str(user.utilisateur_id),
         user_role=role,
@@ -159,7 +182,10 @@ def login():
 
     username = form.login.data
     password = form.mot_de_passe.data
-    success, groups, auth_error = authenticate_mysql(username, password)
+    if current_app.config.get('ENABLE_LDAP'):
+        success, groups, auth_error = authenticate_ldap(username, password)
+    else:
+        success, groups, auth_error = authenticate_mysql(username, password)
 
     if not success:
         log_login_failed(username=username, reason=auth_error or "Invalid credentials")
@@ -4,6 +4,7 @@ from datetime import date, timedelta
 
 # Services centralisés (Phase 1 Refactoring)
 from app.services.dashboard_service import DashboardService
+from app.services.chauffeur_service import ChauffeurService
 
 from app.routes.common import role_required
 
@@ -16,19 +17,15 @@ def get_chauffeur_statut_actuel():
     Utilisée dans toutes les routes pour afficher le statut dans la topbar
     """
     try:
-        from app.models.chauffeur import Chauffeur
         from app.models.chauffeur_statut import ChauffeurStatut
 
-        # Récupérer les informations du chauffeur depuis la base de données
-        chauffeur_db = Chauffeur.query.filter_by(
-            nom=current_user.nom,
-            prenom=current_user.prenom
-        ).first()
+        # Chauffeur résolu une fois par session (lien chauffeur.utilisateur_id)
+        chauffeur_id = ChauffeurService.resoudre_chauffeur_id(current_user.utilisateur_id)
 
         # Récupérer le statut actuel du chauffeur
         statut_actuel = "NON_SPECIFIE"
-        if chauffeur_db:
-            statuts_actuels = ChauffeurStatut.get_current_statuts(chauffeur_db.chauffeur_id)
+        if chauffeur_id is not None:
+            statuts_actuels = ChauffeurStatut.get_current_statuts(chauffeur_id)
             if statuts_actuels:
                 statut_actuel = statuts_actuels[0].statut
 
@@ -94,16 +91,12 @@ def dashboard():
 @role_required('CHAUFFEUR')
 def trajets():
     try:
-        from app.models.chauffeur import Chauffeur
         from app.models.trajet import Trajet
         from app.database import db
         from datetime import datetime, timedelta
         from sqlalchemy import func, and_, or_
         
-        chauffeur_db = Chauffeur.query.filter_by(
-            nom=current_user.nom, 
-            prenom=current_user.prenom
-        ).first()
+        chauffeur_db = ChauffeurService.get_chauffeur(current_user.utilisateur_id)
         
         if not chauffeur_db:
             statut_actuel = get_chauffeur_statut_actuel()
@@ -217,17 +210,13 @@ def trajets():
 @role_required('CHAUFFEUR')
 def profil():
     try:
-        from app.models.chauffeur import Chauffeur
         from app.models.trajet import Trajet
         from app.models.chauffeur_statut import ChauffeurStatut
         from app.database import db
         from datetime import datetime, timedelta
         
         # Récupérer les informations du chauffeur depuis la base de données
-        chauffeur_db = Chauffeur.query.filter_by(
-            nom=current_user.nom, 
-            prenom=current_user.prenom
-        ).first()
+        chauffeur_db = ChauffeurService.get_chauffeur(current_user.utilisateur_id)
         
         # Récupérer le statut actuel du chauffeur
         statut_actuel = "NON_SPECIFIE"
@@ -3,13 +3,18 @@ Routes superviseur - Accès en lecture seule utilisant les services réutilisabl
 Sécurisé avec des URLs dédiées /superviseur/*
 """
 
-from flask import Blueprint, render_template, request, jsonify, make_response
+from flask import Blueprint, render_template, request, jsonify, send_file, url_for
 from flask_login import login_required, current_user
 from datetime import date, datetime, timedelta
 
+from app.database import db
 from app.routes.common import superviseur_only, superviseur_access
 from app.services import StatsService, BusService, MaintenanceService, RapportService
+from app.services.rollup_service import TrajetRollupService
+from app.services.rapport_job_service import RapportJobService, FileAttentePleine
 from app.models.prestataire import Prestataire
+from app.utils.periodes import date_range_filter, resolve_period
+from app.utils.csv_stream import csv_response, export_filename, stream_query
 
 
 
@@ -21,8 +26,6 @@ from app.models.prestataire import Prestataire
 
 ERR_FORMAT_NON_SUPPORTE = 'Format non supporté'
 
-CSV_MIMETYPE = 'text/csv; charset=utf-8'
-
 RAPPORT_ENTITY_TEMPLATE = 'legacy/rapport_entity.html'
 
 MOIS_DECEMBRE = 'Décembre'
@@ -50,48 +53,11 @@ def dashboard():
         if not all([StatsService, BusService, MaintenanceService, RapportService]):
             raise ImportError("Services requis non disponibles")
             
-        # Récupérer les données via les services
-        from datetime import date
-        from app.models.bus_udm import BusUdM
-        from app.models.trajet import Trajet
-        from app.models.chauffeur import Chauffeur
-        from app.database import db
-        from app.utils.trafic import daily_student_trafic
-
-        today = date.today()
-        trajets_jour_aed = Trajet.query.filter(db.func.date(Trajet.date_heure_depart) == today, Trajet.numero_bus_udm != None).count()
-        trajets_jour_bus_agence = Trajet.query.filter(db.func.date(Trajet.date_heure_depart) == today, Trajet.immat_bus != None).count()
-
-        # Calcul des étudiants présents sur le campus
-        arrives = db.session.query(db.func.sum(Trajet.nombre_places_occupees)).filter(
-            db.func.date(Trajet.date_heure_depart) == today,
-            Trajet.type_passagers == 'ETUDIANT',
-            Trajet.point_depart.in_(['Mfetum', 'Ancienne Mairie'])
-        ).scalar() or 0
-
-        departs = db.session.query(db.func.sum(Trajet.nombre_places_occupees)).filter(
-            db.func.date(Trajet.date_heure_depart) == today,
-            Trajet.type_passagers == 'ETUDIANT',
-            Trajet.point_depart == 'Banekane'
-        ).scalar() or 0
+        # Récupérer les données via le service centralisé (identique à l'admin)
+        from app.services.dashboard_service import DashboardService
 
-        etudiants = arrives - departs
-
-        # Statistiques identiques à l'admin
-        stats = {
-            'bus_actifs': BusUdM.query.filter(BusUdM.etat_vehicule != 'DEFAILLANT').count(),
-            'bus_actifs_change': 0,
-            'bus_inactifs': BusUdM.query.filter_by(etat_vehicule='DEFAILLANT').count(),
-            'chauffeurs': Chauffeur.query.count(),
-            'trajets_jour_aed': trajets_jour_aed,
-            'trajets_jour_bus_agence': trajets_jour_bus_agence,
-            'trajets_jour_change': 0,
-            'bus_maintenance': BusUdM.query.filter_by(etat_vehicule='DEFAILLANT').count(),
-            'etudiants': etudiants
-        }
-
-        # Trafic temps réel
-        trafic = daily_student_trafic()
+        stats = DashboardService.get_common_stats()
+        trafic = stats.get('trafic', {})
 
         # Utiliser le template superviseur dédié
         return render_template(
@@ -447,8 +413,6 @@ def rapports():
     """
     try:
         from datetime import date, timedelta
-        from sqlalchemy import func, and_
-        from app.models.trajet import Trajet
         from app.models.bus_udm import BusUdM
 
         # Données pour les rapports rapides
@@ -456,47 +420,12 @@ def rapports():
         week_start = today - timedelta(days=today.weekday())
         month_start = today.replace(day=1)
 
-        # Statistiques du jour
-        trajets_today = Trajet.query.filter(func.date(Trajet.date_heure_depart) == today).all()
-        stats_today = {
-            'total_trajets': len(trajets_today),
-            'total_passagers': sum([t.nombre_places_occupees or 0 for t in trajets_today]),
-            'passagers_etudiants': sum([t.nombre_places_occupees or 0 for t in trajets_today if t.type_passagers == 'ETUDIANT']),
-            'passagers_personnel': sum([t.nombre_places_occupees or 0 for t in trajets_today if t.type_passagers == 'PERSONNEL']),
-            'passagers_malades': sum([t.nombre_places_occupees or 0 for t in trajets_today if t.type_passagers == 'MALADE']),
-        }
-
-        # Statistiques de la semaine
-        trajets_week = Trajet.query.filter(
-            and_(
-                func.date(Trajet.date_heure_depart) >= week_start,
-                func.date(Trajet.date_heure_depart) <= today
-            )
-        ).all()
-        stats_week = {
-            'total_trajets': len(trajets_week),
-            'total_passagers': sum([t.nombre_places_occupees or 0 for t in trajets_week]),
-            'passagers_etudiants': sum([t.nombre_places_occupees or 0 for t in trajets_week if t.type_passagers == 'ETUDIANT']),
-            'passagers_personnel': sum([t.nombre_places_occupees or 0 for t in trajets_week if t.type_passagers == 'PERSONNEL']),
-            'passagers_malades': sum([t.nombre_places_occupees or 0 for t in trajets_week if t.type_passagers == 'MALADE']),
-            'jours_periode': (today - week_start).days + 1
-        }
-
-        # Statistiques du mois
-        trajets_month = Trajet.query.filter(
-            and_(
-                func.date(Trajet.date_heure_depart) >= month_start,
-                func.date(Trajet.date_heure_depart) <= today
-            )
-        ).all()
-        stats_month = {
-            'total_trajets': len(trajets_month),
-            'total_passagers': sum([t.nombre_places_occupees or 0 for t in trajets_month]),
-            'passagers_etudiants': sum([t.nombre_places_occupees or 0 for t in trajets_month if t.type_passagers == 'ETUDIANT']),
-            'passagers_personnel': sum([t.nombre_places_occupees or 0 for t in trajets_month if t.type_passagers == 'PERSONNEL']),
-            'passagers_malades': sum([t.nombre_places_occupees or 0 for t in trajets_month if t.type_passagers == 'MALADE']),
-            'jours_periode': (today - month_start).days + 1
-        }
+        # Statistiques du jour / de la semaine / du mois (agrégat journalier)
+        stats_today = TrajetRollupService.get_totaux(today)
+        stats_week = TrajetRollupService.get_totaux(week_start, today)
+        stats_week['jours_periode'] = (today - week_start).days + 1
+        stats_month = TrajetRollupService.get_totaux(month_start, today)
+        stats_month['jours_periode'] = (today - month_start).days + 1
 
         # Statistiques de la flotte (noms harmonisés avec admin)
         bus_list = BusUdM.query.all()
@@ -542,46 +471,25 @@ def rapport_noblesse():
         # Exécuter la logique admin dans le contexte superviseur
         # Note: Nous devons adapter cela car c'est une fonction de route
         from flask import request
-        from datetime import date, datetime, timedelta
         from app.models.trajet import Trajet
         from app.database import db
 
         # Logique identique à l'admin
-        today = date.today()
-        start_date = today.replace(day=1)
-        end_date = today
-
         periode = request.args.get('periode', 'mois')
         date_debut = request.args.get('date_debut')
         date_fin = request.args.get('date_fin')
 
-        if date_debut and date_fin:
-            try:
-                start_date = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                end_date = datetime.strptime(date_fin, '%Y-%m-%d').date()
-            except ValueError:
-                start_date = today.replace(day=1)
-                end_date = today
-        elif periode == 'jour':
-            start_date = today
-            end_date = today
-        elif periode == 'semaine':
-            start_date = today - timedelta(days=today.weekday())
-            end_date = today
-        elif periode == 'annee':
-            start_date = today.replace(month=1, day=1)
-            end_date = today
+        start_date, end_date = resolve_period(periode, date_debut, date_fin, default='mois')
 
         # Requête des trajets Noblesse (via relation Prestataire)
         from app.models.prestataire import Prestataire
-        from sqlalchemy import and_, func
+        from sqlalchemy import and_
 
         trajets = db.session.query(Trajet).join(Prestataire).filter(
             and_(
                 Trajet.type_trajet == 'PRESTATAIRE',
                 Prestataire.nom_prestataire == 'Noblesse',
-                func.date(Trajet.date_heure_depart) >= start_date,
-                func.date(Trajet.date_heure_depart) <= end_date
+                date_range_filter(Trajet.date_heure_depart, start_date, end_date)
             )
         ).order_by(Trajet.date_heure_depart.desc()).all()
 
@@ -629,46 +537,26 @@ def rapport_charter():
     """
     try:
         from flask import request
-        from datetime import date, datetime, timedelta
+        from datetime import datetime
         from app.models.trajet import Trajet
         from app.database import db
 
         # Logique identique à l'admin
-        today = date.today()
-        start_date = today.replace(day=1)
-        end_date = today
-
         periode = request.args.get('periode', 'mois')
         date_debut = request.args.get('date_debut')
         date_fin = request.args.get('date_fin')
 
-        if date_debut and date_fin:
-            try:
-                start_date = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                end_date = datetime.strptime(date_fin, '%Y-%m-%d').date()
-            except ValueError:
-                start_date = today.replace(day=1)
-                end_date = today
-        elif periode == 'jour':
-            start_date = today
-            end_date = today
-        elif periode == 'semaine':
-            start_date = today - timedelta(days=today.weekday())
-            end_date = today
-        elif periode == 'annee':
-            start_date = today.replace(month=1, day=1)
-            end_date = today
+        start_date, end_date = resolve_period(periode, date_debut, date_fin, default='mois')
 
         # Requête des trajets Charter (via relation Prestataire)
         from app.models.prestataire import Prestataire
-        from sqlalchemy import and_, func
+        from sqlalchemy import and_
 
         trajets = db.session.query(Trajet).join(Prestataire).filter(
             and_(
                 Trajet.type_trajet == 'PRESTATAIRE',
                 Prestataire.nom_prestataire == 'Charter',
-                func.date(Trajet.date_heure_depart) >= start_date,
-                func.date(Trajet.date_heure_depart) <= end_date
+                date_range_filter(Trajet.date_heure_depart, start_date, end_date)
             )
         ).order_by(Trajet.date_heure_depart.desc()).all()
 
@@ -715,43 +603,21 @@ def rapport_bus_udm():
     """
     try:
         from flask import request
-        from datetime import date, datetime, timedelta
+        from datetime import datetime
         from app.models.trajet import Trajet
         from app.database import db
 
         # Logique identique à l'admin
-        today = date.today()
-        start_date = today.replace(day=1)
-        end_date = today
-
         periode = request.args.get('periode', 'mois')
         date_debut = request.args.get('date_debut')
         date_fin = request.args.get('date_fin')
 
-        if date_debut and date_fin:
-            try:
-                start_date = datetime.strptime(date_debut, '%Y-%m-%d').date()
-                end_date = datetime.strptime(date_fin, '%Y-%m-%d').date()
-            except ValueError:
-                start_date = today.replace(day=1)
-                end_date = today
-        elif periode == 'jour':
-            start_date = today
-            end_date = today
-        elif periode == 'semaine':
-            start_date = today - timedelta(days=today.weekday())
-            end_date = today
-        elif periode == 'annee':
-            start_date = today.replace(month=1, day=1)
-            end_date = today
+        start_date, end_date = resolve_period(periode, date_debut, date_fin, default='mois')
 
         # Requête des trajets Bus UdM (type_trajet UDM_INTERNE)
-        from sqlalchemy import func
-
         trajets = Trajet.query.filter(
             Trajet.type_trajet == 'UDM_INTERNE',
-            func.date(Trajet.date_heure_depart) >= start_date,
-            func.date(Trajet.date_heure_depart) <= end_date
+            date_range_filter(Trajet.date_heure_depart, start_date, end_date)
         ).order_by(Trajet.date_heure_depart.desc()).all()
 
         # Calculer les statistiques
@@ -785,41 +651,41 @@ def rapport_bus_udm():
                              message=f"Erreur: {str(e)}", readonly=True)
 
 
+def _export_dates():
+    """Bornes ?date_debut=&date_fin= (AAAA-MM-JJ) des exports, None si absentes"""
+    date_debut = request.args.get('date_debut')
+    date_fin = request.args.get('date_fin')
+    
+    if date_debut:
+        date_debut = datetime.strptime(date_debut, '%Y-%m-%d').date()
+    if date_fin:
+        date_fin = datetime.strptime(date_fin, '%Y-%m-%d').date()
+    return date_debut, date_fin
+
+
 @bp.route('/export/trajets/<format>')
 @superviseur_only
 def export_trajets(format):
     """
-    Export des trajets en CSV ou PDF
+    Export des trajets en CSV (en flux) ou PDF
     Utilise RapportService pour générer les exports
     """
     try:
-        # Paramètres de période
-        date_debut = request.args.get('date_debut')
-        date_fin = request.args.get('date_fin')
-        
-        if date_debut:
-            date_debut = datetime.strptime(date_debut, '%Y-%m-%d').date()
-        if date_fin:
-            date_fin = datetime.strptime(date_fin, '%Y-%m-%d').date()
-        
-        # Récupérer les données
-        rapport = RapportService.get_rapport_trajets(date_debut, date_fin)
+        date_debut, date_fin = _export_dates()
         
         if format.lower() == 'csv':
-            content, filename = RapportService.export_trajets_csv(rapport['trajets'])
-            
-            response = make_response(content)
-            response.headers['Content-Type'] = CSV_MIMETYPE
-            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+            # Lignes lues par paquets, sans charger tout le rapport en mémoire
+            trajets = RapportService.iter_rapport_trajets(date_debut, date_fin)
+            return csv_response(
+                RapportService.iter_trajets_csv_rows(trajets), export_filename('trajets')
+            )
             
         elif format.lower() == 'pdf':
-            content, filename = RapportService.export_trajets_pdf(rapport['trajets'])
-            
-            response = make_response(content)
-            response.headers['Content-Type'] = 'application/pdf'
-            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+            # Génération en arrière-plan : suivre /superviseur/jobs/<id> puis télécharger
+            return _soumettre_rapport('trajets_pdf', {
+                'date_debut': (date_debut or date.today().replace(day=1)).isoformat(),
+                'date_fin': (date_fin or date.today()).isoformat(),
+            })
             
         else:
             return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
@@ -832,65 +698,50 @@ def export_trajets(format):
 @superviseur_only
 def export_carburation(format):
     """
-    Export des données de carburation en CSV
-    Utilise RapportService pour générer les exports
+    Export des données de carburation en CSV (en flux)
     """
     try:
-        # Paramètres de période
-        date_debut = request.args.get('date_debut')
-        date_fin = request.args.get('date_fin')
+        date_debut, date_fin = _export_dates()
         
-        if date_debut:
-            date_debut = datetime.strptime(date_debut, '%Y-%m-%d').date()
-        if date_fin:
-            date_fin = datetime.strptime(date_fin, '%Y-%m-%d').date()
+        if format.lower() != 'csv':
+            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
         
-        # Récupérer les données de carburation
         from app.models.carburation import Carburation
-        query = Carburation.query
+        from app.models.bus_udm import BusUdM
+        
+        # Colonnes seules, numéro du bus par jointure (pas de chargement par ligne)
+        query = db.select(
+            Carburation.date_carburation,
+            BusUdM.numero,
+            Carburation.kilometrage,
+            Carburation.quantite_litres,
+            Carburation.prix_unitaire,
+            Carburation.cout_total,
+            Carburation.remarque
+        ).outerjoin(BusUdM, Carburation.bus_udm_id == BusUdM.id)
         
         if date_debut:
-            query = query.filter(Carburation.date_carburation >= date_debut)
+            query = query.where(Carburation.date_carburation >= date_debut)
         if date_fin:
-            query = query.filter(Carburation.date_carburation <= date_fin)
-            
-        carburations = query.order_by(Carburation.date_carburation.desc()).all()
+            query = query.where(Carburation.date_carburation <= date_fin)
         
-        if format.lower() == 'csv':
-            # Générer le CSV
-            import csv
-            from io import StringIO
-            
-            output = StringIO()
-            writer = csv.writer(output)
-            
-            # En-têtes
-            writer.writerow(['Date', 'Bus N°', 'Kilométrage', 'Quantité (L)', 'Prix Unitaire', 'Coût Total', 'Remarques'])
-            
-            # Données
-            for carb in carburations:
-                writer.writerow([
-                    carb.date_carburation.strftime('%d/%m/%Y') if carb.date_carburation else '',
-                    carb.bus_udm.numero if carb.bus_udm else '',
-                    carb.kilometrage or '',
-                    carb.quantite_litres or '',
-                    carb.prix_unitaire or '',
-                    carb.cout_total or '',
-                    carb.remarque or ''
-                ])
-            
-            content = output.getvalue()
-            output.close()
-            
-            filename = f'carburations_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-            
-            response = make_response(content)
-            response.headers['Content-Type'] = CSV_MIMETYPE
-            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
-            
-        else:
-            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
+        rows = stream_query(query.order_by(Carburation.date_carburation.desc()))
+        lignes = (
+            [
+                carb.date_carburation.strftime('%d/%m/%Y') if carb.date_carburation else '',
+                carb.numero or '',
+                carb.kilometrage or '',
+                carb.quantite_litres or '',
+                carb.prix_unitaire or '',
+                carb.cout_total or '',
+                carb.remarque or ''
+            ]
+            for carb in rows
+        )
+        return csv_response(
+            lignes, export_filename('carburations'),
+            header=['Date', 'Bus N°', 'Kilométrage', 'Quantité (L)', 'Prix Unitaire', 'Coût Total', 'Remarques']
+        )
             
     except Exception as e:
         return jsonify({'error': f'Erreur lors de l\'export: {str(e)}'}), 500
@@ -900,58 +751,49 @@ def export_carburation(format):
 @superviseur_only
 def export_chauffeurs(format):
     """
-    Export des données des chauffeurs en CSV
+    Export des données des chauffeurs en CSV (en flux)
     """
     try:
+        if format.lower() != 'csv':
+            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
+        
         from app.models.chauffeur import Chauffeur
+        from app.models.utilisateur import Utilisateur
+        from app.models.chauffeur_statut import ChauffeurStatut
         
-        chauffeurs = Chauffeur.query.all()
+        # Email (table utilisateur, même identifiant) et statut courant préchargés
+        emails = dict(db.session.query(Utilisateur.utilisateur_id, Utilisateur.email).all())
+        maintenant = datetime.now()
+        statuts = {}
+        for chauffeur_id, statut in db.session.query(
+            ChauffeurStatut.chauffeur_id, ChauffeurStatut.statut
+        ).filter(
+            ChauffeurStatut.date_debut <= maintenant,
+            ChauffeurStatut.date_fin >= maintenant
+        ).order_by(ChauffeurStatut.id):
+            statuts.setdefault(chauffeur_id, statut)
         
-        if format.lower() == 'csv':
-            import csv
-            from io import StringIO
-            
-            output = StringIO()
-            writer = csv.writer(output)
-            
-            # En-têtes
-            writer.writerow(['Nom', 'Prénom', 'Téléphone', 'Email', 'Permis', 'Date Embauche', 'Statut'])
-
-            # Données
-            from app.models.utilisateur import Utilisateur
-            from app.models.chauffeur_statut import ChauffeurStatut
-            for chauffeur in chauffeurs:
-                # Email pris depuis la table utilisateur (même identifiant)
-                user = Utilisateur.query.get(chauffeur.chauffeur_id)
-                email = user.email if user else ''
-
-                # Statut courant (si disponible)
-                statuts = ChauffeurStatut.get_current_statuts(chauffeur.chauffeur_id)
-                statut = statuts[0].statut if statuts else ''
-
-                # Date d'embauche non disponible dans la table chauffeur -> vide
-                writer.writerow([
-                    chauffeur.nom or '',
-                    chauffeur.prenom or '',
-                    chauffeur.telephone or '',
-                    email,
-                    chauffeur.numero_permis or '',
-                    '',  # date_embauche non disponible
-                    statut
-                ])
-            
-            content = output.getvalue()
-            output.close()
-            
-            filename = f'chauffeurs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-            
-            response = make_response(content)
-            response.headers['Content-Type'] = CSV_MIMETYPE
-            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
-            
-        else:
-            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
+        rows = stream_query(db.select(
+            Chauffeur.chauffeur_id, Chauffeur.nom, Chauffeur.prenom,
+            Chauffeur.telephone, Chauffeur.numero_permis
+        ))
+        # Date d'embauche non disponible dans la table chauffeur -> vide
+        lignes = (
+            [
+                chauffeur.nom or '',
+                chauffeur.prenom or '',
+                chauffeur.telephone or '',
+                emails.get(chauffeur.chauffeur_id) or '',
+                chauffeur.numero_permis or '',
+                '',  # date_embauche non disponible
+                statuts.get(chauffeur.chauffeur_id, '')
+            ]
+            for chauffeur in rows
+        )
+        return csv_response(
+            lignes, export_filename('chauffeurs'),
+            header=['Nom', 'Prénom', 'Téléphone', 'Email', 'Permis', 'Date Embauche', 'Statut']
+        )
             
     except Exception as e:
         return jsonify({'error': f'Erreur lors de l\'export: {str(e)}'}), 500
@@ -961,48 +803,36 @@ def export_chauffeurs(format):
 @superviseur_only
 def export_bus(format):
     """
-    Export des données des bus en CSV
+    Export des données des bus en CSV (en flux)
     """
     try:
-        from app.models.bus_udm import BusUdM
+        if format.lower() != 'csv':
+            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
         
-        buses = BusUdM.query.all()
+        from app.models.bus_udm import BusUdM
         
-        if format.lower() == 'csv':
-            import csv
-            from io import StringIO
-            
-            output = StringIO()
-            writer = csv.writer(output)
-            
-            # En-têtes
-            writer.writerow(['Numéro', 'Immatriculation', 'Marque', 'Modèle', 'Année', 'Capacité', 'État', 'Kilométrage'])
-            
-            # Données
-            for bus in buses:
-                writer.writerow([
-                    bus.numero or '',
-                    bus.immatriculation or '',
-                    bus.marque or '',
-                    bus.modele or '',
-                    bus.annee or '',
-                    bus.capacite or '',
-                    bus.etat_vehicule or '',
-                    bus.kilometrage or ''
-                ])
-            
-            content = output.getvalue()
-            output.close()
-            
-            filename = f'bus_udm_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-            
-            response = make_response(content)
-            response.headers['Content-Type'] = CSV_MIMETYPE
-            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
-            
-        else:
-            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
+        rows = stream_query(db.select(
+            BusUdM.numero, BusUdM.immatriculation, BusUdM.marque, BusUdM.modele,
+            BusUdM.nombre_places, BusUdM.etat_vehicule, BusUdM.kilometrage
+        ))
+        # Pas de champ année dans la table bus_udm -> vide ; capacité = nombre de places
+        lignes = (
+            [
+                bus.numero or '',
+                bus.immatriculation or '',
+                bus.marque or '',
+                bus.modele or '',
+                '',
+                bus.nombre_places or '',
+                bus.etat_vehicule or '',
+                bus.kilometrage or ''
+            ]
+            for bus in rows
+        )
+        return csv_response(
+            lignes, export_filename('bus_udm'),
+            header=['Numéro', 'Immatriculation', 'Marque', 'Modèle', 'Année', 'Capacité', 'État', 'Kilométrage']
+        )
             
     except Exception as e:
         return jsonify({'error': f'Erreur lors de l\'export: {str(e)}'}), 500
@@ -1012,46 +842,33 @@ def export_bus(format):
 @superviseur_only
 def export_utilisateurs(format):
     """
-    Export des données des utilisateurs en CSV
+    Export des données des utilisateurs en CSV (en flux)
     """
     try:
-        from app.models.utilisateur import Utilisateur
+        if format.lower() != 'csv':
+            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
         
-        utilisateurs = Utilisateur.query.all()
+        from app.models.utilisateur import Utilisateur
         
-        if format.lower() == 'csv':
-            import csv
-            from io import StringIO
-            
-            output = StringIO()
-            writer = csv.writer(output)
-            
-            # En-têtes
-            writer.writerow(['Nom', 'Prénom', 'Login', 'Email', 'Téléphone', 'Rôle'])
-            
-            # Données
-            for user in utilisateurs:
-                writer.writerow([
-                    user.nom or '',
-                    user.prenom or '',
-                    user.login or '',
-                    user.email or '',
-                    user.telephone or '',
-                    user.role or ''
-                ])
-            
-            content = output.getvalue()
-            output.close()
-            
-            filename = f'utilisateurs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-            
-            response = make_response(content)
-            response.headers['Content-Type'] = CSV_MIMETYPE
-            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
-            
-        else:
-            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
+        rows = stream_query(db.select(
+            Utilisateur.nom, Utilisateur.prenom, Utilisateur.login,
+            Utilisateur.email, Utilisateur.telephone, Utilisateur.role
+        ))
+        lignes = (
+            [
+                user.nom or '',
+                user.prenom or '',
+                user.login or '',
+                user.email or '',
+                user.telephone or '',
+                user.role or ''
+            ]
+            for user in rows
+        )
+        return csv_response(
+            lignes, export_filename('utilisateurs'),
+            header=['Nom', 'Prénom', 'Login', 'Email', 'Téléphone', 'Rôle']
+        )
             
     except Exception as e:
         return jsonify({'error': f'Erreur lors de l\'export: {str(e)}'}), 500
@@ -1061,37 +878,72 @@ def export_utilisateurs(format):
 @superviseur_only
 def export_maintenance(format):
     """
-    Export des données de maintenance en CSV
+    Export des données de maintenance en CSV (en flux)
     Utilise RapportService pour générer les exports
     """
     try:
-        # Paramètres de période
-        date_debut = request.args.get('date_debut')
-        date_fin = request.args.get('date_fin')
+        date_debut, date_fin = _export_dates()
         
-        if date_debut:
-            date_debut = datetime.strptime(date_debut, '%Y-%m-%d').date()
-        if date_fin:
-            date_fin = datetime.strptime(date_fin, '%Y-%m-%d').date()
+        if format.lower() != 'csv':
+            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
         
-        # Récupérer les données
         rapport = RapportService.get_rapport_maintenance(date_debut, date_fin)
-        
-        if format.lower() == 'csv':
-            content, filename = RapportService.export_maintenance_csv(rapport)
-            
-            response = make_response(content)
-            response.headers['Content-Type'] = CSV_MIMETYPE
-            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
-            
-        else:
-            return jsonify({'error': ERR_FORMAT_NON_SUPPORTE}), 400
+        return csv_response(
+            RapportService.iter_maintenance_csv_rows(rapport), export_filename('maintenance')
+        )
             
     except Exception as e:
         return jsonify({'error': f'Erreur lors de l\'export: {str(e)}'}), 500
 
 
+def _soumettre_rapport(type_rapport, parametres):
+    """Lance (ou retrouve) un rapport en arrière-plan ; réponse 202 avec l'URL de suivi"""
+    try:
+        job, _ = RapportJobService.soumettre(type_rapport, parametres, current_user.utilisateur_id)
+    except FileAttentePleine as e:
+        return jsonify({'error': str(e)}), 503
+
+    response = jsonify(_job_payload(job))
+    response.status_code = 202
+    response.headers['Location'] = url_for('superviseur.job_status', job_id=job.id)
+    return response
+
+
+def _job_payload(job):
+    payload = job.to_dict()
+    payload['status_url'] = url_for('superviseur.job_status', job_id=job.id)
+    if job.statut == 'TERMINE':
+        payload['download_url'] = url_for('superviseur.job_download', job_id=job.id)
+    return payload
+
+
+@bp.route('/jobs/<job_id>')
+@superviseur_only
+def job_status(job_id):
+    """État d'un rapport généré en arrière-plan"""
+    job = RapportJobService.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Rapport introuvable ou expiré'}), 404
+    return jsonify(_job_payload(job))
+
+
+@bp.route('/jobs/<job_id>/fichier')
+@superviseur_only
+def job_download(job_id):
+    """Téléchargement du fichier d'un rapport terminé (depuis le cache)"""
+    job = RapportJobService.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Rapport introuvable ou expiré'}), 404
+    if job.statut != 'TERMINE':
+        return jsonify(_job_payload(job)), 409
+
+    chemin = RapportJobService.chemin_fichier(job)
+    if chemin is None:
+        return jsonify({'error': 'Rapport introuvable ou expiré'}), 404
+    return send_file(chemin, mimetype=job.mimetype, as_attachment=True,
+                     download_name=job.nom_fichier)
+
+
 @bp.route('/api/stats')
 @superviseur_only
 def api_stats():
@@ -1108,7 +960,9 @@ def api_stats():
             }), 503
             
         stats = StatsService.get_dashboard_stats()
-        trends = StatsService.get_monthly_trends(6)
+        # Nombre de mois de tendances (une requête par table source, quel que soit N)
+        mois = min(max(request.args.get('mois', 6, type=int), 1), 24)
+        trends = StatsService.get_monthly_trends(mois)
         
         return jsonify({
             'success': True,
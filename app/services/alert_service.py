@@ -1,250 +1,369 @@
 """
 Service d'alertes pour TransportUdM
 Vérifie les seuils critiques et envoie des notifications
+- evaluer_seuils : évaluation pure de toute la flotte (aucun envoi, aucune écriture)
+- notifier_alertes : envoi des alertes nouvelles ou aggravées (voir AlertStateService)
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from datetime import datetime, date
-from sqlalchemy import func
+from sqlalchemy import and_, func
 
 from app.database import db
 from app.models.bus_udm import BusUdM
+from app.models.chauffeur import Chauffeur
 from app.models.vidange import Vidange
-from app.models.carburation import Carburation
+from app.models.document_bus_udm import DocumentBusUdM
+from app.services.alert_state_service import AlertStateService
 from app.services.notification_service import NotificationService
-from app.constants import AppConstants
 from flask import current_app
 
 
+TYPES_EVALUES = ('VIDANGE', 'CARBURANT', 'DOCUMENT', 'PERMIS')
+
+
 class AlertService:
     """Service pour la gestion des alertes et seuils critiques"""
     
     # Seuils par défaut
     SEUIL_VIDANGE_KM = 5000  # Kilomètres
     SEUIL_CARBURANT_PERCENT = 20  # Pourcentage
+    SEUIL_CARBURANT_CRITIQUE_PERCENT = 10  # Pourcentage (nouvelle alerte)
+    SEUIL_DOCUMENT_PERCENT = 30  # Part de validité restante
+    SEUIL_DOCUMENT_CRITIQUE_PERCENT = 10
+    SEUIL_PERMIS_JOURS = 30  # Jours avant expiration du permis
+    SEUIL_PERMIS_CRITIQUE_JOURS = 7
     
     @staticmethod
-    def check_all_critical_thresholds() -> Dict[str, Any]:
+    def check_all_critical_thresholds(types: Iterable[str] = TYPES_EVALUES) -> Dict[str, Any]:
         """
-        Vérifie tous les seuils critiques et envoie les notifications nécessaires
+        Vérifie tous les seuils critiques (ou seulement ``types``) et envoie les notifications nécessaires
+        Une alerte déjà notifiée au même niveau n'est pas renvoyée (voir AlertStateService)
         Retourne un rapport des vérifications effectuées
         """
         rapport = {
             'timestamp': datetime.now().isoformat(),
             'vidange_alerts': [],
             'carburant_alerts': [],
+            'document_alerts': [],
+            'permis_alerts': [],
             'total_buses_checked': 0,
             'notifications_sent': 0
         }
         
         try:
-            # Récupérer tous les bus actifs
-            buses = BusUdM.query.filter(BusUdM.statut != 'HORS_SERVICE').all()
-            rapport['total_buses_checked'] = len(buses)
-            
-            for bus in buses:
-                # Vérifier seuil vidange
-                vidange_alert = AlertService.check_vidange_threshold(bus)
-                if vidange_alert['needs_alert']:
-                    rapport['vidange_alerts'].append(vidange_alert)
-                    if vidange_alert['notification_sent']:
-                        rapport['notifications_sent'] += 1
-                
-                # Vérifier seuil carburant
-                carburant_alert = AlertService.check_carburant_threshold(bus)
-                if carburant_alert['needs_alert']:
-                    rapport['carburant_alerts'].append(carburant_alert)
-                    if carburant_alert['notification_sent']:
-                        rapport['notifications_sent'] += 1
-            
+            evaluation = AlertService.evaluer_seuils(types=types)
+            rapport['total_buses_checked'] = len(evaluation['buses'])
+            rapport['notifications_sent'] = AlertService.notifier_alertes(evaluation)
+
+            rapport['vidange_alerts'] = [e for e in evaluation['VIDANGE'] if e['needs_alert']]
+            rapport['carburant_alerts'] = [e for e in evaluation['CARBURANT'] if e['needs_alert']]
+            rapport['document_alerts'] = [e for e in evaluation['DOCUMENT'] if e['needs_alert']]
+            rapport['permis_alerts'] = [e for e in evaluation['PERMIS'] if e['needs_alert']]
             current_app.logger.info(f"Vérification seuils terminée: {rapport['notifications_sent']} notifications envoyées")
             
         except Exception as e:
+            db.session.rollback()
             current_app.logger.error(f"Erreur vérification seuils: {str(e)}")
             rapport['error'] = str(e)
         
         return rapport
-    
+
     @staticmethod
-    def check_vidange_threshold(bus: BusUdM) -> Dict[str, Any]:
+    def evaluer_seuils(bus_ids: Optional[Iterable[int]] = None, types: Iterable[str] = TYPES_EVALUES,
+                       aujourd_hui: Optional[date] = None) -> Dict[str, Any]:
         """
-        Vérifie si un bus a atteint le seuil critique de vidange
+        Évalue les seuils de toute la flotte (ou des bus ``bus_ids``) sans effet de bord :
+        une requête pour les bus et le kilométrage de leur dernière vidange, une pour
+        les documents, une pour les permis (flotte entière uniquement).
+        Retourne {'buses': [...], 'VIDANGE': [...], 'CARBURANT': [...], 'DOCUMENT': [...],
+        'PERMIS': [...]} ; chaque évaluation porte son niveau de gravité (0 = normal).
         """
-        result = {
+        types = set(types)
+        aujourd_hui = aujourd_hui or date.today()
+
+        # Kilométrage de la dernière vidange par bus (la plus récente en date)
+        derniere_date = db.session.query(
+            Vidange.bus_udm_id, func.max(Vidange.date_vidange).label('date_vidange')
+        ).group_by(Vidange.bus_udm_id).subquery()
+        derniere_vidange = db.session.query(
+            Vidange.bus_udm_id, func.max(Vidange.kilometrage).label('kilometrage')
+        ).join(derniere_date, and_(
+            Vidange.bus_udm_id == derniere_date.c.bus_udm_id,
+            Vidange.date_vidange == derniere_date.c.date_vidange
+        )).group_by(Vidange.bus_udm_id).subquery()
+
+        query = db.session.query(BusUdM, derniere_vidange.c.kilometrage).outerjoin(
+            derniere_vidange, derniere_vidange.c.bus_udm_id == BusUdM.id
+        )
+        if bus_ids is not None:
+            bus_ids = list(bus_ids)
+            query = query.filter(BusUdM.id.in_(bus_ids))
+        lignes = query.order_by(BusUdM.id).all()
+
+        evaluation = {
+            'bus_ids': bus_ids,
+            'types': [type_alerte for type_alerte in TYPES_EVALUES if type_alerte in types],
+            'buses': [
+                {'id': bus.id, 'numero': bus.numero, 'immatriculation': bus.immatriculation,
+                 'kilometrage': bus.kilometrage}
+                for bus, _ in lignes
+            ],
+            'VIDANGE': [AlertService._evaluer_vidange(bus, km) for bus, km in lignes] if 'VIDANGE' in types else [],
+            'CARBURANT': [AlertService._evaluer_carburant(bus) for bus, _ in lignes] if 'CARBURANT' in types else [],
+            'DOCUMENT': [],
+            'PERMIS': [],
+        }
+
+        buses_par_numero = {bus.numero: bus for bus, _ in lignes}
+        if 'DOCUMENT' in types and buses_par_numero:
+            documents = DocumentBusUdM.query.filter(
+                DocumentBusUdM.numero_bus_udm.in_(list(buses_par_numero)),
+                DocumentBusUdM.date_expiration.isnot(None)
+            ).order_by(DocumentBusUdM.document_id).all()
+            evaluation['DOCUMENT'] = [
+                AlertService._evaluer_document(document, buses_par_numero[document.numero_bus_udm], aujourd_hui)
+                for document in documents
+            ]
+
+        # Les permis ne dépendent pas des bus : évalués seulement pour la flotte entière
+        if 'PERMIS' in types and bus_ids is None:
+            evaluation['PERMIS'] = [
+                AlertService._evaluer_permis(chauffeur, aujourd_hui)
+                for chauffeur in Chauffeur.query.order_by(Chauffeur.chauffeur_id).all()
+            ]
+        return evaluation
+
+    @staticmethod
+    def _evaluer_vidange(bus: BusUdM, km_derniere_vidange: Optional[int]) -> Dict[str, Any]:
+        # Kilomètres depuis la dernière vidange (kilométrage total si aucune vidange)
+        kilometrage = bus.kilometrage or 0
+        km_depuis_vidange = kilometrage - km_derniere_vidange if km_derniere_vidange is not None else kilometrage
+        niveau = AlertService._niveau_vidange(km_depuis_vidange)
+        return {
+            'type_alerte': 'VIDANGE',
+            'reference': '',
             'bus_id': bus.id,
             'bus_numero': bus.numero,
-            'needs_alert': False,
-            'km_depuis_vidange': 0,
+            'needs_alert': niveau > 0,
+            'niveau': niveau,
+            'km_depuis_vidange': km_depuis_vidange,
             'seuil': AlertService.SEUIL_VIDANGE_KM,
             'notification_sent': False,
             'error': None
         }
-        
-        try:
-            # Récupérer la dernière vidange
-            derniere_vidange = Vidange.query.filter_by(
-                bus_udm_id=bus.id
-            ).order_by(Vidange.date_vidange.desc()).first()
-            
-            if derniere_vidange:
-                # Calculer les kilomètres depuis la dernière vidange
-                km_depuis_vidange = bus.kilometrage - derniere_vidange.kilometrage
-                result['km_depuis_vidange'] = km_depuis_vidange
-                
-                # Vérifier si le seuil est atteint
-                if km_depuis_vidange >= AlertService.SEUIL_VIDANGE_KM:
-                    result['needs_alert'] = True
-                    
-                    # Vérifier si on a déjà envoyé une alerte récemment (éviter le spam)
-                    if not AlertService._has_recent_vidange_alert(bus.id):
-                        # Envoyer notification
-                        notification_sent = NotificationService.send_seuil_vidange_notification(
-                            bus, km_depuis_vidange, AlertService.SEUIL_VIDANGE_KM
-                        )
-                        result['notification_sent'] = notification_sent
-                        
-                        if notification_sent:
-                            AlertService._mark_vidange_alert_sent(bus.id)
-            else:
-                # Pas de vidange enregistrée, utiliser le kilométrage total
-                result['km_depuis_vidange'] = bus.kilometrage
-                if bus.kilometrage >= AlertService.SEUIL_VIDANGE_KM:
-                    result['needs_alert'] = True
-                    
-                    if not AlertService._has_recent_vidange_alert(bus.id):
-                        notification_sent = NotificationService.send_seuil_vidange_notification(
-                            bus, bus.kilometrage, AlertService.SEUIL_VIDANGE_KM
-                        )
-                        result['notification_sent'] = notification_sent
-                        
-                        if notification_sent:
-                            AlertService._mark_vidange_alert_sent(bus.id)
-        
-        except Exception as e:
-            result['error'] = str(e)
-            current_app.logger.error(f"Erreur vérification vidange bus {bus.numero}: {str(e)}")
-        
-        return result
-    
+
     @staticmethod
-    def check_carburant_threshold(bus: BusUdM) -> Dict[str, Any]:
-        """
-        Vérifie si un bus a atteint le seuil critique de carburant
-        """
-        result = {
+    def _evaluer_carburant(bus: BusUdM) -> Dict[str, Any]:
+        niveau_actuel = bus.niveau_carburant_litres
+        pourcentage, niveau = 0, 0
+        # Niveau évalué seulement si les données de carburant sont connues
+        if niveau_actuel is not None and bus.capacite_reservoir_litres:
+            pourcentage = niveau_actuel / bus.capacite_reservoir_litres * 100
+            niveau = AlertService._niveau_carburant(pourcentage)
+        return {
+            'type_alerte': 'CARBURANT',
+            'reference': '',
             'bus_id': bus.id,
             'bus_numero': bus.numero,
-            'needs_alert': False,
-            'niveau_actuel': 0,
-            'pourcentage': 0,
+            'needs_alert': niveau > 0,
+            'niveau': niveau,
+            'niveau_actuel': niveau_actuel or 0,
+            'pourcentage': pourcentage,
             'seuil': AlertService.SEUIL_CARBURANT_PERCENT,
             'notification_sent': False,
             'error': None
         }
-        
-        try:
-            # Vérifier si on a les données de carburant
-            if bus.niveau_carburant_litres is not None and bus.capacite_reservoir_litres is not None:
-                niveau_actuel = bus.niveau_carburant_litres
-                capacite_totale = bus.capacite_reservoir_litres
-                
-                if capacite_totale > 0:
-                    pourcentage = (niveau_actuel / capacite_totale) * 100
-                    result['niveau_actuel'] = niveau_actuel
-                    result['pourcentage'] = pourcentage
-                    
-                    # Vérifier si le seuil est atteint
-                    if pourcentage <= AlertService.SEUIL_CARBURANT_PERCENT:
-                        result['needs_alert'] = True
-                        
-                        # Vérifier si on a déjà envoyé une alerte récemment
-                        if not AlertService._has_recent_carburant_alert(bus.id, pourcentage):
-                            # Envoyer notification
-                            notification_sent = NotificationService.send_seuil_carburant_notification(
-                                bus, niveau_actuel, AlertService.SEUIL_CARBURANT_PERCENT
-                            )
-                            result['notification_sent'] = notification_sent
-                            
-                            if notification_sent:
-                                AlertService._mark_carburant_alert_sent(bus.id, pourcentage)
-        
-        except Exception as e:
-            result['error'] = str(e)
-            current_app.logger.error(f"Erreur vérification carburant bus {bus.numero}: {str(e)}")
-        
-        return result
-    
+
     @staticmethod
-    def _has_recent_vidange_alert(bus_id: int) -> bool:
+    def _evaluer_document(document: DocumentBusUdM, bus: BusUdM, aujourd_hui: date) -> Dict[str, Any]:
+        jours_restants = (document.date_expiration - aujourd_hui).days
+        duree = max((document.date_expiration - document.date_debut).days, 1) if document.date_debut else 1
+        pourcentage_restant = max(jours_restants, 0) / duree * 100
+        niveau = AlertService._niveau_document(pourcentage_restant, jours_restants)
+        return {
+            'type_alerte': 'DOCUMENT',
+            'reference': str(document.document_id),
+            'bus_id': bus.id,
+            'bus_numero': bus.numero,
+            'document_id': document.document_id,
+            'type_document': document.type_document,
+            'needs_alert': niveau > 0,
+            'niveau': niveau,
+            'jours_restants': jours_restants,
+            'pourcentage_restant': round(pourcentage_restant, 1),
+            'notification_sent': False,
+            'error': None
+        }
+
+    @staticmethod
+    def _evaluer_permis(chauffeur: Chauffeur, aujourd_hui: date) -> Dict[str, Any]:
+        jours_restants = (chauffeur.date_expiration_permis - aujourd_hui).days \
+            if chauffeur.date_expiration_permis else None
+        niveau = AlertService._niveau_permis(jours_restants)
+        return {
+            'type_alerte': 'PERMIS',
+            'reference': str(chauffeur.chauffeur_id),
+            'bus_id': None,
+            'chauffeur_id': chauffeur.chauffeur_id,
+            'chauffeur_nom': chauffeur.nom_complet,
+            'needs_alert': niveau > 0,
+            'niveau': niveau,
+            'jours_restants': jours_restants,
+            'notification_sent': False,
+            'error': None
+        }
+
+    @staticmethod
+    def _niveau_vidange(km_depuis_vidange: int) -> int:
+        """Niveau de gravité : 1 au seuil, puis +1 à chaque seuil supplémentaire dépassé"""
+        return max(km_depuis_vidange, 0) // AlertService.SEUIL_VIDANGE_KM
+
+    @staticmethod
+    def _niveau_carburant(pourcentage: float) -> int:
+        """Niveau de gravité : 1 sous le seuil, 2 sous le seuil critique"""
+        if pourcentage <= min(AlertService.SEUIL_CARBURANT_CRITIQUE_PERCENT, AlertService.SEUIL_CARBURANT_PERCENT):
+            return 2
+        return 1 if pourcentage <= AlertService.SEUIL_CARBURANT_PERCENT else 0
+
+    @staticmethod
+    def _niveau_document(pourcentage_restant: float, jours_restants: int) -> int:
+        """Niveau de gravité : 1 sous le seuil, 2 sous le seuil critique, 3 expiré"""
+        if jours_restants < 0:
+            return 3
+        if pourcentage_restant <= AlertService.SEUIL_DOCUMENT_CRITIQUE_PERCENT:
+            return 2
+        return 1 if pourcentage_restant <= AlertService.SEUIL_DOCUMENT_PERCENT else 0
+
+    @staticmethod
+    def _niveau_permis(jours_restants: Optional[int]) -> int:
+        """Niveau de gravité : 1 sous le seuil, 2 sous le seuil critique, 3 expiré"""
+        if jours_restants is None:
+            return 0
+        if jours_restants <= 0:
+            return 3
+        if jours_restants <= AlertService.SEUIL_PERMIS_CRITIQUE_JOURS:
+            return 2
+        return 1 if jours_restants <= AlertService.SEUIL_PERMIS_JOURS else 0
+
+    @staticmethod
+    def _envoyer(evaluation: Dict[str, Any]) -> bool:
+        """Envoie la notification correspondant à une évaluation"""
+        if evaluation['type_alerte'] == 'PERMIS':
+            chauffeur = db.session.get(Chauffeur, evaluation['chauffeur_id'])
+            return NotificationService.send_permis_expiration_notification(
+                chauffeur, evaluation['jours_restants']
+            )
+        bus = db.session.get(BusUdM, evaluation['bus_id'])
+        if evaluation['type_alerte'] == 'VIDANGE':
+            return NotificationService.send_seuil_vidange_notification(
+                bus, evaluation['km_depuis_vidange'], AlertService.SEUIL_VIDANGE_KM
+            )
+        if evaluation['type_alerte'] == 'CARBURANT':
+            return NotificationService.send_seuil_carburant_notification(
+                bus, evaluation['niveau_actuel'], AlertService.SEUIL_CARBURANT_PERCENT
+            )
+        document = db.session.get(DocumentBusUdM, evaluation['document_id'])
+        return NotificationService.send_document_expiration_notification(
+            bus, document, evaluation['jours_restants']
+        )
+
+    @staticmethod
+    def notifier_alertes(evaluation: Dict[str, Any], etats: Optional[Dict] = None) -> int:
         """
-        Vérifie si une alerte vidange a été envoyée récemment pour ce bus
-        (évite le spam d'emails)
+        Envoie les alertes dont le niveau dépasse le dernier niveau notifié et
+        met à jour les états (réarmement des situations revenues à la normale).
+        Renseigne 'notification_sent' dans chaque évaluation et valide la transaction.
+        Retourne le nombre de notifications envoyées.
         """
-        # Pour l'instant, on utilise une logique simple basée sur les logs
-        # Dans une version plus avancée, on pourrait avoir une table dédiée
-        return False
-    
+        if etats is None:
+            if evaluation['bus_ids'] is None:
+                etats = AlertStateService.get_etats(types=evaluation['types'])
+            else:
+                etats = AlertStateService.get_etats(bus_ids=evaluation['bus_ids'], types=evaluation['types'])
+
+        envoyees = 0
+        for type_alerte in evaluation['types']:
+            for entree in evaluation.get(type_alerte, []):
+                bus_id, niveau, reference = entree['bus_id'], entree['niveau'], entree['reference']
+                if not AlertStateService.doit_notifier(etats, bus_id, type_alerte, niveau, reference):
+                    AlertStateService.enregistrer(etats, bus_id, type_alerte, niveau, reference=reference)
+                    continue
+                try:
+                    entree['notification_sent'] = AlertService._envoyer(entree)
+                except Exception as e:
+                    entree['error'] = str(e)
+                    current_app.logger.error(
+                        f"Erreur notification {type_alerte.lower()} {entree['reference'] or entree['bus_id']}: {str(e)}"
+                    )
+                valeur = entree.get('km_depuis_vidange', entree.get('pourcentage', entree.get('jours_restants')))
+                AlertStateService.enregistrer(etats, bus_id, type_alerte, niveau, entree['notification_sent'],
+                                              valeur, reference)
+                envoyees += entree['notification_sent']
+        db.session.commit()
+        return envoyees
+
     @staticmethod
-    def _mark_vidange_alert_sent(bus_id: int):
-        """Marque qu'une alerte vidange a été envoyée pour ce bus"""
-        # Log pour traçabilité
-        current_app.logger.info(f"Alerte vidange envoyée pour bus ID {bus_id}")
+    def _etats_bus(etats: Optional[Dict], type_alerte: str, bus_id: int) -> Dict:
+        return etats if etats is not None else AlertStateService.get_etats(type_alerte, [bus_id])
+
+    @staticmethod
+    def _check_bus(bus: BusUdM, type_alerte: str, etats: Optional[Dict]) -> Dict[str, Any]:
+        """Évalue puis notifie un seul type d'alerte pour un bus (voir force_check_bus)"""
+        evaluation = AlertService.evaluer_seuils([bus.id], types=[type_alerte])
+        entree = evaluation[type_alerte][0]
+        try:
+            AlertService.notifier_alertes(evaluation, AlertService._etats_bus(etats, type_alerte, bus.id))
+        except Exception as e:
+            db.session.rollback()
+            entree['error'] = str(e)
+            current_app.logger.error(f"Erreur vérification {type_alerte.lower()} bus {bus.numero}: {str(e)}")
+        return entree
     
     @staticmethod
-    def _has_recent_carburant_alert(bus_id: int, pourcentage: float) -> bool:
+    def check_vidange_threshold(bus: BusUdM, etats: Optional[Dict] = None) -> Dict[str, Any]:
         """
-        Vérifie si une alerte carburant a été envoyée récemment pour ce bus
+        Vérifie si un bus a atteint le seuil critique de vidange et notifie si nécessaire
         """
-        # Logique simple pour éviter le spam
-        # On pourrait améliorer avec une table de tracking des alertes
-        return False
+        return AlertService._check_bus(bus, 'VIDANGE', etats)
     
     @staticmethod
-    def _mark_carburant_alert_sent(bus_id: int, pourcentage: float):
-        """Marque qu'une alerte carburant a été envoyée pour ce bus"""
-        current_app.logger.info(f"Alerte carburant envoyée pour bus ID {bus_id} ({pourcentage:.1f}%)")
+    def check_carburant_threshold(bus: BusUdM, etats: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Vérifie si un bus a atteint le seuil critique de carburant et notifie si nécessaire
+        """
+        return AlertService._check_bus(bus, 'CARBURANT', etats)
     
     @staticmethod
     def get_buses_needing_maintenance() -> List[Dict[str, Any]]:
         """
         Retourne la liste des bus nécessitant une maintenance
-        (vidange ou carburant critique)
+        (vidange ou carburant critique) ; lecture seule, aucune notification
         """
         buses_maintenance = []
         
         try:
-            buses = BusUdM.query.filter(BusUdM.statut != 'HORS_SERVICE').all()
-            
-            for bus in buses:
-                bus_info = {
-                    'id': bus.id,
-                    'numero': bus.numero,
-                    'immatriculation': bus.immatriculation,
-                    'kilometrage': bus.kilometrage,
-                    'alerts': []
-                }
-                
-                # Vérifier vidange
-                vidange_check = AlertService.check_vidange_threshold(bus)
+            evaluation = AlertService.evaluer_seuils(types=('VIDANGE', 'CARBURANT'))
+            alertes = {}
+            for vidange_check in evaluation['VIDANGE']:
                 if vidange_check['needs_alert']:
-                    bus_info['alerts'].append({
+                    alertes.setdefault(vidange_check['bus_id'], []).append({
                         'type': 'vidange',
                         'message': f"Vidange nécessaire ({vidange_check['km_depuis_vidange']} km)",
                         'priority': 'high' if vidange_check['km_depuis_vidange'] > AlertService.SEUIL_VIDANGE_KM * 1.2 else 'medium'
                     })
-                
-                # Vérifier carburant
-                carburant_check = AlertService.check_carburant_threshold(bus)
+            for carburant_check in evaluation['CARBURANT']:
                 if carburant_check['needs_alert']:
-                    bus_info['alerts'].append({
+                    alertes.setdefault(carburant_check['bus_id'], []).append({
                         'type': 'carburant',
                         'message': f"Carburant critique ({carburant_check['pourcentage']:.1f}%)",
                         'priority': 'high' if carburant_check['pourcentage'] < 10 else 'medium'
                     })
-                
-                # Ajouter à la liste si des alertes existent
-                if bus_info['alerts']:
-                    buses_maintenance.append(bus_info)
+
+            # Ajouter à la liste les bus ayant des alertes
+            for bus_info in evaluation['buses']:
+                if bus_info['id'] in alertes:
+                    buses_maintenance.append({**bus_info, 'alerts': alertes[bus_info['id']]})
         
         except Exception as e:
             current_app.logger.error(f"Erreur récupération buses maintenance: {str(e)}")
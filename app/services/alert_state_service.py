@@ -0,0 +1,77 @@
+"""
+État de déduplication des alertes de seuil (table alert_state)
+AlertService évalue un niveau de gravité par bus ; ce service décide s'il faut
+notifier (niveau supérieur au dernier notifié) et tient l'état à jour. Les états
+sont chargés en une requête pour toute une vérification.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.database import db
+from app.models.alert_state import AlertState
+
+
+CleEtat = Tuple[Optional[int], str, str]
+
+
+class AlertStateService:
+    """Service de suivi des alertes déjà notifiées"""
+
+    @staticmethod
+    def get_etats(type_alerte: Optional[str] = None,
+                  bus_ids: Optional[Iterable[int]] = None,
+                  types: Optional[Iterable[str]] = None) -> Dict[CleEtat, AlertState]:
+        """États enregistrés indexés par (bus_udm_id, type_alerte, reference)"""
+        query = AlertState.query
+        if type_alerte:
+            query = query.filter(AlertState.type_alerte == type_alerte)
+        if types is not None:
+            query = query.filter(AlertState.type_alerte.in_(list(types)))
+        if bus_ids is not None:
+            query = query.filter(AlertState.bus_udm_id.in_(list(bus_ids)))
+        return {etat.cle: etat for etat in query.all()}
+
+    @staticmethod
+    def doit_notifier(etats: Dict[CleEtat, AlertState], bus_id: Optional[int], type_alerte: str,
+                      niveau: int, reference: str = '') -> bool:
+        """Vrai si le niveau évalué dépasse le dernier niveau notifié"""
+        if niveau <= 0:
+            return False
+        etat = etats.get((bus_id, type_alerte, reference))
+        return etat is None or niveau > etat.niveau
+
+    @staticmethod
+    def enregistrer(etats: Dict[CleEtat, AlertState], bus_id: Optional[int], type_alerte: str, niveau: int,
+                    notifie: bool = False, valeur: Optional[float] = None, reference: str = '') -> None:
+        """
+        Met à jour l'état après évaluation (sans commit) :
+        - niveau 0 : l'état est supprimé, l'alerte est réarmée
+        - notification envoyée : le niveau notifié est enregistré
+        - niveau en baisse : le niveau est abaissé pour réarmer les niveaux supérieurs
+        Aucune écriture si rien n'a changé.
+        """
+        cle = (bus_id, type_alerte, reference)
+        etat = etats.get(cle)
+        if niveau <= 0:
+            if etat is not None:
+                db.session.delete(etat)
+                del etats[cle]
+        elif notifie:
+            if etat is None:
+                etat = AlertState(bus_udm_id=bus_id, type_alerte=type_alerte, reference=reference)
+                db.session.add(etat)
+                etats[cle] = etat
+            etat.niveau = niveau
+            etat.valeur = valeur
+            etat.notifie_le = datetime.now()
+        elif etat is not None and niveau < etat.niveau:
+            etat.niveau = niveau
+
+    @staticmethod
+    def reinitialiser(bus_id: int, type_alerte: str, reference: Optional[str] = None) -> int:
+        """Réarme les alertes d'un bus (vidange effectuée, plein fait) ; sans commit"""
+        query = AlertState.query.filter_by(bus_udm_id=bus_id, type_alerte=type_alerte)
+        if reference is not None:
+            query = query.filter_by(reference=reference)
+        return query.delete(synchronize_session=False)
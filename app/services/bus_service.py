@@ -13,6 +13,7 @@ from app.models.panne_bus_udm import PanneBusUdM
 from app.models.vidange import Vidange
 from app.models.carburation import Carburation
 from app.models.trajet import Trajet
+from app.utils.periodes import date_range_filter
 
 
 
@@ -97,7 +98,7 @@ class BusService:
         # Trajets du mois
         trajets_mois = Trajet.query.filter(
             Trajet.bus_udm_id == bus_id,
-            func.date(Trajet.date_heure_depart) >= debut_mois
+            date_range_filter(Trajet.date_heure_depart, debut_mois)
         ).count()
         
         # Kilomètres parcourus ce mois
@@ -105,7 +106,7 @@ class BusService:
             func.sum(Trajet.distance_km)
         ).filter(
             Trajet.bus_udm_id == bus_id,
-            func.date(Trajet.date_heure_depart) >= debut_mois
+            date_range_filter(Trajet.date_heure_depart, debut_mois)
         ).scalar() or 0
         
         # Pannes
@@ -0,0 +1,105 @@
+"""
+Service de résolution du chauffeur correspondant à un compte utilisateur
+- Lien direct chauffeur.utilisateur_id (migration 012, renseigné à la création du compte)
+- Repli sur la correspondance nom/prénom pour les fiches pas encore liées : le lien
+  (nom sans homonyme uniquement) est écrit dans la transaction de l'appelant, sans
+  commit ; le rattrapage des fiches existantes reste celui de la migration 012
+- L'identifiant résolu est conservé dans la session Flask : les pages chauffeur
+  (statut de la topbar, trajets, profil) ne refont pas la recherche à chaque requête
+"""
+
+import logging
+from typing import Optional
+
+from flask import has_request_context, session
+from sqlalchemy import func
+
+from app.database import db
+from app.models.chauffeur import Chauffeur
+from app.models.utilisateur import Utilisateur
+
+
+logger = logging.getLogger(__name__)
+
+# Clé de session : [utilisateur_id, chauffeur_id]
+CLE_SESSION = 'chauffeur_resolu'
+
+
+class ChauffeurService:
+    """Service du chauffeur associé à l'utilisateur connecté"""
+
+    @staticmethod
+    def resoudre_chauffeur_id(utilisateur_id: int) -> Optional[int]:
+        """Identifiant du chauffeur de l'utilisateur (None si aucune fiche chauffeur)"""
+        if has_request_context():
+            resolu = session.get(CLE_SESSION)
+            if resolu and resolu[0] == utilisateur_id:
+                return resolu[1]
+
+        chauffeur_id = db.session.query(Chauffeur.chauffeur_id) \
+            .filter(Chauffeur.utilisateur_id == utilisateur_id).scalar()
+        if chauffeur_id is None:
+            chauffeur_id = ChauffeurService._lier_par_nom(utilisateur_id)
+
+        # Une fiche absente n'est pas mémorisée : elle peut être créée entre-temps
+        if chauffeur_id is not None and has_request_context():
+            session[CLE_SESSION] = [utilisateur_id, chauffeur_id]
+        return chauffeur_id
+
+    @staticmethod
+    def get_chauffeur(utilisateur_id: int) -> Optional[Chauffeur]:
+        """Fiche chauffeur de l'utilisateur (lecture par clé primaire si déjà résolue)"""
+        chauffeur_id = ChauffeurService.resoudre_chauffeur_id(utilisateur_id)
+        if chauffeur_id is None:
+            return None
+        chauffeur = db.session.get(Chauffeur, chauffeur_id)
+        if chauffeur is None or chauffeur.utilisateur_id not in (None, utilisateur_id):
+            # Fiche supprimée ou réaffectée depuis la mise en session
+            ChauffeurService.oublier()
+            chauffeur_id = ChauffeurService.resoudre_chauffeur_id(utilisateur_id)
+            chauffeur = db.session.get(Chauffeur, chauffeur_id) if chauffeur_id is not None else None
+        return chauffeur
+
+    @staticmethod
+    def oublier() -> None:
+        """Retire le chauffeur résolu de la session"""
+        if has_request_context():
+            session.pop(CLE_SESSION, None)
+
+    @staticmethod
+    def _lier_par_nom(utilisateur_id: int) -> Optional[int]:
+        """
+        Ancienne correspondance nom/prénom, pour les fiches sans utilisateur_id.
+        Le lien n'est fait que si le nom désigne un seul compte CHAUFFEUR et une
+        seule fiche libre (mêmes règles que la migration 012) ; sinon aucune fiche.
+        Le lien est seulement flushé : il est validé avec la transaction de
+        l'appelant, jamais par cette lecture.
+        """
+        utilisateur = db.session.query(Utilisateur.nom, Utilisateur.prenom, Utilisateur.role) \
+            .filter(Utilisateur.utilisateur_id == utilisateur_id).first()
+        if utilisateur is None or utilisateur.role != 'CHAUFFEUR':
+            return None
+
+        homonymes = db.session.query(func.count(Utilisateur.utilisateur_id)).filter_by(
+            nom=utilisateur.nom, prenom=utilisateur.prenom, role='CHAUFFEUR'
+        ).scalar()
+        fiches = Chauffeur.query.filter_by(
+            nom=utilisateur.nom, prenom=utilisateur.prenom, utilisateur_id=None
+        ).limit(2).all()
+        if homonymes != 1 or len(fiches) != 1:
+            if fiches:
+                logger.warning("Chauffeur %s %s ambigu (%s compte(s), %s+ fiche(s)) : lien à faire par un administrateur",
+                               utilisateur.prenom, utilisateur.nom, homonymes, len(fiches))
+            return None
+        chauffeur = fiches[0]
+
+        chauffeur_id = chauffeur.chauffeur_id
+        try:
+            chauffeur.utilisateur_id = utilisateur_id
+            db.session.flush()
+        except Exception as e:
+            # Lien concurrent : la fiche reste utilisable pour cette requête
+            db.session.rollback()
+            logger.warning("Lien chauffeur %s -> utilisateur %s non enregistré: %s",
+                           chauffeur_id, utilisateur_id, e)
+        return chauffeur_id
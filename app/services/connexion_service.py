@@ -0,0 +1,99 @@
+"""
+Service de suivi des connexions (table connexion_historique)
+La connexion est enregistrée au moment de l'authentification ; la liste des
+utilisateurs résout la dernière connexion de tous les comptes en une requête.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Integer, and_, cast, func, insert, select
+
+from app.database import db
+from app.models.audit_log import AuditLog
+from app.models.connexion_historique import ConnexionHistorique
+from app.models.utilisateur import Utilisateur
+
+
+logger = logging.getLogger(__name__)
+
+# Un utilisateur est "actif" s'il s'est connecté dans cette période
+JOURS_ACTIVITE = 30
+
+
+class ConnexionService:
+    """Service de suivi des connexions utilisateurs"""
+
+    @staticmethod
+    def enregistrer_connexion(user: Utilisateur, ip: Optional[str] = None,
+                              date_connexion: Optional[datetime] = None) -> bool:
+        """Trace une connexion réussie ; une erreur n'empêche jamais le login"""
+        try:
+            db.session.add(ConnexionHistorique(
+                utilisateur_id=user.utilisateur_id,
+                date_connexion=date_connexion or datetime.now(),
+                ip_adresse=(ip or '')[:45],
+            ))
+            db.session.commit()
+            return True
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Enregistrement de la connexion de {user.login} impossible: {e}")
+            return False
+
+    @staticmethod
+    def derniere_connexion_subquery():
+        """Sous-requête (utilisateur_id, derniere_connexion) à joindre sur utilisateur"""
+        return db.session.query(
+            ConnexionHistorique.utilisateur_id.label('utilisateur_id'),
+            func.max(ConnexionHistorique.date_connexion).label('derniere_connexion')
+        ).group_by(ConnexionHistorique.utilisateur_id).subquery()
+
+    @staticmethod
+    def get_utilisateurs_avec_derniere_connexion():
+        """Liste de (utilisateur, derniere_connexion ou None) en une seule requête"""
+        derniere = ConnexionService.derniere_connexion_subquery()
+        return db.session.query(Utilisateur, derniere.c.derniere_connexion).outerjoin(
+            derniere, derniere.c.utilisateur_id == Utilisateur.utilisateur_id
+        ).order_by(Utilisateur.utilisateur_id).all()
+
+    @staticmethod
+    def est_actif(derniere_connexion: Optional[datetime], maintenant: Optional[datetime] = None) -> bool:
+        if derniere_connexion is None:
+            return False
+        maintenant = maintenant or datetime.now()
+        return derniere_connexion >= maintenant - timedelta(days=JOURS_ACTIVITE)
+
+    @staticmethod
+    def backfill_depuis_audit() -> int:
+        """
+        Alimente connexion_historique depuis les LOGIN_SUCCESS du journal d'audit
+        (audit_log, y compris les fichiers importés). Rejouable : une connexion
+        déjà présente (même utilisateur, même instant) n'est pas dupliquée.
+        Ne commit pas.
+        """
+        utilisateur_id = cast(AuditLog.ressource_id, Integer)
+        deja_presente = select(ConnexionHistorique.log_id).where(and_(
+            ConnexionHistorique.utilisateur_id == Utilisateur.utilisateur_id,
+            ConnexionHistorique.date_connexion == AuditLog.horodatage,
+        )).exists()
+
+        connexions = select(
+            Utilisateur.utilisateur_id,
+            AuditLog.horodatage,
+            func.coalesce(AuditLog.ip, ''),
+        ).select_from(AuditLog).join(
+            Utilisateur, Utilisateur.utilisateur_id == utilisateur_id
+        ).where(
+            AuditLog.action == 'LOGIN_SUCCESS',
+            AuditLog.succes.is_(True),
+            ~deja_presente,
+        )
+
+        result = db.session.execute(
+            insert(ConnexionHistorique).from_select(
+                ['utilisateur_id', 'date_connexion', 'ip_adresse'], connexions
+            )
+        )
+        return result.rowcount or 0
@@ -5,14 +5,20 @@ Service centralisé pour les statistiques de dashboard
 
 from datetime import date, datetime
 from typing import Dict, Any, Optional
-from sqlalchemy import func
+from sqlalchemy import func, and_
 
 from app.database import db
 from app.models.bus_udm import BusUdM
 from app.models.trajet import Trajet
 from app.models.chauffeur import Chauffeur
 from app.models.prestataire import Prestataire
-from app.utils.trafic import daily_student_trafic
+from app.utils.agregats import sum_case
+from app.utils.periodes import day_filter
+
+
+# Points de départ vers le campus (arrivées) et point du campus (départs)
+POINTS_ARRIVEE_CAMPUS = ['Mfetum', 'Ancienne Mairie']
+POINT_CAMPUS = 'Banekane'
 
 
 class DashboardService:
@@ -27,48 +33,39 @@ class DashboardService:
         if target_date is None:
             target_date = date.today()
         
-        # Statistiques des trajets (code dupliqué éliminé)
-        trajets_jour_aed = Trajet.query.filter(
-            func.date(Trajet.date_heure_depart) == target_date,
-            Trajet.numero_bus_udm != None
-        ).count()
-        
-        trajets_jour_prestataire = Trajet.query.filter(
-            func.date(Trajet.date_heure_depart) == target_date,
-            Trajet.immat_bus != None
-        ).count()
-        
-        # Statistiques des bus (code dupliqué éliminé)
-        bus_actifs = BusUdM.query.filter(BusUdM.etat_vehicule != 'DEFAILLANT').count()
-        bus_maintenance = BusUdM.query.filter_by(etat_vehicule='DEFAILLANT').count()
-        
-        # Calcul des étudiants présents (code dupliqué éliminé)
-        etudiants_stats = DashboardService._calculate_student_presence(target_date)
-        
-        # Trafic temps réel
-        trafic = daily_student_trafic(target_date)
+        # Une seule requête pour tous les compteurs trajets/étudiants du jour
+        compteurs = DashboardService.get_daily_trajet_counters(target_date)
+
+        # Une seule requête pour la flotte et les chauffeurs
+        flotte = DashboardService.get_fleet_counters()
+
+        trafic = {
+            'arrives': compteurs['etudiants_arrives'],
+            'partis': compteurs['etudiants_partis'],
+            'present': compteurs['etudiants_arrives'] - compteurs['etudiants_partis']
+        }
         
         return {
             # Statistiques bus
-            'bus_actifs': bus_actifs,
+            'bus_actifs': flotte['bus_actifs'],
             'bus_actifs_change': 0,  # TODO: calculer le changement
-            'bus_inactifs': bus_maintenance,
-            'bus_maintenance': bus_maintenance,
+            'bus_inactifs': flotte['bus_maintenance'],
+            'bus_maintenance': flotte['bus_maintenance'],
             
             # Statistiques trajets
-            'trajets_jour_aed': trajets_jour_aed,
-            'trajets_jour_bus_agence': trajets_jour_prestataire,
-            'trajets_jour_prestataire': trajets_jour_prestataire,
+            'trajets_jour_aed': compteurs['trajets_jour_aed'],
+            'trajets_jour_bus_agence': compteurs['trajets_jour_prestataire'],
+            'trajets_jour_prestataire': compteurs['trajets_jour_prestataire'],
             'trajets_jour_change': 0,  # TODO: calculer le changement
             
             # Statistiques chauffeurs
-            'chauffeurs': Chauffeur.query.count(),
-            'chauffeurs_disponibles': Chauffeur.query.count(),  # TODO: affiner
+            'chauffeurs': flotte['chauffeurs'],
+            'chauffeurs_disponibles': flotte['chauffeurs'],  # TODO: affiner
             
             # Statistiques étudiants
-            'etudiants': etudiants_stats['present'],
-            'etudiants_arrives': etudiants_stats['arrives'],
-            'etudiants_partis': etudiants_stats['partis'],
+            'etudiants': trafic['present'],
+            'etudiants_arrives': trafic['arrives'],
+            'etudiants_partis': trafic['partis'],
             
             # Trafic temps réel
             'trafic': trafic,
@@ -97,82 +94,123 @@ class DashboardService:
         else:
             return {}
     
+    @staticmethod
+    def get_daily_trajet_counters(target_date: Optional[date] = None) -> Dict[str, int]:
+        """
+        Compteurs trajets et présence étudiante du jour en un seul SELECT
+        (colonnes SUM(CASE ...) au lieu d'une requête par compteur)
+        """
+        if target_date is None:
+            target_date = date.today()
+
+        etudiant = Trajet.type_passagers == 'ETUDIANT'
+        places = func.coalesce(Trajet.nombre_places_occupees, 0)
+
+        row = db.session.query(
+            func.count(Trajet.trajet_id).label('trajets_jour'),
+            sum_case(Trajet.numero_bus_udm.isnot(None)).label('trajets_jour_aed'),
+            sum_case(Trajet.immat_bus.isnot(None)).label('trajets_jour_prestataire'),
+            sum_case(
+                and_(etudiant, Trajet.point_depart.in_(POINTS_ARRIVEE_CAMPUS)), places
+            ).label('etudiants_arrives'),
+            sum_case(
+                and_(etudiant, Trajet.point_depart == POINT_CAMPUS), places
+            ).label('etudiants_partis')
+        ).filter(
+            day_filter(Trajet.date_heure_depart, target_date)
+        ).one()
+
+        return {key: int(value or 0) for key, value in row._asdict().items()}
+
+    @staticmethod
+    def get_fleet_counters() -> Dict[str, int]:
+        """
+        Compteurs flotte (bus actifs/défaillants) et nombre de chauffeurs en un seul SELECT
+        """
+        chauffeurs = db.session.query(func.count(Chauffeur.chauffeur_id)).scalar_subquery()
+
+        row = db.session.query(
+            func.count(BusUdM.id).label('bus_total'),
+            sum_case(BusUdM.etat_vehicule == 'DEFAILLANT').label('bus_maintenance'),
+            chauffeurs.label('chauffeurs')
+        ).one()
+
+        bus_total = int(row.bus_total or 0)
+        bus_maintenance = int(row.bus_maintenance or 0)
+        return {
+            'bus_total': bus_total,
+            'bus_actifs': bus_total - bus_maintenance,
+            'bus_maintenance': bus_maintenance,
+            'chauffeurs': int(row.chauffeurs or 0)
+        }
+
+    @staticmethod
+    def get_compteurs_exploitation() -> Dict[str, int]:
+        """
+        Pannes non résolues, bus DEFAILLANT et trajets du jour en un seul SELECT
+        (jauges métier de /metrics)
+        """
+        from app.models.panne_bus_udm import PanneBusUdM
+
+        pannes = db.session.query(func.count(PanneBusUdM.id)) \
+            .filter(PanneBusUdM.resolue.is_(False)).scalar_subquery()
+        bus = db.session.query(func.count(BusUdM.id)) \
+            .filter(BusUdM.etat_vehicule == 'DEFAILLANT').scalar_subquery()
+        trajets = db.session.query(func.count(Trajet.trajet_id)) \
+            .filter(day_filter(Trajet.date_heure_depart, date.today())).scalar_subquery()
+
+        row = db.session.query(
+            pannes.label('pannes_ouvertes'),
+            bus.label('bus_defaillants'),
+            trajets.label('trajets_jour')
+        ).one()
+        return {key: int(value or 0) for key, value in row._asdict().items()}
+
     @staticmethod
     def _calculate_student_presence(target_date: date) -> Dict[str, int]:
         """
         Calcule la présence étudiante (code dupliqué éliminé)
         """
-        # Arrivées : départs depuis Mfetum/Ancienne mairie vers le campus
-        arrives = db.session.query(func.sum(Trajet.nombre_places_occupees)).filter(
-            func.date(Trajet.date_heure_depart) == target_date,
-            Trajet.type_passagers == 'ETUDIANT',
-            Trajet.point_depart.in_(['Mfetum', 'Ancienne Mairie'])
-        ).scalar() or 0
-        
-        # Départs : départs depuis Banekane (campus) vers l'extérieur
-        partis = db.session.query(func.sum(Trajet.nombre_places_occupees)).filter(
-            func.date(Trajet.date_heure_depart) == target_date,
-            Trajet.type_passagers == 'ETUDIANT',
-            Trajet.point_depart == 'Banekane'
-        ).scalar() or 0
-        
-        present = arrives - partis
-        
+        compteurs = DashboardService.get_daily_trajet_counters(target_date)
+        arrives = compteurs['etudiants_arrives']
+        partis = compteurs['etudiants_partis']
+
         return {
-            'arrives': int(arrives),
-            'partis': int(partis),
-            'present': int(present)
+            'arrives': arrives,
+            'partis': partis,
+            'present': arrives - partis
         }
     
     @staticmethod
     def _get_chauffeur_personal_stats(chauffeur_user_id: int, target_date: date) -> Dict[str, Any]:
         """Statistiques personnelles du chauffeur connecté"""
-        from app.models.chauffeur import Chauffeur
+        from app.services.chauffeur_service import ChauffeurService
         
-        # Trouver le chauffeur correspondant à l'utilisateur
-        from app.models.utilisateur import Utilisateur
-        user = Utilisateur.query.get(chauffeur_user_id)
-        if not user:
-            return {}
-            
-        chauffeur_db = Chauffeur.query.filter_by(nom=user.nom, prenom=user.prenom).first()
-        if not chauffeur_db:
+        # Chauffeur lié à l'utilisateur (chauffeur.utilisateur_id, résolu une fois par session)
+        chauffeur_id = ChauffeurService.resoudre_chauffeur_id(chauffeur_user_id)
+        if chauffeur_id is None:
             return {
                 'mes_trajets_aujourdhui': 0,
                 'etudiants_pour_campus': 0,
                 'personnes_du_campus': 0
             }
         
-        chauffeur_id = chauffeur_db.chauffeur_id
+        places = func.coalesce(Trajet.nombre_places_occupees, 0)
         
-        # Mes trajets aujourd'hui
-        mes_trajets_aujourdhui = Trajet.query.filter(
-            func.date(Trajet.date_heure_depart) == target_date,
-            Trajet.chauffeur_id == chauffeur_id
-        ).count()
-        
-        # Étudiants transportés POUR le campus
-        etudiants_pour_campus = db.session.query(
-            func.sum(Trajet.nombre_places_occupees)
+        # Mes trajets, étudiants POUR le campus et personnes DU campus en un seul SELECT
+        row = db.session.query(
+            func.count(Trajet.trajet_id).label('mes_trajets_aujourdhui'),
+            sum_case(Trajet.point_arriver == POINT_CAMPUS, places).label('etudiants_pour_campus'),
+            sum_case(Trajet.point_depart == POINT_CAMPUS, places).label('personnes_du_campus')
         ).filter(
-            func.date(Trajet.date_heure_depart) == target_date,
-            Trajet.chauffeur_id == chauffeur_id,
-            Trajet.point_arriver == 'Banekane'  # Arrivée au campus
-        ).scalar() or 0
-        
-        # Personnes transportées DU campus
-        personnes_du_campus = db.session.query(
-            func.sum(Trajet.nombre_places_occupees)
-        ).filter(
-            func.date(Trajet.date_heure_depart) == target_date,
-            Trajet.chauffeur_id == chauffeur_id,
-            Trajet.point_depart == 'Banekane'  # Départ du campus
-        ).scalar() or 0
+            day_filter(Trajet.date_heure_depart, target_date),
+            Trajet.chauffeur_id == chauffeur_id
+        ).one()
         
         return {
-            'mes_trajets_aujourdhui': mes_trajets_aujourdhui,
-            'etudiants_pour_campus': int(etudiants_pour_campus),
-            'personnes_du_campus': int(personnes_du_campus)
+            'mes_trajets_aujourdhui': int(row.mes_trajets_aujourdhui or 0),
+            'etudiants_pour_campus': int(row.etudiants_pour_campus or 0),
+            'personnes_du_campus': int(row.personnes_du_campus or 0)
         }
     
     @staticmethod
@@ -0,0 +1,187 @@
+"""
+Mode récapitulatif des notifications (notification_digest)
+Si NOTIFICATION_DIGEST_ENABLED, les alertes des types NOTIFICATION_DIGEST_TYPES ne
+partent pas une à une : elles sont mises de côté par destinataire, puis la tâche
+planifiée « digest_notifications » envoie un seul email par destinataire une fois
+NOTIFICATION_DIGEST_FENETRE secondes écoulées depuis sa plus ancienne alerte.
+Le récapitulatif liste les bus concernés avec leurs voyants vidange et carburant.
+Les pannes de criticité HAUTE restent envoyées immédiatement.
+Le mode n'est appliqué que si un planificateur envoie les récapitulatifs
+(SCHEDULER_ENABLED ou `flask taches worker` actif) : sinon les alertes partent
+immédiatement plutôt que de rester en attente.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import current_app
+from sqlalchemy import func
+
+from app.database import db
+from app.models.bus_udm import BusUdM
+from app.models.notification_digest import NotificationDigest
+from app.models.tache_planifiee import TachePlanifiee
+from app.services.gestion_carburation import compute_voyant_carburant
+from app.services.gestion_vidange import compute_voyant
+from app.services.outbox_service import OutboxService
+from app.utils.emailer import EmailMessage
+from app.utils.modeles_email import rendre_email
+
+
+LIBELLES_VOYANT = {'green': 'Normal', 'orange': 'À surveiller', 'red': 'Critique'}
+
+TACHE_RECAPITULATIF = 'digest_notifications'
+
+# Durée pendant laquelle l'état du planificateur est réutilisé (s)
+PLANIFICATEUR_CACHE_TTL = 60
+
+
+class DigestService:
+    """Service du mode récapitulatif des notifications"""
+
+    @staticmethod
+    def est_differe(type_notification: str) -> bool:
+        """True si les notifications de ce type passent par le récapitulatif"""
+        config = current_app.config
+        if not config.get('NOTIFICATION_DIGEST_ENABLED', False):
+            return False
+        types = config.get('NOTIFICATION_DIGEST_TYPES', ())
+        if isinstance(types, str):
+            types = [t.strip() for t in types.split(',') if t.strip()]
+        return type_notification in types and DigestService.planificateur_actif()
+
+    @staticmethod
+    def planificateur_actif() -> bool:
+        """
+        True si les récapitulatifs sont envoyés : planificateur lancé dans ce processus
+        (SCHEDULER_ENABLED) ou tâche digest_notifications exécutée récemment par un
+        autre processus. Résultat conservé PLANIFICATEUR_CACHE_TTL secondes.
+        """
+        app = current_app._get_current_object()
+        if app.config.get('SCHEDULER_ENABLED'):
+            return True
+        cache = app.extensions.get('digest_planificateur')
+        if cache is not None and cache[0] > time.monotonic():
+            return cache[1]
+
+        maintenant = datetime.now()
+        delai = timedelta(seconds=max(3 * app.config.get('SCHEDULER_DIGEST_INTERVALLE', 60), 600))
+        tache = db.session.get(TachePlanifiee, TACHE_RECAPITULATIF)
+        actif = tache is not None and (
+            (tache.derniere_execution is not None and tache.derniere_execution >= maintenant - delai)
+            or (tache.verrou_expire_le is not None and tache.verrou_expire_le > maintenant)
+        )
+        if not actif:
+            app.logger.warning("Mode récapitulatif ignoré : aucun planificateur n'exécute "
+                               f"{TACHE_RECAPITULATIF} (SCHEDULER_ENABLED ou `flask taches worker`)")
+        app.extensions['digest_planificateur'] = (time.monotonic() + PLANIFICATEUR_CACHE_TTL, actif)
+        return actif
+
+    @staticmethod
+    def ajouter(destinataires: Iterable, type_notification: str, sujet: str,
+                bus_id: Optional[int] = None) -> int:
+        """
+        Met une alerte de côté pour chaque destinataire (objets ayant un attribut ``email``).
+        Ne valide pas la transaction : les lignes sont enregistrées par le commit de
+        l'appelant, avec l'état d'alerte qui a déclenché la notification.
+        Retourne le nombre de lignes ajoutées.
+        """
+        maintenant = datetime.now()
+        lignes = [
+            NotificationDigest(destinataire=d.email, type_notification=type_notification,
+                               sujet=sujet, bus_udm_id=bus_id, cree_le=maintenant)
+            for d in destinataires if d.email
+        ]
+        if lignes:
+            db.session.add_all(lignes)
+        return len(lignes)
+
+    @staticmethod
+    def _etat_bus(bus_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Voyants vidange et carburant des bus concernés (une requête)"""
+        bus_ids = list(bus_ids)
+        if not bus_ids:
+            return {}
+        etats = {}
+        for bus in BusUdM.query.filter(BusUdM.id.in_(bus_ids)).order_by(BusUdM.numero):
+            voyant_vidange, voyant_carburant = compute_voyant(bus), compute_voyant_carburant(bus)
+            etats[bus.id] = {
+                'numero': bus.numero,
+                'immatriculation': bus.immatriculation,
+                'kilometrage': bus.kilometrage,
+                'voyant_vidange': voyant_vidange,
+                'voyant_carburant': voyant_carburant,
+                'libelle_vidange': LIBELLES_VOYANT.get(voyant_vidange, voyant_vidange),
+                'libelle_carburant': LIBELLES_VOYANT.get(voyant_carburant, voyant_carburant),
+            }
+        return etats
+
+    @staticmethod
+    def traiter(maintenant: Optional[datetime] = None, forcer: bool = False) -> int:
+        """
+        Envoie (met en file d'envoi) le récapitulatif des destinataires dont la plus
+        ancienne alerte a dépassé la fenêtre, ou de tous si ``forcer``.
+        Les destinataires ayant exactement les mêmes alertes partagent un seul rendu.
+        Retourne le nombre de récapitulatifs mis en file.
+        """
+        maintenant = maintenant or datetime.now()
+        fenetre = timedelta(seconds=current_app.config.get('NOTIFICATION_DIGEST_FENETRE', 900))
+
+        requete = db.session.query(NotificationDigest.destinataire) \
+            .group_by(NotificationDigest.destinataire)
+        if not forcer:
+            requete = requete.having(func.min(NotificationDigest.cree_le) <= maintenant - fenetre)
+        destinataires = [ligne.destinataire for ligne in requete]
+        if not destinataires:
+            return 0
+
+        lignes = NotificationDigest.query.filter(NotificationDigest.destinataire.in_(destinataires)) \
+            .order_by(NotificationDigest.cree_le, NotificationDigest.id).all()
+        etats_bus = DigestService._etat_bus({l.bus_udm_id for l in lignes if l.bus_udm_id})
+
+        par_destinataire: Dict[str, List[NotificationDigest]] = {}
+        for ligne in lignes:
+            par_destinataire.setdefault(ligne.destinataire, []).append(ligne)
+
+        # Destinataires regroupés par contenu identique : un rendu par groupe
+        groupes: Dict[tuple, List[str]] = {}
+        for email, alertes in par_destinataire.items():
+            cle = tuple((a.type_notification, a.sujet, a.bus_udm_id, a.cree_le) for a in alertes)
+            groupes.setdefault(cle, []).append(email)
+
+        messages = []
+        for cle, emails in groupes.items():
+            bus_ids = list(dict.fromkeys(bus_id for _, _, bus_id, _ in cle if bus_id))
+            rendu = rendre_email(
+                'digest',
+                alertes=[{'type': type_notification, 'sujet': sujet, 'cree_le': cree_le}
+                         for type_notification, sujet, _, cree_le in cle],
+                buses=[etats_bus[bus_id] for bus_id in bus_ids if bus_id in etats_bus],
+                debut=cle[0][3],
+            )
+            messages.extend(EmailMessage(rendu.sujet, rendu.texte, email, rendu.html) for email in emails)
+
+        # Suppression des alertes et mise en file dans la même transaction
+        for ligne in lignes:
+            db.session.delete(ligne)
+        OutboxService.enqueue(messages, 'recapitulatif')
+        db.session.commit()
+        current_app.logger.info(
+            f"Récapitulatif des notifications : {len(lignes)} alerte(s) pour {len(messages)} destinataire(s)"
+        )
+        return len(messages)
+
+    @staticmethod
+    def get_statistiques() -> Dict[str, Any]:
+        """Alertes et destinataires en attente de récapitulatif"""
+        alertes, destinataires, plus_ancienne = db.session.query(
+            func.count(NotificationDigest.id),
+            func.count(func.distinct(NotificationDigest.destinataire)),
+            func.min(NotificationDigest.cree_le),
+        ).one()
+        return {
+            'alertes': alertes,
+            'destinataires': destinataires,
+            'plus_ancienne': plus_ancienne.isoformat() if plus_ancienne else None,
+        }
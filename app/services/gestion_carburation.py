@@ -2,6 +2,7 @@ from app.database import db
 from app.models.bus_udm import BusUdM
 from datetime import datetime
 from app.constants import utc_now_date
+from app.services.alert_state_service import AlertStateService
 
 
 def get_carburation_history(numero_bus_udm=None, date_debut=None, date_fin=None):
@@ -163,6 +164,11 @@ def enregistrer_carburation_common(data: dict) -> dict:
     autonomie_estimee = (nouveau_niveau * km_par_litre)
     bus.km_critique_carburant = round(km_int + autonomie_estimee, 3)
 
+    # Un plein qui repasse au-dessus du seuil réarme l'alerte carburant
+    from app.services.alert_service import AlertService  # import local pour éviter les cycles
+    if capacite_reservoir > 0 and nouveau_niveau / capacite_reservoir * 100 > AlertService.SEUIL_CARBURANT_PERCENT:
+        AlertStateService.reinitialiser(bus.id, 'CARBURANT')
+
     db.session.commit()
 
     km_restant_carburant = (bus.km_critique_carburant - bus.kilometrage) if bus.km_critique_carburant else None
@@ -3,6 +3,7 @@ from app.models.bus_udm import BusUdM
 from app.models.vidange import Vidange
 from datetime import datetime
 from app.constants import utc_now_date
+from app.services.alert_state_service import AlertStateService
 
 # Capacités par type d'huile (km)
 OIL_CAPACITY_KM = {
@@ -113,6 +114,8 @@ def enregistrer_vidange_common(data: dict) -> dict:
     # Définir le km critique selon la capacité du type d'huile saisi
     bus.km_critique_huile = km_int + OIL_CAPACITY_KM.get(type_clean, 600)
     bus.date_derniere_vidange = utc_now_date()
+    # La vidange réarme l'alerte de seuil
+    AlertStateService.reinitialiser(bus.id, 'VIDANGE')
 
     db.session.commit()
 
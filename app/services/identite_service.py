@@ -0,0 +1,126 @@
+"""
+Identité de l'utilisateur connecté (current_user) sans requête par requête HTTP
+- Identite : principal immuable (identifiant, rôle, nom, prénom, email, login)
+  suffisant pour les contrôles d'accès et l'affichage
+- Cache par processus, borné (IDENTITE_CACHE_TAILLE) et à durée de vie limitée
+  (IDENTITE_CACHE_TTL) : les autres workers voient un changement au plus tard après le TTL
+- Invalidé explicitement quand un utilisateur change de rôle, d'identifiants ou est
+  supprimé (IdentiteService.invalider)
+- Les autres attributs (telephone, check_password...) chargent l'objet Utilisateur
+  complet à la demande, une fois par session SQLAlchemy
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from flask import current_app
+from flask_login import UserMixin
+
+from app.database import db
+from app.models.utilisateur import Utilisateur
+
+
+CHAMPS = ('utilisateur_id', 'role', 'nom', 'prenom', 'email', 'login')
+
+
+class Identite(UserMixin):
+    """Principal de l'utilisateur connecté, partagé entre les requêtes (immuable)"""
+    __slots__ = CHAMPS
+
+    def __init__(self, utilisateur_id: int, role: Optional[str], nom: str, prenom: str,
+                 email: str, login: str):
+        for champ, valeur in zip(CHAMPS, (utilisateur_id, role, nom, prenom, email, login)):
+            object.__setattr__(self, champ, valeur)
+
+    def __setattr__(self, nom, valeur):
+        raise AttributeError(f"Identite est immuable : modifier l'objet Utilisateur ({nom})")
+
+    def get_id(self):
+        return str(self.utilisateur_id)
+
+    @property
+    def utilisateur(self) -> Optional[Utilisateur]:
+        """Objet Utilisateur complet (chargé au premier accès dans la session)"""
+        return db.session.get(Utilisateur, self.utilisateur_id)
+
+    def __getattr__(self, nom):
+        # Appelé uniquement pour les attributs hors CHAMPS
+        if nom.startswith('_') or not hasattr(Utilisateur, nom):
+            raise AttributeError(nom)
+        utilisateur = self.utilisateur
+        if utilisateur is None:
+            raise AttributeError(nom)
+        return getattr(utilisateur, nom)
+
+    def __repr__(self):
+        return f"<Identite {self.utilisateur_id} {self.login} {self.role}>"
+
+
+class _CacheIdentites:
+    """Identités récemment utilisées (LRU borné, expiration après ttl secondes)"""
+
+    def __init__(self, ttl: float, taille_max: int):
+        self.ttl = ttl
+        self.taille_max = taille_max
+        self._lock = threading.Lock()
+        self._entrees: 'OrderedDict[int, tuple]' = OrderedDict()
+        self._generation = 0  # Incrémentée à chaque invalidation
+
+    def obtenir(self, utilisateur_id: int) -> Optional[Identite]:
+        maintenant = time.monotonic()
+        with self._lock:
+            entree = self._entrees.get(utilisateur_id)
+            if entree is not None and entree[0] > maintenant:
+                self._entrees.move_to_end(utilisateur_id)
+                return entree[1]
+            generation = self._generation
+
+        ligne = db.session.query(*(getattr(Utilisateur, champ) for champ in CHAMPS)) \
+            .filter(Utilisateur.utilisateur_id == utilisateur_id).first()
+        if ligne is None:
+            return None
+        identite = Identite(*ligne)
+
+        with self._lock:
+            # Invalidation pendant la lecture : la ligne lue est peut-être déjà périmée
+            if generation == self._generation and self.ttl > 0:
+                self._entrees[utilisateur_id] = (maintenant + self.ttl, identite)
+                self._entrees.move_to_end(utilisateur_id)
+                while len(self._entrees) > self.taille_max:
+                    self._entrees.popitem(last=False)
+        return identite
+
+    def invalider(self, utilisateur_id: Optional[int] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if utilisateur_id is None:
+                self._entrees.clear()
+            else:
+                self._entrees.pop(utilisateur_id, None)
+
+
+def _get_cache() -> _CacheIdentites:
+    app = current_app._get_current_object()
+    cache = app.extensions.get('cache_identites')
+    if cache is None:
+        cache = app.extensions.setdefault('cache_identites', _CacheIdentites(
+            app.config.get('IDENTITE_CACHE_TTL', 60),
+            app.config.get('IDENTITE_CACHE_TAILLE', 1000),
+        ))
+    return cache
+
+
+class IdentiteService:
+    """Service de l'identité des utilisateurs connectés (Flask-Login)"""
+
+    @staticmethod
+    def charger(utilisateur_id: int) -> Optional[Identite]:
+        """Identité de l'utilisateur (user_loader) ; None s'il n'existe plus"""
+        return _get_cache().obtenir(utilisateur_id)
+
+    @staticmethod
+    def invalider(utilisateur_id: Optional[int] = None) -> None:
+        """À appeler après modification du rôle, des identifiants ou suppression (tous si None)"""
+        _get_cache().invalider(utilisateur_id)
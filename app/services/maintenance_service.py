@@ -122,12 +122,14 @@ class MaintenanceService:
             # Envoyer notification email (import local pour éviter les imports circulaires)
             try:
                 from app.services.notification_service import NotificationService
-                NotificationService.send_panne_notification(panne, user_name)
+                NotificationService.send_panne_notification(panne, user_name, bus=bus)
+                db.session.commit()  # Valide la mise en file des emails
             except ImportError as e:
                 # Import circulaire ou service non disponible
                 print(f"Service de notification non disponible: {str(e)}")
             except Exception as e:
                 # Ne pas faire échouer la création de panne si l'email échoue
+                db.session.rollback()
                 try:
                     from flask import current_app
                     current_app.logger.warning(f"Échec notification panne: {str(e)}")
@@ -178,11 +180,13 @@ class MaintenanceService:
             try:
                 from app.services.notification_service import NotificationService
                 NotificationService.send_vehicule_repare_notification(panne, user_name)
+                db.session.commit()  # Valide la mise en file des emails
             except ImportError as e:
                 # Import circulaire ou service non disponible
                 print(f"Service de notification non disponible: {str(e)}")
             except Exception as e:
                 # Ne pas faire échouer la résolution si l'email échoue
+                db.session.rollback()
                 try:
                     from flask import current_app
                     current_app.logger.warning(f"Échec notification réparation: {str(e)}")
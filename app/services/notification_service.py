@@ -3,7 +3,9 @@ Service de notifications par email pour TransportUdM
 Gère l'envoi d'emails pour les événements critiques du système
 """
 
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from datetime import datetime
 from flask import current_app
 
@@ -12,10 +14,77 @@ from app.models.utilisateur import Utilisateur
 from app.models.bus_udm import BusUdM
 from app.models.panne_bus_udm import PanneBusUdM
 from app.models.chauffeur_statut import ChauffeurStatut
+from app.services.digest_service import DigestService
+from app.services.outbox_service import OutboxService
 from app.utils.emailer import send_email
+from app.utils.modeles_email import EmailRendu, rendre_email
 from app.utils.audit_logger import log_user_action
 
 
+class Destinataire(NamedTuple):
+    """Destinataire d'une notification (sans objet ORM)"""
+    email: str
+    nom: str
+
+
+class _AnnuaireDestinataires:
+    """
+    Annuaire rôle -> destinataires chargé en une requête et gardé en mémoire.
+    Invalidé explicitement quand un utilisateur est créé, supprimé ou change de
+    rôle (NotificationService.invalider_destinataires) ; rechargé au plus tard
+    après NOTIFICATION_DESTINATAIRES_TTL secondes pour les autres processus.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._par_role: Optional[Dict[str, List[Destinataire]]] = None
+        self._par_id: Dict[int, Destinataire] = {}
+        self._charge_le = 0.0
+
+    def _charger(self) -> Tuple[Dict[str, List[Destinataire]], Dict[int, Destinataire]]:
+        """Index (par rôle, par identifiant) lus ensemble sous le verrou"""
+        with self._lock:
+            if self._par_role is not None and time.monotonic() - self._charge_le < self.ttl:
+                return self._par_role, self._par_id
+            lignes = db.session.query(
+                Utilisateur.utilisateur_id, Utilisateur.role, Utilisateur.email,
+                Utilisateur.prenom, Utilisateur.nom
+            ).filter(Utilisateur.email.isnot(None), Utilisateur.email != '') \
+                .order_by(Utilisateur.utilisateur_id).all()
+            par_role, par_id = {}, {}
+            for utilisateur_id, role, email, prenom, nom in lignes:
+                destinataire = Destinataire(email, f"{prenom} {nom}")
+                par_role.setdefault(role, []).append(destinataire)
+                par_id[utilisateur_id] = destinataire
+            self._par_role, self._par_id = par_role, par_id
+            self._charge_le = time.monotonic()
+            return par_role, par_id
+
+    def par_roles(self, roles: List[str]) -> List[Destinataire]:
+        par_role, _ = self._charger()
+        return [d for role in roles for d in par_role.get(role, [])]
+
+    def par_id(self, utilisateur_id: int) -> Optional[Destinataire]:
+        _, par_id = self._charger()
+        return par_id.get(utilisateur_id)
+
+    def invalider(self) -> None:
+        with self._lock:
+            self._par_role = None
+            self._par_id = {}
+
+
+def _get_annuaire() -> _AnnuaireDestinataires:
+    app = current_app._get_current_object()
+    annuaire = app.extensions.get('annuaire_destinataires')
+    if annuaire is None:
+        annuaire = app.extensions.setdefault('annuaire_destinataires', _AnnuaireDestinataires(
+            app.config.get('NOTIFICATION_DESTINATAIRES_TTL', 300)
+        ))
+    return annuaire
+
+
 class NotificationService:
     """Service centralisé pour les notifications par email"""
     
@@ -25,19 +94,56 @@ class NotificationService:
         'VEHICULE_REPARE': ['RESPONSABLE', 'SUPERVISEUR'],
         'SEUIL_VIDANGE': ['RESPONSABLE', 'SUPERVISEUR'],
         'SEUIL_CARBURANT': ['RESPONSABLE', 'CHAUFFEUR', 'SUPERVISEUR'],
+        'EXPIRATION_DOCUMENT': ['RESPONSABLE', 'SUPERVISEUR'],
+        'EXPIRATION_PERMIS': ['RESPONSABLE', 'SUPERVISEUR'],
         'STATUT_CHAUFFEUR': ['CHAUFFEUR']  # Le chauffeur concerné uniquement
     }
     
     @staticmethod
-    def get_users_by_roles(roles: List[str]) -> List[Utilisateur]:
-        """Récupère les utilisateurs ayant les rôles spécifiés"""
-        return Utilisateur.query.filter(Utilisateur.role.in_(roles)).all()
-    
+    def get_users_by_roles(roles: List[str]) -> List[Destinataire]:
+        """Destinataires (email, nom) des utilisateurs ayant les rôles spécifiés (annuaire en cache)"""
+        return _get_annuaire().par_roles(roles)
+
+    @staticmethod
+    def get_destinataire(utilisateur_id: int) -> Optional[Destinataire]:
+        """Destinataire (email, nom) d'un utilisateur, None s'il n'existe pas ou n'a pas d'email"""
+        return _get_annuaire().par_id(utilisateur_id)
+
+    @staticmethod
+    def invalider_destinataires() -> None:
+        """À appeler après la création, la suppression ou le changement de rôle d'un utilisateur"""
+        _get_annuaire().invalider()
+
     @staticmethod
-    def send_panne_notification(panne: PanneBusUdM, declared_by: str) -> bool:
+    def _send_to_recipients(rendu: EmailRendu, recipients: List[Destinataire], label: str,
+                            type_notification: Optional[str] = None, bus_id: Optional[int] = None,
+                            immediat: bool = False) -> int:
+        """
+        Met le même email (rendu une seule fois) en file d'envoi pour tous les
+        destinataires (voir OutboxService), ou le réserve au prochain récapitulatif
+        si le mode récapitulatif s'applique à ``type_notification`` (voir DigestService).
+        Retourne le nombre d'emails mis en file ou d'alertes mises de côté
+        """
+        if not immediat and type_notification and DigestService.est_differe(type_notification):
+            nombre = DigestService.ajouter(recipients, type_notification, rendu.sujet, bus_id)
+            current_app.logger.info(f"Notification {label} réservée au récapitulatif de {nombre} destinataire(s)")
+            return nombre
+        lignes = OutboxService.enqueue(rendu.messages(recipients), label)
+        current_app.logger.info(f"Notification {label} mise en file pour {len(lignes)} destinataire(s)")
+        return len(lignes)
+
+    @staticmethod
+    def _bus_info(bus: Optional[BusUdM], bus_id: int) -> str:
+        return f"Bus {bus.numero} ({bus.immatriculation})" if bus else f"Bus ID {bus_id}"
+
+    @staticmethod
+    def send_panne_notification(panne: PanneBusUdM, declared_by: str, bus: Optional[BusUdM] = None,
+                                immediat: bool = False) -> bool:
         """
         Envoie une notification lors de la déclaration d'une panne
         Destinataires: MECANICIEN, SUPERVISEUR, RESPONSABLE
+        ``bus`` évite de recharger le véhicule quand l'appelant l'a déjà
+        Les pannes de criticité HAUTE (ou ``immediat``) ne passent jamais par le récapitulatif
         """
         try:
             # Récupérer les destinataires
@@ -50,52 +156,26 @@ class NotificationService:
                 return False
             
             # Récupérer les informations du bus
-            bus = BusUdM.query.get(panne.bus_udm_id)
-            bus_info = f"Bus {bus.numero} ({bus.immatriculation})" if bus else f"Bus ID {panne.bus_udm_id}"
+            if bus is None:
+                bus = db.session.get(BusUdM, panne.bus_udm_id)
             
             # Préparer le contenu de l'email
-            subject = f"🚨 Nouvelle panne déclarée - {bus_info}"
-            
-            body = f"""
-Bonjour,
-
-Une nouvelle panne a été déclarée dans le système TransportUdM.
-
-📋 DÉTAILS DE LA PANNE:
-• Véhicule: {bus_info}
-• Date/Heure: {panne.date_heure.strftime('%d/%m/%Y à %H:%M')}
-• Kilométrage: {panne.kilometrage:,} km
-• Criticité: {panne.criticite}
-• Immobilisation: {'Oui' if panne.immobilisation else 'Non'}
-• Déclarée par: {declared_by}
-
-📝 DESCRIPTION:
-{panne.description}
-
-{'⚠️ ATTENTION: Ce véhicule est immobilisé et ne peut pas être utilisé.' if panne.immobilisation else ''}
-
-Veuillez prendre les mesures nécessaires pour traiter cette panne.
-
----
-Système TransportUdM - Université des Montagnes
-Notification automatique - Ne pas répondre à cet email
-            """.strip()
+            rendu = rendre_email(
+                'panne', panne=panne, declared_by=declared_by,
+                bus_info=NotificationService._bus_info(bus, panne.bus_udm_id)
+            )
             
-            # Envoyer l'email à tous les destinataires
-            success_count = 0
-            for user in recipients:
-                if user.email:
-                    if send_email(subject, body, user.email):
-                        success_count += 1
-                        current_app.logger.info(f"Notification panne envoyée à {user.email}")
-                    else:
-                        current_app.logger.error(f"Échec envoi notification panne à {user.email}")
+            # Mettre l'email en file d'envoi pour tous les destinataires
+            success_count = NotificationService._send_to_recipients(
+                rendu, recipients, 'panne', 'PANNE_DECLAREE', panne.bus_udm_id,
+                immediat=immediat or panne.criticite == 'HAUTE'
+            )
             
             # Log de l'action
             log_user_action(
                 'NOTIFICATION', 
                 'send_panne_notification',
-                f"Panne {panne.id} - {success_count}/{len(recipients)} emails envoyés"
+                f"Panne {panne.id} - {success_count}/{len(recipients)} emails en file"
             )
             
             return success_count > 0
@@ -105,10 +185,11 @@ Notification automatique - Ne pas répondre à cet email
             return False
     
     @staticmethod
-    def send_vehicule_repare_notification(panne: PanneBusUdM, repaired_by: str) -> bool:
+    def send_vehicule_repare_notification(panne: PanneBusUdM, repaired_by: str, bus: Optional[BusUdM] = None) -> bool:
         """
         Envoie une notification lorsqu'un véhicule est réparé
         Destinataires: RESPONSABLE, SUPERVISEUR
+        ``bus`` évite de recharger le véhicule quand l'appelant l'a déjà
         """
         try:
             # Récupérer les destinataires
@@ -121,49 +202,25 @@ Notification automatique - Ne pas répondre à cet email
                 return False
             
             # Récupérer les informations du bus
-            bus = BusUdM.query.get(panne.bus_udm_id)
-            bus_info = f"Bus {bus.numero} ({bus.immatriculation})" if bus else f"Bus ID {panne.bus_udm_id}"
+            if bus is None:
+                bus = db.session.get(BusUdM, panne.bus_udm_id)
             
             # Préparer le contenu de l'email
-            subject = f"✅ Véhicule réparé - {bus_info}"
-            
-            body = f"""
-Bonjour,
-
-Un véhicule a été réparé et est de nouveau opérationnel.
-
-📋 DÉTAILS DE LA RÉPARATION:
-• Véhicule: {bus_info}
-• Panne déclarée le: {panne.date_heure.strftime('%d/%m/%Y à %H:%M')}
-• Réparation terminée le: {panne.date_resolution.strftime('%d/%m/%Y à %H:%M')}
-• Réparé par: {repaired_by}
-• Criticité initiale: {panne.criticite}
-
-📝 DESCRIPTION DE LA PANNE:
-{panne.description}
-
-✅ Le véhicule est maintenant disponible pour les trajets.
-
----
-Système TransportUdM - Université des Montagnes
-Notification automatique - Ne pas répondre à cet email
-            """.strip()
+            rendu = rendre_email(
+                'reparation', panne=panne, repaired_by=repaired_by,
+                bus_info=NotificationService._bus_info(bus, panne.bus_udm_id)
+            )
             
-            # Envoyer l'email à tous les destinataires
-            success_count = 0
-            for user in recipients:
-                if user.email:
-                    if send_email(subject, body, user.email):
-                        success_count += 1
-                        current_app.logger.info(f"Notification réparation envoyée à {user.email}")
-                    else:
-                        current_app.logger.error(f"Échec envoi notification réparation à {user.email}")
+            # Mettre l'email en file d'envoi pour tous les destinataires
+            success_count = NotificationService._send_to_recipients(
+                rendu, recipients, 'réparation', 'VEHICULE_REPARE', panne.bus_udm_id
+            )
             
             # Log de l'action
             log_user_action(
                 'NOTIFICATION', 
                 'send_vehicule_repare_notification',
-                f"Réparation panne {panne.id} - {success_count}/{len(recipients)} emails envoyés"
+                f"Réparation panne {panne.id} - {success_count}/{len(recipients)} emails en file"
             )
             
             return success_count > 0
@@ -189,44 +246,18 @@ Notification automatique - Ne pas répondre à cet email
                 return False
             
             # Préparer le contenu de l'email
-            subject = f"🔧 Seuil vidange atteint - Bus {bus.numero}"
-            
-            body = f"""
-Bonjour,
-
-Un véhicule a atteint le seuil critique pour la vidange.
-
-📋 DÉTAILS DU VÉHICULE:
-• Véhicule: Bus {bus.numero} ({bus.immatriculation})
-• Kilométrage actuel: {bus.kilometrage:,} km
-• Kilomètres depuis dernière vidange: {km_depuis_vidange:,} km
-• Seuil critique: {seuil:,} km
-• Dépassement: {km_depuis_vidange - seuil:,} km
-
-⚠️ ATTENTION: Ce véhicule nécessite une vidange urgente.
-
-Veuillez programmer une intervention de maintenance dans les plus brefs délais.
-
----
-Système TransportUdM - Université des Montagnes
-Notification automatique - Ne pas répondre à cet email
-            """.strip()
+            rendu = rendre_email('vidange', bus=bus, km_depuis_vidange=km_depuis_vidange, seuil=seuil)
             
-            # Envoyer l'email à tous les destinataires
-            success_count = 0
-            for user in recipients:
-                if user.email:
-                    if send_email(subject, body, user.email):
-                        success_count += 1
-                        current_app.logger.info(f"Notification vidange envoyée à {user.email}")
-                    else:
-                        current_app.logger.error(f"Échec envoi notification vidange à {user.email}")
+            # Mettre l'email en file d'envoi pour tous les destinataires
+            success_count = NotificationService._send_to_recipients(
+                rendu, recipients, 'vidange', 'SEUIL_VIDANGE', bus.id
+            )
             
             # Log de l'action
             log_user_action(
                 'NOTIFICATION', 
                 'send_seuil_vidange_notification',
-                f"Bus {bus.numero} - {success_count}/{len(recipients)} emails envoyés"
+                f"Bus {bus.numero} - {success_count}/{len(recipients)} emails en file"
             )
             
             return success_count > 0
@@ -255,57 +286,115 @@ Notification automatique - Ne pas répondre à cet email
             pourcentage = (niveau_actuel / bus.capacite_reservoir_litres * 100) if bus.capacite_reservoir_litres else 0
 
             # Préparer le contenu de l'email
-            subject = f"⛽ Seuil carburant critique - Bus {bus.numero}"
+            rendu = rendre_email('carburant', bus=bus, niveau_actuel=niveau_actuel,
+                                 pourcentage=pourcentage, seuil=seuil)
 
-            body = f"""
-Bonjour,
+            # Mettre l'email en file d'envoi pour tous les destinataires
+            success_count = NotificationService._send_to_recipients(
+                rendu, recipients, 'carburant', 'SEUIL_CARBURANT', bus.id
+            )
 
-Un véhicule a atteint le seuil critique de carburant.
+            # Log de l'action
+            log_user_action(
+                'NOTIFICATION',
+                'send_seuil_carburant_notification',
+                f"Bus {bus.numero} - {success_count}/{len(recipients)} emails en file"
+            )
 
-📋 DÉTAILS DU VÉHICULE:
-• Véhicule: Bus {bus.numero} ({bus.immatriculation})
-• Niveau actuel: {niveau_actuel:.1f} L ({pourcentage:.1f}%)
-• Capacité totale: {bus.capacite_reservoir_litres:.1f} L
-• Seuil critique: {seuil:.1f}%
-• Kilométrage: {bus.kilometrage:,} km
+            return success_count > 0
 
-⚠️ ATTENTION: Ce véhicule nécessite un ravitaillement urgent.
+        except Exception as e:
+            current_app.logger.error(f"Erreur notification carburant: {str(e)}")
+            return False
 
-Veuillez procéder au ravitaillement avant le prochain trajet.
+    @staticmethod
+    def send_document_expiration_notification(bus: BusUdM, document, jours_restants: int) -> bool:
+        """
+        Envoie une notification lorsqu'un document de bus arrive à expiration
+        Destinataires: RESPONSABLE, SUPERVISEUR
+        """
+        try:
+            recipients = NotificationService.get_users_by_roles(
+                NotificationService.NOTIFICATION_RECIPIENTS['EXPIRATION_DOCUMENT']
+            )
 
----
-Système TransportUdM - Université des Montagnes
-Notification automatique - Ne pas répondre à cet email
-            """.strip()
+            if not recipients:
+                current_app.logger.warning("Aucun destinataire trouvé pour notification document")
+                return False
 
-            # Envoyer l'email à tous les destinataires
-            success_count = 0
-            for user in recipients:
-                if user.email:
-                    if send_email(subject, body, user.email):
-                        success_count += 1
-                        current_app.logger.info(f"Notification carburant envoyée à {user.email}")
-                    else:
-                        current_app.logger.error(f"Échec envoi notification carburant à {user.email}")
+            if jours_restants < 0:
+                echeance = f"expiré depuis {-jours_restants} jour(s)"
+            else:
+                echeance = f"expire dans {jours_restants} jour(s)"
+
+            rendu = rendre_email(
+                'document', bus=bus, document=document, jours_restants=jours_restants, echeance=echeance,
+                type_document=document.type_document.replace('_', ' ').title()
+            )
+
+            # Mettre l'email en file d'envoi pour tous les destinataires
+            success_count = NotificationService._send_to_recipients(
+                rendu, recipients, 'document', 'EXPIRATION_DOCUMENT', bus.id
+            )
 
-            # Log de l'action
             log_user_action(
                 'NOTIFICATION',
-                'send_seuil_carburant_notification',
-                f"Bus {bus.numero} - {success_count}/{len(recipients)} emails envoyés"
+                'send_document_expiration_notification',
+                f"Bus {bus.numero} document {document.document_id} - {success_count}/{len(recipients)} emails en file"
             )
 
             return success_count > 0
 
         except Exception as e:
-            current_app.logger.error(f"Erreur notification carburant: {str(e)}")
+            current_app.logger.error(f"Erreur notification document: {str(e)}")
+            return False
+
+    @staticmethod
+    def send_permis_expiration_notification(chauffeur, jours_restants: int) -> bool:
+        """
+        Envoie une notification lorsque le permis d'un chauffeur arrive à expiration
+        Destinataires: RESPONSABLE, SUPERVISEUR
+        """
+        try:
+            recipients = NotificationService.get_users_by_roles(
+                NotificationService.NOTIFICATION_RECIPIENTS['EXPIRATION_PERMIS']
+            )
+
+            if not recipients:
+                current_app.logger.warning("Aucun destinataire trouvé pour notification permis")
+                return False
+
+            if jours_restants <= 0:
+                echeance = "expiré" if jours_restants == 0 else f"expiré depuis {-jours_restants} jour(s)"
+            else:
+                echeance = f"expire dans {jours_restants} jour(s)"
+
+            rendu = rendre_email('permis', chauffeur=chauffeur, jours_restants=jours_restants, echeance=echeance)
+
+            # Mettre l'email en file d'envoi pour tous les destinataires
+            success_count = NotificationService._send_to_recipients(
+                rendu, recipients, 'permis', 'EXPIRATION_PERMIS'
+            )
+
+            log_user_action(
+                'NOTIFICATION',
+                'send_permis_expiration_notification',
+                f"Chauffeur {chauffeur.chauffeur_id} - {success_count}/{len(recipients)} emails en file"
+            )
+
+            return success_count > 0
+
+        except Exception as e:
+            current_app.logger.error(f"Erreur notification permis: {str(e)}")
             return False
 
     @staticmethod
-    def send_statut_chauffeur_notification(chauffeur_statut: ChauffeurStatut, chauffeur_email: str) -> bool:
+    def send_statut_chauffeur_notification(chauffeur_statut: ChauffeurStatut, chauffeur_email: str,
+                                           chauffeur_nom: Optional[str] = None) -> bool:
         """
         Envoie une notification au chauffeur lors de l'affectation d'un statut
         Destinataire: Le chauffeur concerné uniquement
+        ``chauffeur_nom`` (voir get_destinataire) évite de recharger le chauffeur
         """
         try:
             if not chauffeur_email:
@@ -313,9 +402,10 @@ Notification automatique - Ne pas répondre à cet email
                 return False
 
             # Récupérer les informations du chauffeur
-            from app.models.chauffeur import Chauffeur
-            chauffeur = Chauffeur.query.get(chauffeur_statut.chauffeur_id)
-            chauffeur_nom = f"{chauffeur.prenom} {chauffeur.nom}" if chauffeur else f"Chauffeur ID {chauffeur_statut.chauffeur_id}"
+            if not chauffeur_nom:
+                from app.models.chauffeur import Chauffeur
+                chauffeur = db.session.get(Chauffeur, chauffeur_statut.chauffeur_id)
+                chauffeur_nom = f"{chauffeur.prenom} {chauffeur.nom}" if chauffeur else f"Chauffeur ID {chauffeur_statut.chauffeur_id}"
 
             # Mapper les statuts en français
             statuts_fr = {
@@ -331,48 +421,28 @@ Notification automatique - Ne pas répondre à cet email
                 'CONJOINTEMENT': 'CUM et Campus (Conjointement)'
             }
 
-            statut_fr = statuts_fr.get(chauffeur_statut.statut, chauffeur_statut.statut)
-            lieu_fr = lieux_fr.get(chauffeur_statut.lieu, chauffeur_statut.lieu)
-
             # Préparer le contenu de l'email
-            subject = f"📋 Nouveau statut affecté - {statut_fr}"
-
-            body = f"""
-Bonjour {chauffeur_nom},
-
-Un nouveau statut vous a été affecté dans le système TransportUdM.
-
-📋 DÉTAILS DE VOTRE AFFECTATION:
-• Statut: {statut_fr}
-• Lieu d'affectation: {lieu_fr}
-• Date de début: {chauffeur_statut.date_debut.strftime('%d/%m/%Y à %H:%M')}
-• Date de fin: {chauffeur_statut.date_fin.strftime('%d/%m/%Y à %H:%M')}
-• Affecté le: {chauffeur_statut.created_at.strftime('%d/%m/%Y à %H:%M')}
-
-📝 INSTRUCTIONS:
-{NotificationService._get_statut_instructions(chauffeur_statut.statut, chauffeur_statut.lieu)}
-
-Pour toute question concernant votre affectation, veuillez contacter votre responsable.
-
----
-Système TransportUdM - Université des Montagnes
-Notification automatique - Ne pas répondre à cet email
-            """.strip()
+            rendu = rendre_email(
+                'statut', chauffeur_statut=chauffeur_statut, chauffeur_nom=chauffeur_nom,
+                statut_fr=statuts_fr.get(chauffeur_statut.statut, chauffeur_statut.statut),
+                lieu_fr=lieux_fr.get(chauffeur_statut.lieu, chauffeur_statut.lieu),
+                instructions=NotificationService._get_statut_instructions(chauffeur_statut.statut, chauffeur_statut.lieu)
+            )
 
-            # Envoyer l'email
-            if send_email(subject, body, chauffeur_email):
-                current_app.logger.info(f"Notification statut envoyée à {chauffeur_email}")
+            # Mettre l'email en file d'envoi
+            if OutboxService.enqueue(rendu.messages([Destinataire(chauffeur_email, chauffeur_nom)]), 'statut'):
+                current_app.logger.info(f"Notification statut mise en file pour {chauffeur_email}")
 
                 # Log de l'action
                 log_user_action(
                     'NOTIFICATION',
                     'send_statut_chauffeur_notification',
-                    f"Statut {chauffeur_statut.statut} chauffeur {chauffeur_statut.chauffeur_id} - Email envoyé"
+                    f"Statut {chauffeur_statut.statut} chauffeur {chauffeur_statut.chauffeur_id} - Email en file"
                 )
 
                 return True
             else:
-                current_app.logger.error(f"Échec envoi notification statut à {chauffeur_email}")
+                current_app.logger.error(f"Échec mise en file notification statut pour {chauffeur_email}")
                 return False
 
         except Exception as e:
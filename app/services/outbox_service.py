@@ -0,0 +1,222 @@
+"""
+File d'envoi persistante des notifications email (notification_outbox)
+Les notifications sont enregistrées en base pendant la requête puis livrées par
+un thread worker (ou scripts/outbox_worker.py) hors du cycle requête/réponse.
+Un envoi en échec est retenté avec un délai exponentiel ; au-delà de
+NOTIFICATION_OUTBOX_MAX_TENTATIVES, le message passe en ECHEC_DEFINITIF.
+"""
+
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import current_app
+from sqlalchemy import event, func
+
+from app.database import db
+from app.models.notification_outbox import NotificationOutbox
+from app.utils.emailer import EmailMessage, send_bulk
+from app.utils.metriques import NOTIFICATION_ABANDONS
+
+
+STATUTS_A_TRAITER = ('EN_ATTENTE', 'EN_COURS')
+
+# Un lot EN_COURS non terminé après ce délai (worker arrêté) est repris
+DUREE_VERROU = timedelta(minutes=5)
+
+
+class _OutboxWorker(threading.Thread):
+    """Thread de livraison : traite les messages dus puis attend NOTIFICATION_OUTBOX_POLL secondes"""
+
+    def __init__(self, app):
+        super().__init__(name='notification-outbox', daemon=True)
+        self.app = app
+        self.intervalle = app.config.get('NOTIFICATION_OUTBOX_POLL', 5)
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+
+    def reveiller(self) -> None:
+        self._reveil.set()
+
+    def arreter(self) -> None:
+        self._arret.set()
+        self._reveil.set()
+
+    def run(self) -> None:
+        while not self._arret.is_set():
+            self._reveil.clear()
+            with self.app.app_context():
+                try:
+                    while any(OutboxService.traiter_lot().values()):
+                        pass
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Erreur du worker de notifications")
+                finally:
+                    db.session.remove()
+            self._reveil.wait(self.intervalle)
+
+
+def _delai_nouvelle_tentative(tentatives: int, config) -> timedelta:
+    """Backoff exponentiel : BACKOFF, 2×BACKOFF, 4×BACKOFF… plafonné à BACKOFF_MAX"""
+    base = config.get('NOTIFICATION_OUTBOX_BACKOFF', 60)
+    plafond = config.get('NOTIFICATION_OUTBOX_BACKOFF_MAX', 3600)
+    return timedelta(seconds=min(base * 2 ** max(tentatives - 1, 0), plafond))
+
+
+class OutboxService:
+    """Service de la file d'envoi des notifications"""
+
+    @staticmethod
+    def get_worker(demarrer: bool = True, app=None) -> Optional[_OutboxWorker]:
+        """
+        Worker de l'application (si NOTIFICATION_OUTBOX_WORKER), démarré à la première
+        requête servie (create_app) ou par serveur.preparer_worker, et redémarré au
+        besoin par enqueue / relancer
+        """
+        app = app or current_app._get_current_object()
+        if not app.config.get('NOTIFICATION_OUTBOX_WORKER', True):
+            return None
+        worker = app.extensions.get('outbox_worker')
+        if (worker is None or not worker.is_alive()) and demarrer:
+            worker = _OutboxWorker(app)
+            app.extensions['outbox_worker'] = worker
+            worker.start()
+        return worker
+
+    @staticmethod
+    def enqueue(messages: Iterable[EmailMessage], type_notification: str) -> List[NotificationOutbox]:
+        """
+        Ajoute les emails à la file dans la transaction de la session courante,
+        sans la valider : l'appelant commit (les messages partent avec ses propres
+        modifications, ou pas du tout). Le worker est réveillé après le commit.
+        Retourne les lignes créées.
+        """
+        lignes = [
+            NotificationOutbox(
+                type_notification=type_notification,
+                destinataire=message.to_email,
+                sujet=message.subject,
+                corps=message.body,
+                corps_html=message.html,
+                statut='EN_ATTENTE',
+                tentatives=0,
+                prochaine_tentative=datetime.now(),
+            )
+            for message in messages if message.to_email
+        ]
+        if not lignes:
+            return []
+        db.session.add_all(lignes)
+
+        worker = OutboxService.get_worker()
+        if worker is not None:
+            event.listen(db.session(), 'after_commit', lambda session: worker.reveiller(), once=True)
+        return lignes
+
+    @staticmethod
+    def traiter_lot(limite: int = 50) -> Dict[str, int]:
+        """
+        Livre jusqu'à ``limite`` messages arrivés à échéance sur une seule session SMTP.
+        Les messages sont d'abord réservés (statut EN_COURS + verrou) pour qu'un
+        second worker ne les envoie pas en double.
+        Retourne {'envoyes', 'echecs', 'abandonnes'}.
+        """
+        config = current_app.config
+        maintenant = datetime.now()
+        resultat = {'envoyes': 0, 'echecs': 0, 'abandonnes': 0}
+
+        ids = [row.id for row in db.session.query(NotificationOutbox.id).filter(
+            NotificationOutbox.statut.in_(STATUTS_A_TRAITER),
+            NotificationOutbox.prochaine_tentative <= maintenant
+        ).order_by(NotificationOutbox.prochaine_tentative).limit(limite)]
+        if not ids:
+            return resultat
+
+        verrou = uuid.uuid4().hex
+        NotificationOutbox.query.filter(
+            NotificationOutbox.id.in_(ids),
+            NotificationOutbox.statut.in_(STATUTS_A_TRAITER),
+            NotificationOutbox.prochaine_tentative <= maintenant
+        ).update({
+            'statut': 'EN_COURS',
+            'verrou': verrou,
+            'prochaine_tentative': maintenant + DUREE_VERROU,
+        }, synchronize_session=False)
+        db.session.commit()
+
+        lot = NotificationOutbox.query.filter_by(verrou=verrou, statut='EN_COURS') \
+            .order_by(NotificationOutbox.id).all()
+        if not lot:
+            return resultat
+
+        erreurs = []
+        envois = send_bulk([EmailMessage(m.sujet, m.corps, m.destinataire, m.corps_html) for m in lot], erreurs)
+
+        max_tentatives = config.get('NOTIFICATION_OUTBOX_MAX_TENTATIVES', 6)
+        fin = datetime.now()
+        for message, envoye, erreur in zip(lot, envois, erreurs):
+            message.verrou = None
+            if envoye:
+                message.statut = 'ENVOYE'
+                message.envoye_le = fin
+                message.derniere_erreur = None
+                resultat['envoyes'] += 1
+                continue
+
+            message.tentatives += 1
+            message.derniere_erreur = erreur
+            if message.tentatives >= max_tentatives:
+                message.statut = 'ECHEC_DEFINITIF'
+                resultat['abandonnes'] += 1
+                NOTIFICATION_ABANDONS.inc()
+                current_app.logger.error(
+                    f"Notification {message.id} abandonnée après {message.tentatives} tentatives "
+                    f"({message.destinataire}) : {erreur}"
+                )
+            else:
+                message.statut = 'EN_ATTENTE'
+                message.prochaine_tentative = fin + _delai_nouvelle_tentative(message.tentatives, config)
+                resultat['echecs'] += 1
+        db.session.commit()
+        return resultat
+
+    @staticmethod
+    def relancer(message_id: int) -> bool:
+        """Remet en file un message en ECHEC_DEFINITIF ; retourne False s'il n'existe pas ou n'est pas en échec"""
+        message = db.session.get(NotificationOutbox, message_id)
+        if message is None or message.statut != 'ECHEC_DEFINITIF':
+            return False
+        message.statut = 'EN_ATTENTE'
+        message.tentatives = 0
+        message.prochaine_tentative = datetime.now()
+        db.session.commit()
+
+        worker = OutboxService.get_worker()
+        if worker is not None:
+            worker.reveiller()
+        return True
+
+    @staticmethod
+    def get_statistiques(limite_echecs: int = 20) -> Dict[str, Any]:
+        """Profondeur de la file par statut, ancienneté du plus vieux message en attente et derniers échecs"""
+        par_statut = dict(
+            db.session.query(NotificationOutbox.statut, func.count(NotificationOutbox.id))
+            .group_by(NotificationOutbox.statut).all()
+        )
+        plus_ancien = db.session.query(func.min(NotificationOutbox.cree_le)).filter(
+            NotificationOutbox.statut.in_(STATUTS_A_TRAITER)
+        ).scalar()
+        echecs = NotificationOutbox.query.filter(
+            (NotificationOutbox.statut == 'ECHEC_DEFINITIF') |
+            ((NotificationOutbox.statut == 'EN_ATTENTE') & (NotificationOutbox.tentatives > 0))
+        ).order_by(NotificationOutbox.id.desc()).limit(limite_echecs).all()
+
+        return {
+            'en_attente': par_statut.get('EN_ATTENTE', 0) + par_statut.get('EN_COURS', 0),
+            'envoyes': par_statut.get('ENVOYE', 0),
+            'echecs_definitifs': par_statut.get('ECHEC_DEFINITIF', 0),
+            'plus_ancien_en_attente': plus_ancien.isoformat() if plus_ancien else None,
+            'echecs': [message.to_dict() for message in echecs],
+        }
@@ -0,0 +1,95 @@
+"""
+Tâches périodiques de l'application (voir app/utils/planificateur.py)
+- seuils_flotte : vidange et carburant de toute la flotte (AlertService)
+- expirations : documents des bus et permis des chauffeurs
+- rollup_trajets : resynchronisation des derniers jours de trajet_daily_rollup
+- purge_rapports : jobs de rapports expirés ou bloqués
+- digest_notifications : récapitulatifs d'alertes arrivés à échéance (mode récapitulatif)
+Exécutées dans le processus web si SCHEDULER_ENABLED, sinon par `flask taches worker`.
+"""
+
+from datetime import date, timedelta
+from typing import List, Optional
+
+from flask import current_app
+
+from app.database import db
+from app.utils.planificateur import Planificateur, Tache
+
+
+def _verifier(types) -> None:
+    from app.services.alert_service import AlertService
+    rapport = AlertService.check_all_critical_thresholds(types=types)
+    if rapport.get('error'):
+        raise RuntimeError(rapport['error'])
+
+
+def verifier_seuils_flotte() -> None:
+    _verifier(('VIDANGE', 'CARBURANT'))
+
+
+def verifier_expirations() -> None:
+    _verifier(('DOCUMENT', 'PERMIS'))
+
+
+def maintenir_rollup_trajets() -> None:
+    from app.services.rollup_service import TrajetRollupService
+    jours = current_app.config.get('SCHEDULER_ROLLUP_JOURS', 2)
+    aujourd_hui = date.today()
+    TrajetRollupService.reconstruire(aujourd_hui - timedelta(days=jours - 1), aujourd_hui)
+    db.session.commit()
+
+
+def purger_rapports() -> None:
+    from app.services.rapport_job_service import RapportJobService
+    RapportJobService.purger_expires()
+
+
+def envoyer_recapitulatifs() -> None:
+    from app.services.digest_service import DigestService
+    DigestService.traiter()
+
+
+class PlanificationService:
+    """Service du planificateur de tâches périodiques"""
+
+    @staticmethod
+    def get_taches(config) -> List[Tache]:
+        gigue = config.get('SCHEDULER_GIGUE', 60)
+        return [
+            Tache('seuils_flotte', verifier_seuils_flotte,
+                  intervalle=config.get('SCHEDULER_SEUILS_INTERVALLE', 900), gigue=gigue,
+                  description='Seuils de vidange et de carburant de la flotte'),
+            Tache('expirations', verifier_expirations,
+                  cron=config.get('SCHEDULER_EXPIRATIONS_CRON', '0 7 * * *'), gigue=gigue,
+                  description='Expiration des documents des bus et des permis'),
+            Tache('rollup_trajets', maintenir_rollup_trajets,
+                  cron=config.get('SCHEDULER_ROLLUP_CRON', '30 2 * * *'), gigue=gigue, duree_max=1800,
+                  description='Reconstruction des derniers jours de trajet_daily_rollup'),
+            Tache('purge_rapports', purger_rapports,
+                  intervalle=config.get('SCHEDULER_PURGE_RAPPORTS_INTERVALLE', 3600), gigue=gigue,
+                  description='Suppression des rapports expirés'),
+            Tache('digest_notifications', envoyer_recapitulatifs,
+                  intervalle=config.get('SCHEDULER_DIGEST_INTERVALLE', 60), gigue=min(gigue, 10),
+                  description='Envoi des récapitulatifs de notifications'),
+        ]
+
+    @staticmethod
+    def get_planificateur(app=None) -> Planificateur:
+        """Planificateur de l'application (créé au premier appel, non démarré)"""
+        app = app or current_app._get_current_object()
+        planificateur = app.extensions.get('planificateur')
+        if planificateur is None:
+            planificateur = app.extensions.setdefault('planificateur', Planificateur(
+                app, PlanificationService.get_taches(app.config),
+                intervalle=app.config.get('SCHEDULER_POLL', 30),
+            ))
+        return planificateur
+
+    @staticmethod
+    def demarrer(app=None) -> Optional[Planificateur]:
+        """Démarre le thread du planificateur dans le processus courant"""
+        planificateur = PlanificationService.get_planificateur(app)
+        if not planificateur.is_alive():
+            planificateur.start()
+        return planificateur
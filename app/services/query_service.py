@@ -3,7 +3,7 @@ Service centralisé pour les requêtes communes
 Élimine la duplication de requêtes SQL dans les routes et services
 """
 
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy import func, and_, or_
 
@@ -15,6 +15,7 @@ from app.models.prestataire import Prestataire
 from app.models.panne_bus_udm import PanneBusUdM
 from app.models.vidange import Vidange
 from app.models.carburation import Carburation
+from app.utils.periodes import day_filter
 
 
 class QueryService:
@@ -63,7 +64,7 @@ class QueryService:
     @staticmethod
     def get_trajets_by_date(target_date: date, filters: Optional[Dict] = None) -> List[Trajet]:
         """Retourne les trajets pour une date donnée avec filtres optionnels"""
-        query = Trajet.query.filter(func.date(Trajet.date_heure_depart) == target_date)
+        query = Trajet.query.filter(day_filter(Trajet.date_heure_depart, target_date))
         
         if filters:
             if 'type_trajet' in filters:
@@ -82,7 +83,7 @@ class QueryService:
     @staticmethod
     def count_trajets_by_date(target_date: date, filters: Optional[Dict] = None) -> int:
         """Compte les trajets pour une date donnée"""
-        query = Trajet.query.filter(func.date(Trajet.date_heure_depart) == target_date)
+        query = Trajet.query.filter(day_filter(Trajet.date_heure_depart, target_date))
         
         if filters:
             if 'bus_udm' in filters and filters['bus_udm']:
@@ -108,14 +109,14 @@ class QueryService:
         """Statistiques transport étudiants (centralisé)"""
         # Arrivées vers le campus
         arrives = db.session.query(func.sum(Trajet.nombre_places_occupees)).filter(
-            func.date(Trajet.date_heure_depart) == target_date,
+            day_filter(Trajet.date_heure_depart, target_date),
             Trajet.type_passagers == 'ETUDIANT',
             Trajet.point_depart.in_(['Mfetum', 'Ancienne Mairie'])
         ).scalar() or 0
         
         # Départs du campus
         partis = db.session.query(func.sum(Trajet.nombre_places_occupees)).filter(
-            func.date(Trajet.date_heure_depart) == target_date,
+            day_filter(Trajet.date_heure_depart, target_date),
             Trajet.type_passagers == 'ETUDIANT',
             Trajet.point_depart == 'Banekane'
         ).scalar() or 0
@@ -208,51 +209,5 @@ class QueryService:
     @staticmethod
     def get_monthly_trends(months: int = 6) -> Dict[str, List]:
         """Tendances mensuelles pour les graphiques"""
-        today = date.today()
-        trends = {
-            'mois': [],
-            'trajets': [],
-            'pannes': [],
-            'etudiants': []
-        }
-        
-        for i in range(months):
-            # Calculer le mois
-            if today.month - i <= 0:
-                mois = today.month - i + 12
-                annee = today.year - 1
-            else:
-                mois = today.month - i
-                annee = today.year
-            
-            debut_mois = date(annee, mois, 1)
-            if mois == 12:
-                fin_mois = date(annee + 1, 1, 1) - timedelta(days=1)
-            else:
-                fin_mois = date(annee, mois + 1, 1) - timedelta(days=1)
-            
-            # Statistiques du mois
-            trajets = Trajet.query.filter(
-                func.date(Trajet.date_heure_depart) >= debut_mois,
-                func.date(Trajet.date_heure_depart) <= fin_mois
-            ).count()
-            
-            pannes = PanneBusUdM.query.filter(
-                func.date(PanneBusUdM.date_heure) >= debut_mois,
-                func.date(PanneBusUdM.date_heure) <= fin_mois
-            ).count()
-            
-            etudiants = db.session.query(
-                func.sum(Trajet.nombre_places_occupees)
-            ).filter(
-                func.date(Trajet.date_heure_depart) >= debut_mois,
-                func.date(Trajet.date_heure_depart) <= fin_mois,
-                Trajet.type_passagers == 'ETUDIANT'
-            ).scalar() or 0
-            
-            trends['mois'].insert(0, f"{mois:02d}/{annee}")
-            trends['trajets'].insert(0, trajets)
-            trends['pannes'].insert(0, pannes)
-            trends['etudiants'].insert(0, etudiants)
-        
-        return trends
+        from app.services.timeseries_service import TimeSeriesService
+        return TimeSeriesService.get_monthly_trends(months)
@@ -0,0 +1,207 @@
+"""
+Service de génération différée des rapports lourds (PDF)
+Les demandes sont enregistrées dans la table rapport_job puis exécutées par un
+pool de threads borné, hors du thread de la requête. Le fichier produit est
+servi depuis un dossier de cache et supprimé après RAPPORT_JOBS_TTL secondes.
+Deux demandes identiques (même type, mêmes paramètres) partagent le même job.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app
+
+from app.database import db
+from app.models.rapport_job import RapportJob
+from app.utils.metriques import EXPORT_DUREE
+
+
+STATUTS_ACTIFS = ('EN_ATTENTE', 'EN_COURS')
+
+
+class FileAttentePleine(RuntimeError):
+    """Trop de rapports en attente : la demande est refusée"""
+
+
+def _generer_trajets_pdf(parametres: Dict[str, Any]) -> Tuple[bytes, str, str]:
+    from app.services.rapport_service import RapportService
+    rapport = RapportService.get_rapport_trajets(
+        date.fromisoformat(parametres['date_debut']),
+        date.fromisoformat(parametres['date_fin']),
+        parametres.get('type_trajet')
+    )
+    contenu, nom_fichier = RapportService.export_trajets_pdf(rapport['trajets'])
+    return contenu, nom_fichier, 'application/pdf'
+
+
+# Types de rapport : nom -> générateur(parametres) -> (contenu, nom de fichier, mimetype)
+TYPES_RAPPORT: Dict[str, Callable[[Dict[str, Any]], Tuple[bytes, str, str]]] = {
+    'trajets_pdf': _generer_trajets_pdf,
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rapport-job')
+        return _executor
+
+
+def _cle(type_rapport: str, parametres: Dict[str, Any]) -> str:
+    """Empreinte de la demande (paramètres triés) pour le dédoublonnage"""
+    brut = json.dumps({'type': type_rapport, 'parametres': parametres}, sort_keys=True, default=str)
+    return hashlib.sha256(brut.encode('utf-8')).hexdigest()
+
+
+def _dossier_cache() -> str:
+    return current_app.config['RAPPORT_JOBS_DIR']
+
+
+def _executer(app, job_id: str) -> None:
+    """Exécute un job dans son propre contexte d'application (thread du pool)"""
+    with app.app_context():
+        job = db.session.get(RapportJob, job_id)
+        if job is None or job.statut != 'EN_ATTENTE':
+            return
+        job.statut = 'EN_COURS'
+        db.session.commit()
+
+        ttl = timedelta(seconds=app.config['RAPPORT_JOBS_TTL'])
+        type_rapport = job.type_rapport
+        debut = time.perf_counter()
+        try:
+            contenu, nom_fichier, mimetype = TYPES_RAPPORT[job.type_rapport](json.loads(job.parametres))
+
+            dossier = _dossier_cache()
+            os.makedirs(dossier, exist_ok=True)
+            fichier = f"{job.id}{os.path.splitext(nom_fichier)[1]}"
+            chemin = os.path.join(dossier, fichier)
+            # Écriture atomique : le fichier n'est visible qu'une fois complet
+            with open(chemin + '.tmp', 'wb') as f:
+                f.write(contenu)
+            os.replace(chemin + '.tmp', chemin)
+
+            job.fichier = fichier
+            job.nom_fichier = nom_fichier
+            job.mimetype = mimetype
+            job.statut = 'TERMINE'
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception(f"Échec du rapport {job_id}")
+            job = db.session.get(RapportJob, job_id)
+            job.statut = 'ECHEC'
+            job.erreur = str(e)
+
+        job.termine_le = datetime.now()
+        job.expire_le = job.termine_le + ttl
+        db.session.commit()
+        EXPORT_DUREE.observe(time.perf_counter() - debut, format='rapport', nom=type_rapport)
+
+
+class RapportJobService:
+    """Service pour les rapports générés en arrière-plan"""
+
+    @staticmethod
+    def soumettre(type_rapport: str, parametres: Dict[str, Any],
+                  demande_par: Optional[int] = None) -> Tuple[RapportJob, bool]:
+        """
+        Enregistre et lance un rapport ; retourne (job, cree).
+        Une demande identique encore en cours ou dont le fichier est en cache
+        retourne le job existant (cree=False).
+        Lève ValueError pour un type inconnu et FileAttentePleine si trop de
+        rapports sont déjà en attente.
+        """
+        if type_rapport not in TYPES_RAPPORT:
+            raise ValueError(f"Type de rapport inconnu : {type_rapport}")
+
+        RapportJobService.purger_expires()
+
+        cle = _cle(type_rapport, parametres)
+        existant = RapportJob.query.filter(
+            RapportJob.cle == cle,
+            RapportJob.statut.in_(STATUTS_ACTIFS + ('TERMINE',))
+        ).order_by(RapportJob.cree_le.desc()).first()
+        if existant and (existant.statut != 'TERMINE' or RapportJobService.chemin_fichier(existant)):
+            return existant, False
+
+        config = current_app.config
+        en_attente = RapportJob.query.filter(RapportJob.statut.in_(STATUTS_ACTIFS)).count()
+        if en_attente >= config['RAPPORT_JOBS_MAX_EN_ATTENTE']:
+            raise FileAttentePleine("Trop de rapports en cours de génération, réessayez plus tard")
+
+        job = RapportJob(
+            id=uuid.uuid4().hex,
+            type_rapport=type_rapport,
+            parametres=json.dumps(parametres, sort_keys=True, default=str),
+            cle=cle,
+            statut='EN_ATTENTE',
+            demande_par=demande_par,
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        app = current_app._get_current_object()
+        workers = config['RAPPORT_JOBS_WORKERS']
+        if workers > 0:
+            _get_executor(workers).submit(_executer, app, job.id)
+        else:
+            # Pas de pool configuré (tests, outils) : exécution immédiate
+            _executer(app, job.id)
+            db.session.refresh(job)
+        return job, True
+
+    @staticmethod
+    def get_job(job_id: str) -> Optional[RapportJob]:
+        return db.session.get(RapportJob, job_id)
+
+    @staticmethod
+    def chemin_fichier(job: RapportJob) -> Optional[str]:
+        """Chemin du fichier produit s'il est encore en cache, sinon None"""
+        if job.statut != 'TERMINE' or not job.fichier:
+            return None
+        if job.expire_le and job.expire_le < datetime.now():
+            return None
+        chemin = os.path.join(_dossier_cache(), job.fichier)
+        return chemin if os.path.exists(chemin) else None
+
+    @staticmethod
+    def purger_expires() -> int:
+        """
+        Supprime les jobs expirés et leur fichier, et passe en ECHEC les jobs
+        restés en attente au-delà de RAPPORT_JOBS_TIMEOUT (redémarrage du
+        processus). Retourne le nombre de jobs supprimés.
+        """
+        config = current_app.config
+        maintenant = datetime.now()
+
+        expires = RapportJob.query.filter(RapportJob.expire_le < maintenant).all()
+        for job in expires:
+            if job.fichier:
+                chemin = os.path.join(_dossier_cache(), job.fichier)
+                if os.path.exists(chemin):
+                    os.remove(chemin)
+            db.session.delete(job)
+
+        RapportJob.query.filter(
+            RapportJob.statut.in_(STATUTS_ACTIFS),
+            RapportJob.cree_le < maintenant - timedelta(seconds=config['RAPPORT_JOBS_TIMEOUT'])
+        ).update({
+            'statut': 'ECHEC',
+            'erreur': 'Délai de génération dépassé',
+            'termine_le': maintenant,
+            'expire_le': maintenant + timedelta(seconds=config['RAPPORT_JOBS_TTL']),
+        }, synchronize_session=False)
+
+        db.session.commit()
+        return len(expires)
@@ -5,16 +5,18 @@ Export CSV, PDF et données pour tous les rôles
 
 import io
 import csv
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from datetime import date, datetime, timedelta
-from sqlalchemy import func, and_
+from sqlalchemy import and_
 
 from app.database import db
 from app.models.trajet import Trajet
 from app.models.bus_udm import BusUdM
+from app.models.chauffeur import Chauffeur
 from app.models.panne_bus_udm import PanneBusUdM
 from app.models.vidange import Vidange
 from app.models.carburation import Carburation
+from app.utils.periodes import date_range_filter
 
 
 
@@ -37,6 +39,68 @@ except ImportError:
 class RapportService:
     """Service pour la génération de rapports"""
     
+    @staticmethod
+    def _rapport_trajets_query(date_debut: date, date_fin: date, type_trajet: str = None):
+        """
+        Requête colonnes-seules du rapport des trajets : le nom du chauffeur est
+        obtenu par jointure externe (pas de chargement paresseux par ligne)
+        """
+        query = db.select(
+            Trajet.trajet_id,
+            Trajet.date_heure_depart,
+            Trajet.point_depart,
+            Trajet.point_arriver,
+            Trajet.type_trajet,
+            Trajet.type_passagers,
+            Trajet.nombre_places_occupees,
+            Trajet.numero_bus_udm,
+            Chauffeur.nom.label('chauffeur_nom')
+        ).outerjoin(
+            Chauffeur, Trajet.chauffeur_id == Chauffeur.chauffeur_id
+        ).where(
+            date_range_filter(Trajet.date_heure_depart, date_debut, date_fin)
+        )
+
+        if type_trajet:
+            query = query.where(Trajet.type_trajet == type_trajet)
+
+        return query.order_by(Trajet.date_heure_depart.desc())
+
+    @staticmethod
+    def iter_rapport_trajets(date_debut: date = None, date_fin: date = None,
+                             type_trajet: str = None, chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt les lignes du rapport des trajets par paquets de ``chunk_size``
+        (yield_per) : mémoire constante pour les exports sur une année complète
+        Utilisable par : ADMIN, SUPERVISEUR, CHARGE
+        """
+        if not date_debut:
+            date_debut = date.today().replace(day=1)  # Début du mois
+        if not date_fin:
+            date_fin = date.today()
+
+        # Table des bus préchargée une fois (numéro -> immatriculation)
+        bus_immatriculations = dict(
+            db.session.query(BusUdM.numero, BusUdM.immatriculation).all()
+        )
+
+        query = RapportService._rapport_trajets_query(date_debut, date_fin, type_trajet)
+        result = db.session.execute(query.execution_options(yield_per=chunk_size))
+        for row in result:
+            yield {
+                'id': row.trajet_id,
+                'date_heure_depart': row.date_heure_depart,
+                'point_depart': row.point_depart,
+                'point_arrivee': row.point_arriver,
+                'type_trajet': row.type_trajet,
+                'type_passagers': row.type_passagers,
+                'nombre_places_occupees': row.nombre_places_occupees,
+                'distance_km': None,  # Distance non enregistrée sur les trajets
+                'bus_numero': row.numero_bus_udm,
+                'bus_immatriculation': bus_immatriculations.get(row.numero_bus_udm),
+                'chauffeur_nom': row.chauffeur_nom
+            }
+
     @staticmethod
     def get_rapport_trajets(date_debut: date = None, date_fin: date = None, 
                            type_trajet: str = None) -> Dict[str, Any]:
@@ -49,47 +113,16 @@ class RapportService:
         if not date_fin:
             date_fin = date.today()
         
-        # Requête de base
-        query = Trajet.query.filter(
-            func.date(Trajet.date_heure_depart) >= date_debut,
-            func.date(Trajet.date_heure_depart) <= date_fin
-        )
-        
-        if type_trajet:
-            query = query.filter(Trajet.type_trajet == type_trajet)
-        
-        trajets = query.order_by(Trajet.date_heure_depart.desc()).all()
-        
-        # Statistiques
-        total_trajets = len(trajets)
-        total_etudiants = sum(t.nombre_places_occupees for t in trajets if t.type_passagers == 'ETUDIANT')
-        total_km = sum(t.distance_km for t in trajets if t.distance_km)
-        
-        # Répartition par type
-        repartition_type = {}
-        for trajet in trajets:
-            type_t = trajet.type_trajet
-            if type_t not in repartition_type:
-                repartition_type[type_t] = 0
-            repartition_type[type_t] += 1
-        
-        # Données détaillées
+        # Données détaillées et statistiques en un seul parcours
         trajets_data = []
-        for trajet in trajets:
-            bus = BusUdM.query.get(trajet.bus_udm_id) if trajet.bus_udm_id else None
-            trajets_data.append({
-                'id': trajet.id,
-                'date_heure_depart': trajet.date_heure_depart,
-                'point_depart': trajet.point_depart,
-                'point_arrivee': trajet.point_arrivee,
-                'type_trajet': trajet.type_trajet,
-                'type_passagers': trajet.type_passagers,
-                'nombre_places_occupees': trajet.nombre_places_occupees,
-                'distance_km': trajet.distance_km,
-                'bus_numero': bus.numero if bus else None,
-                'bus_immatriculation': bus.immatriculation if bus else None,
-                'chauffeur_nom': trajet.chauffeur.nom if trajet.chauffeur else None
-            })
+        total_etudiants = 0
+        repartition_type = {}
+        for trajet in RapportService.iter_rapport_trajets(date_debut, date_fin, type_trajet):
+            trajets_data.append(trajet)
+            if trajet['type_passagers'] == 'ETUDIANT':
+                total_etudiants += trajet['nombre_places_occupees'] or 0
+            type_t = trajet['type_trajet']
+            repartition_type[type_t] = repartition_type.get(type_t, 0) + 1
         
         return {
             'periode': {
@@ -97,9 +130,9 @@ class RapportService:
                 'fin': date_fin
             },
             'statistiques': {
-                'total_trajets': total_trajets,
+                'total_trajets': len(trajets_data),
                 'total_etudiants': total_etudiants,
-                'total_km': total_km,
+                'total_km': 0,
                 'repartition_type': repartition_type
             },
             'trajets': trajets_data
@@ -118,8 +151,7 @@ class RapportService:
         
         # Pannes
         pannes = PanneBusUdM.query.filter(
-            func.date(PanneBusUdM.date_heure) >= date_debut,
-            func.date(PanneBusUdM.date_heure) <= date_fin
+            date_range_filter(PanneBusUdM.date_heure, date_debut, date_fin)
         ).order_by(PanneBusUdM.date_heure.desc()).all()
         
         # Vidanges
@@ -163,25 +195,15 @@ class RapportService:
         }
     
     @staticmethod
-    def export_trajets_csv(trajets_data: List[Dict[str, Any]]) -> Tuple[str, str]:
-        """
-        Exporte les trajets en CSV
-        Utilisable par : ADMIN, SUPERVISEUR, CHARGE
-        """
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # En-têtes
-        headers = [
+    def iter_trajets_csv_rows(trajets_data: Iterable[Dict[str, Any]]) -> Iterator[List[Any]]:
+        """Lignes CSV (en-têtes compris) des trajets, pour export complet ou en flux"""
+        yield [
             COL_DATE_HEURE, 'Point Départ', 'Point Arrivée', 'Type Trajet',
             'Type Passagers', 'Places Occupées', 'Distance (km)',
             COL_BUS_NUMERO, 'Immatriculation', 'Chauffeur'
         ]
-        writer.writerow(headers)
-        
-        # Données
         for trajet in trajets_data:
-            writer.writerow([
+            yield [
                 trajet['date_heure_depart'].strftime('%d/%m/%Y %H:%M') if trajet['date_heure_depart'] else '',
                 trajet['point_depart'] or '',
                 trajet['point_arrivee'] or '',
@@ -192,7 +214,17 @@ class RapportService:
                 trajet['bus_numero'] or '',
                 trajet['bus_immatriculation'] or '',
                 trajet['chauffeur_nom'] or ''
-            ])
+            ]
+
+    @staticmethod
+    def export_trajets_csv(trajets_data: Iterable[Dict[str, Any]]) -> Tuple[str, str]:
+        """
+        Exporte les trajets en CSV
+        Utilisable par : ADMIN, SUPERVISEUR, CHARGE
+        """
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerows(RapportService.iter_trajets_csv_rows(trajets_data))
         
         csv_content = output.getvalue()
         output.close()
@@ -201,24 +233,16 @@ class RapportService:
         return csv_content, filename
     
     @staticmethod
-    def export_maintenance_csv(maintenance_data: Dict[str, Any]) -> Tuple[str, str]:
-        """
-        Exporte les données de maintenance en CSV
-        Utilisable par : ADMIN, SUPERVISEUR, CHARGE, MECANICIEN
-        """
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
+    def iter_maintenance_csv_rows(maintenance_data: Dict[str, Any]) -> Iterator[List[Any]]:
+        """Lignes CSV des sections pannes et vidanges du rapport de maintenance"""
         # Section Pannes
-        writer.writerow(['=== PANNES ==='])
-        headers_pannes = [
+        yield ['=== PANNES ===']
+        yield [
             COL_DATE_HEURE, COL_BUS_NUMERO, 'Immatriculation', 'Description',
             'Criticité', 'Immobilisation', 'Résolue', 'Enregistré par'
         ]
-        writer.writerow(headers_pannes)
-        
         for panne in maintenance_data['pannes']:
-            writer.writerow([
+            yield [
                 panne['date_heure'].strftime('%d/%m/%Y %H:%M') if panne['date_heure'] else '',
                 panne['numero_bus_udm'] or '',
                 panne['immatriculation'] or '',
@@ -227,26 +251,34 @@ class RapportService:
                 'Oui' if panne['immobilisation'] else 'Non',
                 'Oui' if panne['resolue'] else 'Non',
                 panne['enregistre_par'] or ''
-            ])
+            ]
         
-        writer.writerow([])  # Ligne vide
+        yield []  # Ligne vide
         
         # Section Vidanges
-        writer.writerow(['=== VIDANGES ==='])
-        headers_vidanges = [
+        yield ['=== VIDANGES ===']
+        yield [
             'Date', COL_BUS_NUMERO, 'Immatriculation', 'Kilométrage', 'Type Huile', 'Remarque'
         ]
-        writer.writerow(headers_vidanges)
-        
         for vidange in maintenance_data['vidanges']:
-            writer.writerow([
+            yield [
                 vidange['date_vidange'].strftime('%d/%m/%Y') if vidange['date_vidange'] else '',
                 vidange['bus_numero'] or '',
                 vidange['bus_immatriculation'] or '',
                 vidange['kilometrage'] or 0,
                 vidange['type_huile'] or '',
                 vidange['remarque'] or ''
-            ])
+            ]
+
+    @staticmethod
+    def export_maintenance_csv(maintenance_data: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Exporte les données de maintenance en CSV
+        Utilisable par : ADMIN, SUPERVISEUR, CHARGE, MECANICIEN
+        """
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerows(RapportService.iter_maintenance_csv_rows(maintenance_data))
         
         csv_content = output.getvalue()
         output.close()
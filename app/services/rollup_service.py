@@ -0,0 +1,172 @@
+"""
+Service de maintenance et de lecture de la table trajet_daily_rollup
+Les rapports mensuels/annuels lisent quelques centaines de lignes agrégées
+au lieu de charger tous les trajets de la période
+"""
+
+from datetime import date
+from typing import Dict, Any, Optional
+
+from sqlalchemy import func, insert
+
+from app.database import db
+from app.models.trajet import Trajet
+from app.models.trajet_daily_rollup import TrajetDailyRollup
+
+
+# Colonnes formant la clé d'agrégation (cf. uq_trajet_rollup_cle)
+CLE_ROLLUP = (
+    'jour', 'type_trajet', 'type_passagers', 'point_depart',
+    'numero_bus_udm', 'chauffeur_id', 'prestataire_id'
+)
+
+# Compteurs par type de trajet / type de passagers exposés aux rapports
+COMPTEURS_TYPE_TRAJET = {
+    'UDM_INTERNE': 'trajets_udm',
+    'PRESTATAIRE': 'trajets_prestataire',
+    'AUTRE': 'trajets_autres',
+}
+COMPTEURS_TYPE_PASSAGERS = {
+    'ETUDIANT': 'passagers_etudiants',
+    'PERSONNEL': 'passagers_personnel',
+    'MALADE': 'passagers_malades',
+}
+
+
+def _upsert(values: Dict[str, Any], nombre_trajets, nombre_passagers):
+    """INSERT de la ligne d'agrégat ou incrément atomique si la clé existe déjà"""
+    table = TrajetDailyRollup.__table__
+    dialect = db.session.get_bind().dialect.name
+    values = dict(values, nombre_trajets=nombre_trajets, nombre_passagers=nombre_passagers)
+
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table).values(**values)
+        return stmt.on_duplicate_key_update(
+            nombre_trajets=table.c.nombre_trajets + stmt.inserted.nombre_trajets,
+            nombre_passagers=table.c.nombre_passagers + stmt.inserted.nombre_passagers
+        )
+
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as upsert_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert_insert
+    stmt = upsert_insert(table).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c[col] for col in CLE_ROLLUP],
+        set_={
+            'nombre_trajets': table.c.nombre_trajets + stmt.excluded.nombre_trajets,
+            'nombre_passagers': table.c.nombre_passagers + stmt.excluded.nombre_passagers,
+        }
+    )
+
+
+class TrajetRollupService:
+    """Service pour l'agrégat journalier des trajets"""
+
+    @staticmethod
+    def cle_trajet(trajet: Trajet) -> Dict[str, Any]:
+        """Clé d'agrégation d'un trajet (valeurs neutres pour les dimensions absentes)"""
+        return {
+            'jour': trajet.date_heure_depart.date(),
+            'type_trajet': trajet.type_trajet,
+            'type_passagers': trajet.type_passagers or '',
+            'point_depart': trajet.point_depart or '',
+            'numero_bus_udm': trajet.numero_bus_udm or '',
+            'chauffeur_id': trajet.chauffeur_id or 0,
+            'prestataire_id': trajet.prestataire_id or 0,
+        }
+
+    @staticmethod
+    def enregistrer_trajet(trajet: Trajet) -> None:
+        """
+        Répercute un nouveau trajet dans l'agrégat.
+        Exécuté dans la transaction de l'appelant : un rollback annule aussi l'incrément.
+        """
+        if trajet.date_heure_depart is None or not trajet.type_trajet:
+            return
+        stmt = _upsert(
+            TrajetRollupService.cle_trajet(trajet),
+            1,
+            trajet.nombre_places_occupees or 0
+        )
+        db.session.execute(stmt)
+
+    @staticmethod
+    def reconstruire(date_debut: Optional[date] = None, date_fin: Optional[date] = None) -> int:
+        """
+        Reconstruit l'agrégat depuis la table trajet (backfill), sur toute
+        l'historique ou sur la plage [date_debut, date_fin] incluse.
+        Retourne le nombre de lignes d'agrégat écrites. Ne commit pas.
+        """
+        from app.utils.periodes import date_bounds, date_range_filter
+
+        suppression = db.delete(TrajetDailyRollup)
+        if date_debut:
+            suppression = suppression.where(TrajetDailyRollup.jour >= date_debut)
+        if date_fin:
+            suppression = suppression.where(TrajetDailyRollup.jour <= date_fin)
+        db.session.execute(suppression)
+
+        jour = func.date(Trajet.date_heure_depart)
+        dimensions = [
+            jour,
+            Trajet.type_trajet,
+            func.coalesce(Trajet.type_passagers, ''),
+            func.coalesce(Trajet.point_depart, ''),
+            func.coalesce(Trajet.numero_bus_udm, ''),
+            func.coalesce(Trajet.chauffeur_id, 0),
+            func.coalesce(Trajet.prestataire_id, 0),
+        ]
+        selection = db.select(
+            *dimensions,
+            func.count(Trajet.trajet_id),
+            func.coalesce(func.sum(Trajet.nombre_places_occupees), 0)
+        ).group_by(*dimensions)
+        if date_debut:
+            selection = selection.where(date_range_filter(Trajet.date_heure_depart, date_debut, date_fin))
+        elif date_fin:
+            selection = selection.where(Trajet.date_heure_depart < date_bounds(date_fin, date_fin)[1])
+
+        colonnes = list(CLE_ROLLUP) + ['nombre_trajets', 'nombre_passagers']
+        result = db.session.execute(
+            insert(TrajetDailyRollup.__table__).from_select(colonnes, selection)
+        )
+        return result.rowcount or 0
+
+    @staticmethod
+    def get_totaux(date_debut: date, date_fin: Optional[date] = None, **filtres) -> Dict[str, int]:
+        """
+        Totaux trajets/passagers sur [date_debut, date_fin] incluse, ventilés par
+        type de trajet et type de passagers. ``filtres`` restreint sur les autres
+        dimensions de la clé (ex: type_trajet='UDM_INTERNE').
+        """
+        if date_fin is None:
+            date_fin = date_debut
+
+        query = db.session.query(
+            TrajetDailyRollup.type_trajet,
+            TrajetDailyRollup.type_passagers,
+            func.sum(TrajetDailyRollup.nombre_trajets),
+            func.sum(TrajetDailyRollup.nombre_passagers)
+        ).filter(
+            TrajetDailyRollup.jour >= date_debut,
+            TrajetDailyRollup.jour <= date_fin
+        )
+        for colonne, valeur in filtres.items():
+            query = query.filter(getattr(TrajetDailyRollup, colonne) == valeur)
+        rows = query.group_by(TrajetDailyRollup.type_trajet, TrajetDailyRollup.type_passagers).all()
+
+        totaux = {'total_trajets': 0, 'total_passagers': 0}
+        totaux.update({cle: 0 for cle in COMPTEURS_TYPE_TRAJET.values()})
+        totaux.update({cle: 0 for cle in COMPTEURS_TYPE_PASSAGERS.values()})
+        for type_trajet, type_passagers, nombre_trajets, nombre_passagers in rows:
+            nombre_trajets = int(nombre_trajets or 0)
+            nombre_passagers = int(nombre_passagers or 0)
+            totaux['total_trajets'] += nombre_trajets
+            totaux['total_passagers'] += nombre_passagers
+            if type_trajet in COMPTEURS_TYPE_TRAJET:
+                totaux[COMPTEURS_TYPE_TRAJET[type_trajet]] += nombre_trajets
+            if type_passagers in COMPTEURS_TYPE_PASSAGERS:
+                totaux[COMPTEURS_TYPE_PASSAGERS[type_passagers]] += nombre_passagers
+        return totaux
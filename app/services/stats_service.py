@@ -3,7 +3,7 @@ Service de statistiques réutilisable
 Fournit des statistiques pour tous les rôles utilisateur
 """
 
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from typing import Dict, Any, List, Optional
 from sqlalchemy import func, and_
 
@@ -14,6 +14,7 @@ from app.models.chauffeur import Chauffeur
 from app.models.panne_bus_udm import PanneBusUdM
 from app.models.vidange import Vidange
 from app.models.carburation import Carburation
+from app.utils.periodes import date_range_filter, day_filter
 
 
 class StatsService:
@@ -65,17 +66,17 @@ class StatsService:
             
         # Trajets du jour
         trajets_jour = Trajet.query.filter(
-            func.date(Trajet.date_heure_depart) == target_date
+            day_filter(Trajet.date_heure_depart, target_date)
         ).count()
         
         # Trajets par type
         trajets_udm = Trajet.query.filter(
-            func.date(Trajet.date_heure_depart) == target_date,
+            day_filter(Trajet.date_heure_depart, target_date),
             Trajet.type_trajet == 'UDM_INTERNE'
         ).count()
         
         trajets_prestataire = Trajet.query.filter(
-            func.date(Trajet.date_heure_depart) == target_date,
+            day_filter(Trajet.date_heure_depart, target_date),
             Trajet.type_trajet == 'PRESTATAIRE'
         ).count()
         
@@ -83,7 +84,7 @@ class StatsService:
         etudiants_transportes = db.session.query(
             func.sum(Trajet.nombre_places_occupees)
         ).filter(
-            func.date(Trajet.date_heure_depart) == target_date,
+            day_filter(Trajet.date_heure_depart, target_date),
             Trajet.type_passagers == 'ETUDIANT'
         ).scalar() or 0
         
@@ -142,54 +143,8 @@ class StatsService:
         Tendances mensuelles pour les graphiques
         Utilisable par : ADMIN, SUPERVISEUR
         """
-        today = date.today()
-        trends = {
-            'mois': [],
-            'trajets': [],
-            'pannes': [],
-            'etudiants': []
-        }
-        
-        for i in range(months):
-            # Calculer le mois
-            if today.month - i <= 0:
-                mois = today.month - i + 12
-                annee = today.year - 1
-            else:
-                mois = today.month - i
-                annee = today.year
-            
-            debut_mois = date(annee, mois, 1)
-            if mois == 12:
-                fin_mois = date(annee + 1, 1, 1) - timedelta(days=1)
-            else:
-                fin_mois = date(annee, mois + 1, 1) - timedelta(days=1)
-            
-            # Statistiques du mois
-            trajets = Trajet.query.filter(
-                func.date(Trajet.date_heure_depart) >= debut_mois,
-                func.date(Trajet.date_heure_depart) <= fin_mois
-            ).count()
-            
-            pannes = PanneBusUdM.query.filter(
-                func.date(PanneBusUdM.date_heure) >= debut_mois,
-                func.date(PanneBusUdM.date_heure) <= fin_mois
-            ).count()
-            
-            etudiants = db.session.query(
-                func.sum(Trajet.nombre_places_occupees)
-            ).filter(
-                func.date(Trajet.date_heure_depart) >= debut_mois,
-                func.date(Trajet.date_heure_depart) <= fin_mois,
-                Trajet.type_passagers == 'ETUDIANT'
-            ).scalar() or 0
-            
-            trends['mois'].insert(0, f"{mois:02d}/{annee}")
-            trends['trajets'].insert(0, trajets)
-            trends['pannes'].insert(0, pannes)
-            trends['etudiants'].insert(0, etudiants)
-        
-        return trends
+        from app.services.timeseries_service import TimeSeriesService
+        return TimeSeriesService.get_monthly_trends(months)
     
     @staticmethod
     def get_user_specific_stats(user_role: str, user_id: int = None) -> Dict[str, Any]:
@@ -214,7 +169,7 @@ class StatsService:
         # Trajets du chauffeur ce mois
         trajets_mois = Trajet.query.filter(
             Trajet.chauffeur_id == chauffeur_id,
-            func.date(Trajet.date_heure_depart) >= debut_mois
+            date_range_filter(Trajet.date_heure_depart, debut_mois)
         ).count()
         
         # Kilomètres parcourus
@@ -222,7 +177,7 @@ class StatsService:
             func.sum(Trajet.distance_km)
         ).filter(
             Trajet.chauffeur_id == chauffeur_id,
-            func.date(Trajet.date_heure_depart) >= debut_mois
+            date_range_filter(Trajet.date_heure_depart, debut_mois)
         ).scalar() or 0
         
         return {
@@ -230,7 +185,7 @@ class StatsService:
             'km_mois': km_mois,
             'trajets_aujourd_hui': Trajet.query.filter(
                 Trajet.chauffeur_id == chauffeur_id,
-                func.date(Trajet.date_heure_depart) == today
+                day_filter(Trajet.date_heure_depart, today)
             ).count()
         }
     
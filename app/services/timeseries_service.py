@@ -0,0 +1,153 @@
+"""
+Service de séries temporelles pour les graphiques
+Chaque table source est lue en un seul GROUP BY par jour sur la plage demandée ;
+les journées sont ensuite regroupées par semaine ou par mois et les périodes
+sans donnée complétées à 0
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Any, List, Iterable, NamedTuple, Optional
+
+from sqlalchemy import func
+
+from app.database import db
+from app.models.trajet import Trajet
+from app.models.panne_bus_udm import PanneBusUdM
+from app.utils.agregats import sum_case
+from app.utils.periodes import date_range_filter, month_start
+
+
+GRANULARITES = ('jour', 'semaine', 'mois')
+
+# Libellé affiché pour chaque période selon la granularité
+FORMATS_LIBELLE = {
+    'jour': '%d/%m',
+    'semaine': '%d/%m',
+    'mois': '%m/%Y',
+}
+
+
+class Metrique(NamedTuple):
+    source: str
+    build: Any
+
+
+# Table source -> colonne datée sur laquelle borner et regrouper
+SOURCES = {
+    'trajet': Trajet.date_heure_depart,
+    'panne': PanneBusUdM.date_heure,
+}
+
+# Métriques disponibles : nom -> (table source, agrégat SQL)
+METRIQUES = {
+    'trajets': Metrique('trajet', lambda: func.count(Trajet.trajet_id)),
+    'trajets_udm': Metrique('trajet', lambda: sum_case(Trajet.type_trajet == 'UDM_INTERNE')),
+    'trajets_prestataire': Metrique('trajet', lambda: sum_case(Trajet.type_trajet == 'PRESTATAIRE')),
+    'trajets_autres': Metrique('trajet', lambda: sum_case(Trajet.type_trajet == 'AUTRE')),
+    'passagers': Metrique('trajet', lambda: func.coalesce(func.sum(Trajet.nombre_places_occupees), 0)),
+    'etudiants': Metrique('trajet', lambda: sum_case(
+        Trajet.type_passagers == 'ETUDIANT', func.coalesce(Trajet.nombre_places_occupees, 0))),
+    'personnel': Metrique('trajet', lambda: sum_case(
+        Trajet.type_passagers == 'PERSONNEL', func.coalesce(Trajet.nombre_places_occupees, 0))),
+    'malades': Metrique('trajet', lambda: sum_case(
+        Trajet.type_passagers == 'MALADE', func.coalesce(Trajet.nombre_places_occupees, 0))),
+    'pannes': Metrique('panne', lambda: func.count(PanneBusUdM.id)),
+    'pannes_critiques': Metrique('panne', lambda: sum_case(PanneBusUdM.criticite == 'HAUTE')),
+}
+
+
+def debut_periode(jour: date, granularite: str) -> date:
+    """Premier jour de la période (jour, semaine ISO ou mois) contenant ``jour``"""
+    if granularite == 'semaine':
+        return jour - timedelta(days=jour.weekday())
+    if granularite == 'mois':
+        return jour.replace(day=1)
+    return jour
+
+
+def periodes(start_date: date, end_date: date, granularite: str) -> List[date]:
+    """Débuts des périodes couvrant [start_date, end_date], dans l'ordre"""
+    courant = debut_periode(start_date, granularite)
+    resultat = []
+    while courant <= end_date:
+        resultat.append(courant)
+        if granularite == 'mois':
+            courant = month_start(courant, 1)
+        elif granularite == 'semaine':
+            courant += timedelta(days=7)
+        else:
+            courant += timedelta(days=1)
+    return resultat
+
+
+def _as_date(value) -> date:
+    # func.date() renvoie une chaîne ISO sous SQLite, une date sous MySQL
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class TimeSeriesService:
+    """Service pour les séries temporelles des graphiques"""
+
+    @staticmethod
+    def get_series(metriques: Iterable[str], start_date: date, end_date: date,
+                   granularite: str = 'jour') -> Dict[str, Any]:
+        """
+        Séries ``metriques`` sur [start_date, end_date] inclus, par ``granularite``.
+
+        Retourne ``{'periodes': [date, ...], 'labels': [...], 'series': {metrique: [...]}}``
+        avec une valeur (0 par défaut) par période. Lève ValueError pour une
+        granularité ou une métrique inconnue.
+        """
+        metriques = list(metriques)
+        if granularite not in GRANULARITES:
+            raise ValueError(f"Granularité inconnue : {granularite}")
+        inconnues = [m for m in metriques if m not in METRIQUES]
+        if inconnues:
+            raise ValueError(f"Métrique(s) inconnue(s) : {', '.join(inconnues)}")
+        if start_date > end_date:
+            raise ValueError("La date de début doit précéder la date de fin")
+
+        debuts = periodes(start_date, end_date, granularite)
+        series = {metrique: dict.fromkeys(debuts, 0) for metrique in metriques}
+
+        # Une requête GROUP BY jour par table source
+        par_source: Dict[str, List[str]] = {}
+        for metrique in metriques:
+            par_source.setdefault(METRIQUES[metrique].source, []).append(metrique)
+
+        for nom_source, noms in par_source.items():
+            colonne = SOURCES[nom_source]
+            jour = func.date(colonne)
+            rows = db.session.query(
+                jour, *[METRIQUES[nom].build() for nom in noms]
+            ).filter(
+                date_range_filter(colonne, start_date, end_date)
+            ).group_by(jour).all()
+
+            for row in rows:
+                periode = debut_periode(_as_date(row[0]), granularite)
+                for nom, valeur in zip(noms, row[1:]):
+                    series[nom][periode] += int(valeur or 0)
+
+        return {
+            'periodes': debuts,
+            'labels': [d.strftime(FORMATS_LIBELLE[granularite]) for d in debuts],
+            'series': {metrique: list(valeurs.values()) for metrique, valeurs in series.items()},
+        }
+
+    @staticmethod
+    def get_monthly_trends(months: int = 6, today: Optional[date] = None) -> Dict[str, List]:
+        """Tendances des ``months`` derniers mois (trajets, pannes, étudiants transportés)"""
+        if today is None:
+            today = date.today()
+        resultat = TimeSeriesService.get_series(
+            ['trajets', 'pannes', 'etudiants'], month_start(today, -(months - 1)), today, 'mois'
+        )
+        return {
+            'mois': resultat['labels'],
+            'trajets': resultat['series']['trajets'],
+            'pannes': resultat['series']['pannes'],
+            'etudiants': resultat['series']['etudiants'],
+        }
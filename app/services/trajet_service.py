@@ -17,6 +17,7 @@ from app.models.trajet import Trajet
 from app.models.bus_udm import BusUdM
 from app.models.prestataire import Prestataire
 from app.models.chargetransport import Chargetransport
+from app.services.rollup_service import TrajetRollupService
 
 
 
@@ -133,6 +134,7 @@ def enregistrer_depart_aed(form, user) -> Tuple[bool, str]:
             enregistre_par=user.utilisateur_id,
         )
         db.session.add(trajet)
+        TrajetRollupService.enregistrer_trajet(trajet)
 
         # Mettre à jour le kilométrage du véhicule Bus UdM sélectionné s'il est fourni dans le form
         if hasattr(form, 'kilometrage_actuel') and form.kilometrage_actuel.data is not None:
@@ -184,6 +186,7 @@ def enregistrer_depart_sortie_hors_ville(form, user) -> Tuple[bool, str]:
             motif=form.motif_trajet.data,
         )
         db.session.add(trajet)
+        TrajetRollupService.enregistrer_trajet(trajet)
 
         # Mettre à jour le kilométrage du véhicule Bus UdM
         if hasattr(form, 'kilometrage_actuel') and form.kilometrage_actuel.data is not None:
@@ -272,6 +275,7 @@ def enregistrer_depart_prestataire(data, user) -> Tuple[bool, str]:
         print(f"DEBUG - Avant db.session.add")
         
         db.session.add(trajet)
+        TrajetRollupService.enregistrer_trajet(trajet)
         
         print(f"DEBUG - Avant db.session.commit")
         db.session.commit()
@@ -311,6 +315,7 @@ def enregistrer_depart_banekane_retour(form, user) -> Tuple[bool, str]:
                 enregistre_par=user.utilisateur_id,
             )
             db.session.add(trajet)
+            TrajetRollupService.enregistrer_trajet(trajet)
             # MAJ kilométrage si fourni
             if hasattr(form, 'kilometrage_actuel') and form.kilometrage_actuel.data is not None:
                 bus_udm = BusUdM.query.filter_by(numero=form.numero_aed.data).first()
@@ -361,6 +366,7 @@ def enregistrer_depart_banekane_retour(form, user) -> Tuple[bool, str]:
                 enregistre_par=user.utilisateur_id,
             )
             db.session.add(trajet)
+            TrajetRollupService.enregistrer_trajet(trajet)
             db.session.commit()
             return True, 'Départ de Banekane (retour) enregistré !'
     except Exception as e:
@@ -399,6 +405,7 @@ def enregistrer_trajet_interne_bus_udm(form, user) -> Tuple[bool, str]:
             enregistre_par=user.utilisateur_id,
         )
         db.session.add(trajet)
+        TrajetRollupService.enregistrer_trajet(trajet)
 
         # Mettre à jour le kilométrage du véhicule Bus UdM
         if hasattr(form, 'kilometrage_actuel') and form.kilometrage_actuel.data is not None:
@@ -462,6 +469,7 @@ def enregistrer_trajet_prestataire_modernise(form, user) -> Tuple[bool, str]:
         print(f"DEBUG MODERNISE - Avant db.session.add")
         
         db.session.add(trajet)
+        TrajetRollupService.enregistrer_trajet(trajet)
         
         print(f"DEBUG MODERNISE - Avant db.session.commit")
         db.session.commit()
@@ -505,6 +513,7 @@ def enregistrer_autres_trajets(form, user) -> Tuple[bool, str]:
             motif=form.motif_trajet.data,
         )
         db.session.add(trajet)
+        TrajetRollupService.enregistrer_trajet(trajet)
 
         # Mettre à jour le kilométrage du véhicule Bus UdM
         if hasattr(form, 'kilometrage_actuel') and form.kilometrage_actuel.data is not None:
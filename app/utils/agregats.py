@@ -0,0 +1,7 @@
+"""Expressions d'agrégat SQL partagées par les services de statistiques"""
+from sqlalchemy import case, func
+
+
+def sum_case(condition, value=1):
+    """SUM(CASE WHEN condition THEN value ELSE 0 END), 0 sur un ensemble vide"""
+    return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
@@ -0,0 +1,209 @@
+"""
+Client de l'annuaire Active Directory (ldap3) pour l'authentification.
+- Pool de connexions liées au compte de service (LDAP_SERVICE_USER) pour la
+  recherche du compte et de ses groupes
+- Pool de connexions réutilisées par rebind pour vérifier le mot de passe :
+  pas de nouvelle session TCP/TLS à chaque connexion d'utilisateur
+- Entrée (DN, groupes) de chaque utilisateur en cache LDAP_CACHE_TTL secondes :
+  pendant un pic de connexions, seul le bind de l'utilisateur atteint l'annuaire
+- Annuaire injoignable, délai LDAP_TIMEOUT dépassé ou pool saturé : AnnuaireIndisponible,
+  l'appelant se replie sur l'authentification MySQL
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple
+
+from flask import current_app
+from ldap3 import SUBTREE, SYNC, Connection, Server
+from ldap3.core.exceptions import LDAPCommunicationError, LDAPException, LDAPResponseTimeoutError
+from ldap3.utils.conv import escape_filter_chars
+
+
+class AnnuaireIndisponible(Exception):
+    """Annuaire LDAP injoignable, trop lent ou saturé"""
+
+
+def _nom_groupe(dn: str) -> str:
+    """'CN=Chauffeurs,OU=Groupes,DC=...' -> 'Chauffeurs'"""
+    premier = dn.split(',', 1)[0]
+    return premier.split('=', 1)[1] if '=' in premier else premier
+
+
+class _PoolConnexions:
+    """Connexions LDAP réutilisables, au plus `taille` ouvertes simultanément"""
+
+    def __init__(self, fabrique: Callable[[], Connection], taille: int, attente: float):
+        self._fabrique = fabrique
+        self.taille = taille
+        self.attente = attente
+        self._libres: List[Connection] = []
+        self._ouvertes = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def connexion(self):
+        """(connexion, réutilisée) ; une connexion en erreur est fermée, pas rendue"""
+        conn, reutilisee = self._prendre()
+        try:
+            yield conn, reutilisee
+        except BaseException:
+            self._jeter(conn)
+            raise
+        else:
+            with self._condition:
+                self._libres.append(conn)
+                self._condition.notify()
+
+    def _prendre(self) -> Tuple[Connection, bool]:
+        fin = time.monotonic() + self.attente
+        with self._condition:
+            while True:
+                if self._libres:
+                    return self._libres.pop(), True
+                if self._ouvertes < self.taille:
+                    self._ouvertes += 1
+                    break
+                restant = fin - time.monotonic()
+                if restant <= 0 or not self._condition.wait(restant):
+                    raise AnnuaireIndisponible('Pool LDAP saturé')
+        try:
+            return self._fabrique(), False
+        except BaseException:
+            with self._condition:
+                self._ouvertes -= 1
+                self._condition.notify()
+            raise
+
+    def _jeter(self, conn: Connection) -> None:
+        try:
+            conn.unbind()
+        except Exception:
+            pass
+        with self._condition:
+            self._ouvertes -= 1
+            self._condition.notify()
+
+    def fermer(self) -> None:
+        with self._condition:
+            libres, self._libres = self._libres, []
+        for conn in libres:
+            self._jeter(conn)
+
+
+class AnnuaireLDAP:
+    """Authentification et groupes AD, connexions mutualisées entre les requêtes"""
+
+    def __init__(self, config, serveur: Optional[Server] = None, strategie=SYNC):
+        self.base_dn = config.get('LDAP_BASE_DN', '')
+        self.timeout = config.get('LDAP_TIMEOUT', 5)
+        self.cache_ttl = config.get('LDAP_CACHE_TTL', 300)
+        self.service_user = config.get('LDAP_SERVICE_USER') or ''
+        self.service_password = config.get('LDAP_SERVICE_PASSWORD') or ''
+        domaine = config.get('LDAP_DOMAIN')
+        if self.service_user and domaine and '=' not in self.service_user and '@' not in self.service_user:
+            self.service_user = f'{self.service_user}@{domaine}'
+        url = config.get('LDAP_SERVER', '')
+        if serveur is None and url:
+            serveur = Server(url, connect_timeout=self.timeout)
+        self.serveur = serveur
+        self.strategie = strategie
+
+        taille = config.get('LDAP_POOL_TAILLE', 5)
+        self._service = _PoolConnexions(self._connexion_service, taille, self.timeout)
+        self._verification = _PoolConnexions(self._connexion_verification, taille, self.timeout)
+        self._cache = {}  # login -> (expiration, dn | None, groupes)
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.serveur is not None and self.base_dn and self.service_user)
+
+    def _connexion_service(self) -> Connection:
+        conn = Connection(self.serveur, user=self.service_user, password=self.service_password,
+                          client_strategy=self.strategie, receive_timeout=self.timeout)
+        if not conn.bind():
+            raise AnnuaireIndisponible(f"Bind du compte de service refusé: {conn.result.get('description')}")
+        return conn
+
+    def _connexion_verification(self) -> Connection:
+        conn = Connection(self.serveur, client_strategy=self.strategie, receive_timeout=self.timeout)
+        conn.open()
+        return conn
+
+    def _executer(self, pool: _PoolConnexions, operation: Callable[[Connection], object]):
+        """Exécute l'opération ; une connexion réutilisée coupée par le serveur est remplacée une fois"""
+        while True:
+            reutilisee = False
+            try:
+                with pool.connexion() as (conn, reutilisee):
+                    return operation(conn)
+            except LDAPResponseTimeoutError as e:
+                raise AnnuaireIndisponible(f'Délai LDAP dépassé: {e}') from e
+            except LDAPCommunicationError as e:
+                if not reutilisee:
+                    raise AnnuaireIndisponible(f'Annuaire LDAP injoignable: {e}') from e
+            except LDAPException as e:
+                raise AnnuaireIndisponible(f'Erreur LDAP: {e}') from e
+
+    def rechercher(self, login: str) -> Tuple[Optional[str], List[str]]:
+        """(DN, groupes) du compte ; (None, []) s'il n'existe pas dans l'annuaire"""
+        cle = login.lower()
+        maintenant = time.monotonic()
+        with self._lock:
+            entree = self._cache.get(cle)
+            if entree is not None and entree[0] > maintenant:
+                return entree[1], entree[2]
+
+        def chercher(conn: Connection):
+            conn.search(self.base_dn, f'(sAMAccountName={escape_filter_chars(login)})',
+                        SUBTREE, attributes=['memberOf'], size_limit=1)
+            if not conn.response:
+                return None, []
+            reponse = conn.response[0]
+            groupes = reponse.get('attributes', {}).get('memberOf') or []
+            if isinstance(groupes, str):
+                groupes = [groupes]
+            return reponse['dn'], [_nom_groupe(g) for g in groupes]
+
+        dn, groupes = self._executer(self._service, chercher)
+        with self._lock:
+            self._cache[cle] = (maintenant + self.cache_ttl, dn, groupes)
+        return dn, groupes
+
+    def authentifier(self, login: str, mot_de_passe: str) -> Optional[Tuple[bool, List[str], Optional[str]]]:
+        """
+        Même contrat que authenticate_mysql : (succès, groupes, erreur).
+        None si le compte n'existe pas dans l'annuaire (compte local).
+        """
+        dn, groupes = self.rechercher(login)
+        if dn is None:
+            return None
+        if not mot_de_passe:
+            # Un bind simple sans mot de passe est un bind anonyme accepté par AD
+            return False, [], 'Mot de passe vide'
+        if self._executer(self._verification, lambda conn: conn.rebind(dn, mot_de_passe)):
+            return True, groupes, None
+        return False, [], 'Identifiants LDAP invalides'
+
+    def invalider(self, login: Optional[str] = None) -> None:
+        """Oublie les groupes en cache (tous si login est None)"""
+        with self._lock:
+            if login is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(login.lower(), None)
+
+    def fermer(self) -> None:
+        self._service.fermer()
+        self._verification.fermer()
+
+
+def get_annuaire() -> AnnuaireLDAP:
+    """Client LDAP de l'application courante (créé à la première connexion)"""
+    app = current_app._get_current_object()
+    annuaire = app.extensions.get('annuaire_ldap')
+    if annuaire is None:
+        annuaire = app.extensions.setdefault('annuaire_ldap', AnnuaireLDAP(app.config))
+    return annuaire
@@ -0,0 +1,164 @@
+"""
+Fichiers d'audit par rôle (logs/audit/audit_<role>.log), extension Flask
+- Aucun effet à l'import : rien n'est créé avant la première entrée d'audit
+- Le thread de requête ne fait que déposer l'enregistrement dans une file
+  (QueueHandler) ; un QueueListener écrit les fichiers en arrière-plan
+- Dossier, fichiers et sauvegarde de l'ancien logs/audit.log sont créés par
+  le listener, fichier par fichier, au premier enregistrement de chaque rôle
+- Le listener est redémarré dans un processus forké (workers gunicorn) et
+  vidé à l'arrêt du processus
+- Dossier : AUDIT_LOG_DIR de l'application, à défaut logs/audit sous app.root_path
+  (jamais relatif au répertoire courant)
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import weakref
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from flask import current_app
+
+
+AUDIT_LOG_DIR = 'logs/audit'
+
+AUDIT_ROLES = ['ADMIN', 'RESPONSABLE', 'SUPERVISEUR', 'CHARGE', 'CHAUFFEUR', 'MECANICIEN']
+
+FORMAT_AUDIT = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+# Extensions fermées à l'arrêt du processus (un seul hook atexit, références faibles)
+_OUVERTS: 'weakref.WeakSet[JournauxAudit]' = weakref.WeakSet()
+
+
+@atexit.register
+def _fermer_journaux() -> None:
+    for journaux in list(_OUVERTS):
+        journaux.fermer()
+
+
+def nom_logger(role: str) -> str:
+    return f'audit_{role.lower()}'
+
+
+def cleanup_old_audit_system(dossier_logs: str = 'logs') -> bool:
+    """Renomme l'ancien fichier logs/audit.log (antérieur aux fichiers par rôle)"""
+    try:
+        old_audit_file = os.path.join(dossier_logs, 'audit.log')
+        if os.path.exists(old_audit_file):
+            # Créer une sauvegarde avant suppression
+            backup_file = os.path.join(dossier_logs, f'audit_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
+            os.rename(old_audit_file, backup_file)
+            logging.info(f"Ancien fichier audit.log sauvegardé vers {backup_file}")
+        return True
+    except Exception as e:
+        logging.error(f"Erreur lors du nettoyage de l'ancien système d'audit: {str(e)}")
+        return False
+
+
+class _FichiersParRole(logging.Handler):
+    """Handler du listener : aiguille chaque enregistrement vers le fichier de son rôle"""
+
+    def __init__(self, dossier: str):
+        super().__init__()
+        self.dossier = dossier
+        self._fichiers: Dict[str, logging.FileHandler] = {}
+
+    def _fichier(self, nom: str) -> logging.FileHandler:
+        fichier = self._fichiers.get(nom)
+        if fichier is None:
+            if not self._fichiers:
+                os.makedirs(self.dossier, exist_ok=True)
+                cleanup_old_audit_system(os.path.dirname(self.dossier) or '.')
+            fichier = logging.FileHandler(os.path.join(self.dossier, f'{nom}.log'), encoding='utf-8')
+            fichier.setFormatter(FORMAT_AUDIT)
+            self._fichiers[nom] = fichier
+        return fichier
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._fichier(record.name).handle(record)
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        for fichier in self._fichiers.values():
+            fichier.close()
+        self._fichiers.clear()
+        super().close()
+
+
+class JournauxAudit:
+    """Loggers d'audit par rôle, écrits hors du thread de requête"""
+
+    def __init__(self, app=None):
+        self.dossier = AUDIT_LOG_DIR
+        self._lock = threading.Lock()
+        self._listener: Optional[QueueListener] = None
+        self._pid: Optional[int] = None
+        self._loggers: Dict[str, logging.Logger] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        self.dossier = app.config.get('AUDIT_LOG_DIR') or os.path.join(app.root_path, AUDIT_LOG_DIR)
+        app.extensions['journaux_audit'] = self
+
+    def _demarrer(self) -> None:
+        """File + listener, créés à la première entrée (et après un fork)"""
+        file = queue.SimpleQueue()
+        listener = QueueListener(file, _FichiersParRole(self.dossier))
+        listener.start()
+        loggers = {}
+        for role in AUDIT_ROLES:
+            logger = logging.getLogger(nom_logger(role))
+            logger.setLevel(logging.INFO)
+            # Empêcher la propagation vers le logger racine
+            logger.propagate = False
+            for ancien in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+                logger.removeHandler(ancien)
+            logger.addHandler(QueueHandler(file))
+            loggers[role] = logger
+        _OUVERTS.add(self)
+        self._listener, self._pid, self._loggers = listener, os.getpid(), loggers
+
+    def journal(self, role: str) -> Optional[logging.Logger]:
+        """Logger du rôle (None pour un rôle inconnu)"""
+        if role not in AUDIT_ROLES:
+            return None
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._demarrer()
+        return self._loggers[role]
+
+    def fermer(self) -> None:
+        """Écrit les entrées en file et ferme les fichiers"""
+        with self._lock:
+            listener, self._listener = self._listener, None
+            self._pid = None
+            if listener is None:
+                return
+            for logger in self._loggers.values():
+                for handler in [h for h in logger.handlers
+                                if isinstance(h, QueueHandler) and h.queue is listener.queue]:
+                    logger.removeHandler(handler)
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+
+def init_journaux_audit(app) -> JournauxAudit:
+    """Attache l'extension à l'application (appelé par create_app) ; aucun fichier ouvert"""
+    journaux = app.extensions.get('journaux_audit')
+    if journaux is None:
+        journaux = JournauxAudit(app)
+    return journaux
+
+
+def get_journaux_audit() -> JournauxAudit:
+    """Extension d'audit fichier de l'application courante"""
+    return init_journaux_audit(current_app._get_current_object())
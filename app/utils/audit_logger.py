@@ -1,23 +1,28 @@
 """
 Système d'audit intelligent pour tracer les actions critiques des utilisateurs
 - Filtre les actions importantes uniquement
-- Logs séparés par rôle (6 fichiers distincts)
+- Journal structuré en base (table audit_log, écriture par lots) pour les consultations
+- Logs séparés par rôle (6 fichiers distincts), conservés en copie, écrits en
+  arrière-plan par l'extension app/utils/audit_fichiers.py (rien n'est ouvert à l'import)
 - Actions critiques : Auth, CRUD, Admin, Erreurs, Config
 """
 
 import logging
-import os
-from datetime import datetime
+import math
+from datetime import datetime, timedelta
 from flask import session, request
 from functools import wraps
 from enum import Enum
+from sqlalchemy import func
 
+from app.database import db
+from app.models.audit_log import AuditLog
+from app.utils.audit_fichiers import AUDIT_ROLES, get_journaux_audit
+from app.utils.audit_store import get_audit_store
 
 
 ACTION_PREFIX = 'ACTION:'
 
-AUDIT_LOG_DIR = 'logs/audit'
-
 class AuditActionType(Enum):
     """Types d'actions critiques à auditer"""
     # Authentification
@@ -56,51 +61,6 @@ class AuditLevel(Enum):
     HIGH = "HIGH"         # Actions critiques (Admin, Auth)
     CRITICAL = "CRITICAL" # Erreurs système, violations sécurité
 
-# Configuration des loggers par rôle
-ROLE_LOGGERS = {}
-
-def setup_role_audit_loggers():
-    """Configure un logger séparé pour chaque rôle"""
-
-    # Créer le dossier logs s'il n'existe pas
-    logs_dir = AUDIT_LOG_DIR
-    if not os.path.exists(logs_dir):
-        os.makedirs(logs_dir)
-
-    # Les 6 rôles de l'application
-    roles = ['ADMIN', 'RESPONSABLE', 'SUPERVISEUR', 'CHARGE', 'CHAUFFEUR', 'MECANICIEN']
-
-    for role in roles:
-        logger_name = f'audit_{role.lower()}'
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(logging.INFO)
-
-        # Éviter la duplication des handlers
-        if not logger.handlers:
-            # Handler pour fichier spécifique au rôle
-            handler = logging.FileHandler(
-                os.path.join(logs_dir, f'audit_{role.lower()}.log'),
-                encoding='utf-8'
-            )
-
-            # Format détaillé pour l'audit
-            formatter = logging.Formatter(
-                '%(asctime)s | %(levelname)s | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
-
-            # Empêcher la propagation vers le logger racine
-            logger.propagate = False
-
-        ROLE_LOGGERS[role] = logger
-
-    return ROLE_LOGGERS
-
-# Initialiser les loggers par rôle
-setup_role_audit_loggers()
-
 def is_critical_action(action_type):
     """Détermine si une action doit être auditée"""
     critical_actions = {
@@ -208,11 +168,27 @@ def log_critical_action(action_type, resource_type=None, resource_id=None, detai
         # Déterminer le niveau de criticité
         level = get_action_level(action_type)
 
+        action = action_type.value if hasattr(action_type, 'value') else action_type
+
+        # Journal structuré (inséré par lots)
+        get_audit_store().ajouter({
+            'utilisateur': user_id,
+            'role': user_role,
+            'action': action,
+            'niveau': level.value,
+            'succes': bool(success),
+            'ip': ip_address,
+            'ressource': resource_type,
+            'ressource_id': resource_id,
+            'details': details,
+            'erreur': error_message,
+        })
+
         # Construire le message de log structuré
         log_parts = [
             f"USER:{user_id}",
             f"ROLE:{user_role}",
-            f"ACTION:{action_type.value if hasattr(action_type, 'value') else action_type}",
+            f"ACTION:{action}",
             f"LEVEL:{level.value}",
             f"SUCCESS:{success}",
             f"IP:{ip_address}"
@@ -229,8 +205,8 @@ def log_critical_action(action_type, resource_type=None, resource_id=None, detai
 
         log_message = " | ".join(log_parts)
 
-        # Logger dans le fichier spécifique au rôle
-        role_logger = ROLE_LOGGERS.get(user_role)
+        # Logger dans le fichier spécifique au rôle (écrit par le listener, hors requête)
+        role_logger = get_journaux_audit().journal(user_role)
         if role_logger:
             if level == AuditLevel.CRITICAL:
                 role_logger.error(log_message)
@@ -282,24 +258,6 @@ def log_user_action(action_type, action_name, details=None):
         details=f"Function: {action_name} | {details}" if details else f"Function: {action_name}"
     )
 
-# Fonction pour nettoyer l'ancien système
-def cleanup_old_audit_system():
-    """Supprime l'ancien fichier audit.log s'il existe"""
-    try:
-        old_audit_file = os.path.join('logs', 'audit.log')
-        if os.path.exists(old_audit_file):
-            # Créer une sauvegarde avant suppression
-            backup_file = os.path.join('logs', f'audit_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-            os.rename(old_audit_file, backup_file)
-            logging.info(f"Ancien fichier audit.log sauvegardé vers {backup_file}")
-        return True
-    except Exception as e:
-        logging.error(f"Erreur lors du nettoyage de l'ancien système d'audit: {str(e)}")
-        return False
-
-# Nettoyer automatiquement au démarrage
-cleanup_old_audit_system()
-
 def audit_action(action_type, resource_type=None, track_errors=True):
     """
     Décorateur intelligent pour logger automatiquement les actions critiques
@@ -393,69 +351,75 @@ def smart_audit(resource_type):
         return wrapper
     return decorator
 
-def get_audit_logs(limit=100, role_filter=None, action_filter=None, level_filter=None):
+def _audit_query(role_filter=None, action_filter=None, level_filter=None, user_filter=None,
+                 date_debut=None, date_fin=None):
+    """Requête filtrée sur audit_log (chaque filtre correspond à un index (colonne, horodatage))"""
+    # Les lectures voient les actions encore dans le tampon d'écriture
+    get_audit_store().flush()
+
+    query = AuditLog.query
+    if role_filter:
+        query = query.filter(AuditLog.role == role_filter)
+    if action_filter:
+        query = query.filter(AuditLog.action == action_filter)
+    if level_filter:
+        query = query.filter(AuditLog.niveau == level_filter)
+    if user_filter:
+        query = query.filter(AuditLog.utilisateur == str(user_filter))
+    if date_debut:
+        query = query.filter(AuditLog.horodatage >= date_debut)
+    if date_fin:
+        query = query.filter(AuditLog.horodatage < date_fin)
+    return query.order_by(AuditLog.horodatage.desc(), AuditLog.id.desc())
+
+def get_audit_logs(limit=100, role_filter=None, action_filter=None, level_filter=None, offset=0):
     """
-    Récupère les logs d'audit depuis les fichiers séparés par rôle
+    Récupère les logs d'audit depuis le journal structuré
 
     Args:
         limit: Nombre maximum de logs à retourner
         role_filter: Filtrer par rôle (ADMIN, RESPONSABLE, etc.)
         action_filter: Filtrer par type d'action
         level_filter: Filtrer par niveau (LOW, MEDIUM, HIGH, CRITICAL)
+        offset: Nombre de logs à sauter (pagination)
 
     Returns:
-        Liste des logs d'audit triés par date (plus récent en premier)
+        Liste des logs d'audit (format ligne) triés par date (plus récent en premier)
     """
     try:
-        logs_dir = AUDIT_LOG_DIR
-        if not os.path.exists(logs_dir):
-            return []
-
-        all_logs = []
-        roles_to_check = [role_filter] if role_filter else ['ADMIN', 'RESPONSABLE', 'SUPERVISEUR', 'CHARGE', 'CHAUFFEUR', 'MECANICIEN']
-
-        for role in roles_to_check:
-            log_file = os.path.join(logs_dir, f'audit_{role.lower()}.log')
-            if not os.path.exists(log_file):
-                continue
+        query = _audit_query(role_filter, action_filter, level_filter)
+        return [entry.to_line() for entry in query.offset(offset).limit(limit)]
 
-            try:
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    # Appliquer les filtres
-                    if action_filter and f"ACTION:{action_filter}" not in line:
-                        continue
-                    if level_filter and f"LEVEL:{level_filter}" not in line:
-                        continue
-
-                    # Extraire la date pour le tri
-                    try:
-                        date_part = line.split(' | ')[0]
-                        log_datetime = datetime.strptime(date_part, '%Y-%m-%d %H:%M:%S')
-                        all_logs.append((log_datetime, line))
-                    except (ValueError, IndexError):
-                        # Si parsing de date échoue, ajouter quand même
-                        all_logs.append((datetime.min, line))
+    except Exception as e:
+        logging.error(f"Erreur lors de la lecture des logs d'audit: {str(e)}")
+        return []
 
-            except Exception as e:
-                logging.error(f"Erreur lecture fichier {log_file}: {str(e)}")
-                continue
+def search_audit_logs(page=1, per_page=50, role_filter=None, action_filter=None, level_filter=None,
+                      user_filter=None, date_debut=None, date_fin=None):
+    """
+    Recherche paginée dans le journal d'audit
 
-        # Trier par date (plus récent en premier) et limiter
-        all_logs.sort(key=lambda x: x[0], reverse=True)
-        return [log[1] for log in all_logs[:limit]]
+    Returns:
+        {'items': [dict], 'total', 'page', 'pages'}
+    """
+    page = max(int(page or 1), 1)
+    per_page = max(int(per_page or 50), 1)
+    try:
+        query = _audit_query(role_filter, action_filter, level_filter, user_filter, date_debut, date_fin)
+        total = query.order_by(None).count()
+        items = query.offset((page - 1) * per_page).limit(per_page).all()
+        return {
+            'items': [entry.to_dict() for entry in items],
+            'total': total,
+            'page': page,
+            'pages': math.ceil(total / per_page) if total else 0,
+        }
 
     except Exception as e:
-        logging.error(f"Erreur lors de la lecture des logs d'audit: {str(e)}")
-        return []
+        logging.error(f"Erreur lors de la recherche dans les logs d'audit: {str(e)}")
+        return {'items': [], 'total': 0, 'page': page, 'pages': 0}
 
-def get_role_audit_logs(role, limit=50, action_filter=None, level_filter=None):
+def get_role_audit_logs(role, limit=50, action_filter=None, level_filter=None, offset=0):
     """
     Récupère les logs d'audit pour un rôle spécifique
 
@@ -464,109 +428,71 @@ def get_role_audit_logs(role, limit=50, action_filter=None, level_filter=None):
         limit: Nombre maximum de logs
         action_filter: Filtrer par type d'action
         level_filter: Filtrer par niveau
+        offset: Nombre de logs à sauter (pagination)
 
     Returns:
         Liste des logs pour ce rôle
     """
-    try:
-        logs_dir = AUDIT_LOG_DIR
-        log_file = os.path.join(logs_dir, f'audit_{role.lower()}.log')
-
-        if not os.path.exists(log_file):
-            return []
-
-        logs = []
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        # Prendre les dernières lignes (plus récentes)
-        recent_lines = lines[-limit*2:] if len(lines) > limit*2 else lines
-
-        for line in reversed(recent_lines):  # Plus récent en premier
-            line = line.strip()
-            if not line:
-                continue
-
-            # Appliquer les filtres
-            if action_filter and f"ACTION:{action_filter}" not in line:
-                continue
-            if level_filter and f"LEVEL:{level_filter}" not in line:
-                continue
-
-            logs.append(line)
+    return get_audit_logs(limit=limit, role_filter=role, action_filter=action_filter,
+                          level_filter=level_filter, offset=offset)
 
-            if len(logs) >= limit:
-                break
-
-        return logs
-
-    except Exception as e:
-        logging.error(f"Erreur lors de la lecture des logs pour {role}: {str(e)}")
-        return []
-
-def get_role_statistics():
+def get_role_statistics(days=30):
     """
     Génère des statistiques détaillées sur les actions par rôle
 
+    Args:
+        days: Période analysée (jours glissants)
+
     Returns:
         Dictionnaire avec les statistiques par rôle incluant les niveaux de criticité
     """
     try:
-        stats = {}
-        roles = ['ADMIN', 'RESPONSABLE', 'SUPERVISEUR', 'CHARGE', 'CHAUFFEUR', 'MECANICIEN']
-
-        for role in roles:
-            logs = get_role_audit_logs(role, limit=500)  # Analyser les 500 dernières actions par rôle
+        get_audit_store().flush()
+        depuis = datetime.now() - timedelta(days=days)
 
-            role_stats = {
-                'total': len(logs),
+        stats = {
+            role: {
+                'total': 0,
                 'actions': {},
                 'levels': {'LOW': 0, 'MEDIUM': 0, 'HIGH': 0, 'CRITICAL': 0},
                 'success_rate': 0,
                 'recent_activity': []
             }
-
-            successful_actions = 0
-
-            for log in logs:
-                try:
-                    # Extraire l'action
-                    if ACTION_PREFIX in log:
-                        action_part = log.split(ACTION_PREFIX)[1].split('|')[0].strip()
-                        if action_part not in role_stats['actions']:
-                            role_stats['actions'][action_part] = 0
-                        role_stats['actions'][action_part] += 1
-
-                    # Extraire le niveau
-                    if 'LEVEL:' in log:
-                        level_part = log.split('LEVEL:')[1].split('|')[0].strip()
-                        if level_part in role_stats['levels']:
-                            role_stats['levels'][level_part] += 1
-
-                    # Extraire le succès
-                    if 'SUCCESS:True' in log:
-                        successful_actions += 1
-
-                    # Ajouter à l'activité récente (5 dernières)
-                    if len(role_stats['recent_activity']) < 5:
-                        try:
-                            date_part = log.split(' | ')[0]
-                            action_part = log.split(ACTION_PREFIX)[1].split('|')[0].strip() if ACTION_PREFIX in log else 'Unknown'
-                            role_stats['recent_activity'].append({
-                                'date': date_part,
-                                'action': action_part
-                            })
-                        except (IndexError, KeyError, ValueError):
-                            pass
-
-                except (IndexError, KeyError, ValueError):
-                    continue
-
+            for role in AUDIT_ROLES
+        }
+
+        # Une agrégation GROUP BY pour toute la période au lieu d'une relecture des fichiers
+        rows = db.session.query(
+            AuditLog.role, AuditLog.action, AuditLog.niveau,
+            func.count(AuditLog.id),
+            func.sum(db.case((AuditLog.succes.is_(True), 1), else_=0))
+        ).filter(
+            AuditLog.horodatage >= depuis,
+            AuditLog.role.in_(AUDIT_ROLES)
+        ).group_by(AuditLog.role, AuditLog.action, AuditLog.niveau).all()
+
+        successful_actions = {role: 0 for role in AUDIT_ROLES}
+        for role, action, niveau, total, succes in rows:
+            role_stats = stats[role]
+            role_stats['total'] += total
+            role_stats['actions'][action] = role_stats['actions'].get(action, 0) + total
+            if niveau in role_stats['levels']:
+                role_stats['levels'][niveau] += total
+            successful_actions[role] += int(succes or 0)
+
+        for role, role_stats in stats.items():
             # Calculer le taux de succès
             if role_stats['total'] > 0:
-                role_stats['success_rate'] = round((successful_actions / role_stats['total']) * 100, 1)
+                role_stats['success_rate'] = round((successful_actions[role] / role_stats['total']) * 100, 1)
 
-            stats[role] = role_stats
+                # Activité récente (5 dernières) : parcours de l'index (role, horodatage)
+                recent = db.session.query(AuditLog.horodatage, AuditLog.action).filter(
+                    AuditLog.role == role
+                ).order_by(AuditLog.horodatage.desc(), AuditLog.id.desc()).limit(5).all()
+                role_stats['recent_activity'] = [
+                    {'date': horodatage.strftime('%Y-%m-%d %H:%M:%S'), 'action': action}
+                    for horodatage, action in recent
+                ]
 
         return stats
 
@@ -574,43 +500,32 @@ def get_role_statistics():
         logging.error(f"Erreur lors du calcul des statistiques: {str(e)}")
         return {}
 
-def get_critical_alerts(hours=24):
+def get_critical_alerts(hours=24, limit=None):
     """
     Récupère les alertes critiques des dernières heures
 
     Args:
         hours: Nombre d'heures à analyser
+        limit: Nombre maximum d'alertes (toutes si None)
 
     Returns:
-        Liste des alertes critiques
+        Liste des alertes critiques (plus récente en premier)
     """
     try:
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        alerts = []
-
-        # Chercher dans tous les fichiers de logs
-        for role in ['ADMIN', 'RESPONSABLE', 'SUPERVISEUR', 'CHARGE', 'CHAUFFEUR', 'MECANICIEN']:
-            logs = get_role_audit_logs(role, limit=100, level_filter='CRITICAL')
-
-            for log in logs:
-                try:
-                    # Extraire la date
-                    date_part = log.split(' | ')[0]
-                    log_datetime = datetime.strptime(date_part, '%Y-%m-%d %H:%M:%S')
-
-                    if log_datetime >= cutoff_time:
-                        alerts.append({
-                            'timestamp': date_part,
-                            'role': role,
-                            'log': log,
-                            'severity': 'CRITICAL'
-                        })
-                except (IndexError, ValueError):
-                    continue
-
-        # Trier par date (plus récent en premier)
-        alerts.sort(key=lambda x: x['timestamp'], reverse=True)
-        return alerts
+        query = _audit_query(level_filter=AuditLevel.CRITICAL.value, date_debut=cutoff_time)
+        if limit:
+            query = query.limit(limit)
+
+        return [
+            {
+                'timestamp': entry.horodatage.strftime('%Y-%m-%d %H:%M:%S'),
+                'role': entry.role,
+                'log': entry.to_line(),
+                'severity': 'CRITICAL'
+            }
+            for entry in query
+        ]
 
     except Exception as e:
         logging.error(f"Erreur lors de la récupération des alertes: {str(e)}")
@@ -0,0 +1,202 @@
+"""
+Stockage structuré du journal d'audit (table audit_log)
+- Les entrées sont mises en tampon puis insérées par lots (AUDIT_BATCH_SIZE),
+  au plus tard AUDIT_FLUSH_INTERVAL secondes après la première entrée
+- Les lectures vident le tampon avant de requêter : elles voient toujours
+  les dernières actions
+- Import ponctuel des anciens fichiers logs/audit/*.log (ingest_audit_files)
+"""
+
+import atexit
+import logging
+import os
+import threading
+import weakref
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from flask import current_app
+from sqlalchemy import func, insert
+
+from app.database import db
+from app.models.audit_log import AuditLog
+
+
+logger = logging.getLogger(__name__)
+
+# Clés des lignes de fichier -> colonnes de audit_log
+CLES_LIGNE = {
+    'USER': 'utilisateur',
+    'ROLE': 'role',
+    'ACTION': 'action',
+    'LEVEL': 'niveau',
+    'SUCCESS': 'succes',
+    'IP': 'ip',
+    'RESOURCE': 'ressource',
+    'RESOURCE_ID': 'ressource_id',
+    'DETAILS': 'details',
+    'ERROR': 'erreur',
+}
+
+# Longueur des colonnes texte bornées (les valeurs plus longues sont tronquées)
+LONGUEURS = {
+    'utilisateur': 100,
+    'role': 20,
+    'action': 50,
+    'niveau': 10,
+    'ip': 45,
+    'ressource': 50,
+    'ressource_id': 100,
+}
+
+TAILLE_LOT_IMPORT = 1000
+
+# Tampons vidés à l'arrêt du processus ; références faibles : un tampon
+# (et son application) reste libérable, un seul hook atexit par processus
+_TAMPONS: 'weakref.WeakSet[AuditStore]' = weakref.WeakSet()
+
+
+@atexit.register
+def _vider_tampons() -> None:
+    for store in list(_TAMPONS):
+        store.flush()
+
+
+def _normaliser(entree: Dict[str, Any]) -> Dict[str, Any]:
+    ligne = dict(entree)
+    for colonne, longueur in LONGUEURS.items():
+        valeur = ligne.get(colonne)
+        if valeur is not None:
+            ligne[colonne] = str(valeur)[:longueur]
+    ligne.setdefault('horodatage', datetime.now())
+    ligne.setdefault('source', 'app')
+    return ligne
+
+
+class AuditStore:
+    """Tampon d'écriture du journal d'audit pour une application"""
+
+    def __init__(self, app):
+        self.app = app
+        self.taille_lot = app.config.get('AUDIT_BATCH_SIZE', 50)
+        self.intervalle = app.config.get('AUDIT_FLUSH_INTERVAL', 2.0)
+        self._tampon: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        _TAMPONS.add(self)
+
+    def ajouter(self, entree: Dict[str, Any]) -> None:
+        with self._lock:
+            self._tampon.append(_normaliser(entree))
+            plein = len(self._tampon) >= self.taille_lot
+            if not plein and self.intervalle > 0 and self._timer is None:
+                self._timer = threading.Timer(self.intervalle, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if plein:
+            self.flush()
+
+    def flush(self) -> int:
+        """Insère le tampon en un seul INSERT multi-lignes ; retourne le nombre de lignes"""
+        with self._flush_lock:
+            with self._lock:
+                lot, self._tampon = self._tampon, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not lot:
+                return 0
+            try:
+                # Connexion propre au writer : indépendant de la transaction de la requête
+                with self.app.app_context():
+                    with db.engine.begin() as conn:
+                        conn.execute(insert(AuditLog), lot)
+                return len(lot)
+            except Exception as e:
+                logger.error(f"Écriture du journal d'audit impossible ({len(lot)} entrée(s) perdue(s)): {e}")
+                return 0
+
+    def en_attente(self) -> int:
+        with self._lock:
+            return len(self._tampon)
+
+
+def get_audit_store(app=None) -> AuditStore:
+    """Tampon d'audit de l'application (créé au premier appel)"""
+    app = app or current_app._get_current_object()
+    store = app.extensions.get('audit_store')
+    if store is None:
+        store = app.extensions.setdefault('audit_store', AuditStore(app))
+    return store
+
+
+def parse_audit_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Convertit une ligne de fichier d'audit en entrée audit_log.
+    Les segments DETAILS peuvent contenir eux-mêmes ' | ' : tout segment
+    sans clé connue est rattaché au champ précédent.
+    """
+    parts = line.rstrip('\n').split(' | ')
+    if len(parts) < 3:
+        return None
+    try:
+        horodatage = datetime.strptime(parts[0].strip(), '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return None
+
+    entree: Dict[str, Any] = {'horodatage': horodatage, 'source': 'fichier'}
+    courant = None
+    for part in parts[2:]:
+        cle, sep, valeur = part.partition(':')
+        if sep and cle in CLES_LIGNE and CLES_LIGNE[cle] not in entree:
+            courant = CLES_LIGNE[cle]
+            entree[courant] = valeur
+        elif courant:
+            entree[courant] = f"{entree[courant]} | {part}"
+
+    if 'action' not in entree or 'niveau' not in entree:
+        return None
+    entree['succes'] = entree.get('succes') == 'True'
+    return _normaliser(entree)
+
+
+def _lignes_fichiers(directory: str, avant: Optional[datetime]) -> Iterator[Dict[str, Any]]:
+    for nom in sorted(os.listdir(directory)):
+        if not (nom.startswith('audit_') and nom.endswith('.log')):
+            continue
+        with open(os.path.join(directory, nom), 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                entree = parse_audit_line(line)
+                if entree and (avant is None or entree['horodatage'] < avant):
+                    yield entree
+
+
+def ingest_audit_files(directory: str, taille_lot: int = TAILLE_LOT_IMPORT) -> int:
+    """
+    Importe les fichiers d'audit par rôle dans audit_log.
+
+    Rejouable : les lignes d'un import précédent (source = 'fichier') sont
+    remplacées, et seules les lignes antérieures à la première entrée écrite
+    par l'application sont importées (les suivantes sont déjà en base).
+    Doit être appelé dans un contexte d'application ; ne commit pas.
+    """
+    if not os.path.isdir(directory):
+        return 0
+
+    get_audit_store().flush()
+    db.session.query(AuditLog).filter(AuditLog.source == 'fichier').delete(synchronize_session=False)
+    avant = db.session.query(func.min(AuditLog.horodatage)).filter(AuditLog.source == 'app').scalar()
+
+    total = 0
+    lot: List[Dict[str, Any]] = []
+    for entree in _lignes_fichiers(directory, avant):
+        lot.append(entree)
+        if len(lot) >= taille_lot:
+            db.session.execute(insert(AuditLog), lot)
+            total += len(lot)
+            lot = []
+    if lot:
+        db.session.execute(insert(AuditLog), lot)
+        total += len(lot)
+    return total
@@ -0,0 +1,93 @@
+"""
+Réponses CSV en flux pour les exports
+Les lignes sont lues par paquets (curseur côté serveur via yield_per) et
+écrites au client au fur et à mesure : mémoire constante et premier octet
+envoyé dès le premier paquet, quelle que soit la taille de l'export
+"""
+
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Sequence
+
+from flask import Response, request, stream_with_context
+
+from app.database import db
+from app.utils.metriques import mesurer_export
+
+
+CSV_MIMETYPE = 'text/csv; charset=utf-8'
+
+# Nombre de lignes lues par aller-retour SQL et écrites par morceau HTTP
+TAILLE_PAQUET = 500
+
+
+def stream_query(statement, batch_size: int = TAILLE_PAQUET):
+    """Exécute ``statement`` avec un curseur côté serveur (lignes lues par paquets)"""
+    return db.session.execute(statement.execution_options(yield_per=batch_size))
+
+
+def iter_csv(rows: Iterable[Sequence], header: Optional[Sequence] = None,
+             batch_size: int = TAILLE_PAQUET) -> Iterator[bytes]:
+    """Encode ``rows`` en CSV UTF-8, un morceau de ``batch_size`` lignes à la fois"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    reste = buffer.getvalue()
+    if reste:
+        yield reste.encode('utf-8')
+
+
+def iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compresse un flux de morceaux au format gzip sans le charger en mémoire"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def gzip_demande() -> bool:
+    """Compression demandée (?gzip=1) et acceptée par le client (Accept-Encoding)"""
+    return (request.args.get('gzip', '').lower() in ('1', 'true', 'oui')
+            and 'gzip' in request.accept_encodings)
+
+
+def export_filename(prefix: str, extension: str = 'csv') -> str:
+    """Nom de fichier horodaté : ``<prefix>_AAAAMMJJ_HHMMSS.<extension>``"""
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+
+def csv_response(rows: Iterable[Sequence], filename: str, header: Optional[Sequence] = None,
+                 gzip: Optional[bool] = None) -> Response:
+    """
+    Réponse HTTP CSV en flux (téléchargement ``filename``).
+    ``gzip=None`` suit la demande du client (voir gzip_demande).
+    """
+    if gzip is None:
+        gzip = gzip_demande()
+
+    body = mesurer_export(iter_csv(rows, header), 'csv', request.endpoint or 'inconnu')
+    if gzip:
+        body = iter_gzip(body)
+
+    response = Response(stream_with_context(body), content_type=CSV_MIMETYPE)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,160 @@
+"""
+Serveur SMTP local de débogage
+- N'envoie rien : les messages reçus sont conservés en mémoire (``messages``)
+- Utilisable dans les tests (SMTP_HOST=127.0.0.1, SMTP_PORT=serveur.port, SMTP_USE_TLS=false)
+- En développement : python -m app.utils.debug_smtp --port 1025 (affiche chaque message reçu)
+"""
+
+import argparse
+import socketserver
+import threading
+from email import message_from_bytes
+from email.header import decode_header, make_header
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _partie(msg, type_contenu: str) -> Optional[str]:
+    for partie in msg.walk():
+        if partie.get_content_type() == type_contenu and not partie.is_multipart():
+            return partie.get_payload(decode=True).decode(partie.get_content_charset() or 'utf-8')
+    return None
+
+
+def _decoder_message(mail_from: str, rcpt_to: List[str], data: bytes) -> Dict[str, Any]:
+    msg = message_from_bytes(data)
+    return {
+        'mail_from': mail_from,
+        'rcpt_to': rcpt_to,
+        'subject': str(make_header(decode_header(msg.get('Subject', '')))),
+        'body': _partie(msg, 'text/plain') or '',
+        'html': _partie(msg, 'text/html'),
+        'message': msg,
+    }
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Sous-ensemble du protocole SMTP utilisé par smtplib (EHLO, AUTH, MAIL, RCPT, DATA, RSET, QUIT)"""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode('utf-8') + b'\r\n')
+
+    def handle(self) -> None:
+        serveur = self.server.debug_server
+        mail_from, rcpt_to = None, []
+        self._reply('220 debug-smtp ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            commande = line.decode('utf-8', 'replace').rstrip('\r\n')
+            verbe = commande.split(' ', 1)[0].upper()
+
+            if verbe == 'EHLO':
+                self._reply('250-debug-smtp')
+                self._reply('250-8BITMIME')
+                self._reply('250 AUTH PLAIN LOGIN')
+            elif verbe == 'HELO':
+                self._reply('250 debug-smtp')
+            elif verbe == 'AUTH':
+                self._reply('235 Authentication successful')
+            elif verbe == 'MAIL':
+                mail_from, rcpt_to = commande.split(':', 1)[1].strip().strip('<>'), []
+                self._reply('250 OK')
+            elif verbe == 'RCPT':
+                destinataire = commande.split(':', 1)[1].strip().strip('<>')
+                if destinataire in serveur.refuser:
+                    self._reply('550 No such user')
+                else:
+                    rcpt_to.append(destinataire)
+                    self._reply('250 OK')
+            elif verbe == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                lignes = []
+                while True:
+                    ligne = self.rfile.readline()
+                    if not ligne or ligne in (b'.\r\n', b'.\n'):
+                        break
+                    lignes.append(ligne[1:] if ligne.startswith(b'..') else ligne)
+                serveur._recevoir(_decoder_message(mail_from, rcpt_to, b''.join(lignes)))
+                mail_from, rcpt_to = None, []
+                self._reply('250 OK: queued')
+            elif verbe == 'RSET':
+                mail_from, rcpt_to = None, []
+                self._reply('250 OK')
+            elif verbe == 'NOOP':
+                self._reply('250 OK')
+            elif verbe == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class DebugSMTPServer:
+    """
+    Usage (tests) :
+        with DebugSMTPServer() as smtp:
+            app.config.update(SMTP_HOST=smtp.host, SMTP_PORT=smtp.port, SMTP_USE_TLS=False)
+            ...
+            assert smtp.messages[0]['rcpt_to'] == ['x@y.z']
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 on_message: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self._server = _ThreadingTCPServer((host, port), _SMTPHandler)
+        self._server.debug_server = self
+        self.host, self.port = self._server.server_address[:2]
+        self.messages: List[Dict[str, Any]] = []
+        self.refuser = set()  # Destinataires rejetés (550)
+        self.on_message = on_message
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _recevoir(self, message: Dict[str, Any]) -> None:
+        with self._lock:
+            self.messages.append(message)
+        if self.on_message:
+            self.on_message(message)
+
+    def start(self) -> 'DebugSMTPServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='debug-smtp', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'DebugSMTPServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Serveur SMTP local de débogage (aucun envoi réel)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    args = parser.parse_args()
+
+    def afficher(message):
+        print(f"--- {message['mail_from']} -> {', '.join(message['rcpt_to'])}")
+        print(f"Sujet : {message['subject']}")
+        print(message['body'])
+
+    serveur = DebugSMTPServer(args.host, args.port, on_message=afficher)
+    print(f"Serveur SMTP de débogage à l'écoute sur {serveur.host}:{serveur.port}")
+    try:
+        serveur._server.serve_forever()
+    except KeyboardInterrupt:
+        serveur._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,42 +1,179 @@
 import smtplib
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import Iterable, List, NamedTuple, Optional
 from flask import current_app
 
+from app.utils.metriques import NOTIFICATION_ECHECS, NOTIFICATION_ENVOI_DUREE
+
+
+class EmailMessage(NamedTuple):
+    """Message à envoyer (voir send_bulk) : texte, et partie HTML facultative"""
+    subject: str
+    body: str
+    to_email: str
+    html: Optional[str] = None
+
+
+# Erreurs de connexion : la session SMTP est rouverte et l'envoi retenté une fois
+_ERREURS_CONNEXION = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPTransport:
+    """
+    Connexion SMTP authentifiée réutilisée entre les envois.
+    - Ouverte au premier envoi, refermée après SMTP_IDLE_TIMEOUT secondes d'inactivité
+    - Reconnexion automatique si le serveur a coupé la session
+    - Un verrou sérialise les envois (une session SMTP n'est pas partageable)
+    """
+
+    def __init__(self, config):
+        self.host = config.get('SMTP_HOST')
+        self.port = config.get('SMTP_PORT')
+        self.user = config.get('SMTP_USERNAME')
+        self.pwd = config.get('SMTP_PASSWORD')
+        self.use_tls = config.get('SMTP_USE_TLS', True)
+        self.use_ssl = config.get('SMTP_USE_SSL', False)
+        self.mail_from = config.get('MAIL_FROM') or self.user
+        self.timeout = config.get('SMTP_TIMEOUT', 10)
+        self.idle_timeout = config.get('SMTP_IDLE_TIMEOUT', 60)
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.RLock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.host and self.port and self.mail_from)
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls and not self.use_ssl:
+                server.starttls()
+            if self.user and self.pwd:
+                server.login(self.user, self.pwd)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def close(self) -> None:
+        with self._lock:
+            server, self._server = self._server, None
+            if server is not None:
+                try:
+                    server.quit()
+                except Exception:
+                    try:
+                        server.close()
+                    except Exception:
+                        pass
+
+    def _send_one(self, message: EmailMessage) -> None:
+        if message.html:
+            # multipart/alternative : le client affiche la partie HTML, sinon le texte
+            msg = MIMEMultipart('alternative')
+            msg.attach(MIMEText(message.body, 'plain', 'utf-8'))
+            msg.attach(MIMEText(message.html, 'html', 'utf-8'))
+        else:
+            msg = MIMEText(message.body, 'plain', 'utf-8')
+        msg['Subject'] = message.subject
+        msg['From'] = self.mail_from
+        msg['To'] = message.to_email
+        payload = msg.as_string()
+
+        for tentative in range(2):
+            try:
+                self._connection().sendmail(self.mail_from, [message.to_email], payload)
+                self._last_used = time.monotonic()
+                return
+            except _ERREURS_CONNEXION:
+                # Session expirée côté serveur : on rouvre une connexion et on retente une fois
+                self.close()
+                if tentative:
+                    raise
+
+    def send_bulk(self, messages: Iterable[EmailMessage], errors: Optional[List] = None) -> List[bool]:
+        """Envoie les messages sur une même session ; retourne le succès de chaque message.
+        Si ``errors`` est fourni, il reçoit l'erreur de chaque message (None si envoyé).
+        """
+        messages = list(messages)
+        results = []
+        erreurs = []
+        with self._lock:
+            for message in messages:
+                if not message.to_email:
+                    NOTIFICATION_ECHECS.inc()
+                    results.append(False)
+                    erreurs.append('Destinataire manquant')
+                    continue
+                debut = time.perf_counter()
+                try:
+                    self._send_one(message)
+                    results.append(True)
+                    erreurs.append(None)
+                except Exception as e:
+                    NOTIFICATION_ECHECS.inc()
+                    current_app.logger.error(f"Erreur envoi email à {message.to_email}: {e}")
+                    results.append(False)
+                    erreurs.append(str(e) or e.__class__.__name__)
+                    if self._server is None:
+                        # Serveur injoignable : inutile de retenter pour chaque destinataire
+                        break
+                finally:
+                    NOTIFICATION_ENVOI_DUREE.observe(time.perf_counter() - debut)
+        restants = len(messages) - len(results)
+        if restants:
+            NOTIFICATION_ECHECS.inc(restants)
+        if errors is not None:
+            errors.extend(erreurs + [erreurs[-1]] * restants)
+        return results + [False] * restants
+
+
+def get_transport() -> SMTPTransport:
+    """Transport SMTP de l'application courante (créé au premier envoi)"""
+    app = current_app._get_current_object()
+    transport = app.extensions.get('smtp_transport')
+    if transport is None:
+        transport = app.extensions.setdefault('smtp_transport', SMTPTransport(app.config))
+    return transport
+
+
+def send_bulk(messages: Iterable[EmailMessage], errors: Optional[List] = None) -> List[bool]:
+    """Envoie plusieurs emails texte sur une seule connexion SMTP.
+    Retourne une liste de booléens (un par message, dans l'ordre).
+    Si la configuration SMTP est incomplète, log et retourne False pour chaque message.
+    """
+    messages = list(messages)
+    transport = get_transport()
+    if not transport.configured:
+        current_app.logger.warning('Email non envoyé: configuration SMTP incomplète.')
+        NOTIFICATION_ECHECS.inc(len(messages))
+        if errors is not None:
+            errors.extend(['Configuration SMTP incomplète'] * len(messages))
+        return [False] * len(messages)
+    return transport.send_bulk(messages, errors)
+
+
 def send_email(subject: str, body: str, to_email: str) -> bool:
     """Envoie un email simple en texte. Retourne True si envoyé, False sinon.
     Utilise les variables de config: SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_USE_TLS, SMTP_USE_SSL, MAIL_FROM.
+    La connexion SMTP est réutilisée entre les appels (voir SMTPTransport).
     Si ces variables ne sont pas définies, log et retourne False sans lever d'exception.
     """
-    cfg = current_app.config
-    host = cfg.get('SMTP_HOST')
-    port = cfg.get('SMTP_PORT')
-    user = cfg.get('SMTP_USERNAME')
-    pwd = cfg.get('SMTP_PASSWORD')
-    use_tls = cfg.get('SMTP_USE_TLS', True)
-    use_ssl = cfg.get('SMTP_USE_SSL', False)
-    mail_from = cfg.get('MAIL_FROM') or user
-
-    if not host or not port or not to_email or not mail_from:
+    if not to_email:
         current_app.logger.warning('Email non envoyé: configuration SMTP incomplète.')
         return False
-
-    msg = MIMEText(body, 'plain', 'utf-8')
-    msg['Subject'] = subject
-    msg['From'] = mail_from
-    msg['To'] = to_email
-
-    try:
-        if use_ssl:
-            server = smtplib.SMTP_SSL(host, port)
-        else:
-            server = smtplib.SMTP(host, port)
-            if use_tls:
-                server.starttls()
-        if user and pwd:
-            server.login(user, pwd)
-        server.sendmail(mail_from, [to_email], msg.as_string())
-        server.quit()
-        return True
-    except Exception as e:
-        current_app.logger.error(f"Erreur envoi email: {e}")
-        return False
+    return send_bulk([EmailMessage(subject, body, to_email)])[0]
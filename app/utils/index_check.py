@@ -0,0 +1,132 @@
+"""EXPLAIN-based check that the hot dashboard/report queries still use their index.
+
+Each entry of ``HOT_QUERIES`` pairs a query built exactly like the services
+build it with the index added for it in ``scripts/migrations``. ``check_hot_queries``
+runs ``EXPLAIN`` (MySQL/MariaDB) or ``EXPLAIN QUERY PLAN`` (SQLite) on each one
+and reports the queries whose plan no longer uses the expected index.
+"""
+import re
+from datetime import date, timedelta
+from typing import Callable, Dict, List, NamedTuple, Set
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.database import db
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN <statement>`` construct, compiled for the current dialect."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = 'EXPLAIN QUERY PLAN ' if compiler.dialect.name == 'sqlite' else 'EXPLAIN '
+    return prefix + compiler.process(element.statement, **kw)
+
+
+class HotQuery(NamedTuple):
+    name: str
+    index: str
+    build: Callable
+
+
+def _trajets_jour_par_type():
+    from app.models.trajet import Trajet
+    from app.utils.periodes import day_filter
+    return db.select(Trajet.trajet_id).where(
+        day_filter(Trajet.date_heure_depart, date.today()),
+        Trajet.type_trajet == 'UDM_INTERNE'
+    )
+
+
+def _presence_etudiants():
+    from app.models.trajet import Trajet
+    from app.utils.periodes import day_filter
+    return db.select(db.func.sum(Trajet.nombre_places_occupees)).where(
+        Trajet.type_passagers == 'ETUDIANT',
+        Trajet.point_depart.in_(['Mfetum', 'Ancienne Mairie']),
+        day_filter(Trajet.date_heure_depart, date.today())
+    )
+
+
+def _trajets_chauffeur_jour():
+    from app.models.trajet import Trajet
+    from app.utils.periodes import day_filter
+    return db.select(db.func.count(Trajet.trajet_id)).where(
+        Trajet.chauffeur_id == 1,
+        day_filter(Trajet.date_heure_depart, date.today())
+    )
+
+
+def _utilisation_bus_periode():
+    from app.models.trajet import Trajet
+    from app.utils.periodes import date_range_filter
+    today = date.today()
+    return db.select(db.func.count(Trajet.trajet_id)).where(
+        Trajet.numero_bus_udm == 'BUS-001',
+        date_range_filter(Trajet.date_heure_depart, today - timedelta(days=30), today)
+    )
+
+
+def _derniere_vidange_bus():
+    from app.models.vidange import Vidange
+    return db.select(Vidange.id).where(
+        Vidange.bus_udm_id == 1
+    ).order_by(Vidange.date_vidange.desc()).limit(1)
+
+
+def _derniere_carburation_bus():
+    from app.models.carburation import Carburation
+    return db.select(Carburation.id).where(
+        Carburation.bus_udm_id == 1
+    ).order_by(Carburation.date_carburation.desc()).limit(1)
+
+
+def _pannes_critiques_ouvertes():
+    from app.models.panne_bus_udm import PanneBusUdM
+    return db.select(db.func.count(PanneBusUdM.id)).where(
+        PanneBusUdM.resolue == False,  # noqa: E712
+        PanneBusUdM.criticite == 'HAUTE'
+    )
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery('trajets_jour_par_type', 'idx_trajet_date_type', _trajets_jour_par_type),
+    HotQuery('presence_etudiants', 'idx_trajet_passagers_depart_date', _presence_etudiants),
+    HotQuery('trajets_chauffeur_jour', 'idx_trajet_chauffeur_date', _trajets_chauffeur_jour),
+    HotQuery('utilisation_bus_periode', 'idx_trajet_bus_date', _utilisation_bus_periode),
+    HotQuery('derniere_vidange_bus', 'idx_vidange_bus_date', _derniere_vidange_bus),
+    HotQuery('derniere_carburation_bus', 'idx_carburation_bus_date', _derniere_carburation_bus),
+    HotQuery('pannes_critiques_ouvertes', 'idx_panne_resolue_criticite', _pannes_critiques_ouvertes),
+]
+
+
+_SQLITE_INDEX_RE = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+
+
+def indexes_used(statement) -> Set[str]:
+    """Return the names of the indexes the planner picks for ``statement``."""
+    result = db.session.execute(Explain(statement))
+    if db.engine.dialect.name == 'sqlite':
+        return {m.group(1) for row in result for m in _SQLITE_INDEX_RE.finditer(row[-1])}
+    return {row.key for row in result.mappings() if row.get('key')}
+
+
+def check_hot_queries() -> List[Dict[str, object]]:
+    """Run EXPLAIN on every hot query; return one entry per query with an ``ok`` flag."""
+    report = []
+    for query in HOT_QUERIES:
+        used = indexes_used(query.build())
+        report.append({
+            'name': query.name,
+            'index': query.index,
+            'used': sorted(used),
+            'ok': query.index in used,
+        })
+    return report
@@ -0,0 +1,346 @@
+"""
+Métriques d'exploitation au format Prometheus (GET /metrics)
+- Latence des requêtes HTTP par blueprint et endpoint
+- Pool de connexions : attente au checkout et connexions utilisées
+- Notifications : durée d'envoi SMTP, échecs et abandons
+- Durée des exports (CSV en flux, rapports en arrière-plan)
+- Jauges métier calculées à la collecte : pannes ouvertes, bus DEFAILLANT, trajets du jour
+Les compteurs et histogrammes sont écrits sans verrou : chaque thread incrémente son
+propre fragment, les fragments sont additionnés à la collecte. Chaque processus
+(worker) expose ses propres valeurs, agrégées côté Prometheus.
+/metrics exige l'en-tête « Authorization: Bearer <METRICS_TOKEN> ». Sans jeton configuré,
+l'endpoint répond 404, sauf exposition publique explicite (METRICS_PUBLIC).
+"""
+
+import bisect
+import hmac
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from flask import Response, current_app, g, request
+from sqlalchemy import event
+
+from app.database import db
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seuils des histogrammes (secondes)
+SEUILS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SEUILS_ATTENTE_POOL = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+SEUILS_ENVOI = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SEUILS_EXPORT = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+
+def _echapper(valeur: str) -> str:
+    return valeur.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(valeur: float) -> str:
+    if valeur == float('inf'):
+        return '+Inf'
+    return repr(float(valeur))
+
+
+class _Fragments:
+    """
+    Valeurs par thread : chaque thread n'écrit que dans son propre dictionnaire.
+    Les fragments des threads terminés sont fusionnés à la collecte.
+    """
+
+    def __init__(self, fusion: Callable):
+        self._local = threading.local()
+        self._actifs: List[Tuple[threading.Thread, dict]] = []
+        self._retraites: dict = {}
+        self._fusion = fusion
+        self._verrou = threading.Lock()  # Collecte uniquement, jamais sur le chemin d'écriture
+
+    def local(self) -> dict:
+        try:
+            return self._local.valeurs
+        except AttributeError:
+            valeurs = self._local.valeurs = {}
+            with self._verrou:
+                self._actifs.append((threading.current_thread(), valeurs))
+            return valeurs
+
+    def instantane(self) -> dict:
+        """Somme des fragments de tous les threads"""
+        with self._verrou:
+            actifs = []
+            for thread, valeurs in self._actifs:
+                if thread.is_alive():
+                    actifs.append((thread, valeurs))
+                else:
+                    self._fusionner(self._retraites, valeurs.copy())
+            self._actifs = actifs
+            total = {cle: self._fusion(None, valeur) for cle, valeur in self._retraites.items()}
+            for _, valeurs in actifs:
+                self._fusionner(total, valeurs.copy())
+        return total
+
+    def _fusionner(self, cible: dict, source: dict) -> None:
+        for cle, valeur in source.items():
+            cible[cle] = self._fusion(cible.get(cle), valeur)
+
+
+class _Metrique:
+    type = ''
+
+    def __init__(self, nom: str, aide: str, etiquettes: Sequence[str] = ()):
+        self.nom = nom
+        self.aide = aide
+        self.etiquettes = tuple(etiquettes)
+
+    def _cle(self, valeurs: Dict[str, object]) -> tuple:
+        return tuple(str(valeurs[nom]) for nom in self.etiquettes)
+
+    def _etiquettes(self, cle: tuple, extra: str = '') -> str:
+        paires = [f'{nom}="{_echapper(valeur)}"' for nom, valeur in zip(self.etiquettes, cle)]
+        if extra:
+            paires.append(extra)
+        return '{' + ','.join(paires) + '}' if paires else ''
+
+    def echantillons(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def exposer(self) -> List[str]:
+        lignes = [f'# HELP {self.nom} {self.aide}', f'# TYPE {self.nom} {self.type}']
+        lignes.extend(self.echantillons())
+        return lignes
+
+
+class Compteur(_Metrique):
+    """Compteur croissant"""
+    type = 'counter'
+
+    def __init__(self, nom, aide, etiquettes=()):
+        super().__init__(nom, aide, etiquettes)
+        self._fragments = _Fragments(lambda total, valeur: (total or 0.0) + valeur)
+
+    def inc(self, valeur: float = 1.0, **etiquettes) -> None:
+        cle = self._cle(etiquettes)
+        valeurs = self._fragments.local()
+        valeurs[cle] = valeurs.get(cle, 0.0) + valeur
+
+    def valeur(self, **etiquettes) -> float:
+        return self._fragments.instantane().get(self._cle(etiquettes), 0.0)
+
+    def echantillons(self):
+        for cle, valeur in sorted(self._fragments.instantane().items()):
+            yield f'{self.nom}{self._etiquettes(cle)} {_format(valeur)}'
+
+
+class Jauge(_Metrique):
+    """
+    Jauge : incrémentée/décrémentée (inc/dec), ou calculée à la collecte par
+    ``fonction`` qui retourne une valeur ou un dictionnaire {clé d'étiquettes: valeur}
+    """
+    type = 'gauge'
+
+    def __init__(self, nom, aide, etiquettes=(), fonction: Optional[Callable] = None):
+        super().__init__(nom, aide, etiquettes)
+        self.fonction = fonction
+        self._fragments = _Fragments(lambda total, valeur: (total or 0.0) + valeur)
+
+    def inc(self, valeur: float = 1.0, **etiquettes) -> None:
+        cle = self._cle(etiquettes)
+        valeurs = self._fragments.local()
+        valeurs[cle] = valeurs.get(cle, 0.0) + valeur
+
+    def dec(self, valeur: float = 1.0, **etiquettes) -> None:
+        self.inc(-valeur, **etiquettes)
+
+    def valeurs(self) -> Dict[tuple, float]:
+        if self.fonction is None:
+            return self._fragments.instantane()
+        resultat = self.fonction()
+        return resultat if isinstance(resultat, dict) else {(): resultat}
+
+    def echantillons(self):
+        for cle, valeur in sorted(self.valeurs().items()):
+            yield f'{self.nom}{self._etiquettes(cle)} {_format(valeur)}'
+
+
+class Histogramme(_Metrique):
+    """Histogramme à seuils fixes (compte par intervalle, somme des observations)"""
+    type = 'histogram'
+
+    def __init__(self, nom, aide, etiquettes=(), seuils: Sequence[float] = SEUILS_HTTP):
+        super().__init__(nom, aide, etiquettes)
+        self.seuils = tuple(sorted(seuils))
+        self._fragments = _Fragments(self._additionner)
+
+    @staticmethod
+    def _additionner(total, valeur):
+        return list(valeur) if total is None else [a + b for a, b in zip(total, valeur)]
+
+    def observe(self, valeur: float, **etiquettes) -> None:
+        cle = self._cle(etiquettes)
+        valeurs = self._fragments.local()
+        compteurs = valeurs.get(cle)
+        if compteurs is None:
+            # Un compteur par intervalle (dont +Inf) puis la somme
+            compteurs = valeurs[cle] = [0] * (len(self.seuils) + 1) + [0.0]
+        compteurs[bisect.bisect_left(self.seuils, valeur)] += 1
+        compteurs[-1] += valeur
+
+    def nombre(self, **etiquettes) -> int:
+        compteurs = self._fragments.instantane().get(self._cle(etiquettes))
+        return sum(compteurs[:-1]) if compteurs else 0
+
+    def echantillons(self):
+        for cle, compteurs in sorted(self._fragments.instantane().items()):
+            cumul = 0
+            for seuil, nombre in zip(self.seuils + (float('inf'),), compteurs):
+                cumul += nombre
+                le = 'le="%s"' % _format(seuil)
+                yield f'{self.nom}_bucket{self._etiquettes(cle, le)} {cumul}'
+            yield f'{self.nom}_sum{self._etiquettes(cle)} {_format(compteurs[-1])}'
+            yield f'{self.nom}_count{self._etiquettes(cle)} {cumul}'
+
+
+class Registre:
+    """Ensemble des métriques exposées"""
+
+    def __init__(self):
+        self._metriques: Dict[str, _Metrique] = {}
+
+    def ajouter(self, metrique: _Metrique) -> _Metrique:
+        self._metriques[metrique.nom] = metrique
+        return metrique
+
+    def exposer(self) -> str:
+        lignes = []
+        for metrique in self._metriques.values():
+            try:
+                lignes.extend(metrique.exposer())
+            except Exception as e:
+                current_app.logger.warning(f"Métrique {metrique.nom} non collectée : {e}")
+        return '\n'.join(lignes) + '\n'
+
+
+REGISTRE = Registre()
+
+HTTP_DUREE = REGISTRE.ajouter(Histogramme(
+    'transport_http_request_duration_seconds', 'Durée des requêtes HTTP',
+    ('blueprint', 'endpoint', 'method')))
+HTTP_REQUETES = REGISTRE.ajouter(Compteur(
+    'transport_http_requests_total', 'Requêtes HTTP traitées',
+    ('blueprint', 'endpoint', 'status')))
+DB_POOL_ATTENTE = REGISTRE.ajouter(Histogramme(
+    'transport_db_pool_checkout_wait_seconds', "Attente d'une connexion du pool",
+    seuils=SEUILS_ATTENTE_POOL))
+DB_POOL_UTILISEES = REGISTRE.ajouter(Jauge(
+    'transport_db_pool_connections_in_use', 'Connexions du pool actuellement empruntées'))
+NOTIFICATION_ENVOI_DUREE = REGISTRE.ajouter(Histogramme(
+    'transport_notification_send_duration_seconds', "Durée d'envoi SMTP d'une notification",
+    seuils=SEUILS_ENVOI))
+NOTIFICATION_ECHECS = REGISTRE.ajouter(Compteur(
+    'transport_notification_failures_total', "Échecs d'envoi de notification"))
+NOTIFICATION_ABANDONS = REGISTRE.ajouter(Compteur(
+    'transport_notification_abandoned_total', 'Notifications abandonnées après la dernière tentative'))
+EXPORT_DUREE = REGISTRE.ajouter(Histogramme(
+    'transport_export_duration_seconds', 'Durée des exports', ('format', 'nom'), seuils=SEUILS_EXPORT))
+
+
+def _compteurs_exploitation():
+    """Jauges métier : une seule requête par collecte (résultat gardé dans flask.g)"""
+    if '_compteurs_exploitation' not in g:
+        from app.services.dashboard_service import DashboardService
+        g._compteurs_exploitation = DashboardService.get_compteurs_exploitation()
+    return g._compteurs_exploitation
+
+
+REGISTRE.ajouter(Jauge('transport_pannes_ouvertes', 'Pannes non résolues',
+                       fonction=lambda: _compteurs_exploitation()['pannes_ouvertes']))
+REGISTRE.ajouter(Jauge('transport_bus_defaillants', "Bus à l'état DEFAILLANT",
+                       fonction=lambda: _compteurs_exploitation()['bus_defaillants']))
+REGISTRE.ajouter(Jauge('transport_trajets_jour', "Trajets enregistrés aujourd'hui",
+                       fonction=lambda: _compteurs_exploitation()['trajets_jour']))
+
+
+# --- Instrumentation -----------------------------------------------------
+
+def _emprunt(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_UTILISEES.inc()
+
+
+def _restitution(dbapi_connection, connection_record):
+    DB_POOL_UTILISEES.dec()
+
+
+def instrumenter_pools(app) -> None:
+    """
+    Attente au checkout (pool.connect) et connexions empruntées (checkout/checkin).
+    À rappeler après engine.dispose() : le pool recréé garde les événements mais pas pool.connect.
+    """
+    with app.app_context():
+        moteurs = list(db.engines.values())
+    for moteur in moteurs:
+        pool = moteur.pool
+        if not event.contains(pool, 'checkout', _emprunt):
+            event.listen(pool, 'checkout', _emprunt)
+            event.listen(pool, 'checkin', _restitution)
+        if getattr(pool, '_metriques', False):
+            continue
+        connecter = pool.connect
+
+        def connecter_mesure(connecter=connecter):
+            debut = time.perf_counter()
+            try:
+                return connecter()
+            finally:
+                DB_POOL_ATTENTE.observe(time.perf_counter() - debut)
+
+        pool.connect = connecter_mesure
+        pool._metriques = True
+
+
+def _debut_requete():
+    g._metriques_debut = time.perf_counter()
+
+
+def _fin_requete(response):
+    debut = g.pop('_metriques_debut', None)
+    if debut is not None:
+        blueprint = request.blueprint or ''
+        endpoint = request.endpoint or 'inconnu'  # 404 : cardinalité bornée
+        HTTP_DUREE.observe(time.perf_counter() - debut, blueprint=blueprint, endpoint=endpoint,
+                           method=request.method)
+        HTTP_REQUETES.inc(blueprint=blueprint, endpoint=endpoint, status=response.status_code)
+    return response
+
+
+def mesurer_export(morceaux: Iterable[bytes], format: str, nom: str) -> Iterable[bytes]:
+    """Relaie un flux d'export et observe sa durée une fois entièrement envoyé"""
+    debut = time.perf_counter()
+    yield from morceaux
+    EXPORT_DUREE.observe(time.perf_counter() - debut, format=format, nom=nom)
+
+
+def metrics():
+    """Exposition des métriques (format texte Prometheus)"""
+    jeton = current_app.config.get('METRICS_TOKEN')
+    if jeton:
+        autorisation = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(autorisation.encode(), f'Bearer {jeton}'.encode()):
+            return Response('Non autorisé\n', status=401, content_type='text/plain; charset=utf-8')
+    elif not current_app.config.get('METRICS_PUBLIC'):
+        # Ni jeton ni exposition publique demandée : l'endpoint n'existe pas
+        return Response('Not Found\n', status=404, content_type='text/plain; charset=utf-8')
+    return Response(REGISTRE.exposer(), content_type=CONTENT_TYPE)
+
+
+def init_metriques(app) -> None:
+    """Installe les métriques si METRICS_ENABLED (appelé par create_app)"""
+    if not app.config.get('METRICS_ENABLED', True) or app.extensions.get('metriques'):
+        return
+    instrumenter_pools(app)
+    app.before_request(_debut_requete)
+    app.after_request(_fin_requete)
+    app.add_url_rule('/metrics', 'metrics', metrics)
+    app.extensions['metriques'] = REGISTRE
+    if not app.config.get('METRICS_TOKEN') and not app.config.get('METRICS_PUBLIC'):
+        app.logger.warning('METRICS_TOKEN non défini : /metrics désactivé (404), voir METRICS_PUBLIC')
@@ -0,0 +1,103 @@
+"""
+Modèles des emails de notification (app/templates/emails)
+- Compilés une seule fois au démarrage (init_modeles_email) puis réutilisés
+- Chaque notification a un sujet, une partie texte (<nom>.txt) et une partie HTML (<nom>.html)
+- Un rendu est calculé une fois par événement et partagé par tous les destinataires
+"""
+
+import os
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from flask import current_app
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+from app.constants import DATE_FORMAT_FR
+from app.utils.emailer import EmailMessage
+
+
+DOSSIER_MODELES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'emails')
+
+# Sujet de chaque notification ; le corps est dans <nom>.txt et <nom>.html
+SUJETS = {
+    'panne': "🚨 Nouvelle panne déclarée - {{ bus_info }}",
+    'reparation': "✅ Véhicule réparé - {{ bus_info }}",
+    'vidange': "🔧 Seuil vidange atteint - Bus {{ bus.numero }}",
+    'carburant': "⛽ Seuil carburant critique - Bus {{ bus.numero }}",
+    'document': "📄 {{ 'Document expiré' if jours_restants < 0 else 'Document bientôt expiré' }}"
+                " - Bus {{ bus.numero }} ({{ type_document }})",
+    'permis': "🪪 {{ 'Permis expiré' if jours_restants <= 0 else 'Permis bientôt expiré' }}"
+              " - {{ chauffeur.nom_complet }}",
+    'statut': "📋 Nouveau statut affecté - {{ statut_fr }}",
+    'digest': "📬 Récapitulatif des alertes - {{ alertes|length }} alerte(s)",
+}
+
+
+def _milliers(valeur) -> str:
+    if valeur is None:
+        return '-'
+    if isinstance(valeur, float) and valeur.is_integer():
+        valeur = int(valeur)  # Kilométrages stockés en FLOAT
+    return f"{valeur:,}"
+
+
+def _date_fr(valeur) -> str:
+    return valeur.strftime(DATE_FORMAT_FR) if valeur else ''
+
+
+def _date_heure_fr(valeur) -> str:
+    return valeur.strftime('%d/%m/%Y à %H:%M') if valeur else ''
+
+
+class EmailRendu(NamedTuple):
+    """Email rendu pour un événement, commun à tous ses destinataires"""
+    sujet: str
+    texte: str
+    html: str
+
+    def messages(self, destinataires: Iterable) -> List[EmailMessage]:
+        """Un EmailMessage par destinataire (objets ayant un attribut ``email``)"""
+        return [EmailMessage(self.sujet, self.texte, d.email, self.html) for d in destinataires if d.email]
+
+
+class ModelesEmail:
+    """Environnement Jinja dédié aux emails et modèles précompilés"""
+
+    def __init__(self, dossier: str = DOSSIER_MODELES):
+        self.env = Environment(
+            loader=FileSystemLoader(dossier),
+            autoescape=select_autoescape(['html'], default_for_string=False),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,
+        )
+        self.env.filters.update(milliers=_milliers, date_fr=_date_fr, date_heure_fr=_date_heure_fr)
+        self._modeles = {
+            nom: (self.env.from_string(sujet),
+                  self.env.get_template(f'{nom}.txt'),
+                  self.env.get_template(f'{nom}.html'))
+            for nom, sujet in SUJETS.items()
+        }
+
+    def rendre(self, nom: str, contexte: Dict[str, Any]) -> EmailRendu:
+        sujet, texte, html = self._modeles[nom]
+        sujet = sujet.render(contexte).strip()
+        return EmailRendu(
+            sujet,
+            texte.render(contexte).strip(),
+            html.render(contexte, sujet=sujet),
+        )
+
+
+def init_modeles_email(app) -> ModelesEmail:
+    """Compile les modèles et les attache à l'application (appelé par create_app)"""
+    modeles = app.extensions.get('modeles_email')
+    if modeles is None:
+        modeles = app.extensions.setdefault('modeles_email', ModelesEmail())
+    return modeles
+
+
+def rendre_email(nom: str, contexte: Optional[Dict[str, Any]] = None, **valeurs) -> EmailRendu:
+    """Rend la notification ``nom`` avec les modèles de l'application courante"""
+    modeles = init_modeles_email(current_app._get_current_object())
+    return modeles.rendre(nom, dict(contexte or {}, **valeurs))
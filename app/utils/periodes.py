@@ -0,0 +1,94 @@
+"""Helpers to turn reporting periods into sargable datetime range filters.
+
+Every bound is half-open ``[start, end)`` on the raw column, so a query like
+``date_heure_depart >= '2025-03-01 00:00' AND date_heure_depart < '2025-04-01 00:00'``
+can use an index on the column, unlike ``DATE(date_heure_depart) >= ...``.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import and_
+
+from app.constants import DATE_FORMAT_ISO
+
+
+PERIODES = ('jour', 'semaine', 'mois', 'annee')
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def day_bounds(target_date: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """Return ``[00:00 of target_date, 00:00 of the next day)``."""
+    if target_date is None:
+        target_date = date.today()
+    start = datetime.combine(_as_date(target_date), time.min)
+    return start, start + timedelta(days=1)
+
+
+def date_bounds(start_date: date, end_date: Optional[date] = None) -> Tuple[datetime, Optional[datetime]]:
+    """Return datetime bounds covering the inclusive day range ``start_date..end_date``.
+
+    ``end_date=None`` leaves the range open-ended (``end`` is ``None``).
+    """
+    start = datetime.combine(_as_date(start_date), time.min)
+    if end_date is None:
+        return start, None
+    return start, datetime.combine(_as_date(end_date), time.min) + timedelta(days=1)
+
+
+def month_start(target_date: date, offset: int = 0) -> date:
+    """First day of the month ``offset`` months after (or before, if negative) target_date's month."""
+    index = target_date.year * 12 + target_date.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def resolve_period(periode: Optional[str] = None, date_debut: Optional[str] = None,
+                   date_fin: Optional[str] = None, default: str = 'mois',
+                   today: Optional[date] = None) -> Tuple[date, date]:
+    """Resolve a UI period (``jour``/``semaine``/``mois``/``annee`` or custom) to inclusive dates.
+
+    A custom range is used when both ``date_debut`` and ``date_fin`` are given
+    as ISO strings; unparsable or unknown input falls back to ``default``.
+    Ranges end today, as in the reporting pages.
+    """
+    if today is None:
+        today = date.today()
+
+    if date_debut and date_fin:
+        try:
+            return (datetime.strptime(date_debut, DATE_FORMAT_ISO).date(),
+                    datetime.strptime(date_fin, DATE_FORMAT_ISO).date())
+        except (TypeError, ValueError):
+            periode = default
+
+    if periode not in PERIODES:
+        periode = default
+
+    if periode == 'jour':
+        return today, today
+    if periode == 'semaine':
+        return today - timedelta(days=today.weekday()), today
+    if periode == 'annee':
+        return today.replace(month=1, day=1), today
+    return today.replace(day=1), today
+
+
+def date_range_filter(column, start_date: date, end_date: Optional[date] = None):
+    """SQL filter ``column >= start AND column < end`` for the inclusive day range.
+
+    Meant for DateTime columns; ``end_date=None`` only applies the lower bound.
+    """
+    start, end = date_bounds(start_date, end_date)
+    if end is None:
+        return column >= start
+    return and_(column >= start, column < end)
+
+
+def day_filter(column, target_date: Optional[date] = None):
+    """SQL filter selecting the rows of a single day on ``column``."""
+    start, end = day_bounds(target_date)
+    return and_(column >= start, column < end)
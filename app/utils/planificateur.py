@@ -0,0 +1,253 @@
+"""
+Planificateur léger de tâches périodiques
+- Tâches à intervalle fixe (secondes) ou à horaire type cron (« minute heure jour mois jour_semaine »)
+- Gigue aléatoire ajoutée à chaque échéance pour étaler la charge entre tâches et processus
+- Échéances et verrous stockés en base (tache_planifiee) : avec plusieurs workers web
+  ou un worker CLI (`flask taches worker`), une échéance n'est exécutée qu'une fois
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from flask import current_app
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.database import db
+from app.models.tache_planifiee import TachePlanifiee
+
+
+def _champ(texte: str, mini: int, maxi: int) -> FrozenSet[int]:
+    """Valeurs d'un champ cron : *, */n, a, a-b, a-b/n, a/n et listes séparées par des virgules"""
+    valeurs = set()
+    for partie in texte.split(','):
+        plage, _, pas = partie.partition('/')
+        pas = int(pas) if pas else 1
+        if plage == '*':
+            debut, fin = mini, maxi
+        elif '-' in plage:
+            debut, fin = (int(v) for v in plage.split('-', 1))
+        else:
+            debut = int(plage)
+            fin = maxi if partie != plage else debut
+        if debut < mini or fin > maxi or debut > fin or pas < 1:
+            raise ValueError(f"Champ cron invalide : {texte!r}")
+        valeurs.update(range(debut, fin + 1, pas))
+    return frozenset(valeurs)
+
+
+class Cron:
+    """
+    Expression cron à cinq champs (heure locale, résolution à la minute).
+    Jour de la semaine : 0 ou 7 = dimanche. Si le jour du mois et le jour de la
+    semaine sont tous deux restreints, l'un ou l'autre suffit (comme cron).
+    """
+
+    def __init__(self, expression: str):
+        champs = expression.split()
+        if len(champs) != 5:
+            raise ValueError(f"Expression cron invalide (5 champs attendus) : {expression!r}")
+        self.expression = expression
+        self.minutes = _champ(champs[0], 0, 59)
+        self.heures = _champ(champs[1], 0, 23)
+        self.jours = _champ(champs[2], 1, 31)
+        self.mois = _champ(champs[3], 1, 12)
+        self.jours_semaine = frozenset(j % 7 for j in _champ(champs[4], 0, 7))
+        self._jour_restreint = champs[2] != '*'
+        self._semaine_restreinte = champs[4] != '*'
+
+    def _jour_correspond(self, moment: datetime) -> bool:
+        jour = moment.day in self.jours
+        semaine = (moment.weekday() + 1) % 7 in self.jours_semaine
+        if self._jour_restreint and self._semaine_restreinte:
+            return jour or semaine
+        return jour and semaine
+
+    def prochaine(self, apres: datetime) -> datetime:
+        """Première minute strictement postérieure à ``apres`` correspondant à l'expression"""
+        moment = apres.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = apres + timedelta(days=366 * 5)
+        while moment <= limite:
+            if moment.month not in self.mois:
+                annee, mois = divmod(moment.month, 12)
+                moment = moment.replace(year=moment.year + annee, month=mois + 1, day=1, hour=0, minute=0)
+            elif not self._jour_correspond(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.heures:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Expression cron sans échéance : {self.expression!r}")
+
+    def __repr__(self):
+        return f'<Cron {self.expression}>'
+
+
+class Tache:
+    """Tâche périodique : ``fonction`` est appelée sans argument dans un contexte d'application"""
+
+    def __init__(self, nom: str, fonction: Callable[[], object], intervalle: Optional[float] = None,
+                 cron: Optional[str] = None, gigue: float = 0, duree_max: int = 600,
+                 description: str = ''):
+        if (intervalle is None) == (cron is None):
+            raise ValueError(f"Tâche {nom} : indiquer soit un intervalle, soit une expression cron")
+        self.nom = nom
+        self.fonction = fonction
+        self.intervalle = intervalle
+        self.cron = Cron(cron) if cron else None
+        self.gigue = gigue
+        self.duree_max = duree_max  # Au-delà, le verrou est considéré comme abandonné
+        self.description = description
+
+    def _gigue(self) -> timedelta:
+        return timedelta(seconds=random.uniform(0, self.gigue)) if self.gigue else timedelta(0)
+
+    def premiere(self, maintenant: datetime) -> datetime:
+        """Première échéance : immédiate (plus la gigue) pour un intervalle, prochain créneau pour un cron"""
+        if self.cron:
+            return self.prochaine(maintenant)
+        return maintenant + self._gigue()
+
+    def prochaine(self, apres: datetime) -> datetime:
+        """Échéance suivant une exécution démarrée à ``apres``"""
+        if self.cron:
+            return self.cron.prochaine(apres) + self._gigue()
+        return apres + timedelta(seconds=self.intervalle) + self._gigue()
+
+    @property
+    def planification(self) -> str:
+        return self.cron.expression if self.cron else f'toutes les {self.intervalle:g} s'
+
+
+class Planificateur(threading.Thread):
+    """
+    Exécute les tâches arrivées à échéance toutes les ``intervalle`` secondes.
+    Utilisable comme thread (start/arreter) ou au premier plan (run, executer_dues).
+    """
+
+    def __init__(self, app, taches: Iterable[Tache], intervalle: float = 30,
+                 identifiant: Optional[str] = None):
+        super().__init__(name='planificateur', daemon=True)
+        self.app = app
+        self.taches: Dict[str, Tache] = {tache.nom: tache for tache in taches}
+        self.intervalle = intervalle
+        self.identifiant = (identifiant or
+                            f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}')[:64]
+        self._initialise = False
+        self._arret = threading.Event()
+
+    def arreter(self) -> None:
+        self._arret.set()
+
+    def run(self) -> None:
+        while not self._arret.is_set():
+            with self.app.app_context():
+                try:
+                    self.executer_dues()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception("Erreur du planificateur de tâches")
+                finally:
+                    db.session.remove()
+            self._arret.wait(self.intervalle)
+
+    def initialiser(self, maintenant: Optional[datetime] = None) -> None:
+        """Crée les lignes tache_planifiee manquantes (première échéance de chaque tâche)"""
+        maintenant = maintenant or datetime.now()
+        existantes = {nom for nom, in db.session.query(TachePlanifiee.nom)}
+        for tache in self.taches.values():
+            if tache.nom not in existantes:
+                db.session.add(TachePlanifiee(nom=tache.nom, prochaine_execution=tache.premiere(maintenant)))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Un autre processus a créé les lignes en même temps
+            db.session.rollback()
+        self._initialise = True
+
+    def _reserver(self, tache: Tache, maintenant: datetime, forcer: bool) -> bool:
+        """Pose le verrou de la tâche ; False si elle n'est pas due ou déjà tenue par un autre processus"""
+        conditions = [
+            TachePlanifiee.nom == tache.nom,
+            or_(TachePlanifiee.verrou_expire_le.is_(None), TachePlanifiee.verrou_expire_le < maintenant),
+        ]
+        if not forcer:
+            conditions.append(TachePlanifiee.prochaine_execution <= maintenant)
+        resultat = db.session.execute(
+            update(TachePlanifiee).where(*conditions).values(
+                detenteur=self.identifiant,
+                verrou_expire_le=maintenant + timedelta(seconds=tache.duree_max),
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return resultat.rowcount == 1
+
+    def executer(self, nom: str, forcer: bool = True, maintenant: Optional[datetime] = None) -> Optional[bool]:
+        """
+        Exécute la tâche ``nom`` si le verrou a pu être posé (et si elle est due, sauf ``forcer``).
+        Retourne True (succès), False (échec) ou None (non exécutée).
+        """
+        tache = self.taches[nom]
+        if not self._initialise:
+            self.initialiser(maintenant)
+        debut = maintenant or datetime.now()
+        if not self._reserver(tache, debut, forcer):
+            return None
+
+        chrono = time.monotonic()
+        erreur = None
+        try:
+            tache.fonction()
+        except Exception as e:
+            db.session.rollback()
+            erreur = str(e) or e.__class__.__name__
+            current_app.logger.exception(f"Tâche planifiée {nom} en échec")
+        duree = time.monotonic() - chrono
+
+        db.session.execute(
+            update(TachePlanifiee).where(
+                TachePlanifiee.nom == nom,
+                TachePlanifiee.detenteur == self.identifiant,
+            ).values(
+                prochaine_execution=tache.prochaine(debut),
+                derniere_execution=debut,
+                derniere_duree=round(duree, 3),
+                dernier_statut='ECHEC' if erreur else 'OK',
+                derniere_erreur=erreur,
+                detenteur=None,
+                verrou_expire_le=None,
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        current_app.logger.info(f"Tâche planifiée {nom} : {'échec' if erreur else 'ok'} en {duree:.2f} s")
+        return erreur is None
+
+    def executer_dues(self, maintenant: Optional[datetime] = None) -> Dict[str, bool]:
+        """Exécute les tâches arrivées à échéance ; retourne {nom: succès} des tâches lancées"""
+        resultats = {}
+        for nom in self.taches:
+            resultat = self.executer(nom, forcer=False, maintenant=maintenant)
+            if resultat is not None:
+                resultats[nom] = resultat
+        return resultats
+
+    def get_etat(self) -> List[Dict]:
+        """État des tâches enregistrées (planification, dernière et prochaine exécution)"""
+        lignes = {ligne.nom: ligne for ligne in TachePlanifiee.query.filter(
+            TachePlanifiee.nom.in_(list(self.taches))
+        )}
+        etat = []
+        for tache in self.taches.values():
+            ligne = lignes.get(tache.nom)
+            entree = ligne.to_dict() if ligne else {'nom': tache.nom}
+            entree.update(planification=tache.planification, description=tache.description)
+            etat.append(entree)
+        return etat
@@ -0,0 +1,187 @@
+"""
+Profilage SQL par requête HTTP
+- Compte les instructions SQL et le temps passé en base pendant chaque requête
+  (événements before/after_cursor_execute du moteur SQLAlchemy)
+- En-tête Server-Timing (db, app) sur les réponses aux administrateurs si
+  SQL_PROFILER_SERVER_TIMING (désactivé par défaut en production)
+- Journalise les requêtes qui dépassent SQL_PROFILER_BUDGET_REQUETES instructions
+  ou SQL_PROFILER_BUDGET_DB_MS millisecondes en base
+- Agrège par endpoint (page admin /admin/performances) et conserve les
+  SQL_PROFILER_TOP instructions les plus lentes avec leur endpoint
+Les instructions hors requête HTTP (tâches planifiées, workers) ne sont pas comptées.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from flask import current_app, g, has_request_context, request, session
+from sqlalchemy import event
+
+from app.database import db
+
+
+LONGUEUR_MAX_SQL = 500  # Instructions tronquées dans les statistiques et les logs
+
+
+class _ProfilRequete:
+    """Mesures de la requête HTTP en cours (stockées dans flask.g)"""
+    __slots__ = ('debut', 'instructions', 'duree_db', 'plus_lente', 'duree_plus_lente')
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.instructions = 0
+        self.duree_db = 0.0
+        self.plus_lente: Optional[str] = None
+        self.duree_plus_lente = 0.0
+
+
+class ProfileurSQL:
+    """Statistiques SQL par endpoint, partagées par les threads du processus"""
+
+    def __init__(self, app=None):
+        self._verrou = threading.Lock()
+        self._compteur = itertools.count()
+        self.reinitialiser()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        self.config = app.config
+        with app.app_context():
+            for moteur in db.engines.values():
+                event.listen(moteur, 'before_cursor_execute', self._avant_instruction)
+                event.listen(moteur, 'after_cursor_execute', self._apres_instruction)
+        app.before_request(self._debut_requete)
+        app.after_request(self._fin_requete)
+        app.extensions['profileur_sql'] = self
+
+    def reinitialiser(self) -> None:
+        with self._verrou:
+            self._endpoints: Dict[str, Dict[str, Any]] = {}
+            self._lentes: List[tuple] = []  # Tas (durée, ordre, détail) des instructions les plus lentes
+            self.depuis = datetime.now()
+
+    # --- Événements SQLAlchemy -------------------------------------------
+
+    @staticmethod
+    def _avant_instruction(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and has_request_context() and '_profil_sql' in g:
+            context._profil_debut = time.perf_counter()
+
+    def _apres_instruction(self, conn, cursor, statement, parameters, context, executemany):
+        debut = getattr(context, '_profil_debut', None)
+        if debut is None:
+            return
+        duree = time.perf_counter() - debut
+        profil = g._profil_sql
+        profil.instructions += 1
+        profil.duree_db += duree
+        if duree > profil.duree_plus_lente:
+            profil.plus_lente, profil.duree_plus_lente = statement, duree
+        if duree * 1000 >= self.config.get('SQL_PROFILER_REQUETE_LENTE_MS', 100):
+            self._noter_lente(statement, duree)
+
+    def _noter_lente(self, statement: str, duree: float) -> None:
+        detail = {
+            'endpoint': request.endpoint or request.path,
+            'sql': ' '.join(statement.split())[:LONGUEUR_MAX_SQL],
+            'duree_ms': round(duree * 1000, 2),
+            'horodatage': datetime.now().isoformat(timespec='seconds'),
+        }
+        taille = self.config.get('SQL_PROFILER_TOP', 20)
+        with self._verrou:
+            element = (duree, next(self._compteur), detail)
+            if len(self._lentes) < taille:
+                heapq.heappush(self._lentes, element)
+            elif self._lentes and duree > self._lentes[0][0]:
+                heapq.heapreplace(self._lentes, element)
+
+    # --- Requêtes Flask --------------------------------------------------
+
+    @staticmethod
+    def _debut_requete():
+        g._profil_sql = _ProfilRequete()
+
+    def _fin_requete(self, response):
+        profil = g.pop('_profil_sql', None)
+        if profil is None:
+            return response
+        duree_totale = time.perf_counter() - profil.debut
+        endpoint = request.endpoint or request.path
+        self._agreger(endpoint, profil, duree_totale)
+
+        # Nombre d'instructions et temps en base : réservés aux sessions administrateur
+        if self.config.get('SQL_PROFILER_SERVER_TIMING', True) and session.get('user_role') == 'ADMIN':
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={profil.duree_db * 1000:.1f};desc="SQL ({profil.instructions})", '
+                f'app;dur={duree_totale * 1000:.1f}'
+            )
+
+        budget_instructions = self.config.get('SQL_PROFILER_BUDGET_REQUETES', 30)
+        budget_db_ms = self.config.get('SQL_PROFILER_BUDGET_DB_MS', 250)
+        if profil.instructions > budget_instructions or profil.duree_db * 1000 > budget_db_ms:
+            plus_lente = ' '.join((profil.plus_lente or '').split())[:LONGUEUR_MAX_SQL]
+            current_app.logger.warning(
+                f"Budget SQL dépassé - {request.method} {request.path} ({endpoint}) : "
+                f"{profil.instructions} instruction(s), {profil.duree_db * 1000:.1f} ms en base "
+                f"(budget {budget_instructions} / {budget_db_ms} ms) ; "
+                f"plus lente {profil.duree_plus_lente * 1000:.1f} ms : {plus_lente}"
+            )
+        return response
+
+    def _agreger(self, endpoint: str, profil: _ProfilRequete, duree_totale: float) -> None:
+        with self._verrou:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'appels': 0, 'instructions': 0, 'instructions_max': 0,
+                    'duree_db': 0.0, 'duree_db_max': 0.0, 'duree_totale': 0.0,
+                }
+            stats['appels'] += 1
+            stats['instructions'] += profil.instructions
+            stats['instructions_max'] = max(stats['instructions_max'], profil.instructions)
+            stats['duree_db'] += profil.duree_db
+            stats['duree_db_max'] = max(stats['duree_db_max'], profil.duree_db)
+            stats['duree_totale'] += duree_totale
+
+    # --- Consultation ----------------------------------------------------
+
+    def get_endpoints(self, limite: int = 20) -> List[Dict[str, Any]]:
+        """Endpoints triés par temps total passé en base (décroissant)"""
+        with self._verrou:
+            lignes = [dict(stats, endpoint=endpoint) for endpoint, stats in self._endpoints.items()]
+        lignes.sort(key=lambda s: s['duree_db'], reverse=True)
+        return [{
+            'endpoint': s['endpoint'],
+            'appels': s['appels'],
+            'instructions_moyenne': round(s['instructions'] / s['appels'], 1),
+            'instructions_max': s['instructions_max'],
+            'duree_db_ms': round(s['duree_db'] * 1000, 1),
+            'duree_db_moyenne_ms': round(s['duree_db'] * 1000 / s['appels'], 2),
+            'duree_db_max_ms': round(s['duree_db_max'] * 1000, 2),
+            'duree_moyenne_ms': round(s['duree_totale'] * 1000 / s['appels'], 2),
+        } for s in lignes[:limite]]
+
+    def get_instructions_lentes(self) -> List[Dict[str, Any]]:
+        """Instructions les plus lentes observées (décroissant)"""
+        with self._verrou:
+            lentes = sorted(self._lentes, reverse=True)
+        return [detail for _, _, detail in lentes]
+
+
+def get_profileur(app=None) -> Optional[ProfileurSQL]:
+    """Profileur de l'application (None si SQL_PROFILER_ENABLED est désactivé)"""
+    app = app or current_app._get_current_object()
+    return app.extensions.get('profileur_sql')
+
+
+def init_profileur_sql(app) -> Optional[ProfileurSQL]:
+    """Installe le profileur si SQL_PROFILER_ENABLED (appelé par create_app)"""
+    if not app.config.get('SQL_PROFILER_ENABLED', True):
+        return None
+    return app.extensions.get('profileur_sql') or ProfileurSQL(app)
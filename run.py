@@ -8,4 +8,6 @@ if __name__ == '__main__':
     # En développement local, utiliser 127.0.0.1
     host = os.environ.get('FLASK_HOST', '0.0.0.0')
     port = int(os.environ.get('FLASK_PORT', 5000))
-    app.run(host=host, port=port, debug=True)
\ No newline at end of file
+    # Serveur de développement uniquement : en production, utiliser serveur.py (gunicorn)
+    debug = os.environ.get('FLASK_DEBUG', 'true').lower() in ('1', 'true', 'yes')
+    app.run(host=host, port=port, debug=debug)
\ No newline at end of file
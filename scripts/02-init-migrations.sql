@@ -0,0 +1,17 @@
+-- Applique les migrations versionnées (scripts/migrations/) lors de l'initialisation
+-- d'une nouvelle base Docker (scripts/ est monté sur /docker-entrypoint-initdb.d).
+-- Sur une base existante, utiliser scripts/migrations/apply_migrations.sh.
+
+SOURCE /docker-entrypoint-initdb.d/migrations/001_index_trajet.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/002_index_maintenance.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/003_trajet_daily_rollup.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/004_rapport_job.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/005_audit_log.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/006_connexion_historique.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/007_notification_outbox.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/008_alert_state.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/009_tache_planifiee.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/010_notification_html.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/011_notification_digest.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/012_chauffeur_utilisateur.sql;
+SOURCE /docker-entrypoint-initdb.d/migrations/013_alert_state_cle.sql;
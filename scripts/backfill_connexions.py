@@ -0,0 +1,50 @@
+"""
+Alimente connexion_historique depuis les connexions réussies du journal d'audit.
+
+Usage (avec DATABASE_URL pointant sur la base à traiter) :
+    python scripts/backfill_connexions.py                      # depuis la table audit_log
+    python scripts/backfill_connexions.py --importer-fichiers  # importe d'abord logs/audit/*.log
+    python scripts/backfill_connexions.py --importer-fichiers --dossier /chemin/vers/logs/audit
+
+Rejouable : les connexions déjà présentes ne sont pas dupliquées.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.database import db  # noqa: E402
+from app.services.connexion_service import ConnexionService  # noqa: E402
+from app.utils.audit_store import ingest_audit_files  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--importer-fichiers', action='store_true',
+                        help="Importer les fichiers d'audit dans audit_log avant le backfill")
+    parser.add_argument('--dossier', help="Dossier des fichiers d'audit (défaut : AUDIT_LOG_DIR)")
+    args = parser.parse_args()
+
+    app = create_app(demarrer_planificateur=False)
+    dossier = args.dossier or app.config['AUDIT_LOG_DIR']
+    with app.app_context():
+        try:
+            if args.importer_fichiers:
+                importees = ingest_audit_files(dossier)
+                print(f"{importees} entrée(s) d'audit importée(s) depuis {dossier}")
+            lignes = ConnexionService.backfill_depuis_audit()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Erreur lors du backfill : {e}")
+            return 1
+
+    print(f"{lignes} connexion(s) ajoutée(s) à connexion_historique")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Compare le débit du serveur de développement (run.py) et du serveur de production (serveur.py).
+
+Usage (depuis la racine du projet, avec la configuration de l'application) :
+    python scripts/benchmark_wsgi.py                      # les deux modes, GET /
+    python scripts/benchmark_wsgi.py --mode gunicorn --chemin /login --requetes 5000 --concurrence 32
+
+Chaque mode est lancé dans un sous-processus sur un port libre, chauffé, puis
+sollicité par --concurrence clients HTTP (keep-alive) pour --requetes requêtes.
+Affiche requêtes/s, latence p50/p95 et nombre d'erreurs.
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _port_libre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _lancer(mode: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    if mode == 'dev':
+        # Configuration actuelle de run.py : Werkzeug, debug et rechargement actifs
+        env.update(FLASK_HOST='127.0.0.1', FLASK_PORT=str(port))
+        commande = [sys.executable, 'run.py']
+    else:
+        env.update(WEB_BIND=f'127.0.0.1:{port}')
+        commande = [sys.executable, 'serveur.py']
+    return subprocess.Popen(commande, cwd=RACINE, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _attendre(port: int, chemin: str, delai: float = 60) -> None:
+    fin = time.monotonic() + delai
+    while time.monotonic() < fin:
+        try:
+            connexion = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connexion.request('GET', chemin)
+            connexion.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Serveur injoignable sur le port {port}")
+
+
+def _client(port: int, chemin: str, nombre: int, latences: list, erreurs: list) -> None:
+    connexion = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    for _ in range(nombre):
+        debut = time.perf_counter()
+        try:
+            connexion.request('GET', chemin)
+            reponse = connexion.getresponse()
+            reponse.read()
+            if reponse.status >= 500:
+                erreurs.append(reponse.status)
+            if reponse.getheader('Connection', '').lower() == 'close':
+                connexion.close()
+        except (OSError, http.client.HTTPException) as e:
+            erreurs.append(e)
+            connexion.close()
+        latences.append(time.perf_counter() - debut)
+    connexion.close()
+
+
+def mesurer(mode: str, chemin: str, requetes: int, concurrence: int) -> dict:
+    port = _port_libre()
+    processus = _lancer(mode, port)
+    try:
+        _attendre(port, chemin)
+        _client(port, chemin, 50, [], [])  # Chauffe
+        latences, erreurs = [], []
+        par_client = max(requetes // concurrence, 1)
+        clients = [threading.Thread(target=_client, args=(port, chemin, par_client, latences, erreurs))
+                   for _ in range(concurrence)]
+        debut = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        duree = time.perf_counter() - debut
+    finally:
+        os.killpg(processus.pid, signal.SIGTERM)
+        processus.wait(timeout=30)
+
+    latences.sort()
+    return {
+        'mode': mode,
+        'requetes': len(latences),
+        'req_s': len(latences) / duree,
+        'p50_ms': statistics.median(latences) * 1000,
+        'p95_ms': latences[int(len(latences) * 0.95) - 1] * 1000,
+        'erreurs': len(erreurs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--mode', choices=('dev', 'gunicorn', 'tous'), default='tous')
+    parser.add_argument('--chemin', default='/')
+    parser.add_argument('--requetes', type=int, default=2000)
+    parser.add_argument('--concurrence', type=int, default=16)
+    args = parser.parse_args()
+
+    modes = ('dev', 'gunicorn') if args.mode == 'tous' else (args.mode,)
+    print(f"GET {args.chemin} - {args.requetes} requêtes, {args.concurrence} clients, {os.cpu_count()} CPU")
+    for mode in modes:
+        r = mesurer(mode, args.chemin, args.requetes, args.concurrence)
+        print(f"{r['mode']:<9} {r['req_s']:8.1f} req/s  p50 {r['p50_ms']:7.1f} ms  "
+              f"p95 {r['p95_ms']:7.1f} ms  erreurs {r['erreurs']}")
+
+
+if __name__ == '__main__':
+    main()
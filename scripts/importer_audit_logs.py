@@ -0,0 +1,48 @@
+"""
+Importe les fichiers d'audit par rôle (logs/audit/audit_*.log) dans la table audit_log.
+
+Usage (avec DATABASE_URL pointant sur la base à traiter) :
+    python scripts/importer_audit_logs.py
+    python scripts/importer_audit_logs.py --dossier /chemin/vers/logs/audit
+
+Rejouable : un nouvel import remplace le précédent, et les lignes déjà écrites
+en base par l'application (après la migration 005) ne sont pas dupliquées.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.database import db  # noqa: E402
+from app.utils.audit_store import ingest_audit_files  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dossier', help="Dossier des fichiers d'audit (défaut : AUDIT_LOG_DIR)")
+    args = parser.parse_args()
+
+    app = create_app(demarrer_planificateur=False)
+    dossier = args.dossier or app.config['AUDIT_LOG_DIR']
+    if not os.path.isdir(dossier):
+        print(f"Dossier introuvable : {dossier}")
+        return 1
+
+    with app.app_context():
+        try:
+            lignes = ingest_audit_files(dossier)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Erreur lors de l'import : {e}")
+            return 1
+
+    print(f"{lignes} entrée(s) d'audit importée(s) depuis {dossier}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+-- Migration 001 : Index composites des filtres chauds sur la table trajet
+-- Date de création : 2026-10-18
+--
+-- Les dashboards et rapports filtrent désormais sur des plages demi-ouvertes
+-- [début, fin) de date_heure_depart (voir app/utils/periodes.py) : ces index
+-- transforment les parcours complets de la table trajet en parcours de plage.
+-- Correspond aux __table_args__ de app/models/trajet.py.
+--
+-- Script idempotent : un index déjà présent n'est pas recréé.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+DELIMITER //
+CREATE PROCEDURE add_index_if_missing(IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_columns VARCHAR(255))
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM information_schema.STATISTICS
+                 WHERE TABLE_SCHEMA = DATABASE()
+                 AND TABLE_NAME = p_table
+                 AND INDEX_NAME = p_index) THEN
+    SET @sql = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, ' (', p_columns, ')');
+    PREPARE stmt FROM @sql;
+    EXECUTE stmt;
+    DEALLOCATE PREPARE stmt;
+  END IF;
+END //
+DELIMITER ;
+
+-- ========================================
+-- TRAJET
+-- ========================================
+
+-- Compteurs du jour / de la période par type de trajet (dashboards, rapports)
+CALL add_index_if_missing('trajet', 'idx_trajet_date_type', 'date_heure_depart, type_trajet');
+
+-- Présence étudiante : type_passagers = 'ETUDIANT' AND point_depart IN (...) sur une journée
+CALL add_index_if_missing('trajet', 'idx_trajet_passagers_depart_date', 'type_passagers, point_depart, date_heure_depart');
+
+-- Statistiques personnelles et performances des chauffeurs
+CALL add_index_if_missing('trajet', 'idx_trajet_chauffeur_date', 'chauffeur_id, date_heure_depart');
+
+-- Utilisation d'un bus UdM sur une période
+CALL add_index_if_missing('trajet', 'idx_trajet_bus_date', 'numero_bus_udm, date_heure_depart');
+
+-- Rapports prestataires (Noblesse, Charter...)
+CALL add_index_if_missing('trajet', 'idx_trajet_prestataire_date', 'prestataire_id, date_heure_depart');
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('001', 'Index composites trajet (date_heure_depart, type_trajet, type_passagers, chauffeur, bus, prestataire)');
+
+SELECT 'Migration 001 appliquée' AS resultat;
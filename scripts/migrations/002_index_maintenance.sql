@@ -0,0 +1,73 @@
+-- Migration 002 : Index composites panne_bus_udm, vidange et carburation
+-- Date de création : 2026-10-18
+--
+-- Couvre les recherches "dernière vidange / carburation par bus"
+-- (ORDER BY date DESC LIMIT 1), les compteurs du mois et les pannes ouvertes
+-- par criticité. Correspond aux __table_args__ de app/models/panne_bus_udm.py,
+-- app/models/vidange.py et app/models/carburation.py.
+--
+-- Les index DESC sont pris en compte par MySQL 8.0+ et MariaDB 10.8+
+-- (les versions antérieures les créent en ordre croissant, ce qui reste utilisable).
+--
+-- Script idempotent : un index déjà présent n'est pas recréé.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+DELIMITER //
+CREATE PROCEDURE add_index_if_missing(IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_columns VARCHAR(255))
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM information_schema.STATISTICS
+                 WHERE TABLE_SCHEMA = DATABASE()
+                 AND TABLE_NAME = p_table
+                 AND INDEX_NAME = p_index) THEN
+    SET @sql = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, ' (', p_columns, ')');
+    PREPARE stmt FROM @sql;
+    EXECUTE stmt;
+    DEALLOCATE PREPARE stmt;
+  END IF;
+END //
+DELIMITER ;
+
+-- ========================================
+-- PANNE_BUS_UDM
+-- ========================================
+
+-- Pannes ouvertes / critiques (resolue = 0 AND criticite = 'HAUTE')
+CALL add_index_if_missing('panne_bus_udm', 'idx_panne_resolue_criticite', 'resolue, criticite');
+
+-- Pannes ouvertes d'un bus (fiche bus, statistiques bus)
+CALL add_index_if_missing('panne_bus_udm', 'idx_panne_bus_resolue', 'bus_udm_id, resolue');
+
+-- ========================================
+-- VIDANGE
+-- ========================================
+
+-- Dernière vidange par bus
+CALL add_index_if_missing('vidange', 'idx_vidange_bus_date', 'bus_udm_id, date_vidange DESC');
+
+-- Vidanges du mois
+CALL add_index_if_missing('vidange', 'idx_vidange_date', 'date_vidange');
+
+-- ========================================
+-- CARBURATION
+-- ========================================
+
+-- Dernière carburation par bus
+CALL add_index_if_missing('carburation', 'idx_carburation_bus_date', 'bus_udm_id, date_carburation DESC');
+
+-- Carburations du mois / historique filtré par dates
+CALL add_index_if_missing('carburation', 'idx_carburation_date', 'date_carburation');
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('002', 'Index composites panne_bus_udm, vidange, carburation');
+
+SELECT 'Migration 002 appliquée' AS resultat;
@@ -0,0 +1,58 @@
+-- Migration 003 : Agrégat journalier des trajets (trajet_daily_rollup)
+-- Date de création : 2026-10-18
+--
+-- Les rapports du jour / de la semaine / du mois lisent cette table au lieu
+-- de charger tous les trajets de la période. Elle est maintenue à chaque
+-- enregistrement de trajet (app/services/rollup_service.py) ; les dimensions
+-- absentes valent '' ou 0 (et non NULL) pour que la clé unique serve d'upsert.
+-- Correspond à app/models/trajet_daily_rollup.py.
+--
+-- Le backfill est idempotent : relancer le script recalcule l'agrégat.
+-- Pour reconstruire une plage de dates : python scripts/rebuild_trajet_rollup.py
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS trajet_daily_rollup (
+  id INT(11) NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  jour DATE NOT NULL,
+  type_trajet VARCHAR(20) NOT NULL,
+  type_passagers VARCHAR(20) NOT NULL DEFAULT '',
+  point_depart VARCHAR(50) NOT NULL DEFAULT '',
+  numero_bus_udm VARCHAR(50) NOT NULL DEFAULT '',
+  chauffeur_id INT(11) NOT NULL DEFAULT 0,
+  prestataire_id INT(11) NOT NULL DEFAULT 0,
+  nombre_trajets INT(11) NOT NULL DEFAULT 0,
+  nombre_passagers INT(11) NOT NULL DEFAULT 0,
+  UNIQUE KEY uq_trajet_rollup_cle (jour, type_trajet, type_passagers, point_depart,
+                                   numero_bus_udm, chauffeur_id, prestataire_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Backfill depuis l'historique des trajets
+DELETE FROM trajet_daily_rollup;
+
+INSERT INTO trajet_daily_rollup
+  (jour, type_trajet, type_passagers, point_depart, numero_bus_udm,
+   chauffeur_id, prestataire_id, nombre_trajets, nombre_passagers)
+SELECT DATE(date_heure_depart),
+       type_trajet,
+       COALESCE(type_passagers, ''),
+       COALESCE(point_depart, ''),
+       COALESCE(numero_bus_udm, ''),
+       COALESCE(chauffeur_id, 0),
+       COALESCE(prestataire_id, 0),
+       COUNT(trajet_id),
+       COALESCE(SUM(nombre_places_occupees), 0)
+FROM trajet
+GROUP BY DATE(date_heure_depart), type_trajet, COALESCE(type_passagers, ''),
+         COALESCE(point_depart, ''), COALESCE(numero_bus_udm, ''),
+         COALESCE(chauffeur_id, 0), COALESCE(prestataire_id, 0);
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('003', 'Agrégat journalier des trajets (trajet_daily_rollup) et backfill');
+
+SELECT 'Migration 003 appliquée' AS resultat;
@@ -0,0 +1,39 @@
+-- Migration 004 : Table des rapports générés en arrière-plan (rapport_job)
+-- Date de création : 2026-10-18
+--
+-- Les exports PDF lourds sont enregistrés ici puis produits par le pool de
+-- app/services/rapport_job_service.py ; le fichier est servi depuis le dossier
+-- de cache (RAPPORT_JOBS_DIR) jusqu'à expire_le.
+-- Correspond à app/models/rapport_job.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS rapport_job (
+  id VARCHAR(32) NOT NULL PRIMARY KEY,
+  type_rapport VARCHAR(50) NOT NULL,
+  parametres TEXT NOT NULL,
+  cle VARCHAR(64) NOT NULL,
+  statut ENUM('EN_ATTENTE','EN_COURS','TERMINE','ECHEC') NOT NULL DEFAULT 'EN_ATTENTE',
+  fichier VARCHAR(255) DEFAULT NULL,
+  nom_fichier VARCHAR(255) DEFAULT NULL,
+  mimetype VARCHAR(100) DEFAULT NULL,
+  erreur TEXT DEFAULT NULL,
+  demande_par INT(11) DEFAULT NULL,
+  cree_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  termine_le DATETIME DEFAULT NULL,
+  expire_le DATETIME DEFAULT NULL,
+  KEY idx_rapport_job_cle_statut (cle, statut),
+  KEY idx_rapport_job_expire (expire_le)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('004', 'Table rapport_job (rapports PDF générés en arrière-plan)');
+
+SELECT 'Migration 004 appliquée' AS resultat;
@@ -0,0 +1,43 @@
+-- Migration 005 : Journal d'audit structuré (audit_log)
+-- Date de création : 2026-10-18
+--
+-- Les actions critiques sont insérées par lots par app/utils/audit_store.py ;
+-- les consultations (logs, statistiques par rôle, alertes) s'appuient sur les
+-- index (colonne, horodatage) au lieu de relire logs/audit/*.log.
+-- Historique des fichiers : python scripts/importer_audit_logs.py
+-- Correspond à app/models/audit_log.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS audit_log (
+  id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  horodatage DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  utilisateur VARCHAR(100) NOT NULL DEFAULT 'SYSTEM',
+  role VARCHAR(20) NOT NULL DEFAULT 'UNKNOWN',
+  action VARCHAR(50) NOT NULL,
+  niveau VARCHAR(10) NOT NULL,
+  succes TINYINT(1) NOT NULL DEFAULT 1,
+  ip VARCHAR(45) DEFAULT NULL,
+  ressource VARCHAR(50) DEFAULT NULL,
+  ressource_id VARCHAR(100) DEFAULT NULL,
+  details TEXT DEFAULT NULL,
+  erreur TEXT DEFAULT NULL,
+  source VARCHAR(10) NOT NULL DEFAULT 'app',
+  KEY idx_audit_log_horodatage (horodatage),
+  KEY idx_audit_log_role (role, horodatage),
+  KEY idx_audit_log_action (action, horodatage),
+  KEY idx_audit_log_niveau (niveau, horodatage),
+  KEY idx_audit_log_utilisateur (utilisateur, horodatage)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('005', 'Table audit_log (journal d''audit structuré et indexé)');
+
+SELECT 'Migration 005 appliquée' AS resultat;
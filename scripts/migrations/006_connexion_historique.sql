@@ -0,0 +1,55 @@
+-- Migration 006 : Suivi des connexions (connexion_historique)
+-- Date de création : 2026-10-18
+--
+-- La table existait dans le schéma initial sans être alimentée. Elle est
+-- désormais écrite à chaque authentification (app/services/connexion_service.py)
+-- et la liste des utilisateurs lit la dernière connexion via l'index
+-- (utilisateur_id, date_connexion).
+-- Historique : python scripts/backfill_connexions.py (depuis le journal d'audit).
+-- Correspond à app/models/connexion_historique.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Bases créées sans le schéma initial complet
+CREATE TABLE IF NOT EXISTS connexion_historique (
+  log_id INT(11) NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  utilisateur_id INT(11) NOT NULL,
+  date_connexion DATETIME NOT NULL,
+  ip_adresse VARCHAR(45) NOT NULL,
+  KEY utilisateur_id (utilisateur_id),
+  CONSTRAINT connexion_historique_ibfk_1 FOREIGN KEY (utilisateur_id) REFERENCES utilisateur (utilisateur_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+DELIMITER //
+CREATE PROCEDURE add_index_if_missing(IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_columns VARCHAR(255))
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM information_schema.STATISTICS
+                 WHERE TABLE_SCHEMA = DATABASE()
+                 AND TABLE_NAME = p_table
+                 AND INDEX_NAME = p_index) THEN
+    SET @sql = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, ' (', p_columns, ')');
+    PREPARE stmt FROM @sql;
+    EXECUTE stmt;
+    DEALLOCATE PREPARE stmt;
+  END IF;
+END //
+DELIMITER ;
+
+-- Dernière connexion par utilisateur (MAX(date_connexion) GROUP BY utilisateur_id)
+CALL add_index_if_missing('connexion_historique', 'idx_connexion_utilisateur_date', 'utilisateur_id, date_connexion');
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('006', 'Suivi des connexions (index connexion_historique)');
+
+SELECT 'Migration 006 appliquée' AS resultat;
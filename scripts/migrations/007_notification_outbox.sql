@@ -0,0 +1,38 @@
+-- Migration 007 : File d'envoi des notifications email (notification_outbox)
+-- Date de création : 2026-10-18
+--
+-- Les notifications ne sont plus envoyées pendant la requête : elles sont
+-- enregistrées ici puis livrées par le worker de app/services/outbox_service.py
+-- (ou python scripts/outbox_worker.py), avec nouvelles tentatives espacées.
+-- Correspond à app/models/notification_outbox.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+  id INT(11) NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  type_notification VARCHAR(50) NOT NULL,
+  destinataire VARCHAR(255) NOT NULL,
+  sujet VARCHAR(255) NOT NULL,
+  corps TEXT NOT NULL,
+  statut ENUM('EN_ATTENTE','EN_COURS','ENVOYE','ECHEC_DEFINITIF') NOT NULL DEFAULT 'EN_ATTENTE',
+  tentatives INT(11) NOT NULL DEFAULT 0,
+  prochaine_tentative DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  verrou VARCHAR(32) DEFAULT NULL,
+  derniere_erreur TEXT DEFAULT NULL,
+  cree_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  envoye_le DATETIME DEFAULT NULL,
+  KEY idx_outbox_statut_echeance (statut, prochaine_tentative),
+  KEY idx_outbox_verrou (verrou)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('007', 'Table notification_outbox (file d''envoi des notifications)');
+
+SELECT 'Migration 007 appliquée' AS resultat;
@@ -0,0 +1,34 @@
+-- Migration 008 : État de déduplication des alertes de seuil (alert_state)
+-- Date de création : 2026-10-18
+--
+-- AlertService enregistre ici le dernier niveau notifié par bus (vidange,
+-- carburant) et par document (expiration) : une vérification répétée ne
+-- renvoie pas d'email tant que le niveau n'a pas changé. L'état est supprimé
+-- après une vidange, un plein ou le renouvellement d'un document.
+-- Correspond à app/models/alert_state.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS alert_state (
+  id INT(11) NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  bus_udm_id INT(11) NOT NULL,
+  type_alerte ENUM('VIDANGE','CARBURANT','DOCUMENT') NOT NULL,
+  reference VARCHAR(50) NOT NULL DEFAULT '',
+  niveau INT(11) NOT NULL,
+  valeur FLOAT DEFAULT NULL,
+  notifie_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_alert_state_cle (bus_udm_id, type_alerte, reference),
+  CONSTRAINT alert_state_ibfk_1 FOREIGN KEY (bus_udm_id) REFERENCES bus_udm (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('008', 'Table alert_state (déduplication des alertes de seuil)');
+
+SELECT 'Migration 008 appliquée' AS resultat;
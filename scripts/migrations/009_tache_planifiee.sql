@@ -0,0 +1,37 @@
+-- Migration 009 : Planificateur de tâches périodiques (tache_planifiee) et alertes de permis
+-- Date de création : 2026-10-18
+--
+-- tache_planifiee conserve l'échéance et le verrou de chaque tâche périodique :
+-- avec plusieurs workers, une échéance n'est exécutée que par le processus
+-- ayant posé le verrou. alert_state accepte désormais les alertes d'expiration
+-- de permis, rattachées à un chauffeur (reference) et non à un bus.
+-- Correspond à app/models/tache_planifiee.py et app/models/alert_state.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS tache_planifiee (
+  nom VARCHAR(50) NOT NULL PRIMARY KEY,
+  prochaine_execution DATETIME NOT NULL,
+  derniere_execution DATETIME DEFAULT NULL,
+  derniere_duree FLOAT DEFAULT NULL,
+  dernier_statut VARCHAR(10) DEFAULT NULL,
+  derniere_erreur TEXT DEFAULT NULL,
+  detenteur VARCHAR(64) DEFAULT NULL,
+  verrou_expire_le DATETIME DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+ALTER TABLE alert_state
+  MODIFY bus_udm_id INT(11) DEFAULT NULL,
+  MODIFY type_alerte ENUM('VIDANGE','CARBURANT','DOCUMENT','PERMIS') NOT NULL;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('009', 'Table tache_planifiee (planificateur) et alertes de permis');
+
+SELECT 'Migration 009 appliquée' AS resultat;
@@ -0,0 +1,42 @@
+-- Migration 010 : Partie HTML des notifications en file d'envoi (notification_outbox.corps_html)
+-- Date de création : 2026-10-18
+--
+-- Les notifications sont rendues depuis app/templates/emails en texte et en
+-- HTML ; le worker les envoie en multipart/alternative. La colonne est
+-- facultative : les messages déjà en file restent envoyés en texte seul.
+-- Correspond à app/models/notification_outbox.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+DROP PROCEDURE IF EXISTS add_column_if_missing;
+
+DELIMITER //
+CREATE PROCEDURE add_column_if_missing(IN p_table VARCHAR(64), IN p_column VARCHAR(64), IN p_definition VARCHAR(255))
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM information_schema.COLUMNS
+                 WHERE TABLE_SCHEMA = DATABASE()
+                 AND TABLE_NAME = p_table
+                 AND COLUMN_NAME = p_column) THEN
+    SET @sql = CONCAT('ALTER TABLE ', p_table, ' ADD COLUMN ', p_column, ' ', p_definition);
+    PREPARE stmt FROM @sql;
+    EXECUTE stmt;
+    DEALLOCATE PREPARE stmt;
+  END IF;
+END //
+DELIMITER ;
+
+CALL add_column_if_missing('notification_outbox', 'corps_html', 'TEXT DEFAULT NULL AFTER corps');
+
+DROP PROCEDURE IF EXISTS add_column_if_missing;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('010', 'Colonne notification_outbox.corps_html (emails multipart)');
+
+SELECT 'Migration 010 appliquée' AS resultat;
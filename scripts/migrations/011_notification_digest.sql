@@ -0,0 +1,32 @@
+-- Migration 011 : Alertes en attente de récapitulatif (notification_digest)
+-- Date de création : 2026-10-18
+--
+-- En mode récapitulatif (NOTIFICATION_DIGEST_ENABLED), les alertes sont mises
+-- de côté par destinataire puis envoyées en un seul email à la fin de la
+-- fenêtre NOTIFICATION_DIGEST_FENETRE (tâche planifiée digest_notifications).
+-- Correspond à app/models/notification_digest.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS notification_digest (
+  id INT(11) NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  destinataire VARCHAR(255) NOT NULL,
+  type_notification VARCHAR(50) NOT NULL,
+  sujet VARCHAR(255) NOT NULL,
+  bus_udm_id INT(11) DEFAULT NULL,
+  cree_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  KEY idx_digest_destinataire_cree (destinataire, cree_le),
+  CONSTRAINT notification_digest_ibfk_1 FOREIGN KEY (bus_udm_id) REFERENCES bus_udm (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('011', 'Table notification_digest (récapitulatif des alertes)');
+
+SELECT 'Migration 011 appliquée' AS resultat;
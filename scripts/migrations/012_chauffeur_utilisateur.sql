@@ -0,0 +1,87 @@
+-- Migration 012 : Lien direct chauffeur -> utilisateur (chauffeur.utilisateur_id)
+-- Date de création : 2026-10-18
+--
+-- Les pages chauffeur retrouvaient la fiche du chauffeur connecté par nom et
+-- prénom (colonnes non indexées) à chaque affichage. La colonne est renseignée
+-- ici par correspondance nom/prénom avec les comptes de rôle CHAUFFEUR ; un nom
+-- porté par plusieurs comptes n'est pas lié (l'application fait le lien à la
+-- première connexion, voir app/services/chauffeur_service.py).
+-- Correspond à app/models/chauffeur.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+DROP PROCEDURE IF EXISTS add_column_if_missing;
+DROP PROCEDURE IF EXISTS add_constraint_if_missing;
+
+DELIMITER //
+CREATE PROCEDURE add_column_if_missing(IN p_table VARCHAR(64), IN p_column VARCHAR(64), IN p_definition VARCHAR(255))
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM information_schema.COLUMNS
+                 WHERE TABLE_SCHEMA = DATABASE()
+                 AND TABLE_NAME = p_table
+                 AND COLUMN_NAME = p_column) THEN
+    SET @sql = CONCAT('ALTER TABLE ', p_table, ' ADD COLUMN ', p_column, ' ', p_definition);
+    PREPARE stmt FROM @sql;
+    EXECUTE stmt;
+    DEALLOCATE PREPARE stmt;
+  END IF;
+END //
+
+CREATE PROCEDURE add_constraint_if_missing(IN p_table VARCHAR(64), IN p_constraint VARCHAR(64), IN p_definition VARCHAR(255))
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM information_schema.TABLE_CONSTRAINTS
+                 WHERE TABLE_SCHEMA = DATABASE()
+                 AND TABLE_NAME = p_table
+                 AND CONSTRAINT_NAME = p_constraint) THEN
+    SET @sql = CONCAT('ALTER TABLE ', p_table, ' ADD CONSTRAINT ', p_constraint, ' ', p_definition);
+    PREPARE stmt FROM @sql;
+    EXECUTE stmt;
+    DEALLOCATE PREPARE stmt;
+  END IF;
+END //
+DELIMITER ;
+
+CALL add_column_if_missing('chauffeur', 'utilisateur_id', 'INT(11) DEFAULT NULL AFTER date_expiration_permis');
+
+-- Reprise : premier chauffeur portant le nom d'un compte CHAUFFEUR unique
+UPDATE chauffeur c
+JOIN (
+  SELECT MIN(ch.chauffeur_id) AS chauffeur_id, MIN(u.utilisateur_id) AS utilisateur_id
+  FROM utilisateur u
+  JOIN chauffeur ch ON ch.nom = u.nom AND ch.prenom = u.prenom
+  WHERE u.role = 'CHAUFFEUR'
+  GROUP BY u.nom, u.prenom
+  HAVING COUNT(DISTINCT u.utilisateur_id) = 1
+) lien ON lien.chauffeur_id = c.chauffeur_id
+SET c.utilisateur_id = lien.utilisateur_id
+WHERE c.utilisateur_id IS NULL
+  AND lien.utilisateur_id NOT IN (
+    SELECT utilisateur_id FROM (
+      SELECT utilisateur_id FROM chauffeur WHERE utilisateur_id IS NOT NULL
+    ) deja_lies
+  );
+
+CALL add_constraint_if_missing('chauffeur', 'uq_chauffeur_utilisateur', 'UNIQUE (utilisateur_id)');
+CALL add_constraint_if_missing('chauffeur', 'fk_chauffeur_utilisateur',
+  'FOREIGN KEY (utilisateur_id) REFERENCES utilisateur (utilisateur_id) ON DELETE SET NULL');
+
+DROP PROCEDURE IF EXISTS add_column_if_missing;
+DROP PROCEDURE IF EXISTS add_constraint_if_missing;
+
+-- Comptes CHAUFFEUR restés sans fiche liée (homonymes ou fiche absente)
+SELECT u.utilisateur_id, u.login, u.nom, u.prenom
+FROM utilisateur u
+LEFT JOIN chauffeur c ON c.utilisateur_id = u.utilisateur_id
+WHERE u.role = 'CHAUFFEUR' AND c.chauffeur_id IS NULL;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('012', 'Colonne chauffeur.utilisateur_id (lien direct au compte utilisateur)');
+
+SELECT 'Migration 012 appliquée' AS resultat;
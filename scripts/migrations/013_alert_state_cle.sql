@@ -0,0 +1,88 @@
+-- Migration 013 : Unicité des alertes de permis (alert_state.bus_cle)
+-- Date de création : 2026-10-18
+--
+-- Les alertes PERMIS (migration 009) n'ont pas de bus : bus_udm_id est NULL,
+-- et deux NULL ne sont jamais égaux dans un index unique. La clé
+-- uq_alert_state_cle porte désormais sur la colonne bus_cle (bus_udm_id,
+-- 0 sans bus, renseignée par l'application ; une colonne générée est exclue
+-- par la clé étrangère ON DELETE CASCADE de bus_udm_id) ; les doublons de permis déjà enregistrés sont
+-- réduits à la ligne la plus récente.
+-- Correspond à app/models/alert_state.py.
+--
+-- Script idempotent.
+-- ATTENTION: Effectuez une sauvegarde (scripts/backup_avant_migration.sh) avant d'exécuter ce script !
+
+CREATE TABLE IF NOT EXISTS schema_migration (
+  version VARCHAR(10) NOT NULL PRIMARY KEY,
+  description VARCHAR(255) NOT NULL,
+  applique_le DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+DROP PROCEDURE IF EXISTS add_column_if_missing;
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+DELIMITER //
+CREATE PROCEDURE add_column_if_missing(IN p_table VARCHAR(64), IN p_column VARCHAR(64), IN p_definition VARCHAR(255))
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM information_schema.COLUMNS
+                 WHERE TABLE_SCHEMA = DATABASE()
+                 AND TABLE_NAME = p_table
+                 AND COLUMN_NAME = p_column) THEN
+    SET @sql = CONCAT('ALTER TABLE ', p_table, ' ADD COLUMN ', p_column, ' ', p_definition);
+    PREPARE stmt FROM @sql;
+    EXECUTE stmt;
+    DEALLOCATE PREPARE stmt;
+  END IF;
+END //
+
+CREATE PROCEDURE add_index_if_missing(IN p_table VARCHAR(64), IN p_index VARCHAR(64), IN p_definition VARCHAR(255))
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM information_schema.STATISTICS
+                 WHERE TABLE_SCHEMA = DATABASE()
+                 AND TABLE_NAME = p_table
+                 AND INDEX_NAME = p_index) THEN
+    SET @sql = CONCAT('ALTER TABLE ', p_table, ' ADD ', p_definition);
+    PREPARE stmt FROM @sql;
+    EXECUTE stmt;
+    DEALLOCATE PREPARE stmt;
+  END IF;
+END //
+DELIMITER ;
+
+-- Doublons de permis : on garde la ligne la plus récente de chaque chauffeur
+DELETE a FROM alert_state a
+JOIN alert_state b
+  ON b.type_alerte = a.type_alerte
+ AND b.reference = a.reference
+ AND b.bus_udm_id IS NULL
+ AND b.id > a.id
+WHERE a.bus_udm_id IS NULL;
+
+CALL add_column_if_missing('alert_state', 'bus_cle', 'INT(11) NOT NULL DEFAULT 0 AFTER bus_udm_id');
+UPDATE alert_state SET bus_cle = COALESCE(bus_udm_id, 0) WHERE bus_cle <> COALESCE(bus_udm_id, 0);
+
+-- Index de la clé étrangère avant de retirer l'ancienne clé (bus_udm_id, ...)
+CALL add_index_if_missing('alert_state', 'idx_alert_state_bus', 'INDEX idx_alert_state_bus (bus_udm_id)');
+
+-- Ancienne clé sur bus_udm_id : remplacée si elle ne porte pas encore sur bus_cle
+SET @ancienne_cle = (SELECT COUNT(*) FROM information_schema.STATISTICS
+                     WHERE TABLE_SCHEMA = DATABASE()
+                     AND TABLE_NAME = 'alert_state'
+                     AND INDEX_NAME = 'uq_alert_state_cle'
+                     AND SEQ_IN_INDEX = 1
+                     AND COLUMN_NAME = 'bus_udm_id');
+SET @sql = IF(@ancienne_cle > 0, 'ALTER TABLE alert_state DROP INDEX uq_alert_state_cle', 'SELECT 1');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+CALL add_index_if_missing('alert_state', 'uq_alert_state_cle',
+  'UNIQUE KEY uq_alert_state_cle (bus_cle, type_alerte, reference)');
+
+DROP PROCEDURE IF EXISTS add_column_if_missing;
+DROP PROCEDURE IF EXISTS add_index_if_missing;
+
+INSERT IGNORE INTO schema_migration (version, description)
+VALUES ('013', 'Colonne alert_state.bus_cle (unicité des alertes de permis)');
+
+SELECT 'Migration 013 appliquée' AS resultat;
@@ -0,0 +1,34 @@
+#!/bin/bash
+# Applique, dans l'ordre, les migrations versionnées de scripts/migrations/
+# non encore enregistrées dans la table schema_migration.
+#
+# Usage: scripts/migrations/apply_migrations.sh <utilisateur_mysql> <base>
+# Pensez à lancer scripts/backup_avant_migration.sh au préalable.
+
+set -e
+
+DB_USER="${1:?Utilisateur MySQL requis}"
+DB_NAME="${2:?Nom de la base requis}"
+MIGRATIONS_DIR="$(cd "$(dirname "$0")" && pwd)"
+
+read -s -p "Mot de passe MySQL pour $DB_USER: " MYSQL_PWD
+echo
+export MYSQL_PWD
+
+# Versions déjà appliquées (la table peut ne pas encore exister)
+APPLIQUEES=$(mysql -u "$DB_USER" -N -B "$DB_NAME" \
+    -e "SELECT version FROM schema_migration" 2>/dev/null || true)
+
+for FICHIER in "$MIGRATIONS_DIR"/[0-9][0-9][0-9]_*.sql; do
+    VERSION=$(basename "$FICHIER" | cut -d_ -f1)
+    if echo "$APPLIQUEES" | grep -qx "$VERSION"; then
+        echo "Migration $VERSION déjà appliquée, ignorée"
+        continue
+    fi
+    echo "Application de la migration $VERSION ($(basename "$FICHIER"))"
+    mysql -u "$DB_USER" "$DB_NAME" < "$FICHIER"
+done
+
+echo
+echo "Vérification des plans d'exécution des requêtes chaudes:"
+echo "  python scripts/verifier_index.py"
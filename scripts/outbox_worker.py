@@ -0,0 +1,63 @@
+"""
+Livre les notifications en attente dans la file notification_outbox.
+
+Usage (avec DATABASE_URL et la configuration SMTP de l'application) :
+    python scripts/outbox_worker.py            # boucle continue (NOTIFICATION_OUTBOX_POLL)
+    python scripts/outbox_worker.py --once     # un seul passage (cron)
+
+À utiliser avec NOTIFICATION_OUTBOX_WORKER=false lorsque la livraison doit
+tourner dans un processus séparé de l'application web.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.database import db  # noqa: E402
+from app.services.outbox_service import OutboxService  # noqa: E402
+
+
+def _passage() -> dict:
+    total = {'envoyes': 0, 'echecs': 0, 'abandonnes': 0}
+    while True:
+        resultat = OutboxService.traiter_lot()
+        for cle, valeur in resultat.items():
+            total[cle] += valeur
+        if not any(resultat.values()):
+            return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--once', action='store_true', help='Un seul passage puis arrêt')
+    args = parser.parse_args()
+
+    app = create_app(demarrer_planificateur=False)
+    with app.app_context():
+        intervalle = app.config['NOTIFICATION_OUTBOX_POLL']
+        while True:
+            try:
+                total = _passage()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Erreur lors de la livraison : {e}")
+                if args.once:
+                    return 1
+                total = None
+            if total and any(total.values()):
+                print(f"{total['envoyes']} envoyé(s), {total['echecs']} à retenter, "
+                      f"{total['abandonnes']} abandonné(s)")
+            if args.once:
+                return 0
+            try:
+                time.sleep(intervalle)
+            except KeyboardInterrupt:
+                return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Reconstruit l'agrégat journalier trajet_daily_rollup depuis la table trajet.
+
+Usage (avec DATABASE_URL pointant sur la base à traiter) :
+    python scripts/rebuild_trajet_rollup.py                      # tout l'historique
+    python scripts/rebuild_trajet_rollup.py --debut 2025-03-01 --fin 2025-03-31
+
+À lancer après une correction manuelle de trajets en base : seules les
+journées de la plage demandée sont recalculées.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.database import db  # noqa: E402
+from app.services.rollup_service import TrajetRollupService  # noqa: E402
+
+
+def _date(value: str):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--debut', type=_date, help='Première journée à reconstruire (AAAA-MM-JJ)')
+    parser.add_argument('--fin', type=_date, help='Dernière journée à reconstruire (AAAA-MM-JJ)')
+    args = parser.parse_args()
+
+    app = create_app(demarrer_planificateur=False)
+    with app.app_context():
+        try:
+            lignes = TrajetRollupService.reconstruire(args.debut, args.fin)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Erreur lors de la reconstruction : {e}")
+            return 1
+
+    print(f"{lignes} ligne(s) d'agrégat reconstruite(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Vérifie via EXPLAIN que les requêtes chaudes utilisent toujours leur index.
+
+Usage (avec DATABASE_URL pointant sur la base à contrôler) :
+    python scripts/verifier_index.py
+
+Code de sortie 1 si au moins une requête n'utilise plus l'index attendu
+(index manquant : appliquer scripts/migrations/, ou requête modifiée).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.utils.index_check import check_hot_queries  # noqa: E402
+
+
+def main() -> int:
+    app = create_app(demarrer_planificateur=False)
+    with app.app_context():
+        report = check_hot_queries()
+
+    for entry in report:
+        statut = 'OK   ' if entry['ok'] else 'ECHEC'
+        utilises = ', '.join(entry['used']) or 'aucun'
+        print(f"{statut} {entry['name']}: attendu {entry['index']}, utilisé(s): {utilises}")
+
+    echecs = [entry for entry in report if not entry['ok']]
+    if echecs:
+        print(f"\n{len(echecs)} requête(s) n'utilisent plus leur index")
+        return 1
+    print(f"\n{len(report)} requêtes chaudes utilisent leur index")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
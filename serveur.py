@@ -0,0 +1,95 @@
+"""
+Serveur WSGI de production : gunicorn, workers préforkés (gthread)
+    python serveur.py
+run.py reste réservé au développement (serveur Werkzeug, un seul processus).
+
+Configuration (voir Config) :
+- WEB_BIND (0.0.0.0:5000), WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT, WEB_MAX_REQUESTS
+- WEB_PRELOAD : create_app est exécuté une seule fois dans le processus maître avant
+  le fork. Après le fork, chaque worker abandonne les connexions héritées du maître
+  et démarre son propre planificateur (verrou en base : une seule exécution par tâche).
+- Pool SQLAlchemy de chaque worker : DB_POOL_SIZE, dérivé de WEB_WORKERS, WEB_THREADS
+  et DB_MAX_CONNEXIONS (voir taille_pool)
+
+Rechargement gracieux : `kill -HUP <pid du maître>` démarre de nouveaux workers puis
+arrête les anciens une fois leurs requêtes terminées (WEB_GRACEFUL_TIMEOUT). Avec
+WEB_PRELOAD, le code déjà chargé par le maître est conservé : pour déployer une
+nouvelle version sans coupure, `kill -USR2` (nouveau maître) puis `kill -TERM` sur l'ancien.
+
+Mesures de débit : scripts/benchmark_wsgi.py
+"""
+
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from app.config import Config
+
+
+def preparer_worker(app) -> None:
+    """Worker forké depuis un maître préchargé : pool neuf et threads propres au processus"""
+    from app.database import db
+    from app.utils.metriques import instrumenter_pools
+
+    with app.app_context():
+        for moteur in db.engines.values():
+            # Connexions ouvertes par le maître : ni réutilisées ni fermées par ce worker
+            moteur.dispose(close=False)
+    if app.extensions.get('metriques'):
+        instrumenter_pools(app)
+    if app.config.get('SCHEDULER_ENABLED'):
+        from app.services.planification_service import PlanificationService
+        app.extensions.pop('planificateur', None)
+        PlanificationService.demarrer(app)
+    if app.config.get('NOTIFICATION_OUTBOX_WORKER'):
+        from app.services.outbox_service import OutboxService
+        OutboxService.get_worker(app=app)
+
+
+def _apres_fork(server, worker) -> None:
+    app = getattr(server.app, 'callable', None)
+    if app is not None:  # None sans préchargement : l'application est créée dans le worker
+        preparer_worker(app)
+
+
+def options_gunicorn(config=Config) -> dict:
+    return {
+        'bind': os.environ.get('WEB_BIND', '0.0.0.0:5000'),
+        'workers': config.WEB_WORKERS,
+        'worker_class': 'gthread',
+        'threads': config.WEB_THREADS,
+        'preload_app': config.WEB_PRELOAD,
+        'timeout': config.WEB_TIMEOUT,
+        'graceful_timeout': config.WEB_GRACEFUL_TIMEOUT,
+        'max_requests': config.WEB_MAX_REQUESTS,
+        'max_requests_jitter': config.WEB_MAX_REQUESTS // 10,
+        'keepalive': 5,
+        'accesslog': '-',
+        'errorlog': '-',
+        'post_fork': _apres_fork,
+    }
+
+
+class ServeurWSGI(BaseApplication):
+    """Application gunicorn configurée depuis Config (sans fichier de configuration)"""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for cle, valeur in self.options.items():
+            self.cfg.set(cle, valeur)
+
+    def load(self):
+        from app import create_app
+        # Préchargé dans le maître : le planificateur est démarré après le fork (preparer_worker)
+        return create_app(demarrer_planificateur=not self.cfg.preload_app)
+
+
+def main() -> None:
+    ServeurWSGI(options_gunicorn()).run()
+
+
+if __name__ == '__main__':
+    main()
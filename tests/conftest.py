@@ -5,6 +5,7 @@ Utilise create_app() pour maximiser le coverage.
 import pytest
 import os
 import sys
+import tempfile
 
 # Définir les variables d'environnement AVANT tout import
 os.environ['FLASK_ENV'] = 'testing'
@@ -27,6 +28,17 @@ def app():
     Config.SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     Config.WTF_CSRF_ENABLED = False
     Config.TESTING = True
+    # Rapports en arrière-plan exécutés immédiatement, fichiers hors du dépôt
+    Config.RAPPORT_JOBS_WORKERS = 0
+    Config.RAPPORT_JOBS_DIR = os.path.join(tempfile.gettempdir(), 'transport_udm_rapports_tests')
+    # Journal d'audit : pas de thread d'écriture, le tampon est vidé à la lecture
+    Config.AUDIT_FLUSH_INTERVAL = 0
+    # Fichiers d'audit par rôle hors du dépôt
+    Config.AUDIT_LOG_DIR = os.path.join(tempfile.gettempdir(), 'transport_udm_audit_tests')
+    # File d'envoi des notifications : pas de worker, livraison via OutboxService.traiter_lot()
+    Config.NOTIFICATION_OUTBOX_WORKER = False
+    # Planificateur : pas de thread, tâches lancées explicitement
+    Config.SCHEDULER_ENABLED = False
     
     from app import create_app
     from app.extensions import db
@@ -51,6 +63,14 @@ def app():
     import app.models.document_bus_udm  # noqa: F401
     import app.models.fuel_alert_state  # noqa: F401
     import app.models.vidange  # noqa: F401
+    import app.models.trajet_daily_rollup  # noqa: F401
+    import app.models.rapport_job  # noqa: F401
+    import app.models.audit_log  # noqa: F401
+    import app.models.connexion_historique  # noqa: F401
+    import app.models.notification_outbox  # noqa: F401
+    import app.models.notification_digest  # noqa: F401
+    import app.models.alert_state  # noqa: F401
+    import app.models.tache_planifiee  # noqa: F401
 
     flask_app = create_app()
     flask_app.config.update({
@@ -62,6 +82,11 @@ def app():
     with flask_app.app_context():
         db.create_all()
         yield flask_app
+        # Vider le tampon d'audit tant que la base existe encore
+        audit_store = flask_app.extensions.get('audit_store')
+        if audit_store:
+            audit_store.flush()
+        flask_app.extensions['journaux_audit'].fermer()
         db.session.remove()
         db.drop_all()
 
@@ -141,6 +166,36 @@ def sample_bus(app):
     return bus
 
 
+@pytest.fixture
+def flotte(app):
+    """Bus avec vidange, carburant et document proches des seuils, et destinataires des alertes."""
+    from datetime import date, timedelta
+    from app.extensions import db
+    from app.models.bus_udm import BusUdM
+    from app.models.document_bus_udm import DocumentBusUdM
+    from app.models.utilisateur import Utilisateur
+    from app.models.vidange import Vidange
+
+    for role in ('RESPONSABLE', 'SUPERVISEUR'):
+        u = Utilisateur(nom='N', prenom='P', login=f'alerte_{role.lower()}',
+                        email=f'alerte_{role.lower()}@t.com', telephone='000', role=role)
+        u.set_password('x')
+        db.session.add(u)
+    bus = BusUdM(numero='BUS_ET', immatriculation='ET-1', nombre_places=20, numero_chassis='CH_ET',
+                 etat_vehicule='BON', kilometrage=16000, capacite_reservoir_litres=100.0,
+                 niveau_carburant_litres=15.0)
+    db.session.add(bus)
+    db.session.commit()
+    db.session.add(Vidange(bus_udm_id=bus.id, date_vidange=date.today() - timedelta(days=90),
+                           kilometrage=10000, type_huile='QUARTZ'))
+    document = DocumentBusUdM(numero_bus_udm=bus.numero, type_document='ASSURANCE_VIGNETTE',
+                              date_debut=date.today() - timedelta(days=340),
+                              date_expiration=date.today() + timedelta(days=25))
+    db.session.add(document)
+    db.session.commit()
+    return bus, document
+
+
 @pytest.fixture
 def authenticated_client(client, sample_user, app):
     """Client authentifié."""
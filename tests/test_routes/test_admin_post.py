@@ -258,6 +258,22 @@ class TestAdminNotificationsPOST:
         _safe(c, 'post', f'/admin/notifications/force_check_bus/{d["bus"].id}')
         _safe(c, 'post', '/admin/notifications/force_check_bus/99999')
     
+    def test_outbox_status_and_retry(self, admin_setup):
+        from app.models.notification_outbox import NotificationOutbox
+        c, _ = admin_setup
+        message = NotificationOutbox(type_notification='panne', destinataire='x@t.com', sujet='S',
+                                     corps='C', statut='ECHEC_DEFINITIF', tentatives=6,
+                                     derniere_erreur='550 No such user')
+        db.session.add(message)
+        db.session.commit()
+
+        data = c.get('/admin/notifications/outbox').get_json()
+        assert data['echecs_definitifs'] == 1 and data['echecs'][0]['destinataire'] == 'x@t.com'
+        assert c.get('/admin/notifications').status_code == 200
+        assert c.post(f'/admin/notifications/outbox/{message.id}/relancer').status_code == 200
+        assert c.post(f'/admin/notifications/outbox/{message.id}/relancer').status_code == 404
+        assert c.get('/admin/notifications/outbox').get_json()['en_attente'] == 1
+
     def test_settings_post(self, admin_setup):
         c, _ = admin_setup
         _safe(c, 'post', '/admin/notifications/settings', data={
@@ -27,9 +27,10 @@ class _DummyUser(UserMixin):
 
 
 @pytest.fixture
-def mini_app():
+def mini_app(tmp_path):
     """Minimal Flask app with login manager and stub auth.login route."""
     app = Flask(__name__)
+    app.config['AUDIT_LOG_DIR'] = str(tmp_path / 'audit')
     app.config['SECRET_KEY'] = 'test-secret'
     app.config['TESTING'] = True
     app.config['WTF_CSRF_ENABLED'] = False
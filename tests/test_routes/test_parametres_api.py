@@ -79,10 +79,28 @@ class TestAuditAPIs:
     def test_critical_alerts(self, admin_client):
         _safe_get(admin_client, '/admin/api/audit/alerts')
 
+    def test_logs_and_alerts_from_audit_table(self, admin_client):
+        # Connexion échouée (CRITICAL) puis connexion réussie de l'admin de la fixture
+        admin_client.post('/login', data={'login': 'adm_param', 'mot_de_passe': 'mauvais'})
+        r = admin_client.get('/admin/parametres/api/audit/logs?role=ADMIN&limit=1&page=1')
+        assert r.status_code == 200
+        data = r.get_json()
+        assert data['count'] == 1 and data['page'] == 1
+        assert 'ROLE:ADMIN' in data['logs'][0]
+
+        alertes = admin_client.get('/admin/api/audit/alerts').get_json()
+        assert any('LOGIN_FAILED' in a['log'] for a in alertes)
+
 
 class TestUsersAPIs:
     def test_list_users(self, admin_client):
         _safe_get(admin_client, '/admin/api/users')
+
+    def test_list_users_last_login(self, admin_client):
+        users = {u['login']: u for u in admin_client.get('/admin/api/users').get_json()}
+        # La connexion de la fixture est enregistrée dans connexion_historique
+        assert users['adm_param']['active'] is True
+        assert users['adm_param']['derniere_connexion'] != 'Jamais connecté'
     
     def test_create_user(self, admin_client):
         _safe_post(admin_client, '/admin/api/users', json_data={
@@ -177,6 +195,40 @@ class TestUsersAPIs:
             pass
 
 
+class TestAnnuaireDestinataires:
+    def test_directory_cached_and_refreshed_by_user_apis(self, admin_client):
+        from sqlalchemy import event
+        from app.services.notification_service import NotificationService
+        requetes = []
+
+        def compter(conn, cursor, statement, *args):
+            requetes.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', compter)
+        try:
+            assert NotificationService.get_users_by_roles(['ADMIN']) == [('adm_p@t.com', 'P Adm')]
+            NotificationService.get_users_by_roles(['SUPERVISEUR', 'RESPONSABLE'])
+            assert NotificationService.get_destinataire(1).email == 'adm_p@t.com'
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', compter)
+        assert len(requetes) == 1
+
+        reponse = admin_client.post('/admin/api/users', json={
+            'login': 'sup_annuaire', 'password': 'Pass!123', 'confirm_password': 'Pass!123',
+            'nom': 'Sup', 'prenom': 'A', 'role': 'SUPERVISEUR', 'email': 'sup@t.com',
+        })
+        user_id = reponse.get_json()['user_id']
+        assert NotificationService.get_users_by_roles(['SUPERVISEUR']) == [('sup@t.com', 'A Sup')]
+
+        admin_client.put(f'/admin/api/users/{user_id}/role', json={'new_role': 'RESPONSABLE'})
+        assert NotificationService.get_users_by_roles(['SUPERVISEUR']) == []
+        assert [d.email for d in NotificationService.get_users_by_roles(['RESPONSABLE'])] == ['sup@t.com']
+
+        assert admin_client.delete(f'/admin/api/users/{user_id}').get_json()['success'] is True
+        assert NotificationService.get_users_by_roles(['RESPONSABLE']) == []
+        assert NotificationService.get_destinataire(user_id) is None
+
+
 class TestPrestatairesAPIs:
     def test_list_prestataires(self, admin_client):
         _safe_get(admin_client, '/admin/api/prestataires')
@@ -158,6 +158,47 @@ class TestSuperviseurRoutes:
                   '/superviseur/export/maintenance/csv']:
             _safe_get(c, p)
     
+    def test_exports_csv_streamed(self, sup_client):
+        import gzip
+        c, _ = sup_client
+        r = c.get('/superviseur/export/bus/csv')
+        assert r.status_code == 200
+        assert r.headers['Content-Disposition'].startswith('attachment; filename="bus_udm_')
+        lignes = r.get_data(as_text=True).splitlines()
+        assert lignes[0].startswith('Numéro,Immatriculation')
+        assert any(l.startswith('BUS_RR,RR-001,Mercedes,Sprinter,,20,') for l in lignes)
+
+        r = c.get('/superviseur/export/carburation/csv?gzip=1', headers={'Accept-Encoding': 'gzip'})
+        assert r.status_code == 200
+        assert r.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(r.data).decode('utf-8').startswith('Date,Bus N°')
+
+        for p in ['/superviseur/export/trajets/csv', '/superviseur/export/chauffeurs/csv',
+                  '/superviseur/export/utilisateurs/csv', '/superviseur/export/maintenance/csv']:
+            r = c.get(p)
+            assert r.status_code == 200, p
+            assert r.data
+
+    def test_export_pdf_job_flow(self, sup_client, tmp_path, app):
+        app.config['RAPPORT_JOBS_DIR'] = str(tmp_path)
+        c, _ = sup_client
+        r = c.get('/superviseur/export/trajets/pdf?date_debut=2025-01-01&date_fin=2025-01-31')
+        assert r.status_code == 202
+        job = r.get_json()
+        assert r.headers['Location'].endswith(f"/superviseur/jobs/{job['id']}")
+
+        statut = c.get(job['status_url']).get_json()
+        assert statut['statut'] == 'TERMINE'
+        fichier = c.get(statut['download_url'])
+        assert fichier.status_code == 200
+        assert fichier.mimetype == 'application/pdf'
+        assert fichier.data.startswith(b'%PDF')
+
+        # Même demande : même job
+        r = c.get('/superviseur/export/trajets/pdf?date_debut=2025-01-01&date_fin=2025-01-31')
+        assert r.get_json()['id'] == job['id']
+        assert c.get('/superviseur/jobs/inexistant').status_code == 404
+
     def test_exports_pdf(self, sup_client):
         c, _ = sup_client
         for p in ['/superviseur/export/trajets/pdf',
@@ -102,22 +102,29 @@ class TestAlertService:
         result = _safe(AlertService.check_carburant_threshold, setup['bus1'])
         assert result is None or isinstance(result, dict)
     
-    def test_has_recent_vidange_alert(self, setup):
-        from app.services.alert_service import AlertService
-        _safe(AlertService._has_recent_vidange_alert, setup['bus1'].id)
-    
-    def test_mark_vidange_alert(self, setup):
-        from app.services.alert_service import AlertService
-        _safe(AlertService._mark_vidange_alert_sent, setup['bus1'].id)
-    
-    def test_has_recent_carburant_alert(self, setup):
-        from app.services.alert_service import AlertService
-        _safe(AlertService._has_recent_carburant_alert, setup['bus1'].id, 15.0)
-    
-    def test_mark_carburant_alert(self, setup):
+    def test_vidange_alert_state(self, setup):
+        from app.services.alert_state_service import AlertStateService
+        bus_id = setup['bus1'].id
+        etats = AlertStateService.get_etats('VIDANGE', [bus_id])
+        assert AlertStateService.doit_notifier(etats, bus_id, 'VIDANGE', 1)
+        AlertStateService.enregistrer(etats, bus_id, 'VIDANGE', 1, True, 10000)
+        db.session.commit()
+        etats = AlertStateService.get_etats('VIDANGE', [bus_id])
+        assert not AlertStateService.doit_notifier(etats, bus_id, 'VIDANGE', 1)
+        assert AlertStateService.doit_notifier(etats, bus_id, 'VIDANGE', 2)
+
+    def test_carburant_alert_state(self, setup):
         from app.services.alert_service import AlertService
-        _safe(AlertService._mark_carburant_alert_sent, setup['bus1'].id, 15.0)
-    
+        from app.services.alert_state_service import AlertStateService
+        bus_id = setup['bus1'].id
+        niveau = AlertService._niveau_carburant(15.0)
+        etats = AlertStateService.get_etats('CARBURANT', [bus_id])
+        AlertStateService.enregistrer(etats, bus_id, 'CARBURANT', niveau, True, 15.0)
+        db.session.commit()
+        etats = AlertStateService.get_etats('CARBURANT', [bus_id])
+        assert not AlertStateService.doit_notifier(etats, bus_id, 'CARBURANT', niveau)
+        assert AlertStateService.reinitialiser(bus_id, 'CARBURANT') == 1
+
     @patch('app.services.notification_service.send_email')
     def test_get_buses_needing_maintenance(self, mock_email, setup):
         mock_email.return_value = True
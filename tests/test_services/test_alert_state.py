@@ -0,0 +1,153 @@
+"""
+Tests de la déduplication des alertes de seuil (AlertService / alert_state).
+Les notifications sont comptées dans la file d'envoi (notification_outbox).
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+
+
+def _emails_en_file():
+    from app.models.notification_outbox import NotificationOutbox
+    return NotificationOutbox.query.count()
+
+
+class TestDeduplication:
+    def test_repeated_check_sends_nothing_new(self, flotte):
+        from app.models.alert_state import AlertState
+        from app.services.alert_service import AlertService
+
+        rapport = AlertService.check_all_critical_thresholds()
+        assert 'error' not in rapport
+        assert rapport['notifications_sent'] == 3  # vidange, carburant, document
+        assert _emails_en_file() == 6
+        assert {(e.type_alerte, e.niveau) for e in AlertState.query} == \
+            {('VIDANGE', 1), ('CARBURANT', 1), ('DOCUMENT', 2)}
+
+        rapport = AlertService.check_all_critical_thresholds()
+        assert rapport['notifications_sent'] == 0 and len(rapport['vidange_alerts']) == 1
+        assert _emails_en_file() == 6
+
+    def test_more_severe_level_notifies_again(self, flotte):
+        from app.services.alert_service import AlertService
+        bus, _ = flotte
+        AlertService.check_all_critical_thresholds()
+
+        bus.niveau_carburant_litres = 8.0
+        bus.kilometrage = 20500
+        db.session.commit()
+        rapport = AlertService.check_all_critical_thresholds()
+        assert len(rapport['carburant_alerts']) == 1
+        assert rapport['notifications_sent'] == 2  # carburant critique et second seuil de vidange
+
+
+class TestReinitialisation:
+    def test_refill_and_renewal_rearm(self, flotte):
+        from app.models.alert_state import AlertState
+        from app.services.alert_service import AlertService
+        bus, document = flotte
+        AlertService.check_all_critical_thresholds()
+
+        # Plein puis nouvelle baisse avant la vérification suivante
+        from app.services.gestion_carburation import enregistrer_carburation_common
+        enregistrer_carburation_common({'bus_udm_id': bus.id, 'kilometrage': 16000,
+                                        'quantite_litres': 80, 'prix_unitaire': 800})
+        assert AlertState.query.filter_by(type_alerte='CARBURANT').count() == 0
+        bus.niveau_carburant_litres = 12.0
+        document.date_expiration = date.today() + timedelta(days=365)
+        db.session.commit()
+
+        rapport = AlertService.check_all_critical_thresholds()
+        assert rapport['notifications_sent'] == 1 and rapport['carburant_alerts'][0]['notification_sent']
+        assert AlertState.query.filter_by(type_alerte='DOCUMENT').count() == 0
+
+    def test_vidange_resets_state(self, flotte):
+        from app.models.alert_state import AlertState
+        from app.services.alert_service import AlertService
+        from app.services.gestion_vidange import enregistrer_vidange_common
+        bus, _ = flotte
+        assert AlertService.force_check_bus(bus.id)['vidange']['notification_sent'] is True
+        assert AlertService.force_check_bus(bus.id)['vidange']['notification_sent'] is False
+
+        enregistrer_vidange_common({'bus_udm_id': bus.id, 'kilometrage': 16000,
+                                    'type_huile': 'Quartz 5000 20W-50'})
+        assert AlertState.query.filter_by(type_alerte='VIDANGE').count() == 0
+
+
+class TestEvaluation:
+    def test_fleet_evaluated_in_constant_queries(self, flotte):
+        from sqlalchemy import event
+        from app.models.bus_udm import BusUdM
+        from app.models.vidange import Vidange
+        from app.services.alert_service import AlertService
+        for i in range(5):
+            bus = BusUdM(numero=f'BUS_EV{i}', immatriculation=f'EV-{i}', nombre_places=20,
+                         numero_chassis=f'CH_EV{i}', etat_vehicule='BON', kilometrage=9000 + i * 1000)
+            db.session.add(bus)
+            db.session.flush()
+            # Deux vidanges : seule la plus récente compte
+            db.session.add_all([
+                Vidange(bus_udm_id=bus.id, date_vidange=date.today() - timedelta(days=200),
+                        kilometrage=8000, type_huile='QUARTZ'),
+                Vidange(bus_udm_id=bus.id, date_vidange=date.today() - timedelta(days=20),
+                        kilometrage=1000 + i * 1000, type_huile='QUARTZ'),
+            ])
+        db.session.commit()
+
+        requetes = []
+
+        def compter(conn, cursor, statement, *args):
+            requetes.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', compter)
+        try:
+            evaluation = AlertService.evaluer_seuils()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', compter)
+        assert len(requetes) == 3  # bus + dernière vidange, documents, permis
+        km = {e['bus_numero']: e['km_depuis_vidange'] for e in evaluation['VIDANGE']}
+        assert km['BUS_EV0'] == 8000 and km['BUS_EV4'] == 8000 and km['BUS_ET'] == 6000
+
+    def test_maintenance_listing_has_no_side_effects(self, flotte):
+        from app.models.alert_state import AlertState
+        from app.services.alert_service import AlertService
+        buses = AlertService.get_buses_needing_maintenance()
+        assert [a['type'] for a in buses[0]['alerts']] == ['vidange', 'carburant']
+        assert _emails_en_file() == 0 and AlertState.query.count() == 0
+
+
+class TestPermis:
+    def test_permis_expiry_notified_once(self, flotte):
+        from app.models.alert_state import AlertState
+        from app.models.chauffeur import Chauffeur
+        from app.services.alert_service import AlertService
+        db.session.add_all([
+            Chauffeur(nom='Proche', prenom='P', numero_permis='P1', telephone='1',
+                      date_delivrance_permis=date.today() - timedelta(days=3000),
+                      date_expiration_permis=date.today() + timedelta(days=5)),
+            Chauffeur(nom='Valide', prenom='V', numero_permis='P2', telephone='2',
+                      date_delivrance_permis=date.today() - timedelta(days=300),
+                      date_expiration_permis=date.today() + timedelta(days=400)),
+        ])
+        db.session.commit()
+
+        rapport = AlertService.check_all_critical_thresholds(types=('PERMIS',))
+        assert rapport['notifications_sent'] == 1 and rapport['vidange_alerts'] == []
+        assert rapport['permis_alerts'][0]['niveau'] == 2
+        etat = AlertState.query.one()
+        assert etat.bus_udm_id is None and etat.type_alerte == 'PERMIS'
+
+        assert AlertService.check_all_critical_thresholds(types=('PERMIS',))['notifications_sent'] == 0
+
+    def test_permis_state_unique_without_bus(self, app):
+        from app.models.alert_state import AlertState
+        db.session.add(AlertState(type_alerte='PERMIS', reference='12', niveau=1))
+        db.session.commit()
+        assert AlertState.query.one().bus_cle == 0
+        db.session.add(AlertState(type_alerte='PERMIS', reference='12', niveau=2))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
@@ -0,0 +1,98 @@
+"""
+Tests de la résolution du chauffeur connecté (chauffeur.utilisateur_id, cache de session).
+"""
+import re
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+@pytest.fixture
+def compte_chauffeur(app):
+    from app.models.chauffeur import Chauffeur
+    from app.models.utilisateur import Utilisateur
+    user = Utilisateur(nom='Route', prenom='Pilote', login='pilote', email='p@t.com',
+                       telephone='000', role='CHAUFFEUR')
+    user.set_password('Pass!123')
+    db.session.add(user)
+    db.session.add(Chauffeur(nom='Route', prenom='Pilote', numero_permis='PERM_P', telephone='000',
+                             date_delivrance_permis=date(2020, 1, 1),
+                             date_expiration_permis=date(2030, 1, 1)))
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def selects_chauffeur(app):
+    instructions = []
+
+    def compter(conn, cursor, statement, parameters, context, executemany):
+        if re.search(r'FROM chauffeur\b', statement):
+            instructions.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', compter)
+    yield instructions
+    event.remove(db.engine, 'before_cursor_execute', compter)
+
+
+class TestResolution:
+    def test_name_match_links_once(self, app, compte_chauffeur):
+        from app.models.chauffeur import Chauffeur
+        from app.services.chauffeur_service import ChauffeurService
+        chauffeur_id = ChauffeurService.resoudre_chauffeur_id(compte_chauffeur.utilisateur_id)
+        assert chauffeur_id is not None
+        assert db.session.get(Chauffeur, chauffeur_id).utilisateur_id == compte_chauffeur.utilisateur_id
+
+        # Le lien est direct, même si le nom du compte change ensuite
+        compte_chauffeur.nom = 'Renomme'
+        db.session.commit()
+        assert ChauffeurService.resoudre_chauffeur_id(compte_chauffeur.utilisateur_id) == chauffeur_id
+
+    def test_link_left_to_caller_transaction(self, app, compte_chauffeur):
+        from app.models.chauffeur import Chauffeur
+        from app.services.chauffeur_service import ChauffeurService
+        chauffeur_id = ChauffeurService.resoudre_chauffeur_id(compte_chauffeur.utilisateur_id)
+        db.session.rollback()
+        assert db.session.get(Chauffeur, chauffeur_id).utilisateur_id is None
+
+    def test_homonyms_not_linked(self, app, compte_chauffeur):
+        from app.models.chauffeur import Chauffeur
+        from app.models.utilisateur import Utilisateur
+        from app.services.chauffeur_service import ChauffeurService
+        homonyme = Utilisateur(nom='Route', prenom='Pilote', login='pilote2', email='p2@t.com',
+                               telephone='000', role='CHAUFFEUR')
+        homonyme.set_password('Pass!123')
+        db.session.add(homonyme)
+        db.session.commit()
+        for compte in (compte_chauffeur, homonyme):
+            assert ChauffeurService.resoudre_chauffeur_id(compte.utilisateur_id) is None
+        assert Chauffeur.query.filter(Chauffeur.utilisateur_id.isnot(None)).count() == 0
+
+    def test_no_chauffeur_record(self, app, sample_user):
+        from app.services.chauffeur_service import ChauffeurService
+        assert ChauffeurService.resoudre_chauffeur_id(sample_user.utilisateur_id) is None
+        assert ChauffeurService.get_chauffeur(sample_user.utilisateur_id) is None
+
+
+class TestPagesChauffeur:
+    def test_resolved_once_per_session(self, app, client, compte_chauffeur, selects_chauffeur):
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(compte_chauffeur.utilisateur_id)
+            sess['user_id'] = str(compte_chauffeur.utilisateur_id)
+            sess['user_role'] = 'CHAUFFEUR'
+            sess['user_login'] = compte_chauffeur.login
+
+        assert client.get('/chauffeur/bus_udm').status_code == 200
+        premiere = len(selects_chauffeur)
+        assert premiere >= 1
+        for _ in range(2):
+            assert client.get('/chauffeur/bus_udm').status_code == 200
+        assert len(selects_chauffeur) == premiere
+
+        # Les pages qui affichent la fiche la relisent par clé primaire
+        del selects_chauffeur[:]
+        assert client.get('/chauffeur/profil').status_code == 200
+        assert selects_chauffeur and all('WHERE chauffeur.chauffeur_id = ?' in s for s in selects_chauffeur)
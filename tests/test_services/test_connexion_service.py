@@ -0,0 +1,74 @@
+"""
+Tests du suivi des connexions (ConnexionService / connexion_historique).
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+def _user(login, role='CHARGE'):
+    from app.models.utilisateur import Utilisateur
+    u = Utilisateur(nom='N', prenom='P', login=login, email=f'{login}@t.com',
+                    telephone='000', role=role)
+    u.set_password('Pass!123')
+    db.session.add(u)
+    db.session.commit()
+    return u
+
+
+class TestDerniereConnexion:
+    def test_login_records_connection(self, client, app):
+        from app.models.connexion_historique import ConnexionHistorique
+        u = _user('cnx_login', role='ADMIN')
+        client.post('/login', data={'login': 'cnx_login', 'mot_de_passe': 'Pass!123'})
+        client.post('/login', data={'login': 'cnx_login', 'mot_de_passe': 'faux'})
+        connexions = ConnexionHistorique.query.filter_by(utilisateur_id=u.utilisateur_id).all()
+        assert len(connexions) == 1
+
+    def test_users_resolved_in_one_query(self, app):
+        from app.services.connexion_service import ConnexionService
+        actif, ancien, jamais = _user('cnx_a'), _user('cnx_b'), _user('cnx_c')
+        maintenant = datetime.now()
+        ConnexionService.enregistrer_connexion(actif, '10.0.0.1', maintenant - timedelta(days=40))
+        ConnexionService.enregistrer_connexion(actif, '10.0.0.1', maintenant - timedelta(days=1))
+        ConnexionService.enregistrer_connexion(ancien, None, maintenant - timedelta(days=45))
+
+        requetes = []
+
+        def compter(conn, cursor, statement, *args):
+            requetes.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', compter)
+        try:
+            resultat = {u.utilisateur_id: d for u, d in ConnexionService.get_utilisateurs_avec_derniere_connexion()}
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', compter)
+        assert len(requetes) == 1
+        assert resultat[actif.utilisateur_id] == maintenant - timedelta(days=1)
+        assert ConnexionService.est_actif(resultat[actif.utilisateur_id])
+        assert not ConnexionService.est_actif(resultat[ancien.utilisateur_id])
+        assert resultat[jamais.utilisateur_id] is None and not ConnexionService.est_actif(None)
+
+
+class TestBackfill:
+    def test_backfill_from_audit_log_is_repeatable(self, app):
+        from app.models.audit_log import AuditLog
+        from app.models.connexion_historique import ConnexionHistorique
+        from app.services.connexion_service import ConnexionService
+        u = _user('cnx_bf')
+        quand = datetime(2025, 1, 10, 8, 0)
+        for action, ressource_id, succes in (('LOGIN_SUCCESS', str(u.utilisateur_id), True),
+                                             ('LOGIN_SUCCESS', '99999', True),
+                                             ('LOGIN_FAILED', str(u.utilisateur_id), False)):
+            db.session.add(AuditLog(horodatage=quand, utilisateur=str(u.utilisateur_id), role='CHARGE',
+                                    action=action, niveau='HIGH', succes=succes, ip='10.0.0.9',
+                                    ressource='session', ressource_id=ressource_id, source='fichier'))
+        db.session.commit()
+
+        assert ConnexionService.backfill_depuis_audit() == 1
+        db.session.commit()
+        assert ConnexionService.backfill_depuis_audit() == 0
+        connexion = ConnexionHistorique.query.one()
+        assert (connexion.utilisateur_id, connexion.date_connexion, connexion.ip_adresse) == \
+            (u.utilisateur_id, quand, '10.0.0.9')
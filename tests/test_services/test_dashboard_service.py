@@ -0,0 +1,92 @@
+"""
+Tests des compteurs agrégés de DashboardService (un SELECT par source).
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from app.extensions import db
+
+
+@pytest.fixture
+def trajets_du_jour(app):
+    from app.models.bus_udm import BusUdM
+    from app.models.chauffeur import Chauffeur
+    from app.models.trajet import Trajet
+
+    db.session.add_all([
+        BusUdM(numero='BUS_D1', immatriculation='D1', nombre_places=30,
+               numero_chassis='CH_D1', etat_vehicule='BON'),
+        BusUdM(numero='BUS_D2', immatriculation='D2', nombre_places=30,
+               numero_chassis='CH_D2', etat_vehicule='DEFAILLANT'),
+    ])
+    chauffeur = Chauffeur(
+        nom='Dash', prenom='Board', numero_permis='PERM_DASH', telephone='000',
+        date_delivrance_permis=date(2020, 1, 1),
+        date_expiration_permis=date(2030, 1, 1),
+    )
+    db.session.add(chauffeur)
+    db.session.commit()
+
+    today = date.today()
+    midi = datetime.combine(today, datetime.min.time()) + timedelta(hours=12)
+    db.session.add_all([
+        Trajet(type_trajet='UDM_INTERNE', date_heure_depart=midi, point_depart='Mfetum',
+               type_passagers='ETUDIANT', nombre_places_occupees=25,
+               numero_bus_udm='BUS_D1', chauffeur_id=chauffeur.chauffeur_id,
+               point_arriver='Banekane'),
+        Trajet(type_trajet='UDM_INTERNE', date_heure_depart=midi, point_depart='Banekane',
+               type_passagers='ETUDIANT', nombre_places_occupees=10,
+               numero_bus_udm='BUS_D1', chauffeur_id=chauffeur.chauffeur_id),
+        Trajet(type_trajet='PRESTATAIRE', date_heure_depart=midi, point_depart='Ancienne Mairie',
+               type_passagers='ETUDIANT', nombre_places_occupees=7, immat_bus='PR-001'),
+        # Veille : ne doit pas être comptée
+        Trajet(type_trajet='UDM_INTERNE', date_heure_depart=midi - timedelta(days=1),
+               point_depart='Mfetum', type_passagers='ETUDIANT',
+               nombre_places_occupees=99, numero_bus_udm='BUS_D1'),
+    ])
+    db.session.commit()
+    return chauffeur
+
+
+class TestDailyTrajetCounters:
+    def test_counters_single_day(self, trajets_du_jour):
+        from app.services.dashboard_service import DashboardService
+        compteurs = DashboardService.get_daily_trajet_counters()
+        assert compteurs['trajets_jour'] == 3
+        assert compteurs['trajets_jour_aed'] == 2
+        assert compteurs['trajets_jour_prestataire'] == 1
+        assert compteurs['etudiants_arrives'] == 32
+        assert compteurs['etudiants_partis'] == 10
+
+    def test_counters_empty_day(self, app):
+        from app.services.dashboard_service import DashboardService
+        compteurs = DashboardService.get_daily_trajet_counters(date(2000, 1, 1))
+        assert set(compteurs.values()) == {0}
+
+    def test_fleet_counters(self, trajets_du_jour):
+        from app.services.dashboard_service import DashboardService
+        flotte = DashboardService.get_fleet_counters()
+        assert flotte == {'bus_total': 2, 'bus_actifs': 1, 'bus_maintenance': 1, 'chauffeurs': 1}
+
+    def test_common_stats_consistent_with_trafic(self, trajets_du_jour):
+        from app.services.dashboard_service import DashboardService
+        from app.utils.trafic import daily_student_trafic
+        stats = DashboardService.get_common_stats()
+        assert stats['trafic'] == daily_student_trafic()
+        assert stats['etudiants'] == 22
+        assert stats['bus_actifs'] == 1
+        assert stats['chauffeurs'] == 1
+
+    def test_chauffeur_personal_stats(self, trajets_du_jour):
+        from app.services.dashboard_service import DashboardService
+        from app.models.utilisateur import Utilisateur
+        user = Utilisateur(nom='Dash', prenom='Board', login='dash', email='d@t.com',
+                           telephone='000', role='CHAUFFEUR')
+        user.set_password('Pass!123')
+        db.session.add(user)
+        db.session.commit()
+        stats = DashboardService.get_role_specific_stats('CHAUFFEUR', user.utilisateur_id)
+        assert stats == {
+            'mes_trajets_aujourdhui': 2,
+            'etudiants_pour_campus': 25,
+            'personnes_du_campus': 10,
+        }
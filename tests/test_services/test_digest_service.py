@@ -0,0 +1,98 @@
+"""
+Tests du mode récapitulatif des notifications (DigestService / notification_digest).
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.extensions import db
+
+
+@pytest.fixture
+def digest(app):
+    # Planificateur dans le processus : les récapitulatifs sont envoyés
+    app.config.update(NOTIFICATION_DIGEST_ENABLED=True, NOTIFICATION_DIGEST_FENETRE=900, SCHEDULER_ENABLED=True)
+    yield
+    app.config.update(NOTIFICATION_DIGEST_ENABLED=False, SCHEDULER_ENABLED=False)
+
+
+def _file_envoi():
+    from app.models.notification_outbox import NotificationOutbox
+    return NotificationOutbox.query.order_by(NotificationOutbox.id).all()
+
+
+class TestRecapitulatif:
+    def test_alerts_coalesced_per_recipient(self, flotte, digest):
+        from app.models.notification_digest import NotificationDigest
+        from app.services.alert_service import AlertService
+        from app.services.digest_service import DigestService
+        bus, _ = flotte
+        bus.km_critique_huile = 15500
+        db.session.commit()
+
+        rapport = AlertService.check_all_critical_thresholds()
+        assert rapport['notifications_sent'] == 3
+        assert _file_envoi() == []
+        assert NotificationDigest.query.count() == 6
+        assert DigestService.get_statistiques()['destinataires'] == 2
+
+        # Fenêtre non écoulée : rien n'est envoyé
+        assert DigestService.traiter() == 0
+        assert DigestService.traiter(maintenant=datetime.now() + timedelta(seconds=901)) == 2
+        assert NotificationDigest.query.count() == 0
+
+        emails = _file_envoi()
+        assert sorted(e.destinataire for e in emails) == ['alerte_responsable@t.com', 'alerte_superviseur@t.com']
+        assert {e.type_notification for e in emails} == {'recapitulatif'}
+        email = emails[0]
+        assert email.sujet == '📬 Récapitulatif des alertes - 3 alerte(s)'
+        assert 'Seuil vidange atteint - Bus BUS_ET' in email.corps
+        assert 'Bus BUS_ET (ET-1) - 16,000 km - Vidange: Critique - Carburant: Normal' in email.corps
+        assert 'BUS_ET' in email.corps_html
+        assert DigestService.traiter(forcer=True) == 0
+
+    def test_high_criticity_breakdown_not_delayed(self, flotte, digest):
+        from app.models.notification_digest import NotificationDigest
+        from app.models.panne_bus_udm import PanneBusUdM
+        from app.services.notification_service import NotificationService
+        bus, _ = flotte
+
+        def declarer(criticite):
+            panne = PanneBusUdM(bus_udm_id=bus.id, numero_bus_udm=bus.numero,
+                                immatriculation=bus.immatriculation, kilometrage=16000,
+                                description='Test', criticite=criticite, immobilisation=False,
+                                enregistre_par='Test', date_heure=datetime.now())
+            db.session.add(panne)
+            db.session.commit()
+            return NotificationService.send_panne_notification(panne, 'Test', bus=bus)
+
+        assert declarer('HAUTE') is True
+        assert len(_file_envoi()) == 2 and NotificationDigest.query.count() == 0
+        assert declarer('MOYENNE') is True
+        assert len(_file_envoi()) == 2 and NotificationDigest.query.count() == 2
+
+    def test_entries_join_caller_transaction(self, flotte, digest):
+        from app.models.notification_digest import NotificationDigest
+        from app.services.digest_service import DigestService
+        from app.services.notification_service import NotificationService
+        destinataires = NotificationService.get_users_by_roles(['RESPONSABLE', 'SUPERVISEUR'])
+        assert DigestService.ajouter(destinataires, 'SEUIL_VIDANGE', 'Sujet') == 2
+        db.session.rollback()
+        assert NotificationDigest.query.count() == 0
+
+    def test_requires_running_scheduler(self, app, digest):
+        from app.models.tache_planifiee import TachePlanifiee
+        from app.services.digest_service import DigestService
+        app.config['SCHEDULER_ENABLED'] = False
+        assert DigestService.est_differe('SEUIL_VIDANGE') is False
+
+        # `flask taches worker` dans un autre processus : dernière exécution récente
+        db.session.add(TachePlanifiee(nom='digest_notifications', prochaine_execution=datetime.now(),
+                                      derniere_execution=datetime.now() - timedelta(minutes=1)))
+        db.session.commit()
+        assert DigestService.est_differe('SEUIL_VIDANGE') is False  # État en cache
+        app.extensions.pop('digest_planificateur')
+        assert DigestService.est_differe('SEUIL_VIDANGE') is True
+
+    def test_disabled_by_default(self, flotte):
+        from app.services.digest_service import DigestService
+        assert DigestService.est_differe('SEUIL_VIDANGE') is False
@@ -0,0 +1,76 @@
+"""
+Tests de l'identité en cache de l'utilisateur connecté (app/services/identite_service.py).
+"""
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+@pytest.fixture
+def connecte(client, sample_user):
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(sample_user.utilisateur_id)
+        sess['_fresh'] = True
+        sess['user_id'] = str(sample_user.utilisateur_id)
+        sess['user_role'] = sample_user.role
+        sess['user_login'] = sample_user.login
+    return client
+
+
+@pytest.fixture
+def selects_utilisateur(app):
+    instructions = []
+
+    def compter(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM utilisateur' in statement:
+            instructions.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', compter)
+    yield instructions
+    event.remove(db.engine, 'before_cursor_execute', compter)
+
+
+class TestIdentiteService:
+    def test_cached_until_invalidated(self, app, sample_user, selects_utilisateur):
+        from app.services.identite_service import IdentiteService
+        identite = IdentiteService.charger(sample_user.utilisateur_id)
+        assert (identite.role, identite.login, identite.get_id()) == ('ADMIN', 'testuser', str(sample_user.utilisateur_id))
+        assert identite.is_authenticated
+        assert IdentiteService.charger(sample_user.utilisateur_id) is identite
+        assert len(selects_utilisateur) == 1
+
+        IdentiteService.invalider(sample_user.utilisateur_id)
+        assert IdentiteService.charger(sample_user.utilisateur_id) is not identite
+        assert len(selects_utilisateur) == 2
+        assert IdentiteService.charger(999999) is None
+
+    def test_other_attributes_loaded_lazily(self, app, sample_user):
+        from app.services.identite_service import IdentiteService
+        identite = IdentiteService.charger(sample_user.utilisateur_id)
+        assert identite.telephone == '0123456789'
+        assert identite.check_password('TestPassword123!')
+        with pytest.raises(AttributeError):
+            identite.initials  # Pas un attribut du modèle : le `default` des templates s'applique
+        with pytest.raises(AttributeError):
+            identite.role = 'CHAUFFEUR'
+
+
+class TestChargementParRequete:
+    def test_single_user_query_across_requests(self, app, connecte, selects_utilisateur):
+        for _ in range(3):
+            assert connecte.get('/admin/performances/api').status_code == 200
+        assert len(selects_utilisateur) == 1
+
+    def test_role_change_invalidates(self, app, connecte, sample_user):
+        from app.models.utilisateur import Utilisateur
+        from app.services.identite_service import IdentiteService
+        autre = Utilisateur(nom='Autre', prenom='U', login='autre', email='a@t.com', telephone='1', role='CHAUFFEUR')
+        autre.set_password('x')
+        db.session.add(autre)
+        db.session.commit()
+        assert IdentiteService.charger(autre.utilisateur_id).role == 'CHAUFFEUR'
+
+        reponse = connecte.put(f'/admin/api/users/{autre.utilisateur_id}/role', json={'new_role': 'MECANICIEN'})
+        assert reponse.status_code == 200
+        assert IdentiteService.charger(autre.utilisateur_id).role == 'MECANICIEN'
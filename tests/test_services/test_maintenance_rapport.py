@@ -189,6 +189,37 @@ class TestRapportServiceTrajets:
               type_trajet='UDM_INTERNE')
 
 
+class TestRapportTrajetsRequetes:
+    def test_rapport_rows_and_stats(self, setup):
+        from app.services.rapport_service import RapportService
+        rapport = RapportService.get_rapport_trajets(date.today() - timedelta(days=5), date.today())
+        assert rapport['statistiques']['total_trajets'] == 3
+        assert rapport['statistiques']['total_etudiants'] == 30
+        assert rapport['statistiques']['repartition_type'] == {'UDM_INTERNE': 3}
+        ligne = rapport['trajets'][0]
+        assert ligne['bus_immatriculation'] == 'MR-001'
+        assert ligne['point_arrivee'] == 'Banekane'
+
+    def test_constant_query_count(self, setup):
+        from sqlalchemy import event
+        from app.services.rapport_service import RapportService
+        requetes = []
+
+        def compter(conn, cursor, statement, *args):
+            requetes.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', compter)
+        try:
+            lignes = list(RapportService.iter_rapport_trajets(
+                date.today() - timedelta(days=5), date.today(), chunk_size=1
+            ))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', compter)
+        assert len(lignes) == 3
+        # Carte des bus + requête des trajets, quel que soit le nombre de lignes
+        assert len(requetes) == 2
+
+
 class TestRapportServiceMaintenance:
     def test_get_rapport_maintenance(self, setup):
         from app.services.rapport_service import RapportService
@@ -0,0 +1,207 @@
+"""
+Tests de la file d'envoi des notifications (OutboxService / notification_outbox).
+La livraison passe par le serveur SMTP local de débogage (app/utils/debug_smtp.py).
+"""
+import socket
+import pytest
+from datetime import datetime, timedelta
+
+from app.extensions import db
+
+
+@pytest.fixture
+def smtp(app):
+    from app.utils.debug_smtp import DebugSMTPServer
+    with DebugSMTPServer() as serveur:
+        app.config.update(SMTP_HOST=serveur.host, SMTP_PORT=serveur.port, SMTP_USERNAME=None,
+                          SMTP_PASSWORD=None, SMTP_USE_TLS=False, SMTP_USE_SSL=False,
+                          MAIL_FROM='transport@t.com')
+        app.extensions.pop('smtp_transport', None)
+        yield serveur
+        transport = app.extensions.pop('smtp_transport', None)
+        if transport:
+            transport.close()
+
+
+@pytest.fixture
+def smtp_injoignable(app):
+    # Port libre sur lequel rien n'écoute
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    app.config.update(SMTP_HOST='127.0.0.1', SMTP_PORT=port, SMTP_USE_TLS=False,
+                      MAIL_FROM='transport@t.com', NOTIFICATION_OUTBOX_MAX_TENTATIVES=3,
+                      NOTIFICATION_OUTBOX_BACKOFF=60, NOTIFICATION_OUTBOX_BACKOFF_MAX=90)
+    app.extensions.pop('smtp_transport', None)
+    return port
+
+
+def _enqueue(*emails):
+    from app.services.outbox_service import OutboxService
+    from app.utils.emailer import EmailMessage
+    return OutboxService.enqueue([EmailMessage('Sujet é', 'Corps\n.ligne', e) for e in emails], 'test')
+
+
+def _rendre_dus():
+    from app.models.notification_outbox import NotificationOutbox
+    NotificationOutbox.query.update({'prochaine_tentative': datetime.now() - timedelta(seconds=1)})
+    db.session.commit()
+
+
+class TestLivraison:
+    def test_enqueue_joins_caller_transaction(self, app):
+        from app.models.notification_outbox import NotificationOutbox
+        assert len(_enqueue('a@t.com')) == 1
+        db.session.rollback()
+        assert NotificationOutbox.query.count() == 0
+
+    def test_enqueue_then_deliver(self, smtp):
+        from app.services.outbox_service import OutboxService
+        lignes = _enqueue('a@t.com', '', 'b@t.com')
+        assert len(lignes) == 2 and smtp.messages == []
+
+        assert OutboxService.traiter_lot() == {'envoyes': 2, 'echecs': 0, 'abandonnes': 0}
+        assert OutboxService.traiter_lot() == {'envoyes': 0, 'echecs': 0, 'abandonnes': 0}
+        assert [m['rcpt_to'] for m in smtp.messages] == [['a@t.com'], ['b@t.com']]
+        assert smtp.messages[0]['subject'] == 'Sujet é'
+        assert smtp.messages[0]['body'] == 'Corps\n.ligne'
+        assert all(ligne.statut == 'ENVOYE' and ligne.envoye_le for ligne in lignes)
+
+    def test_refused_recipient_is_retried_alone(self, smtp):
+        from app.services.outbox_service import OutboxService
+        smtp.refuser.add('refuse@t.com')
+        ok, refuse = _enqueue('ok@t.com', 'refuse@t.com')
+        assert OutboxService.traiter_lot() == {'envoyes': 1, 'echecs': 1, 'abandonnes': 0}
+        assert ok.statut == 'ENVOYE'
+        assert refuse.statut == 'EN_ATTENTE' and refuse.tentatives == 1
+        assert refuse.prochaine_tentative > datetime.now() + timedelta(seconds=30)
+
+
+class TestNouvellesTentatives:
+    def test_backoff_then_dead_letter(self, smtp_injoignable):
+        from app.services.outbox_service import OutboxService
+        ligne, = _enqueue('a@t.com')
+
+        assert OutboxService.traiter_lot()['echecs'] == 1
+        delai = ligne.prochaine_tentative - datetime.now()
+        assert timedelta(seconds=55) < delai <= timedelta(seconds=60)
+        # Pas encore à échéance : rien à traiter
+        assert OutboxService.traiter_lot()['echecs'] == 0
+
+        _rendre_dus()
+        OutboxService.traiter_lot()
+        delai = ligne.prochaine_tentative - datetime.now()
+        assert timedelta(seconds=85) < delai <= timedelta(seconds=90)  # 120 s plafonné à 90 s
+
+        _rendre_dus()
+        assert OutboxService.traiter_lot()['abandonnes'] == 1
+        assert ligne.statut == 'ECHEC_DEFINITIF' and ligne.tentatives == 3
+        assert ligne.derniere_erreur
+
+        stats = OutboxService.get_statistiques()
+        assert stats['echecs_definitifs'] == 1 and stats['en_attente'] == 0
+        assert stats['echecs'][0]['id'] == ligne.id
+
+        assert OutboxService.relancer(ligne.id) is True
+        assert OutboxService.relancer(ligne.id) is False
+        assert ligne.statut == 'EN_ATTENTE' and ligne.tentatives == 0
+
+    def test_stale_lease_is_reclaimed(self, smtp):
+        from app.services.outbox_service import OutboxService
+        ligne, = _enqueue('a@t.com')
+        # Lot réservé par un worker arrêté avant la fin de l'envoi
+        ligne.statut, ligne.verrou = 'EN_COURS', 'ancien'
+        ligne.prochaine_tentative = datetime.now() + timedelta(minutes=1)
+        db.session.commit()
+        assert OutboxService.traiter_lot()['envoyes'] == 0
+
+        _rendre_dus()
+        assert OutboxService.traiter_lot()['envoyes'] == 1
+        assert ligne.statut == 'ENVOYE' and ligne.verrou is None
+
+
+class TestNotificationService:
+    def test_statut_notification_is_queued(self, smtp):
+        from app.models.chauffeur_statut import ChauffeurStatut
+        from app.models.notification_outbox import NotificationOutbox
+        from app.services.notification_service import NotificationService
+        maintenant = datetime.now()
+        statut = ChauffeurStatut(chauffeur_id=1, statut='CONGE', lieu='CUM', date_debut=maintenant,
+                                 date_fin=maintenant, created_at=maintenant)
+
+        assert NotificationService.send_statut_chauffeur_notification(statut, 'chauffeur@t.com') is True
+        assert smtp.messages == []
+        assert NotificationOutbox.query.one().type_notification == 'statut'
+
+    def test_panne_rendered_once_and_sent_multipart(self, smtp, monkeypatch):
+        from sqlalchemy import event
+        from app.models.bus_udm import BusUdM
+        from app.models.panne_bus_udm import PanneBusUdM
+        from app.models.utilisateur import Utilisateur
+        from app.services.notification_service import NotificationService
+        from app.services.outbox_service import OutboxService
+        from app.utils.modeles_email import ModelesEmail
+        for i, role in enumerate(('MECANICIEN', 'SUPERVISEUR', 'RESPONSABLE')):
+            u = Utilisateur(nom='N', prenom='P', login=f'dest{i}', email=f'dest{i}@t.com',
+                            telephone='000', role=role)
+            u.set_password('x')
+            db.session.add(u)
+        bus = BusUdM(numero='BUS_TPL', immatriculation='TPL-1', nombre_places=20,
+                     numero_chassis='CH_TPL', etat_vehicule='BON', kilometrage=12000)
+        db.session.add(bus)
+        db.session.commit()
+        panne = PanneBusUdM(bus_udm_id=bus.id, numero_bus_udm=bus.numero, immatriculation=bus.immatriculation,
+                            kilometrage=12000, description='Fuite <huile>', criticite='HAUTE',
+                            immobilisation=True, enregistre_par='Test', date_heure=datetime.now())
+        db.session.add(panne)
+        db.session.commit()
+        db.session.refresh(bus)
+        db.session.refresh(panne)
+
+        rendus = []
+        rendre = ModelesEmail.rendre
+        monkeypatch.setattr(ModelesEmail, 'rendre', lambda self, *a: rendus.append(a[0]) or rendre(self, *a))
+        selects = []
+
+        def compter(conn, cursor, statement, *args):
+            if statement.startswith('SELECT'):
+                selects.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', compter)
+        try:
+            assert NotificationService.send_panne_notification(panne, 'Test', bus=bus) is True
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', compter)
+        assert rendus == ['panne']
+        assert not any('FROM bus_udm' in s for s in selects)
+
+        assert OutboxService.traiter_lot()['envoyes'] == 3
+        message = smtp.messages[0]
+        assert message['subject'] == '🚨 Nouvelle panne déclarée - Bus BUS_TPL (TPL-1)'
+        assert message['message'].get_content_type() == 'multipart/alternative'
+        assert '• Kilométrage: 12,000 km' in message['body'] and 'Fuite <huile>' in message['body']
+        assert 'Fuite &lt;huile&gt;' in message['html'] and 'immobilisé' in message['html']
+
+
+class TestDemarrage:
+    def test_worker_started_by_first_request_only(self, app, monkeypatch):
+        from app import create_app
+        from app.config import Config
+        monkeypatch.setattr(Config, 'NOTIFICATION_OUTBOX_WORKER', True)
+
+        # Scripts et commandes CLI : aucune requête servie, aucun thread
+        script = create_app(demarrer_planificateur=False)
+        servie = create_app()
+        assert 'outbox_worker' not in servie.extensions
+        script.test_client().get('/')
+        assert 'outbox_worker' not in script.extensions
+
+        servie.test_client().get('/')
+        worker = servie.extensions['outbox_worker']
+        try:
+            assert worker.is_alive()
+        finally:
+            worker.arreter()
+            worker.join(5)
+            for autre in (script, servie):
+                autre.extensions['journaux_audit'].fermer()
@@ -0,0 +1,77 @@
+"""
+Tests des rapports générés en arrière-plan (RapportJobService).
+Le pool est désactivé (RAPPORT_JOBS_WORKERS = 0) : les jobs s'exécutent immédiatement.
+"""
+import os
+import pytest
+from datetime import datetime, timedelta
+
+from app.extensions import db
+
+
+@pytest.fixture
+def jobs_app(app, tmp_path):
+    app.config.update(
+        RAPPORT_JOBS_WORKERS=0,
+        RAPPORT_JOBS_DIR=str(tmp_path),
+        RAPPORT_JOBS_MAX_EN_ATTENTE=2,
+    )
+    return app
+
+
+PARAMS = {'date_debut': '2025-03-01', 'date_fin': '2025-03-31'}
+
+
+class TestSoumission:
+    def test_job_produces_cached_file(self, jobs_app):
+        from app.services.rapport_job_service import RapportJobService
+        job, cree = RapportJobService.soumettre('trajets_pdf', PARAMS, demande_par=1)
+        assert cree
+        assert job.statut == 'TERMINE', job.erreur
+        chemin = RapportJobService.chemin_fichier(job)
+        assert chemin and os.path.dirname(chemin) == jobs_app.config['RAPPORT_JOBS_DIR']
+        with open(chemin, 'rb') as f:
+            assert f.read(4) == b'%PDF'
+
+    def test_identical_requests_are_deduplicated(self, jobs_app):
+        from app.services.rapport_job_service import RapportJobService
+        premier, _ = RapportJobService.soumettre('trajets_pdf', PARAMS)
+        second, cree = RapportJobService.soumettre('trajets_pdf', dict(reversed(list(PARAMS.items()))))
+        assert not cree and second.id == premier.id
+        autre, cree = RapportJobService.soumettre('trajets_pdf', dict(PARAMS, date_fin='2025-04-30'))
+        assert cree and autre.id != premier.id
+
+    def test_unknown_type_and_full_queue(self, jobs_app):
+        from app.models.rapport_job import RapportJob
+        from app.services.rapport_job_service import RapportJobService, FileAttentePleine
+        with pytest.raises(ValueError):
+            RapportJobService.soumettre('inconnu', {})
+        for i in range(2):
+            db.session.add(RapportJob(id=f'attente{i}', type_rapport='trajets_pdf', parametres='{}',
+                                      cle=f'cle{i}', statut='EN_ATTENTE'))
+        db.session.commit()
+        with pytest.raises(FileAttentePleine):
+            RapportJobService.soumettre('trajets_pdf', PARAMS)
+
+
+class TestPurge:
+    def test_expired_jobs_and_files_are_removed(self, jobs_app):
+        from app.models.rapport_job import RapportJob
+        from app.services.rapport_job_service import RapportJobService
+        job, _ = RapportJobService.soumettre('trajets_pdf', PARAMS)
+        chemin = RapportJobService.chemin_fichier(job)
+        job.expire_le = datetime.now() - timedelta(seconds=1)
+        db.session.commit()
+
+        assert RapportJobService.purger_expires() == 1
+        assert not os.path.exists(chemin)
+        assert db.session.get(RapportJob, job.id) is None
+
+    def test_stale_pending_jobs_fail(self, jobs_app):
+        from app.models.rapport_job import RapportJob
+        from app.services.rapport_job_service import RapportJobService
+        db.session.add(RapportJob(id='bloque', type_rapport='trajets_pdf', parametres='{}', cle='x',
+                                  statut='EN_COURS', cree_le=datetime.now() - timedelta(hours=2)))
+        db.session.commit()
+        RapportJobService.purger_expires()
+        assert db.session.get(RapportJob, 'bloque').statut == 'ECHEC'
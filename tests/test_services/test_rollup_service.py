@@ -0,0 +1,109 @@
+"""
+Tests de l'agrégat journalier des trajets (TrajetRollupService).
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from app.extensions import db
+
+
+JOUR = date(2025, 3, 19)
+
+
+def _trajet(heure=8, jour=JOUR, **kwargs):
+    from app.models.trajet import Trajet
+    valeurs = dict(type_trajet='UDM_INTERNE', point_depart='Mfetum',
+                   type_passagers='ETUDIANT', nombre_places_occupees=10,
+                   numero_bus_udm='BUS_R1')
+    valeurs.update(kwargs)
+    return Trajet(date_heure_depart=datetime.combine(jour, datetime.min.time()) + timedelta(hours=heure),
+                  **valeurs)
+
+
+@pytest.fixture
+def trajets_enregistres(app):
+    from app.services.rollup_service import TrajetRollupService
+    trajets = [
+        _trajet(8),
+        _trajet(9, nombre_places_occupees=15),
+        _trajet(10, type_trajet='PRESTATAIRE', numero_bus_udm=None, prestataire_id=3,
+                point_depart='Banekane', nombre_places_occupees=30),
+        _trajet(11, type_trajet='AUTRE', type_passagers='PERSONNEL', nombre_places_occupees=None),
+        _trajet(12, type_passagers='MALADE', nombre_places_occupees=2),
+        _trajet(8, jour=JOUR + timedelta(days=1), nombre_places_occupees=40),
+    ]
+    for trajet in trajets:
+        db.session.add(trajet)
+        TrajetRollupService.enregistrer_trajet(trajet)
+    db.session.commit()
+    return trajets
+
+
+class TestEnregistrement:
+    def test_upsert_increments_existing_row(self, trajets_enregistres):
+        from app.models.trajet_daily_rollup import TrajetDailyRollup
+        ligne = TrajetDailyRollup.query.filter_by(
+            jour=JOUR, type_trajet='UDM_INTERNE', type_passagers='ETUDIANT'
+        ).one()
+        assert ligne.nombre_trajets == 2
+        assert ligne.nombre_passagers == 25
+        assert ligne.chauffeur_id == 0 and ligne.prestataire_id == 0
+
+    def test_rollback_discards_increment(self, app):
+        from app.models.trajet_daily_rollup import TrajetDailyRollup
+        from app.services.rollup_service import TrajetRollupService
+        trajet = _trajet(8)
+        db.session.add(trajet)
+        TrajetRollupService.enregistrer_trajet(trajet)
+        db.session.rollback()
+        assert TrajetDailyRollup.query.count() == 0
+
+    def test_service_registration_updates_rollup(self, app):
+        from types import SimpleNamespace
+        from app.services.trajet_service import enregistrer_depart_prestataire
+        from app.services.rollup_service import TrajetRollupService
+        ok, _ = enregistrer_depart_prestataire({
+            'date_heure_depart': '2025-03-19T07:30', 'lieu_depart': 'Banekane',
+            'type_passagers': 'ETUDIANT', 'nombre_places_occupees': '12',
+            'immat_bus': 'PR-R1', 'nom_prestataire': '1', 'nom_chauffeur': 'Paul',
+        }, SimpleNamespace(utilisateur_id=1))
+        assert ok
+        totaux = TrajetRollupService.get_totaux(JOUR)
+        assert totaux['trajets_prestataire'] == 1
+        assert totaux['passagers_etudiants'] == 12
+
+
+class TestLecture:
+    def test_totaux_by_type(self, trajets_enregistres):
+        from app.services.rollup_service import TrajetRollupService
+        totaux = TrajetRollupService.get_totaux(JOUR)
+        assert totaux == {
+            'total_trajets': 5, 'total_passagers': 57,
+            'trajets_udm': 3, 'trajets_prestataire': 1, 'trajets_autres': 1,
+            'passagers_etudiants': 55, 'passagers_personnel': 0, 'passagers_malades': 2,
+        }
+        assert TrajetRollupService.get_totaux(JOUR, JOUR + timedelta(days=1))['total_passagers'] == 97
+        assert TrajetRollupService.get_totaux(JOUR, prestataire_id=3)['total_trajets'] == 1
+
+    def test_reconstruire_matches_incremental(self, trajets_enregistres):
+        from app.models.trajet_daily_rollup import TrajetDailyRollup
+        from app.services.rollup_service import TrajetRollupService
+
+        def contenu():
+            return sorted(
+                (str(r.jour), r.type_trajet, r.type_passagers, r.point_depart, r.numero_bus_udm,
+                 r.chauffeur_id, r.prestataire_id, r.nombre_trajets, r.nombre_passagers)
+                for r in TrajetDailyRollup.query.all()
+            )
+
+        incremental = contenu()
+        TrajetDailyRollup.query.delete()
+        db.session.commit()
+
+        TrajetRollupService.reconstruire()
+        db.session.commit()
+        assert contenu() == incremental
+
+        # Reconstruction partielle : seule la journée demandée est recalculée
+        TrajetRollupService.reconstruire(JOUR, JOUR)
+        db.session.commit()
+        assert contenu() == incremental
@@ -0,0 +1,88 @@
+"""
+Tests des séries temporelles (un GROUP BY par table source, périodes complétées à 0).
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+@pytest.fixture
+def historique(app):
+    from app.models.trajet import Trajet
+    from app.models.panne_bus_udm import PanneBusUdM
+
+    def trajet(jour, type_trajet='UDM_INTERNE', places=10, passagers='ETUDIANT'):
+        return Trajet(type_trajet=type_trajet, point_depart='Mfetum', type_passagers=passagers,
+                      nombre_places_occupees=places,
+                      date_heure_depart=datetime.combine(jour, datetime.min.time()) + timedelta(hours=9))
+
+    db.session.add_all([
+        trajet(date(2025, 1, 6)),
+        trajet(date(2025, 1, 31), type_trajet='PRESTATAIRE', places=30),
+        trajet(date(2025, 3, 3), passagers='PERSONNEL', places=4),
+        trajet(date(2025, 3, 4)),
+        # Hors plage
+        trajet(date(2024, 12, 31), places=99),
+        PanneBusUdM(numero_bus_udm='BUS_T1', description='Frein', criticite='HAUTE',
+                    enregistre_par='test', date_heure=datetime(2025, 3, 10, 8)),
+    ])
+    db.session.commit()
+
+
+class TestSeries:
+    def test_monthly_buckets_zero_filled(self, historique):
+        from app.services.timeseries_service import TimeSeriesService
+        serie = TimeSeriesService.get_series(
+            ['trajets', 'trajets_prestataire', 'etudiants', 'pannes'],
+            date(2025, 1, 1), date(2025, 3, 31), 'mois'
+        )
+        assert serie['labels'] == ['01/2025', '02/2025', '03/2025']
+        assert serie['series'] == {
+            'trajets': [2, 0, 2],
+            'trajets_prestataire': [1, 0, 0],
+            'etudiants': [40, 0, 10],
+            'pannes': [0, 0, 1],
+        }
+
+    def test_weekly_and_daily_buckets(self, historique):
+        from app.services.timeseries_service import TimeSeriesService
+        semaines = TimeSeriesService.get_series(['trajets'], date(2025, 3, 3), date(2025, 3, 16), 'semaine')
+        assert semaines['periodes'] == [date(2025, 3, 3), date(2025, 3, 10)]
+        assert semaines['series']['trajets'] == [2, 0]
+
+        jours = TimeSeriesService.get_series(['passagers'], date(2025, 3, 2), date(2025, 3, 4))
+        assert jours['labels'] == ['02/03', '03/03', '04/03']
+        assert jours['series']['passagers'] == [0, 4, 10]
+
+    def test_one_query_per_source(self, historique):
+        from app.services.timeseries_service import TimeSeriesService
+        requetes = []
+
+        def compter(conn, cursor, statement, *args):
+            requetes.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', compter)
+        try:
+            TimeSeriesService.get_series(
+                ['trajets', 'trajets_udm', 'etudiants', 'pannes', 'pannes_critiques'],
+                date(2024, 1, 1), date(2025, 12, 31), 'mois'
+            )
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', compter)
+        assert len(requetes) == 2
+
+    def test_invalid_arguments(self, app):
+        from app.services.timeseries_service import TimeSeriesService
+        with pytest.raises(ValueError):
+            TimeSeriesService.get_series(['trajets'], date(2025, 1, 1), date(2025, 1, 2), 'heure')
+        with pytest.raises(ValueError):
+            TimeSeriesService.get_series(['inconnue'], date(2025, 1, 1), date(2025, 1, 2))
+
+    def test_monthly_trends_shape(self, historique):
+        from app.services.stats_service import StatsService
+        trends = StatsService.get_monthly_trends(3)
+        assert set(trends) == {'mois', 'trajets', 'pannes', 'etudiants'}
+        assert len(trends['mois']) == 3
+        assert trends['mois'][-1] == date.today().strftime('%m/%Y')
@@ -0,0 +1,76 @@
+"""
+Tests du client LDAP (app/utils/annuaire_ldap.py) contre le serveur simulé de ldap3.
+"""
+import pytest
+from ldap3 import MOCK_SYNC, MODIFY_REPLACE, OFFLINE_AD_2012_R2, Connection, Server
+
+BASE_DN = 'dc=udm,dc=local'
+SERVICE_DN = 'cn=svc_transport,ou=services,dc=udm,dc=local'
+CONFIG = {'LDAP_BASE_DN': BASE_DN, 'LDAP_SERVICE_USER': SERVICE_DN, 'LDAP_SERVICE_PASSWORD': 'svc',
+          'LDAP_TIMEOUT': 1, 'LDAP_POOL_TAILLE': 2, 'LDAP_CACHE_TTL': 300}
+
+
+@pytest.fixture
+def serveur_ad():
+    serveur = Server('ad_simule', get_info=OFFLINE_AD_2012_R2)
+    dit = Connection(serveur, user=SERVICE_DN, password='svc', client_strategy=MOCK_SYNC)
+    dit.strategy.add_entry(SERVICE_DN, {'sAMAccountName': 'svc_transport', 'userPassword': 'svc',
+                                        'objectClass': 'person'})
+    dit.strategy.add_entry('cn=Jean Route,ou=users,dc=udm,dc=local', {
+        'sAMAccountName': 'jroute', 'userPassword': 'Secret!1', 'objectClass': 'person',
+        'memberOf': ['CN=Chauffeurs,OU=Groupes,DC=udm,DC=local', 'CN=Personnel,OU=Groupes,DC=udm,DC=local'],
+    })
+    dit.bind()
+    return serveur, dit
+
+
+@pytest.fixture
+def annuaire(serveur_ad):
+    from app.utils.annuaire_ldap import AnnuaireLDAP
+    return AnnuaireLDAP(CONFIG, serveur=serveur_ad[0], strategie=MOCK_SYNC)
+
+
+class TestAnnuaire:
+    def test_authentication_and_groups(self, annuaire):
+        assert annuaire.authentifier('jroute', 'Secret!1') == (True, ['Chauffeurs', 'Personnel'], None)
+        assert annuaire.authentifier('jroute', 'mauvais')[0] is False
+        assert annuaire.authentifier('jroute', '')[0] is False
+        assert annuaire.authentifier('local_only', 'x') is None
+        assert annuaire.authentifier('*)(sAMAccountName=*', 'x') is None
+
+    def test_connections_pooled_and_groups_cached(self, annuaire, serveur_ad):
+        for _ in range(5):
+            assert annuaire.authentifier('jroute', 'Secret!1')[0]
+        assert annuaire._service._ouvertes == 1 and annuaire._verification._ouvertes == 1
+
+        dit = serveur_ad[1]
+        dit.modify('cn=Jean Route,ou=users,dc=udm,dc=local',
+                   {'memberOf': [(MODIFY_REPLACE, ['CN=Mecanciens,OU=Groupes,DC=udm,DC=local'])]})
+        assert annuaire.authentifier('jroute', 'Secret!1')[1] == ['Chauffeurs', 'Personnel']
+        annuaire.invalider('JRoute')
+        assert annuaire.authentifier('jroute', 'Secret!1')[1] == ['Mecanciens']
+
+    def test_unreachable_server(self):
+        from app.utils.annuaire_ldap import AnnuaireIndisponible, AnnuaireLDAP
+        annuaire = AnnuaireLDAP(CONFIG, serveur=Server('127.0.0.1', port=1, connect_timeout=1))
+        with pytest.raises(AnnuaireIndisponible):
+            annuaire.authentifier('jroute', 'Secret!1')
+        assert annuaire._service._ouvertes == 0
+
+
+class TestLoginLDAP:
+    def test_directory_user_created_with_role(self, app, client, annuaire):
+        from app.models.utilisateur import Utilisateur
+        app.config['ENABLE_LDAP'] = True
+        app.extensions['annuaire_ldap'] = annuaire
+        reponse = client.post('/login', data={'login': 'jroute', 'mot_de_passe': 'Secret!1'})
+        assert reponse.status_code == 302 and reponse.location.endswith('/chauffeur/dashboard')
+        assert Utilisateur.query.filter_by(login='jroute').one().role == 'CHAUFFEUR'
+
+    def test_falls_back_to_mysql_when_unreachable(self, app, client, sample_user):
+        from app.utils.annuaire_ldap import AnnuaireLDAP
+        app.config['ENABLE_LDAP'] = True
+        app.extensions['annuaire_ldap'] = AnnuaireLDAP(
+            CONFIG, serveur=Server('127.0.0.1', port=1, connect_timeout=1))
+        reponse = client.post('/login', data={'login': 'testuser', 'mot_de_passe': 'TestPassword123!'})
+        assert reponse.status_code == 302 and reponse.location.endswith('/admin/dashboard')
@@ -0,0 +1,54 @@
+"""
+Tests des fichiers d'audit par rôle (app/utils/audit_fichiers.py).
+"""
+import logging
+import os
+import subprocess
+import sys
+
+from flask import Flask, session
+
+
+class TestJournauxAudit:
+    def test_import_has_no_side_effects(self, tmp_path):
+        (tmp_path / 'logs').mkdir()
+        (tmp_path / 'logs' / 'audit.log').write_text('ancien')
+        racine = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        code = ('import threading, app.utils.audit_logger, app.utils.audit_fichiers; '
+                'assert threading.active_count() == 1')
+        subprocess.run([sys.executable, '-c', code], cwd=tmp_path, check=True,
+                       env=dict(os.environ, PYTHONPATH=racine))
+        assert os.listdir(tmp_path / 'logs') == ['audit.log']
+
+    def test_directory_not_relative_to_cwd(self, app):
+        from app.utils.audit_fichiers import JournauxAudit, get_journaux_audit
+        assert get_journaux_audit().dossier == app.config['AUDIT_LOG_DIR']
+        autre = Flask('autre_app')
+        assert JournauxAudit(autre).dossier == os.path.join(autre.root_path, 'logs', 'audit')
+
+    def test_written_by_listener_on_first_use(self, app, tmp_path):
+        from app.utils.audit_fichiers import get_journaux_audit
+        from app.utils.audit_logger import log_critical_action
+        dossier = tmp_path / 'logs' / 'audit'
+        (tmp_path / 'logs').mkdir()
+        (tmp_path / 'logs' / 'audit.log').write_text('ancien')
+        journaux = get_journaux_audit()
+        journaux.dossier = str(dossier)
+        assert app.extensions['journaux_audit'] is journaux
+        assert not dossier.exists()
+
+        with app.test_request_context('/'):
+            session['user_id'] = '7'
+            session['user_role'] = 'CHAUFFEUR'
+            log_critical_action('LOGIN_FAILED', details='essai')
+        handlers = logging.getLogger('audit_chauffeur').handlers
+        assert [type(h).__name__ for h in handlers] == ['QueueHandler']
+
+        journaux.fermer()
+        assert os.listdir(dossier) == ['audit_chauffeur.log']
+        ligne = (dossier / 'audit_chauffeur.log').read_text(encoding='utf-8')
+        assert '| ERROR | USER:7 | ROLE:CHAUFFEUR | ACTION:LOGIN_FAILED' in ligne
+        assert 'DETAILS:essai' in ligne
+        # L'ancien fichier unique est sauvegardé à la première écriture
+        assert [f for f in os.listdir(tmp_path / 'logs') if f.startswith('audit_backup_')]
+        assert not logging.getLogger('audit_chauffeur').handlers
@@ -0,0 +1,157 @@
+"""
+Tests du journal d'audit structuré (table audit_log, écriture par lots).
+"""
+import gc
+import weakref
+from datetime import datetime, timedelta
+from flask import session
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+def _log(app, user_id, role, action, **kwargs):
+    from app.utils.audit_logger import log_critical_action
+    with app.test_request_context('/'):
+        session['user_id'] = user_id
+        session['user_role'] = role
+        log_critical_action(action, **kwargs)
+
+
+def _entree(horodatage, role='ADMIN', action='CREATE', niveau='MEDIUM', **kwargs):
+    from app.models.audit_log import AuditLog
+    entree = AuditLog(horodatage=horodatage, utilisateur='1', role=role, action=action,
+                      niveau=niveau, succes=kwargs.pop('succes', True), ip='127.0.0.1', **kwargs)
+    db.session.add(entree)
+    return entree
+
+
+class TestEcriture:
+    def test_entries_are_buffered_then_visible_to_reads(self, app):
+        from app.models.audit_log import AuditLog
+        from app.utils.audit_logger import get_audit_logs
+        from app.utils.audit_store import get_audit_store
+
+        _log(app, '7', 'ADMIN', 'USER_CREATED', resource_type='utilisateur', resource_id=9,
+             details='New role: CHARGE | Created by: ADMIN')
+        assert get_audit_store().en_attente() == 1
+        assert db.session.query(AuditLog).count() == 0
+
+        logs = get_audit_logs(role_filter='ADMIN')
+        assert get_audit_store().en_attente() == 0
+        assert len(logs) == 1
+        assert 'USER:7 | ROLE:ADMIN | ACTION:USER_CREATED | LEVEL:HIGH | SUCCESS:True' in logs[0]
+        assert logs[0].endswith('DETAILS:New role: CHARGE | Created by: ADMIN')
+
+    def test_full_batch_is_written_in_one_insert(self, app):
+        from app.models.audit_log import AuditLog
+        from app.utils.audit_store import get_audit_store
+
+        store = get_audit_store()
+        store.taille_lot = 3
+        inserts = []
+
+        def compter(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('INSERT INTO audit_log'):
+                inserts.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', compter)
+        try:
+            for i in range(3):
+                _log(app, str(i), 'CHARGE', 'CREATE', resource_type='trajet')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', compter)
+
+        assert len(inserts) == 1
+        assert store.en_attente() == 0
+        assert db.session.query(AuditLog).filter_by(role='CHARGE').count() == 3
+
+    def test_store_not_kept_alive_by_exit_hook(self, app):
+        from app.utils.audit_store import _TAMPONS, AuditStore
+        store = AuditStore(app)
+        assert store in _TAMPONS
+        reference = weakref.ref(store)
+        del store
+        gc.collect()
+        assert reference() is None
+
+
+class TestConsultation:
+    def test_filters_order_and_pagination(self, app):
+        from app.utils.audit_logger import get_audit_logs, search_audit_logs
+        maintenant = datetime.now()
+        for i in range(5):
+            _entree(maintenant - timedelta(minutes=i), role='SUPERVISEUR', action='UPDATE',
+                    ressource_id=str(i))
+        _entree(maintenant, role='ADMIN', action='DELETE')
+        db.session.commit()
+
+        logs = get_audit_logs(limit=2, role_filter='SUPERVISEUR', offset=2)
+        assert [l.split('RESOURCE_ID:')[1] for l in logs] == ['2', '3']
+        assert get_audit_logs(action_filter='DELETE')[0].count('ROLE:ADMIN') == 1
+
+        page = search_audit_logs(page=3, per_page=2, role_filter='SUPERVISEUR')
+        assert (page['total'], page['pages'], page['page']) == (5, 3, 3)
+        assert [item['ressource_id'] for item in page['items']] == ['4']
+
+    def test_statistics_and_critical_alerts(self, app):
+        from app.utils.audit_logger import get_role_statistics, get_critical_alerts
+        maintenant = datetime.now()
+        _entree(maintenant - timedelta(hours=1), role='CHAUFFEUR', action='LOGIN_FAILED',
+                niveau='CRITICAL', succes=False)
+        _entree(maintenant - timedelta(hours=30), role='CHAUFFEUR', action='LOGIN_FAILED',
+                niveau='CRITICAL', succes=False)
+        _entree(maintenant, role='CHAUFFEUR', action='LOGIN_SUCCESS', niveau='HIGH')
+        _entree(maintenant - timedelta(days=60), role='CHAUFFEUR', action='CREATE')
+        db.session.commit()
+
+        stats = get_role_statistics()
+        chauffeur = stats['CHAUFFEUR']
+        assert chauffeur['total'] == 3
+        assert chauffeur['actions'] == {'LOGIN_FAILED': 2, 'LOGIN_SUCCESS': 1}
+        assert chauffeur['levels']['CRITICAL'] == 2
+        assert chauffeur['success_rate'] == 33.3
+        assert chauffeur['recent_activity'][0]['action'] == 'LOGIN_SUCCESS'
+        assert stats['ADMIN']['total'] == 0
+
+        alertes = get_critical_alerts(hours=24)
+        assert len(alertes) == 1
+        assert alertes[0]['role'] == 'CHAUFFEUR' and 'LEVEL:CRITICAL' in alertes[0]['log']
+
+
+class TestImportFichiers:
+    LIGNES = [
+        '2025-01-10 08:00:00 | WARNING | USER:3 | ROLE:ADMIN | ACTION:LOGIN_SUCCESS | LEVEL:HIGH | '
+        'SUCCESS:True | IP:10.0.0.1 | RESOURCE:session | RESOURCE_ID:3 | DETAILS:Role: ADMIN | via LDAP\n',
+        '2025-01-10 09:00:00 | ERROR | USER:SYSTEM | ROLE:ADMIN | ACTION:SYSTEM_ERROR | LEVEL:CRITICAL | '
+        'SUCCESS:False | IP:10.0.0.1 | RESOURCE:system | DETAILS:Error type: X | Context: y | ERROR:boom\n',
+        'ligne illisible\n',
+        '2025-02-01 09:00:00 | INFO | USER:4 | ROLE:ADMIN | ACTION:CREATE | LEVEL:MEDIUM | '
+        'SUCCESS:True | IP:10.0.0.1\n',
+    ]
+
+    def test_parse_line_keeps_pipes_in_details(self):
+        from app.utils.audit_store import parse_audit_line
+        entree = parse_audit_line(self.LIGNES[1])
+        assert entree['horodatage'] == datetime(2025, 1, 10, 9, 0)
+        assert entree['details'] == 'Error type: X | Context: y'
+        assert entree['erreur'] == 'boom'
+        assert entree['succes'] is False and entree['source'] == 'fichier'
+        assert parse_audit_line(self.LIGNES[2]) is None
+
+    def test_ingest_is_repeatable(self, app, tmp_path):
+        from app.models.audit_log import AuditLog
+        from app.utils.audit_store import ingest_audit_files
+        (tmp_path / 'audit_admin.log').write_text(''.join(self.LIGNES), encoding='utf-8')
+        # Déjà écrit par l'application : les lignes à partir de cette date ne sont pas réimportées
+        _entree(datetime(2025, 1, 20), source='app')
+        db.session.commit()
+
+        assert ingest_audit_files(str(tmp_path)) == 2
+        db.session.commit()
+        assert ingest_audit_files(str(tmp_path)) == 2
+        db.session.commit()
+
+        importees = AuditLog.query.filter_by(source='fichier').order_by(AuditLog.horodatage).all()
+        assert [e.action for e in importees] == ['LOGIN_SUCCESS', 'SYSTEM_ERROR']
+        assert importees[0].to_line() == self.LIGNES[0].rstrip('\n')
@@ -0,0 +1,45 @@
+"""
+Tests des réponses CSV en flux (morceaux par paquet, gzip optionnel).
+"""
+import csv
+import gzip
+import io
+
+from app.utils.csv_stream import csv_response, iter_csv, iter_gzip
+
+
+def _lire(contenu: bytes):
+    return list(csv.reader(io.StringIO(contenu.decode('utf-8'))))
+
+
+class TestIterCsv:
+    def test_chunks_per_batch(self):
+        lignes = ([i, f'ligne {i}'] for i in range(5))
+        morceaux = list(iter_csv(lignes, header=['N°', 'Libellé'], batch_size=2))
+        # en-tête + 2 lignes, 2 lignes, 1 ligne
+        assert len(morceaux) == 3
+        assert _lire(b''.join(morceaux))[0] == ['N°', 'Libellé']
+        assert len(_lire(b''.join(morceaux))) == 6
+
+    def test_gzip_round_trip(self):
+        morceaux = iter_csv(([i] for i in range(1000)), batch_size=100)
+        compresse = b''.join(iter_gzip(morceaux))
+        assert _lire(gzip.decompress(compresse))[-1] == ['999']
+
+
+class TestCsvResponse:
+    def test_plain_response_headers(self, app):
+        with app.test_request_context('/'):
+            response = csv_response([['a', 'é']], 'export.csv', header=['x', 'y'])
+            assert response.is_streamed
+            assert response.headers['Content-Disposition'] == 'attachment; filename="export.csv"'
+            assert 'Content-Encoding' not in response.headers
+            assert _lire(b''.join(response.response)) == [['x', 'y'], ['a', 'é']]
+
+    def test_gzip_only_when_requested_and_accepted(self, app):
+        with app.test_request_context('/?gzip=1', headers={'Accept-Encoding': 'gzip'}):
+            response = csv_response([['a']], 'export.csv')
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert _lire(gzip.decompress(b''.join(response.response))) == [['a']]
+        with app.test_request_context('/?gzip=1'):
+            assert 'Content-Encoding' not in csv_response([['a']], 'export.csv').headers
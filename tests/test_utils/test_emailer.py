@@ -0,0 +1,129 @@
+"""
+Tests du transport SMTP réutilisable (app/utils/emailer.py).
+Le serveur SMTP est remplacé par un faux objet qui compte les connexions.
+"""
+import smtplib
+import pytest
+
+
+class FakeSMTP:
+    instances = []
+    coupures = 0  # Nombre de sendmail à faire échouer par déconnexion
+    injoignable = False
+
+    def __init__(self, host, port, timeout=None):
+        if FakeSMTP.injoignable:
+            raise ConnectionRefusedError('injoignable')
+        self.envoyes = []
+        self.tls = False
+        self.logged = False
+        self.closed = False
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        self.tls = True
+
+    def login(self, user, pwd):
+        self.logged = True
+
+    def sendmail(self, mail_from, to, payload):
+        if FakeSMTP.coupures:
+            FakeSMTP.coupures -= 1
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        if to == ['refuse@t.com']:
+            raise smtplib.SMTPRecipientsRefused({'refuse@t.com': (550, b'No such user')})
+        self.envoyes.append(to[0])
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def smtp(app, monkeypatch):
+    FakeSMTP.instances = []
+    FakeSMTP.coupures = 0
+    FakeSMTP.injoignable = False
+    monkeypatch.setattr(smtplib, 'SMTP', FakeSMTP)
+    app.config.update(SMTP_HOST='smtp.test', SMTP_PORT=587, SMTP_USERNAME='u',
+                      SMTP_PASSWORD='p', SMTP_USE_TLS=True, SMTP_USE_SSL=False)
+    app.extensions.pop('smtp_transport', None)
+    return FakeSMTP
+
+
+def _messages(*emails):
+    from app.utils.emailer import EmailMessage
+    return [EmailMessage('Sujet', 'Corps', email) for email in emails]
+
+
+class TestTransport:
+    def test_bulk_and_single_sends_share_one_session(self, smtp):
+        from app.utils.emailer import send_bulk, send_email
+        assert send_bulk(_messages('a@t.com', 'b@t.com', 'refuse@t.com', 'c@t.com')) == [True, True, False, True]
+        assert send_email('Sujet', 'Corps', 'd@t.com') is True
+        assert len(smtp.instances) == 1
+        session = smtp.instances[0]
+        assert session.tls and session.logged
+        assert session.envoyes == ['a@t.com', 'b@t.com', 'c@t.com', 'd@t.com']
+
+    def test_reconnects_after_server_disconnect(self, smtp):
+        from app.utils.emailer import send_bulk
+        assert send_bulk(_messages('a@t.com')) == [True]
+        smtp.coupures = 1
+        assert send_bulk(_messages('b@t.com')) == [True]
+        assert len(smtp.instances) == 2 and smtp.instances[0].closed
+        assert smtp.instances[1].envoyes == ['b@t.com']
+
+    def test_idle_session_is_closed(self, smtp):
+        from app.utils.emailer import get_transport, send_bulk
+        send_bulk(_messages('a@t.com'))
+        get_transport().idle_timeout = -1
+        send_bulk(_messages('b@t.com'))
+        assert len(smtp.instances) == 2 and smtp.instances[0].closed
+
+    def test_unreachable_server_fails_fast(self, smtp):
+        from app.utils.emailer import send_bulk
+        smtp.injoignable = True
+        assert send_bulk(_messages('a@t.com', 'b@t.com', 'c@t.com')) == [False, False, False]
+
+    def test_incomplete_configuration(self, smtp, app):
+        from app.utils.emailer import send_email
+        app.config['SMTP_HOST'] = None
+        app.extensions.pop('smtp_transport', None)
+        assert send_email('Sujet', 'Corps', 'a@t.com') is False
+        assert smtp.instances == []
+
+
+class TestNotificationService:
+    def test_panne_notification_uses_one_session(self, smtp):
+        from datetime import datetime
+        from app.extensions import db
+        from app.models.bus_udm import BusUdM
+        from app.models.panne_bus_udm import PanneBusUdM
+        from app.models.utilisateur import Utilisateur
+        from app.services.notification_service import NotificationService
+        from app.services.outbox_service import OutboxService
+
+        for i, role in enumerate(['MECANICIEN', 'SUPERVISEUR', 'RESPONSABLE', 'MECANICIEN']):
+            u = Utilisateur(nom='N', prenom='P', login=f'notif{i}', email=f'notif{i}@t.com',
+                            telephone='000', role=role)
+            u.set_password('x')
+            db.session.add(u)
+        bus = BusUdM(numero='BUS_MAIL', immatriculation='ML-1', nombre_places=20,
+                     numero_chassis='CH_ML', etat_vehicule='BON')
+        db.session.add(bus)
+        db.session.commit()
+        panne = PanneBusUdM(bus_udm_id=bus.id, numero_bus_udm=bus.numero, immatriculation=bus.immatriculation,
+                            date_heure=datetime.now(), kilometrage=1000, description='Test',
+                            criticite='HAUTE', immobilisation=False, enregistre_par='Test')
+        db.session.add(panne)
+        db.session.commit()
+
+        assert NotificationService.send_panne_notification(panne, 'Test') is True
+        # Mise en file pendant la requête, envoi par le worker
+        assert smtp.instances == []
+        assert OutboxService.traiter_lot()['envoyes'] == 4
+        assert len(smtp.instances) == 1
+        assert sorted(smtp.instances[0].envoyes) == [f'notif{i}@t.com' for i in range(4)]
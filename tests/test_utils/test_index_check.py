@@ -0,0 +1,20 @@
+"""
+Tests du contrôle EXPLAIN des requêtes chaudes (index composites).
+"""
+
+
+class TestHotQueriesIndexes:
+    def test_every_hot_query_uses_its_index(self, app):
+        from app.utils.index_check import check_hot_queries
+        report = check_hot_queries()
+        assert report
+        echecs = [entry for entry in report if not entry['ok']]
+        assert echecs == []
+
+    def test_missing_index_is_reported(self, app):
+        from app.extensions import db
+        from app.utils.index_check import check_hot_queries
+        db.session.execute(db.text('DROP INDEX idx_vidange_bus_date'))
+        report = {entry['name']: entry for entry in check_hot_queries()}
+        assert report['derniere_vidange_bus']['ok'] is False
+        assert report['trajets_jour_par_type']['ok'] is True
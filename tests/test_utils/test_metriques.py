@@ -0,0 +1,85 @@
+"""
+Tests des métriques Prometheus (app/utils/metriques.py, GET /metrics).
+"""
+import threading
+from datetime import datetime
+
+from app.extensions import db
+
+
+class TestRegistre:
+    def test_thread_fragments_summed(self):
+        from app.utils.metriques import Compteur, Histogramme
+        compteur = Compteur('test_total', 'Test', ('type',))
+        histogramme = Histogramme('test_seconds', 'Test', seuils=(0.1, 1.0))
+
+        def travailler():
+            for _ in range(1000):
+                compteur.inc(type='a')
+                histogramme.observe(0.5)
+
+        threads = [threading.Thread(target=travailler) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        compteur.inc(type='b')
+        histogramme.observe(0.05)
+
+        # Les fragments des threads terminés sont conservés
+        assert compteur.valeur(type='a') == 4000 and compteur.valeur(type='b') == 1
+        assert histogramme.nombre() == 4001
+        lignes = histogramme.exposer()
+        assert 'test_seconds_bucket{le="0.1"} 1' in lignes
+        assert 'test_seconds_bucket{le="1.0"} 4001' in lignes
+        assert 'test_seconds_bucket{le="+Inf"} 4001' in lignes
+        assert 'test_seconds_count 4001' in lignes
+        assert compteur.exposer()[1:] == ['# TYPE test_total counter', 'test_total{type="a"} 4000.0',
+                                          'test_total{type="b"} 1.0']
+
+
+class TestEndpoint:
+    def test_metrics_exposition(self, app, client):
+        from app.models.bus_udm import BusUdM
+        from app.models.panne_bus_udm import PanneBusUdM
+        bus = BusUdM(numero='BUS_MET', immatriculation='MET-1', nombre_places=20, numero_chassis='CH_MET',
+                     etat_vehicule='DEFAILLANT', kilometrage=1000)
+        db.session.add(bus)
+        db.session.commit()
+        db.session.add(PanneBusUdM(bus_udm_id=bus.id, numero_bus_udm=bus.numero, description='Test',
+                                   criticite='FAIBLE', enregistre_par='Test', date_heure=datetime.now()))
+        db.session.commit()
+
+        app.config['METRICS_PUBLIC'] = True
+        client.get('/login')
+        reponse = client.get('/metrics')
+        assert reponse.status_code == 200
+        assert reponse.content_type.startswith('text/plain; version=0.0.4')
+        texte = reponse.get_data(as_text=True)
+        assert 'transport_http_request_duration_seconds_count{blueprint="auth",endpoint="auth.login_form",method="GET"}' in texte
+        assert 'transport_pannes_ouvertes 1.0' in texte
+        assert 'transport_bus_defaillants 1.0' in texte
+        assert 'transport_trajets_jour 0.0' in texte
+        assert '# TYPE transport_db_pool_checkout_wait_seconds histogram' in texte
+        assert 'transport_db_pool_connections_in_use' in texte
+
+    def test_token_required(self, app, client):
+        app.config['METRICS_TOKEN'] = 'secret'
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer autre'}).status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+    def test_hidden_without_token_unless_public(self, app, client):
+        app.config.update(METRICS_TOKEN=None, METRICS_PUBLIC=False)
+        assert client.get('/metrics').status_code == 404
+        app.config['METRICS_PUBLIC'] = True
+        assert client.get('/metrics').status_code == 200
+
+    def test_notification_failures_counted(self, app):
+        from app.utils.emailer import EmailMessage, send_bulk
+        from app.utils.metriques import NOTIFICATION_ECHECS
+        app.config.update(SMTP_HOST=None)
+        app.extensions.pop('smtp_transport', None)
+        avant = NOTIFICATION_ECHECS.valeur()
+        assert send_bulk([EmailMessage('S', 'C', 'a@t.com'), EmailMessage('S', 'C', 'b@t.com')]) == [False, False]
+        assert NOTIFICATION_ECHECS.valeur() == avant + 2
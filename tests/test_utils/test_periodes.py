@@ -0,0 +1,69 @@
+"""
+Tests des helpers de période (bornes demi-ouvertes sargables).
+"""
+from datetime import date, datetime, timedelta
+
+from app.utils.periodes import (
+    day_bounds, date_bounds, month_start, resolve_period, date_range_filter, day_filter
+)
+
+
+TODAY = date(2025, 3, 19)  # mercredi
+
+
+class TestBounds:
+    def test_day_bounds_half_open(self):
+        start, end = day_bounds(TODAY)
+        assert start == datetime(2025, 3, 19)
+        assert end == datetime(2025, 3, 20)
+
+    def test_date_bounds_inclusive_end(self):
+        assert date_bounds(date(2025, 3, 1), date(2025, 3, 31)) == (
+            datetime(2025, 3, 1), datetime(2025, 4, 1)
+        )
+
+    def test_date_bounds_open_ended(self):
+        assert date_bounds(date(2025, 3, 1)) == (datetime(2025, 3, 1), None)
+
+    def test_month_start_offsets(self):
+        assert month_start(TODAY) == date(2025, 3, 1)
+        assert month_start(TODAY, -3) == date(2024, 12, 1)
+        assert month_start(date(2024, 12, 31), 1) == date(2025, 1, 1)
+
+
+class TestResolvePeriod:
+    def test_named_periods(self):
+        assert resolve_period('jour', today=TODAY) == (TODAY, TODAY)
+        assert resolve_period('semaine', today=TODAY) == (date(2025, 3, 17), TODAY)
+        assert resolve_period('mois', today=TODAY) == (date(2025, 3, 1), TODAY)
+        assert resolve_period('annee', today=TODAY) == (date(2025, 1, 1), TODAY)
+
+    def test_custom_range(self):
+        assert resolve_period('mois', '2025-01-05', '2025-02-10', today=TODAY) == (
+            date(2025, 1, 5), date(2025, 2, 10)
+        )
+
+    def test_invalid_falls_back_to_default(self):
+        assert resolve_period('mois', 'bad', '2025-02-10', default='jour', today=TODAY) == (TODAY, TODAY)
+        assert resolve_period('inconnue', today=TODAY) == (date(2025, 3, 1), TODAY)
+
+
+class TestFilters:
+    def test_filters_do_not_wrap_column(self, app):
+        from app.models.trajet import Trajet
+        sql = str(date_range_filter(Trajet.date_heure_depart, TODAY, TODAY))
+        assert 'date(' not in sql.lower()
+        assert 'date_heure_depart >=' in sql and 'date_heure_depart <' in sql
+        assert 'date(' not in str(day_filter(Trajet.date_heure_depart, TODAY)).lower()
+
+    def test_range_filter_selects_boundaries(self, app):
+        from app.extensions import db
+        from app.models.trajet import Trajet
+        for dt in (datetime(2025, 3, 18, 23, 59), datetime(2025, 3, 19, 0, 0),
+                   datetime(2025, 3, 19, 23, 59, 59), datetime(2025, 3, 20, 0, 0)):
+            db.session.add(Trajet(type_trajet='AUTRE', date_heure_depart=dt, point_depart='Banekane'))
+        db.session.commit()
+        assert Trajet.query.filter(day_filter(Trajet.date_heure_depart, TODAY)).count() == 2
+        assert Trajet.query.filter(
+            date_range_filter(Trajet.date_heure_depart, TODAY - timedelta(days=1), TODAY)
+        ).count() == 3
@@ -0,0 +1,121 @@
+"""
+Tests du planificateur de tâches périodiques (app/utils/planificateur.py).
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.utils.planificateur import Cron, Planificateur, Tache
+
+
+class TestCron:
+    def test_next_slot(self):
+        samedi = datetime(2026, 10, 17, 7, 0, 30)
+        assert Cron('0 7 * * *').prochaine(samedi) == datetime(2026, 10, 18, 7, 0)
+        assert Cron('*/15 * * * *').prochaine(samedi) == datetime(2026, 10, 17, 7, 15)
+        assert Cron('30 2 1 */3 *').prochaine(samedi) == datetime(2027, 1, 1, 2, 30)
+        # Lundi à vendredi 8 h
+        assert Cron('0 8 * * 1-5').prochaine(samedi) == datetime(2026, 10, 19, 8, 0)
+        # 7 = dimanche ; jour du mois et jour de semaine restreints : l'un ou l'autre
+        assert Cron('0 0 * * 7').prochaine(samedi) == datetime(2026, 10, 18, 0, 0)
+        assert Cron('0 0 31 * 1').prochaine(samedi) == datetime(2026, 10, 19, 0, 0)
+
+    @pytest.mark.parametrize('expression', ['* * *', '60 * * * *', '0 7 * * 8', '5-1 * * * *'])
+    def test_invalid_expression(self, expression):
+        with pytest.raises(ValueError):
+            Cron(expression)
+
+    def test_impossible_date(self):
+        with pytest.raises(ValueError):
+            Cron('0 0 30 2 *').prochaine(datetime(2026, 1, 1))
+
+
+class TestTache:
+    def test_interval_jitter_bounds(self):
+        tache = Tache('t', lambda: None, intervalle=600, gigue=60)
+        debut = datetime(2026, 10, 18, 12, 0)
+        for _ in range(50):
+            assert debut + timedelta(seconds=600) <= tache.prochaine(debut) <= debut + timedelta(seconds=660)
+            assert debut <= tache.premiere(debut) <= debut + timedelta(seconds=60)
+
+    def test_interval_or_cron_required(self):
+        with pytest.raises(ValueError):
+            Tache('t', lambda: None)
+        with pytest.raises(ValueError):
+            Tache('t', lambda: None, intervalle=60, cron='* * * * *')
+
+
+@pytest.fixture
+def appels():
+    return []
+
+
+@pytest.fixture
+def taches(appels):
+    def echouer():
+        raise RuntimeError('panne')
+    return [
+        Tache('compteur', lambda: appels.append('compteur'), intervalle=300),
+        Tache('quotidienne', lambda: appels.append('quotidienne'), cron='0 7 * * *'),
+        Tache('echec', echouer, intervalle=60),
+    ]
+
+
+class TestPlanificateur:
+    def test_due_jobs_run_once(self, app, taches, appels):
+        from app.models.tache_planifiee import TachePlanifiee
+        planificateur = Planificateur(app, taches, identifiant='a')
+        assert planificateur.executer_dues() == {'compteur': True, 'echec': False}
+        assert appels == ['compteur']
+        assert planificateur.executer_dues() == {}
+
+        ligne = db.session.get(TachePlanifiee, 'echec')
+        assert ligne.dernier_statut == 'ECHEC' and ligne.derniere_erreur == 'panne'
+        assert ligne.detenteur is None and ligne.verrou_expire_le is None
+        compteur = db.session.get(TachePlanifiee, 'compteur')
+        assert compteur.prochaine_execution - compteur.derniere_execution == timedelta(seconds=300)
+        assert db.session.get(TachePlanifiee, 'quotidienne').derniere_execution is None
+
+    def test_single_runner_lock(self, app, taches, appels):
+        from app.models.tache_planifiee import TachePlanifiee
+        premier = Planificateur(app, taches, identifiant='a')
+        second = Planificateur(app, taches, identifiant='b')
+        premier.initialiser()
+        # Le premier processus a posé le verrou et exécute la tâche
+        ligne = db.session.get(TachePlanifiee, 'compteur')
+        ligne.detenteur, ligne.verrou_expire_le = 'a', datetime.now() + timedelta(minutes=10)
+        db.session.commit()
+
+        assert second.executer('compteur') is None
+        assert 'compteur' not in second.executer_dues()
+        assert appels == []
+
+        # Verrou expiré (processus arrêté pendant l'exécution) : la tâche est reprise
+        ligne.verrou_expire_le = datetime.now() - timedelta(seconds=1)
+        db.session.commit()
+        assert second.executer_dues()['compteur'] is True
+        assert appels == ['compteur']
+        # Tâche déjà exécutée par l'autre processus : plus due
+        assert 'compteur' not in premier.executer_dues()
+
+    def test_forced_run(self, app, taches, appels):
+        planificateur = Planificateur(app, taches, identifiant='a')
+        assert planificateur.executer('quotidienne') is True
+        assert appels == ['quotidienne']
+        etat = {e['nom']: e for e in planificateur.get_etat()}
+        assert etat['quotidienne']['planification'] == '0 7 * * *'
+        assert etat['quotidienne']['dernier_statut'] == 'OK'
+
+
+class TestCommandes:
+    def test_registered_jobs(self, app):
+        from app.services.planification_service import PlanificationService
+        planificateur = PlanificationService.get_planificateur(app)
+        assert set(planificateur.taches) == {'seuils_flotte', 'expirations', 'rollup_trajets', 'purge_rapports',
+                                             'digest_notifications'}
+        assert not planificateur.is_alive()
+
+        resultat = app.test_cli_runner().invoke(args=['taches', 'executer', 'purge_rapports'])
+        assert resultat.exit_code == 0 and 'purge_rapports : ok' in resultat.output
+        resultat = app.test_cli_runner().invoke(args=['taches', 'liste'])
+        assert 'seuils_flotte' in resultat.output and '0 7 * * *' in resultat.output
@@ -0,0 +1,67 @@
+"""
+Tests du profilage SQL par requête (app/utils/profilage_sql.py, /admin/performances).
+"""
+import logging
+import pytest
+
+from app.extensions import db
+
+
+@pytest.fixture
+def admin_client(client, app):
+    from app.models.utilisateur import Utilisateur
+    user = Utilisateur(nom='Adm', prenom='P', login='adm_perf', email='adm_perf@t.com',
+                       telephone='000', role='ADMIN')
+    user.set_password('Pass!123')
+    db.session.add(user)
+    db.session.commit()
+    client.post('/login', data={'login': 'adm_perf', 'mot_de_passe': 'Pass!123'})
+    return client
+
+
+class TestProfileur:
+    def test_server_timing_and_endpoint_stats(self, app, admin_client):
+        from app.utils.profilage_sql import get_profileur
+        profileur = get_profileur(app)
+        profileur.reinitialiser()
+
+        reponse = admin_client.get('/admin/notifications')
+        assert reponse.status_code == 200
+        timing = reponse.headers['Server-Timing']
+        assert timing.startswith('db;dur=') and 'app;dur=' in timing
+        # Réponses anonymes : pas de mesure exposée
+        assert 'Server-Timing' not in app.test_client().get('/login').headers
+
+        stats = {e['endpoint']: e for e in profileur.get_endpoints()}
+        assert stats['admin.notifications']['appels'] == 1
+        assert stats['admin.notifications']['instructions_max'] >= 1
+        # Les instructions hors requête HTTP ne sont pas comptées
+        db.session.execute(db.text('SELECT 1'))
+        assert profileur.get_endpoints() == list(stats.values())
+
+    def test_budget_exceeded_logged(self, app, admin_client, caplog):
+        from app.utils.profilage_sql import get_profileur
+        app.config.update(SQL_PROFILER_BUDGET_REQUETES=0, SQL_PROFILER_REQUETE_LENTE_MS=0, SQL_PROFILER_TOP=3)
+        profileur = get_profileur(app)
+        profileur.reinitialiser()
+
+        with caplog.at_level(logging.WARNING, logger=app.logger.name):
+            admin_client.get('/admin/notifications')
+        assert any('Budget SQL dépassé' in r.getMessage() and 'admin.notifications' in r.getMessage()
+                   for r in caplog.records)
+
+        lentes = profileur.get_instructions_lentes()
+        assert 0 < len(lentes) <= 3
+        assert lentes[0]['duree_ms'] >= lentes[-1]['duree_ms']
+        assert {l['endpoint'] for l in lentes} == {'admin.notifications'}
+
+    def test_admin_page(self, app, admin_client):
+        admin_client.get('/admin/notifications')
+        assert admin_client.get('/admin/performances').status_code == 200
+
+        donnees = admin_client.get('/admin/performances/api').get_json()
+        assert donnees['success'] and 'admin.notifications' in {e['endpoint'] for e in donnees['endpoints']}
+
+        assert admin_client.post('/admin/performances/reinitialiser').get_json()['success']
+        donnees = admin_client.get('/admin/performances/api').get_json()
+        assert {e['endpoint'] for e in donnees['endpoints']} == {'admin.reinitialiser_performances'}
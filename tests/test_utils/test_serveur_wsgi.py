@@ -0,0 +1,47 @@
+"""
+Tests du lanceur WSGI de production (serveur.py) et de la taille du pool dérivée.
+"""
+import pytest
+
+from app.extensions import db
+
+
+class TestTaillePool:
+    @pytest.mark.parametrize('workers, threads, attendu', [
+        (4, 4, 6),      # un par thread + 2 threads de fond
+        (20, 4, 3),     # plafonné : 20 × (3 + 2) = 100 connexions
+        (200, 4, 1),
+    ])
+    def test_derived_from_workers(self, workers, threads, attendu):
+        from app.config import taille_pool
+        assert taille_pool(workers, threads, max_connexions=100, max_overflow=2) == attendu
+
+
+class TestServeur:
+    def test_gunicorn_options(self):
+        from app.config import Config
+        from serveur import options_gunicorn, _apres_fork
+        options = options_gunicorn(Config)
+        assert options['workers'] == Config.WEB_WORKERS and options['threads'] == Config.WEB_THREADS
+        assert options['worker_class'] == 'gthread'
+        assert options['preload_app'] is Config.WEB_PRELOAD
+        assert options['post_fork'] is _apres_fork
+
+    def test_worker_gets_fresh_instrumented_pool(self, app):
+        from serveur import preparer_worker
+        ancien = db.engine.pool
+        preparer_worker(app)
+        assert db.engine.pool is not ancien
+        assert db.engine.pool._metriques
+        assert db.session.execute(db.text('SELECT 1')).scalar() == 1
+
+    def test_worker_starts_outbox_delivery(self, app):
+        from serveur import preparer_worker
+        app.config['NOTIFICATION_OUTBOX_WORKER'] = True
+        preparer_worker(app)
+        worker = app.extensions['outbox_worker']
+        try:
+            assert worker.is_alive()
+        finally:
+            worker.arreter()
+            worker.join(5)
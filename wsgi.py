@@ -0,0 +1,8 @@
+"""
+Point d'entrée WSGI pour un serveur externe (ex. `gunicorn wsgi:app`, mod_wsgi).
+Le lanceur intégré est serveur.py.
+"""
+
+from app import create_app
+
+app = create_app()